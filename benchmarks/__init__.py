@@ -0,0 +1 @@
+"""Benchmarks 패키지 - 성능 측정 스크립트"""
@@ -0,0 +1,101 @@
+"""
+LLM Calls Benchmark
+
+요청 종류별(단순 질문/웹 검색/웹 검색 실패 후 LLM/메모리 조회)로 AIAgent.process_request가
+LLM을 몇 번 호출하는지 호출 지점별로 셉니다. 스크립트 백엔드와 로컬 검색 제공자를 사용하므로
+네트워크 없이 결정적으로 실행됩니다.
+
+결과 통합 단계에서 이미 답변인 단계 출력(웹 검색 요약 등)을 그대로 쓰는 경우(통합 생략)와
+항상 통합 LLM을 호출하는 경우(항상 통합)를 비교합니다.
+
+사용법:
+    uv run python -m benchmarks.llm_calls_benchmark
+"""
+
+import argparse
+import json
+import os
+import tempfile
+from collections import Counter
+
+REQUESTS = {
+    "simple_query": ["파이썬에서 리스트를 정렬하는 방법", "좋은 아침이야", "재귀 함수가 뭐야?"],
+    "web_search": ["내일 부산 날씨 알려줘", "서울 미세먼지 어때", "그거 언제 출시한다고 했지?"],
+    "web_search_fallback": ["내일 부산 날씨 알려줘", "오늘 코스피 지수"],
+    "memory_query": ["내가 좋아하는 음식 기억나?", "내 생일이 언제라고 했지?"],
+}
+
+LOCAL_DOCS = [
+    {"title": "부산 날씨", "snippet": "부산 내일 맑음, 최고 24도", "url": "https://weather.example.com/busan"},
+    {"title": "서울 미세먼지", "snippet": "서울 미세먼지 보통", "url": "https://air.example.com/seoul"},
+    {"title": "코스피 지수", "snippet": "코스피 2,600선 마감", "url": "https://finance.example.com/kospi"},
+    {"title": "신제품 출시일", "snippet": "신제품은 다음 달 출시 예정", "url": "https://news.example.com/launch"},
+]
+
+
+def make_responder(state: dict):
+    """프롬프트 종류에 맞는 스크립트 응답을 만드는 함수"""
+    def respond(kwargs: dict) -> str:
+        prompt = kwargs["messages"][-1]["content"]
+        if "의도를 파악하세요" in prompt:
+            return json.dumps({"intent": "question", "entities": {}, "confidence": 0.9})
+        if "작업 타입을 결정하세요" in prompt:
+            task_type = "web_search" if state["type"].startswith("web_search") else state["type"]
+            return json.dumps({"task_type": task_type, "reasoning": "", "requires_tools": [], "estimated_steps": 1})
+        if "기억해달라고 요청했는지" in prompt:
+            return json.dumps({"should_save": False})
+        if "최적의 검색어를 생성하세요" in prompt:
+            return json.dumps({"query": "신제품 출시일", "filters": {}})
+        return "스크립트 응답입니다."
+    return respond
+
+
+def main():
+    """벤치마크 실행"""
+    parser = argparse.ArgumentParser(description="요청 종류별 LLM 호출 수 벤치마크")
+    parser.add_argument("--types", nargs="+", default=list(REQUESTS), choices=list(REQUESTS))
+    args = parser.parse_args()
+
+    # 벤치마크가 실제 메모리/검색 캐시 파일을 오염시키지 않도록 임시 저장소 사용
+    workdir = tempfile.mkdtemp(prefix="miniviseo_llm_calls_")
+    os.environ["MEMORY_FILE"] = os.path.join(workdir, "memory.json")
+    os.environ["SESSION_ARCHIVE_DIR"] = os.path.join(workdir, "archive")
+    os.environ["SEARCH_CACHE_FILE"] = ""
+    os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+
+    from src.agent.core import AIAgent
+    from src.agent.synthesizer import ResultSynthesizer
+    from src.tools.search_cache import SearchCache
+    from src.tools.search_providers import LocalSearchProvider, SearchFanout
+    from src.tools.web_search import WebSearch
+    from src.utils.llm_backends import ScriptedBackend
+    from src.utils.openai_client import OpenAIClient, get_openai_client, set_openai_client
+
+    state = {"type": None}
+    set_openai_client(OpenAIClient(backend=ScriptedBackend(make_responder(state))))
+    agent = AIAgent()
+    client = get_openai_client()
+
+    print(f"{'요청 종류':<20} {'결과 통합':<9} {'요청당 LLM 호출':>14}  호출 지점별 (요청당)")
+    for request_type in args.types:
+        for mode, skip_answers in (("항상 통합", False), ("통합 생략", True)):
+            state["type"] = request_type
+            agent.synthesizer = ResultSynthesizer(skip_answers=skip_answers)
+            agent.executor.tool_router.web_search = WebSearch(
+                cache=SearchCache(cache_path=""),
+                fanout=SearchFanout([LocalSearchProvider(LOCAL_DOCS, fail=request_type == "web_search_fallback")])
+            )
+
+            sites = Counter()
+            for index, user_input in enumerate(REQUESTS[request_type]):
+                client.reset_call_stats()
+                agent.process_request(user_input, session_id=f"bench-{request_type}-{mode}-{index}")
+                sites.update({site: stats["calls"] for site, stats in client.get_call_stats().items()})
+
+            count = len(REQUESTS[request_type])
+            breakdown = ", ".join(f"{site} {calls / count:.1f}" for site, calls in sorted(sites.items()))
+            print(f"{request_type:<20} {mode:<9} {sum(sites.values()) / count:>14.2f}  {breakdown}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Search Result Parse Benchmark
+
+DuckDuckGo 결과 페이지 형식의 합성 HTML(결과 수, 결과 뒤 부가 마크업 크기를 바꿔 가며)을
+lxml pull 파서(필요한 결과 수를 채우면 중단)와 BeautifulSoup 전체 파싱으로 각각 처리해
+파싱 시간을 비교합니다.
+
+사용법:
+    uv run python -m benchmarks.parse_benchmark --results 10 30 --max-results 5
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks.routing_benchmark import percentile
+from src.tools.search_providers import _parse_duckduckgo_lxml, _parse_duckduckgo_soup
+
+RESULT_BLOCK = """<div class="result results_links results_links_deep web-result">
+<div class="links_main links_deep result__body"><h2 class="result__title">
+<a rel="nofollow" class="result__a" href="//duckduckgo.com/l/?uddg=https%3A%2F%2Fexample.com%2Fpage{i}&amp;rut=abc">검색 결과 제목 {i}</a></h2>
+<div class="result__extras"><div class="result__extras__url"><a class="result__url" href="https://example.com/page{i}">example.com/page{i}</a></div></div>
+<a class="result__snippet" href="https://example.com/page{i}">서울 날씨와 주간 예보, 미세먼지 정보를 확인하세요. 결과 {i}의 스니펫 텍스트입니다.</a>
+</div></div>
+"""
+
+
+def make_page(results: int, trailer_kb: int) -> bytes:
+    """결과 블록 + 결과 뒤 부가 마크업(페이지 이동, 스크립트 등)으로 이루어진 페이지"""
+    body = "".join(RESULT_BLOCK.format(i=i) for i in range(results))
+    trailer = "<div class=\"nav-link\"><form><input type=\"hidden\" name=\"s\" value=\"30\"></form></div>\n" * (trailer_kb * 10)
+    return f"<html><head><title>q</title></head><body><div id=\"links\">{body}</div>{trailer}</body></html>".encode("utf-8")
+
+
+def measure(parse, page: bytes, max_results: int, repeat: int) -> list:
+    """파싱 지연 시간 측정 (초)"""
+    latencies = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        parse(page, max_results)
+        latencies.append(time.perf_counter() - start_time)
+    return latencies
+
+
+def main():
+    """벤치마크 실행"""
+    parser = argparse.ArgumentParser(description="검색 결과 페이지 파싱 벤치마크")
+    parser.add_argument("--results", type=int, nargs="+", default=[10, 30], help="페이지의 결과 수")
+    parser.add_argument("--trailer-kb", type=int, default=20, help="결과 뒤 부가 마크업 크기 (KB)")
+    parser.add_argument("--max-results", type=int, default=5, help="필요한 결과 수")
+    parser.add_argument("--repeat", type=int, default=200, help="반복 횟수")
+    args = parser.parse_args()
+
+    parsers = {
+        "lxml": lambda page, n: _parse_duckduckgo_lxml(page, n, "utf-8"),
+        "bs4": _parse_duckduckgo_soup,
+    }
+    print(f"{'결과 수':>7} {'페이지(KB)':>10} {'파서':>5} {'중앙값(ms)':>11} {'p99(ms)':>9}")
+    for results in args.results:
+        page = make_page(results, args.trailer_kb)
+        for name, parse in parsers.items():
+            assert len(parse(page, args.max_results)) == min(results, args.max_results)
+            latencies = measure(parse, page, args.max_results, args.repeat)
+            print(f"{results:>7} {len(page) / 1024:>10.1f} {name:>5} "
+                  f"{statistics.median(latencies) * 1000:>11.3f} {percentile(latencies, 99) * 1000:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
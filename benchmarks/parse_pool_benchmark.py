@@ -0,0 +1,99 @@
+"""
+Parse Pool Benchmark
+
+큰 페이지 본문 추출을 여러 스레드에서 계속 돌리는 동안, 작은 결과 페이지를 파싱하는 가벼운 요청의
+지연 시간을 측정합니다. 본문 추출을 요청 스레드에서 하는 경우(inline)와 파싱 프로세스 풀로 보내는
+경우(pool)를 비교해, 큰 페이지가 GIL을 잡아 다른 요청이 밀리는 정도를 보여 줍니다.
+
+사용법:
+    uv run python -m benchmarks.parse_pool_benchmark --heavy-threads 4 --page-kb 2048
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+from benchmarks.parse_benchmark import make_page
+from benchmarks.routing_benchmark import percentile
+from src.tools.page_fetcher import extract_main_text
+from src.tools.parse_pool import ParsePool
+from src.tools.search_providers import DuckDuckGoHTMLProvider
+
+PARAGRAPH = "<p>서울은 내일 오전부터 비가 내리고 최고 기온은 18도로 평년보다 낮겠습니다. <b>주말</b>에는 맑겠습니다.</p>\n"
+
+
+def make_article(size_kb: int) -> bytes:
+    """본문 문단이 size_kb 정도 이어지는 기사 페이지"""
+    paragraph = PARAGRAPH.encode("utf-8")
+    count = size_kb * 1024 // len(paragraph) + 1
+    return b"<html><head><meta charset=\"utf-8\"></head><body><article>" + paragraph * count + b"</article></body></html>"
+
+
+def run(mode: str, pool: ParsePool, article: bytes, results_page: bytes, heavy_threads: int, duration: float) -> dict:
+    """
+    무거운 추출 스레드를 돌리면서 가벼운 요청 지연 시간 측정
+
+    Returns:
+        {"latencies": 가벼운 요청 지연 시간(초) 리스트, "heavy": 끝난 추출 수}
+    """
+    stop = threading.Event()
+    heavy_done = [0]
+    lock = threading.Lock()
+
+    def heavy():
+        while not stop.is_set():
+            if mode == "pool":
+                pool.run(extract_main_text, article, len(article))
+            else:
+                extract_main_text(article, len(article))
+            with lock:
+                heavy_done[0] += 1
+
+    threads = [threading.Thread(target=heavy, daemon=True) for _ in range(heavy_threads)]
+    for thread in threads:
+        thread.start()
+
+    latencies = []
+    end_time = time.perf_counter() + duration
+    while time.perf_counter() < end_time:
+        start_time = time.perf_counter()
+        DuckDuckGoHTMLProvider.parse(results_page, 5)
+        latencies.append(time.perf_counter() - start_time)
+        time.sleep(0.005)
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {"latencies": latencies, "heavy": heavy_done[0]}
+
+
+def main():
+    """벤치마크 실행"""
+    parser = argparse.ArgumentParser(description="파싱 프로세스 풀 동시 요청 지연 시간 벤치마크")
+    parser.add_argument("--heavy-threads", type=int, default=4, help="큰 페이지 본문을 추출하는 스레드 수")
+    parser.add_argument("--page-kb", type=int, default=2048, help="큰 페이지 크기 (KB)")
+    parser.add_argument("--workers", type=int, default=2, help="파싱 프로세스 수")
+    parser.add_argument("--duration", type=float, default=5.0, help="모드별 측정 시간 (초)")
+    args = parser.parse_args()
+
+    article = make_article(args.page_kb)
+    results_page = make_page(10, 0)
+    pool = ParsePool(max_workers=args.workers, task_timeout=30.0)
+    pool.start(wait=True)
+
+    print(f"큰 페이지 {len(article) / 1024:.0f}KB × 추출 스레드 {args.heavy_threads}개, 작업 프로세스 {args.workers}개")
+    print(f"{'모드':<7} {'가벼운 요청':>10} {'중앙값(ms)':>11} {'p99(ms)':>9} {'최대(ms)':>9} {'추출/초':>8}")
+    try:
+        for mode in ("inline", "pool"):
+            result = run(mode, pool, article, results_page, args.heavy_threads, args.duration)
+            latencies = result["latencies"]
+            print(f"{mode:<7} {len(latencies):>10} {statistics.median(latencies) * 1000:>11.2f} "
+                  f"{percentile(latencies, 99) * 1000:>9.2f} {max(latencies) * 1000:>9.2f} "
+                  f"{result['heavy'] / args.duration:>8.1f}")
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Pipeline Benchmark
+
+AIAgent.process_request 전체 파이프라인의 지연 시간과 요청당 LLM 호출 수를 측정합니다.
+LLM_BACKEND=replay 와 함께 실행하면 네트워크 없이 결정적으로 측정할 수 있습니다.
+
+사용법:
+    # 1. 실제 API로 한 번 기록
+    LLM_BACKEND=record uv run python -m benchmarks.pipeline_benchmark --requests requests.jsonl
+    # 2. 기록을 재생하여 반복 측정
+    LLM_BACKEND=replay LLM_REPLAY_JITTER=0.05 uv run python -m benchmarks.pipeline_benchmark --requests requests.jsonl
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.routing_benchmark import load_requests, percentile
+
+
+def main():
+    """벤치마크 실행"""
+    parser = argparse.ArgumentParser(description="에이전트 파이프라인 벤치마크")
+    parser.add_argument("--requests", required=True, help="요청 JSONL 파일")
+    parser.add_argument("--limit", type=int, default=None, help="최대 요청 수")
+    parser.add_argument("--rounds", type=int, default=1, help="반복 횟수")
+    args = parser.parse_args()
+
+    # 벤치마크가 실제 메모리 파일을 오염시키지 않도록 임시 저장소 사용
+    workdir = tempfile.mkdtemp(prefix="miniviseo_bench_")
+    os.environ["MEMORY_FILE"] = os.path.join(workdir, "memory.json")
+
+    from src.agent.core import AIAgent
+    from src.utils.openai_client import get_openai_client
+
+    requests = load_requests(args.requests, args.limit)
+    if not requests:
+        print("실행할 요청이 없습니다.")
+        return
+
+    agent = AIAgent()
+    client = get_openai_client()
+
+    latencies = []
+    llm_calls = []
+    for _ in range(args.rounds):
+        for user_input in requests:
+            client.reset_call_stats()
+            start_time = time.perf_counter()
+            agent.process_request(user_input)
+            latencies.append(time.perf_counter() - start_time)
+            llm_calls.append(sum(s["calls"] for s in client.get_call_stats().values()))
+
+    print(f"백엔드: {client.backend.name}, 요청 {len(requests)}개 × {args.rounds}회")
+    print(f"지연 시간: 평균 {statistics.mean(latencies):.3f}s, "
+          f"p50 {percentile(latencies, 50):.3f}s, p90 {percentile(latencies, 90):.3f}s")
+    print(f"LLM 호출 수: 요청당 평균 {statistics.mean(llm_calls):.2f}회, 최대 {max(llm_calls)}회")
+
+
+if __name__ == "__main__":
+    main()
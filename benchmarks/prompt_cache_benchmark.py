@@ -0,0 +1,99 @@
+"""
+Prompt Cache Benchmark
+
+도구 선택 프롬프트가 요청 간에 얼마나 긴 공통 prefix를 공유하는지 측정합니다.
+--live 옵션을 주면 실제 API를 호출하여 호출 지점별 캐시 토큰 비율을 보고합니다.
+
+사용법:
+    uv run python -m benchmarks.prompt_cache_benchmark --tools 50
+    uv run python -m benchmarks.prompt_cache_benchmark --tools 50 --live
+"""
+
+import argparse
+import os
+from typing import Dict, Any, List
+
+from src.prompts import get_system_prompt, get_tool_selection_prompt
+from src.utils.openai_client import get_openai_client
+
+SAMPLE_TASKS = [
+    "내일 오후 3시에 팀 회의 일정 추가해줘",
+    "오늘 할 일 목록 보여줘",
+    "이번 주 금요일 저녁 약속 등록해줘",
+    "방금 찾은 맛집 노션에 저장해줘",
+    "다음주 월요일 오전 10시 치과 예약 기록해줘",
+]
+
+SAMPLE_CONTEXTS = [
+    "",
+    "User: 내일 서울 날씨 알려줘\nAssistant: 내일 서울은 맑고 최고 기온 21도입니다.",
+    "User: 강남역 근처 맛집 찾아줘\nAssistant: A식당, B식당, C식당을 찾았습니다.",
+]
+
+
+def build_tool_catalog(num_tools: int) -> Dict[str, Dict[str, Any]]:
+    """합성 MCP 도구 카탈로그 생성"""
+    catalog = {}
+    for i in range(num_tools):
+        catalog[f"server{i % 3}.tool_{i:03d}"] = {
+            "name": f"tool_{i:03d}",
+            "description": f"예시 도구 {i}번: 외부 서비스의 {i}번째 기능을 호출합니다.",
+            "inputSchema": {
+                "properties": {
+                    "title": {"type": "string", "description": "항목 제목"},
+                    "date": {"type": "string", "description": "날짜 (YYYY-MM-DDTHH:MM:SS+09:00)"},
+                    "content": {"type": "string", "description": "상세 내용"},
+                },
+                "required": ["title"],
+            },
+        }
+    return catalog
+
+
+def render_prompts(catalog: Dict[str, Dict[str, Any]]) -> List[str]:
+    """여러 요청에 대한 도구 선택 프롬프트 렌더링"""
+    tools = list(catalog.keys())
+    prompts = []
+    for i, task in enumerate(SAMPLE_TASKS):
+        context = SAMPLE_CONTEXTS[i % len(SAMPLE_CONTEXTS)]
+        prompts.append(get_tool_selection_prompt(task, tools, catalog, context))
+    return prompts
+
+
+def main():
+    """벤치마크 실행"""
+    parser = argparse.ArgumentParser(description="프롬프트 prefix 캐시 벤치마크")
+    parser.add_argument("--tools", type=int, default=30, help="합성 도구 개수")
+    parser.add_argument("--live", action="store_true", help="실제 API 호출로 캐시 토큰 측정")
+    args = parser.parse_args()
+
+    catalog = build_tool_catalog(args.tools)
+    prompts = render_prompts(catalog)
+
+    system_prompt = get_system_prompt()
+    shared = [os.path.commonprefix([system_prompt + a, system_prompt + b]) for a, b in zip(prompts, prompts[1:])]
+    avg_total = sum(len(system_prompt + p) for p in prompts) / len(prompts)
+    avg_shared = sum(len(s) for s in shared) / len(shared)
+
+    print(f"도구 {args.tools}개, 요청 {len(prompts)}개")
+    print(f"평균 프롬프트 길이: {avg_total:.0f} 문자")
+    print(f"연속 요청 간 평균 공통 prefix: {avg_shared:.0f} 문자 ({avg_shared / avg_total:.1%})")
+
+    if not args.live:
+        return
+
+    client = get_openai_client()
+    client.reset_call_stats()
+    for prompt in prompts:
+        client.query_with_json(system_prompt=system_prompt, user_message=prompt, call_site="tool_selection")
+
+    print()
+    for site, stats in client.get_call_stats().items():
+        print(
+            f"[{site}] 호출 {stats['calls']}회, 프롬프트 토큰 {stats['prompt_tokens']}, "
+            f"캐시 토큰 {stats['cached_tokens']} ({stats['cached_ratio']:.1%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Archive Recall Benchmark
+
+합성 대화 N개로 아카이브 recall 색인을 만들고, 미리 심어 둔 사실을
+다른 표현의 질문으로 찾는 검색 지연 시간과 적중률을 측정합니다.
+
+사용법:
+    uv run python -m benchmarks.recall_benchmark --messages 100000
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.routing_benchmark import percentile
+from src.memory.recall_index import ArchiveRecallIndex
+
+FILLER_WORDS = (
+    "날씨 서울 부산 주식 환율 여행 맛집 영화 축구 야구 회의 일정 프로젝트 보고서 python 코드 "
+    "버그 배포 서버 데이터 가격 추천 예약 호텔 항공권 기차 뉴스 경제 금리 내일 오늘 회사 "
+    "점심 저녁 친구 가족 주말 운동 병원 알려줘 어때 찾아줘 정리해줘"
+).split()
+
+# (대화 중 말한 사실, 나중에 다시 묻는 질문)
+PLANTED_FACTS = [
+    ("다음 주 제주도 렌터카 예약 확인 부탁해", "제주도 렌터카 예약했었지?"),
+    ("우리 강아지 이름은 초코야", "강아지 이름이 뭐였지"),
+    ("지난번에 추천한 책은 사피엔스였어", "추천받은 책 제목 알려줘"),
+    ("내 노트북은 맥북 프로 14인치야", "노트북 기종이 뭐였더라"),
+    ("아내 생일은 3월 15일이야", "아내 생일 언제라고 했지"),
+    ("kubernetes 클러스터 업그레이드 일정 잡아줘", "쿠버네티스 업그레이드 일정"),
+    ("엄마가 좋아하는 꽃은 튤립", "엄마 좋아하는 꽃"),
+    ("회사 와이파이 비밀번호 바꿨어", "와이파이 비밀번호 변경"),
+    ("다이어트 중이라 저탄수화물 식단 하고 있어", "식단 뭐 하고 있다고 했지"),
+    ("도쿄 여행 숙소는 신주쿠 근처로 잡았어", "도쿄 숙소 어디였지"),
+]
+
+
+def main():
+    """벤치마크 실행"""
+    parser = argparse.ArgumentParser(description="아카이브 recall 색인 벤치마크")
+    parser.add_argument("--messages", type=int, default=100000, help="색인할 메시지 수")
+    parser.add_argument("--batch", type=int, default=50, help="한 번에 아카이브되는 메시지 수")
+    parser.add_argument("--rounds", type=int, default=20, help="질문 반복 횟수")
+    parser.add_argument("--top-k", type=int, default=3, help="검색 결과 수")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    planted_at = dict(zip(rng.sample(range(args.messages), len(PLANTED_FACTS)), PLANTED_FACTS))
+    index = ArchiveRecallIndex(tempfile.mkdtemp(prefix="miniviseo_recall_"))
+
+    start_time = time.perf_counter()
+    batch = []
+    for i in range(args.messages):
+        if i in planted_at:
+            content = planted_at[i][0]
+        else:
+            content = " ".join(rng.choices(FILLER_WORDS, k=rng.randint(4, 12)))
+        batch.append({"role": "user", "content": content, "timestamp": f"{i:09d}"})
+        if len(batch) >= args.batch:
+            index.add(batch)
+            batch = []
+    index.add(batch)
+    build_seconds = time.perf_counter() - start_time
+
+    # 재시작 직후 상황: 새 인스턴스의 첫 검색에서 역색인 정렬 배열 생성
+    index = ArchiveRecallIndex(str(index.index_dir))
+    start_time = time.perf_counter()
+    index.search("warm up")
+    first_search = time.perf_counter() - start_time
+
+    latencies = []
+    hits = 0
+    for _ in range(args.rounds):
+        for fact, question in PLANTED_FACTS:
+            start_time = time.perf_counter()
+            results = index.search(question, top_k=args.top_k)
+            latencies.append(time.perf_counter() - start_time)
+            hits += any(message["content"] == fact for message, _ in results)
+
+    stats = index.get_stats()
+    print(f"메시지 {stats['rows']}개, 디스크 {stats['disk_bytes'] / 1024 / 1024:.1f}MB, "
+          f"색인 추가 {build_seconds:.1f}s ({args.batch}개씩)")
+    print(f"첫 검색 (역색인 생성 포함): {first_search * 1000:.0f}ms")
+    print(f"검색 지연 시간: 평균 {statistics.mean(latencies) * 1000:.2f}ms, "
+          f"p50 {percentile(latencies, 50) * 1000:.2f}ms, p99 {percentile(latencies, 99) * 1000:.2f}ms")
+    print(f"적중률 (top-{args.top_k}): {hits / len(latencies):.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Model Routing Benchmark
+
+기록된 사용자 요청을 여러 모델 라우팅 프로필로 재실행하여
+계획 수립 지연 시간과 기준 프로필 대비 계획 일치율을 비교합니다.
+
+사용법:
+    uv run python -m benchmarks.routing_benchmark --profiles nano
+    uv run python -m benchmarks.routing_benchmark --requests requests.jsonl --limit 20
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Dict, Any, List, Tuple
+
+from src.agent.planner import AgentPlanner, ExecutionPlan
+from src.memory.storage import create_memory_storage
+from src.utils.config import config
+from src.utils.openai_client import get_openai_client
+
+
+def load_requests(requests_file: str = None, limit: int = None) -> List[str]:
+    """
+    기록된 사용자 요청 로드
+
+    Args:
+        requests_file: JSONL 파일 경로 (각 줄은 문자열 또는 {"user_input": ...})
+                       None이면 메모리 저장소의 사용자 메시지 사용
+        limit: 최대 요청 수
+
+    Returns:
+        사용자 입력 리스트
+    """
+    requests = []
+
+    if requests_file:
+        with open(requests_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if isinstance(record, dict):
+                    record = record.get("user_input", "")
+                if record:
+                    requests.append(record)
+    else:
+        storage = create_memory_storage()
+        for message in storage.get_session_memory():
+            if message.get("role") == "user" and message.get("content"):
+                requests.append(message["content"])
+
+    if limit:
+        requests = requests[-limit:]
+    return requests
+
+
+def plan_signature(plan: ExecutionPlan) -> Tuple:
+    """계획 비교용 시그니처 (작업 타입 + 단계별 도구)"""
+    return (
+        plan.task_type.value,
+        tuple((step.get("tool"), step.get("tool_name", "")) for step in plan.steps)
+    )
+
+
+def run_profile(planner: AgentPlanner, profile: str, requests: List[str]) -> Dict[str, Any]:
+    """
+    하나의 프로필로 모든 요청의 계획 수립 실행
+
+    Args:
+        planner: AgentPlanner 인스턴스
+        profile: 라우팅 프로필 이름 ("" 이면 기본 라우팅)
+        requests: 사용자 입력 리스트
+
+    Returns:
+        {"latencies": [...], "signatures": [...], "call_stats": {...}}
+    """
+    client = get_openai_client()
+    client.set_profile(profile)
+    client.reset_call_stats()
+
+    latencies = []
+    signatures = []
+    for user_input in requests:
+        start_time = time.perf_counter()
+        plan = planner.create_execution_plan(user_input)
+        latencies.append(time.perf_counter() - start_time)
+        signatures.append(plan_signature(plan))
+
+    return {
+        "latencies": latencies,
+        "signatures": signatures,
+        "call_stats": client.get_call_stats()
+    }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """백분위수 계산"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main():
+    """벤치마크 실행"""
+    parser = argparse.ArgumentParser(description="모델 라우팅 프로필 벤치마크")
+    parser.add_argument("--requests", help="요청 JSONL 파일 (기본: 메모리 저장소의 사용자 메시지)")
+    parser.add_argument("--profiles", nargs="*", help="비교할 프로필 (기본: 설정된 모든 프로필)")
+    parser.add_argument("--baseline", default="", help="기준 프로필 (기본: 기본 라우팅)")
+    parser.add_argument("--limit", type=int, default=None, help="최대 요청 수")
+    args = parser.parse_args()
+
+    requests = load_requests(args.requests, args.limit)
+    if not requests:
+        print("재실행할 요청이 없습니다.")
+        return
+
+    profiles = args.profiles
+    if profiles is None:
+        profiles = list(config.model_routes["profiles"].keys())
+    profiles = [args.baseline] + [p for p in profiles if p != args.baseline]
+
+    print(f"요청 {len(requests)}개, 프로필 {len(profiles)}개 벤치마크 시작")
+
+    planner = AgentPlanner()
+    results = {profile: run_profile(planner, profile, requests) for profile in profiles}
+    baseline = results[args.baseline]["signatures"]
+
+    print()
+    print(f"{'profile':<16}{'mean(s)':>10}{'p50(s)':>10}{'p90(s)':>10}{'agreement':>12}")
+    for profile, result in results.items():
+        latencies = result["latencies"]
+        agreement = sum(
+            1 for a, b in zip(result["signatures"], baseline) if a == b
+        ) / len(baseline)
+        print(
+            f"{profile or '(default)':<16}"
+            f"{statistics.mean(latencies):>10.3f}"
+            f"{percentile(latencies, 50):>10.3f}"
+            f"{percentile(latencies, 90):>10.3f}"
+            f"{agreement:>12.1%}"
+        )
+
+    print()
+    for profile, result in results.items():
+        print(f"[{profile or '(default)'}] 호출 지점별 통계")
+        for site, stats in result["call_stats"].items():
+            models = ", ".join(f"{m}×{n}" for m, n in stats["models"].items())
+            print(
+                f"  - {site}: {stats['calls']}회, 평균 {stats['avg_latency']:.3f}s, "
+                f"fallback {stats['fallbacks']}회 ({models})"
+            )
+
+
+if __name__ == "__main__":
+    main()
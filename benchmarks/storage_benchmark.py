@@ -0,0 +1,117 @@
+"""
+Memory Storage Benchmark
+
+세션 기록이 N개인 저장소를 백엔드별(json/binary/sqlite)로 만들고
+다시 열어 최근 메시지를 읽는 로드 지연 시간, 메시지 추가 지연 시간, 디스크 크기를 비교합니다.
+
+사용법:
+    uv run python -m benchmarks.storage_benchmark --sizes 1000 10000 100000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.routing_benchmark import percentile
+from src.memory.binary_storage import BinaryMemoryStorage
+from src.memory.sqlite_storage import SQLiteMemoryStorage
+from src.memory.storage import JSONMemoryStorage
+
+WORDS = "날씨 서울 주식 환율 여행 맛집 회의 일정 프로젝트 보고서 python 코드 배포 서버 데이터 추천 뉴스".split()
+
+BACKENDS = {
+    "json": lambda path, seed: JSONMemoryStorage(path),
+    "binary": lambda path, seed: BinaryMemoryStorage(path, migrate_from=seed),
+    "sqlite": lambda path, seed: SQLiteMemoryStorage(path, migrate_from=seed),
+}
+
+
+def make_messages(count: int, rng: random.Random) -> list:
+    """합성 대화 메시지 생성"""
+    return [
+        {
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": " ".join(rng.choices(WORDS, k=rng.randint(8, 40))),
+            "timestamp": f"2024-01-01T00:00:{i:09d}",
+            "metadata": {}
+        }
+        for i in range(count)
+    ]
+
+
+def disk_bytes(path: Path) -> int:
+    """저장소가 사용하는 파일 크기 합계 (보조 파일 포함)"""
+    files = [p for p in path.parent.iterdir() if p.name.startswith(path.name) and p.is_file()]
+    if path.is_dir():
+        files += [p for p in path.rglob("*") if p.is_file()]
+    return sum(p.stat().st_size for p in files)
+
+
+def run(backend: str, messages: list, workdir: Path, loads: int, appends: int) -> dict:
+    """백엔드 하나 측정"""
+    seed = workdir / "seed.json"
+    path = workdir / {"json": "memory.json", "binary": "memory.bin", "sqlite": "memory.db"}[backend]
+    if backend == "json":
+        path.write_text(seed.read_text(encoding="utf-8"), encoding="utf-8")
+    BACKENDS[backend](str(path), str(seed)).close()
+
+    # 로드: 새 인스턴스 생성 + 최근 10개 조회 (재시작 후 첫 요청)
+    load_latencies = []
+    for _ in range(loads):
+        start_time = time.perf_counter()
+        storage = BACKENDS[backend](str(path), str(seed))
+        storage.get_recent_session_memory(10)
+        load_latencies.append(time.perf_counter() - start_time)
+        storage.close()
+
+    # 추가: 메시지 하나씩 저장 (json은 주기적인 전체 스냅샷 저장 포함)
+    storage = BACKENDS[backend](str(path), str(seed))
+    append_latencies = []
+    for message in messages[:appends]:
+        start_time = time.perf_counter()
+        storage.add_session_memory(message)
+        append_latencies.append(time.perf_counter() - start_time)
+    storage.close()
+
+    return {
+        "load_ms": statistics.median(load_latencies) * 1000,
+        "append_ms": statistics.mean(append_latencies) * 1000,
+        "append_p99_ms": percentile(append_latencies, 99) * 1000,
+        "disk_mb": disk_bytes(path) / 1024 / 1024,
+    }
+
+
+def main():
+    """벤치마크 실행"""
+    parser = argparse.ArgumentParser(description="메모리 저장소 백엔드 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="세션 메시지 수")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--loads", type=int, default=5, help="로드 반복 횟수")
+    parser.add_argument("--appends", type=int, default=200, help="측정할 메시지 추가 횟수")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    extra = make_messages(args.appends, rng)
+    print(f"{'메시지':>8} {'백엔드':>7} {'로드(ms)':>10} {'추가 평균(ms)':>14} {'추가 p99(ms)':>13} {'디스크(MB)':>11}")
+    for size in args.sizes:
+        messages = make_messages(size, rng)
+        for backend in args.backends:
+            with tempfile.TemporaryDirectory(prefix="miniviseo_storage_") as tmp:
+                workdir = Path(tmp)
+                with open(workdir / "seed.json", "w", encoding="utf-8") as f:
+                    json.dump({
+                        "sessions": {"default": messages},
+                        "long_term_memory": {},
+                        "metadata": {}
+                    }, f, ensure_ascii=False, indent=2)
+                result = run(backend, extra, workdir, args.loads, args.appends)
+            print(f"{size:>8} {backend:>7} {result['load_ms']:>10.2f} {result['append_ms']:>14.3f} "
+                  f"{result['append_p99_ms']:>13.3f} {result['disk_mb']:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ CLI와 Web API에서 공통으로 사용됩니다.
 import traceback
 from src.utils.logger import setup_logger
 from src.agent import AgentPlanner, ChainExecutor, ResultSynthesizer
-from src.memory import SessionMemory, PersistentMemory
+from src.memory import MemoryNamespaces
 
 logger = setup_logger("agent_core")
 
@@ -24,17 +24,19 @@ class AIAgent:
         self.planner = AgentPlanner()
         self.executor = ChainExecutor()
         self.synthesizer = ResultSynthesizer()
-        self.session_memory = SessionMemory()
-        self.persistent_memory = PersistentMemory()
+        # 사용자/세션별 메모리 (LRU 캐시)
+        self.memory_namespaces = MemoryNamespaces()
         
         logger.info("AI Agent 초기화 완료")
     
-    def process_request(self, user_input: str) -> str:
+    def process_request(self, user_input: str, session_id: str = None, user_id: str = None) -> str:
         """
         사용자 요청 처리
         
         Args:
             user_input: 사용자 입력
+            session_id: 세션 ID (None이면 기본 세션)
+            user_id: 사용자 ID (None이면 기본 사용자)
         
         Returns:
             최종 응답
@@ -42,45 +44,52 @@ class AIAgent:
         logger.info(f"요청 처리 시작: {user_input[:50]}...")
         
         try:
-            # 0. 세션 메모리에 사용자 입력 저장
-            self.session_memory.add_message("user", user_input)
-            
-            # 1. 장기 메모리 자동 저장 분석
-            # 대화 이력을 조회 (최근 10개 턴)
-            conversation_history = self.session_memory.get_context_string(limit=10)
-            saved_memory = self.persistent_memory.analyze_and_remember(user_input, conversation_history)
-            if saved_memory:
-                logger.info(f"중요 정보 저장됨: {saved_memory}")
-            
-            # 2. 실행 계획 수립
-            # MCP 클라이언트에서 사용 가능한 도구 목록 및 스키마 가져오기
-            available_mcp_tools = []
-            mcp_client = self.executor.tool_router.mcp_client
-            for server_name in mcp_client.list_servers():
-                tools = mcp_client.get_available_tools(server_name)
-                # 서버 이름과 도구 이름을 조합하여 전달 (예: "notion.create_page")
-                available_mcp_tools.extend([f"{server_name}.{tool}" for tool in tools])
-            
-            # 도구 스키마 정보 가져오기
-            tools_schema = mcp_client.get_all_tools_schema()
-            
-            logger.info(f"사용 가능한 MCP 도구: {available_mcp_tools}")
-            # conversation_history는 위에서 조회됨
-            plan = self.planner.create_execution_plan(user_input, available_mcp_tools, tools_schema, conversation_history)
-            
-            # 3. 체인 실행
-            # conversation_history는 위에서 이미 조회됨
-            execution_result = self.executor.execute_chain(plan, user_input, conversation_history)
-            
-            # 4. 결과 통합 및 응답 생성
-            final_response = self.synthesizer.synthesize(user_input, execution_result)
-            
-            # 5. 세션 메모리에 응답 저장
-            self.session_memory.add_message("assistant", final_response)
-            
-            return final_response
-            
+            # 요청을 처리하는 동안 사용자 캐시에서 밀려나도 저장소를 닫지 않도록 참조를 잡음
+            with self.memory_namespaces.use(user_id, session_id) as (session_memory, persistent_memory):
+                return self._process(user_input, session_memory, persistent_memory)
         except Exception as e:
             logger.error(f"요청 처리 중 오류 발생: {e}")
             traceback.print_exc()
             return "죄송합니다. 시스템 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
+    
+    def _process(self, user_input: str, session_memory, persistent_memory) -> str:
+        """요청 처리 본체 (메모리는 호출한 쪽에서 잡고 있음)"""
+        # 0. 세션 메모리에 사용자 입력 저장
+        session_memory.add_message("user", user_input)
+        
+        # 1. 장기 메모리 자동 저장 분석
+        # 대화 이력 조회 (누적 요약 + 관련 과거 대화 + 최근 대화, 토큰 예산 안에서)
+        conversation_history = session_memory.get_context(query=user_input)
+        saved_memory = persistent_memory.analyze_and_remember(user_input, conversation_history)
+        if saved_memory:
+            logger.info(f"중요 정보 저장됨: {saved_memory}")
+        
+        # 2. 실행 계획 수립
+        # MCP 클라이언트에서 사용 가능한 도구 목록 및 스키마 가져오기
+        available_mcp_tools = []
+        mcp_client = self.executor.tool_router.mcp_client
+        for server_name in mcp_client.list_servers():
+            tools = mcp_client.get_available_tools(server_name)
+            # 서버 이름과 도구 이름을 조합하여 전달 (예: "notion.create_page")
+            available_mcp_tools.extend([f"{server_name}.{tool}" for tool in tools])
+        
+        # 도구 스키마 정보 가져오기
+        tools_schema = mcp_client.get_all_tools_schema()
+        
+        logger.info(f"사용 가능한 MCP 도구: {available_mcp_tools}")
+        # conversation_history는 위에서 조회됨
+        plan = self.planner.create_execution_plan(user_input, available_mcp_tools, tools_schema, conversation_history)
+        
+        # 3. 체인 실행
+        # conversation_history는 위에서 이미 조회됨
+        execution_result = self.executor.execute_chain(
+            plan, user_input, conversation_history, persistent_memory=persistent_memory
+        )
+        
+        # 4. 결과 통합 및 응답 생성
+        final_response = self.synthesizer.synthesize(user_input, execution_result)
+        
+        # 5. 세션 메모리에 응답 저장
+        session_memory.add_message("assistant", final_response)
+        
+        return final_response
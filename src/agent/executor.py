@@ -33,13 +33,16 @@ class StepResult:
         status: ExecutionStatus,
         output: Any = None,
         error: Optional[str] = None,
-        tool_used: Optional[str] = None
+        tool_used: Optional[str] = None,
+        is_answer: bool = False
     ):
         self.step_number = step_number
         self.status = status
         self.output = output
         self.error = error
         self.tool_used = tool_used
+        # 출력이 이미 사용자에게 보낼 답변인지 (결과 통합 LLM 호출 생략 판단용)
+        self.is_answer = is_answer
     
     def to_dict(self) -> Dict[str, Any]:
         """딕셔너리로 변환"""
@@ -48,7 +51,8 @@ class StepResult:
             "status": self.status.value,
             "output": self.output,
             "error": self.error,
-            "tool_used": self.tool_used
+            "tool_used": self.tool_used,
+            "is_answer": self.is_answer
         }
 
 
@@ -101,7 +105,8 @@ class ChainExecutor:
                     step_number=step_number,
                     status=ExecutionStatus.COMPLETED,
                     output=result,
-                    tool_used="llm"
+                    tool_used="llm",
+                    is_answer=True
                 )
             
             elif tool == "mcp":
@@ -120,8 +125,9 @@ class ChainExecutor:
                 return StepResult(
                     step_number=step_number,
                     status=ExecutionStatus.COMPLETED,
-                    output=result,
-                    tool_used="web_search"
+                    output=result["text"],
+                    tool_used="web_search",
+                    is_answer=result["is_answer"]
                 )
             
             elif tool == "memory":
@@ -142,7 +148,8 @@ class ChainExecutor:
                     step_number=step_number,
                     status=ExecutionStatus.COMPLETED,
                     output=result,
-                    tool_used="llm"
+                    tool_used="llm",
+                    is_answer=True
                 )
         
         except Exception as e:
@@ -175,7 +182,7 @@ class ChainExecutor:
              
         user_message += f"사용자 요청: {user_input}"
         
-        response = self.openai_client.simple_query(system_prompt, user_message)
+        response = self.openai_client.simple_query(system_prompt, user_message, call_site="llm_step")
         return response
     
     def _execute_mcp_step(
@@ -219,7 +226,8 @@ class ChainExecutor:
             prompt = get_tool_selection_prompt(task_desc, available_mcp_tools, tools_schema)
             selection_result = self.openai_client.query_with_json(
                 system_prompt=get_system_prompt(),
-                user_message=prompt
+                user_message=prompt,
+                call_site="tool_selection"
             )
             
             if selection_result:
@@ -269,7 +277,8 @@ class ChainExecutor:
                 param_prompt = get_mcp_tool_param_prompt(tool_name, tool_description, schema_str, enhanced_input)
                 new_params = self.openai_client.query_with_json(
                     system_prompt=get_system_prompt(),
-                    user_message=param_prompt
+                    user_message=param_prompt,
+                    call_site="mcp_params"
                 )
                 
                 if new_params:
@@ -291,15 +300,13 @@ class ChainExecutor:
         self,
         user_input: str,
         context: Dict[str, Any] = None
-    ) -> str:
-        """웹 검색 스텝 실행"""
+    ) -> Dict[str, Any]:
+        """웹 검색 스텝 실행 ({"text": 답변, "is_answer": 그대로 보낼 수 있는 답변인지})"""
         logger.info("웹 검색 스텝 실행")
         
         # Tool Router를 통해 호출
         # 파라미터가 없으면 빈 딕셔너리 전달 (Router가 쿼리 생성)
-        result = self.tool_router.route_tool_call("web_search", "search", {}, user_input)
-        
-        return str(result)
+        return self.tool_router.route_tool_call("web_search", "search", {}, user_input)
     
     def _execute_memory_step(
         self,
@@ -309,8 +316,11 @@ class ChainExecutor:
         """메모리 스텝 실행"""
         logger.info("메모리 스텝 실행")
         
-        # 장기 메모리 전체 조회 (또는 검색 로직 추가 가능)
-        memories = self.persistent_memory.get_memory_string()
+        # 요청한 사용자의 장기 메모리 사용 (없으면 기본 네임스페이스)
+        persistent_memory = (context or {}).get("persistent_memory") or self.persistent_memory
+        
+        # 사용자 입력과 관련된 상위 k개 메모리만 사용 (전체를 넣으면 프롬프트가 계속 커짐)
+        memories = persistent_memory.get_relevant_memory_string(user_input)
         
         return f"장기 메모리 조회 결과:\n{memories}"
     
@@ -318,7 +328,8 @@ class ChainExecutor:
         self,
         plan: ExecutionPlan,
         user_input: str,
-        conversation_history: str = None
+        conversation_history: str = None,
+        persistent_memory=None
     ) -> Dict[str, Any]:
         """
         전체 체인 실행
@@ -326,6 +337,8 @@ class ChainExecutor:
         Args:
             plan: 실행 계획
             user_input: 사용자 입력
+            conversation_history: 대화 이력 문자열
+            persistent_memory: 요청한 사용자의 장기 메모리 (None이면 기본 네임스페이스)
         
         Returns:
             실행 결과
@@ -341,7 +354,8 @@ class ChainExecutor:
         self.execution_history = []
         context = {
             "previous_results": [],
-            "conversation_history": conversation_history
+            "conversation_history": conversation_history,
+            "persistent_memory": persistent_memory
         }
         
         for step in plan.steps:
@@ -413,8 +427,9 @@ class ChainExecutor:
                 return StepResult(
                     step_number=failed_step.get("step", 0),
                     status=ExecutionStatus.FALLBACK,
-                    output=result,
-                    tool_used="web_search"
+                    output=result["text"],
+                    tool_used="web_search",
+                    is_answer=result["is_answer"]
                 )
             except Exception as e:
                 logger.error(f"웹 검색 fallback 실패: {e}")
@@ -428,7 +443,8 @@ class ChainExecutor:
                     step_number=failed_step.get("step", 0),
                     status=ExecutionStatus.FALLBACK,
                     output=result,
-                    tool_used="llm"
+                    tool_used="llm",
+                    is_answer=True
                 )
             except Exception as e:
                 logger.error(f"LLM fallback 실패: {e}")
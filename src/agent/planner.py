@@ -86,7 +86,8 @@ class AgentPlanner:
             prompt = get_intent_prompt(user_input)
             result = self.openai_client.query_with_json(
                 system_prompt=get_system_prompt(),
-                user_message=prompt
+                user_message=prompt,
+                call_site="intent"
             )
             
             if result:
@@ -130,7 +131,8 @@ class AgentPlanner:
             prompt = get_task_type_prompt(user_input)
             result = self.openai_client.query_with_json(
                 system_prompt=get_system_prompt(),
-                user_message=prompt
+                user_message=prompt,
+                call_site="task_type"
             )
             
             if result:
@@ -191,7 +193,8 @@ class AgentPlanner:
             prompt = get_tool_selection_prompt(task_description, available_mcp_tools, tools_schema, conversation_history)
             result = self.openai_client.query_with_json(
                 system_prompt=get_system_prompt(),
-                user_message=prompt
+                user_message=prompt,
+                call_site="tool_selection"
             )
             
             if result:
@@ -243,7 +246,8 @@ class AgentPlanner:
         try:
             result = self.openai_client.query_with_json(
                 system_prompt=get_system_prompt(),
-                user_message=prompt
+                user_message=prompt,
+                call_site="task_decomposition"
             )
             
             if result and "steps" in result:
@@ -15,9 +15,16 @@ logger = setup_logger("result_synthesizer")
 class ResultSynthesizer:
     """결과 통합 클래스"""
     
-    def __init__(self):
-        """초기화"""
+    def __init__(self, skip_answers: bool = True):
+        """
+        초기화
+        
+        Args:
+            skip_answers: 성공한 단계가 하나이고 그 출력이 이미 답변(LLM 응답, 웹 검색 요약)이면
+                          통합 LLM 호출 없이 그대로 반환
+        """
         self.openai_client = get_openai_client()
+        self.skip_answers = skip_answers
         logger.info("Result Synthesizer 초기화 완료")
     
     def synthesize(
@@ -47,6 +54,12 @@ class ResultSynthesizer:
             logger.info("단일 LLM 응답 반환")
             return str(final_output)
         
+        # 단계 출력이 이미 답변인 경우 (웹 검색 요약, 도구 실패 후 LLM fallback) 다시 쓰지 않음
+        succeeded = [step for step in steps if step.get("status") != "failed"]
+        if self.skip_answers and status == "completed" and len(succeeded) == 1 and succeeded[0].get("is_answer"):
+            logger.info(f"단계 답변 그대로 반환 ({succeeded[0]['tool_used']}), 결과 통합 생략")
+            return str(succeeded[0]["output"])
+        
         # 2. 오류 발생 시
         if status == "failed":
             logger.warning("실행 실패, 오류 메시지 생성")
@@ -66,7 +79,8 @@ class ResultSynthesizer:
             
             response = self.openai_client.simple_query(
                 system_prompt="당신은 실행 결과를 종합하여 사용자에게 명확하게 전달하는 AI 어시스턴트입니다.",
-                user_message=prompt
+                user_message=prompt,
+                call_site="synthesis"
             )
             
             logger.info("결과 통합 완료")
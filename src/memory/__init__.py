@@ -1,8 +1,21 @@
 """Memory 패키지 - 메모리 관리 (세션 및 장기 메모리)"""
 
-from .storage import MemoryStorage
+from .storage import MemoryStorage, JSONMemoryStorage, create_memory_storage, get_storage_stats
+from .sqlite_storage import SQLiteMemoryStorage
+from .binary_storage import BinaryMemoryStorage
 from .session import SessionMemory
 from .persistent import PersistentMemory
+from .namespaces import MemoryNamespaces
 
-__all__ = ['MemoryStorage', 'SessionMemory', 'PersistentMemory']
+__all__ = [
+    'MemoryStorage',
+    'JSONMemoryStorage',
+    'SQLiteMemoryStorage',
+    'BinaryMemoryStorage',
+    'create_memory_storage',
+    'get_storage_stats',
+    'SessionMemory',
+    'PersistentMemory',
+    'MemoryNamespaces'
+]
 
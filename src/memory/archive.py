@@ -0,0 +1,196 @@
+"""
+Session Archive
+
+세션 대화 창에서 밀려난 메시지를 보관하는 추가 전용 아카이브입니다.
+메시지는 활성 세그먼트(JSONL)에 추가되고, 세그먼트가 일정 크기를 넘으면
+gzip으로 압축된 봉인 세그먼트로 교체됩니다. 두 형식 모두 검색할 수 있습니다.
+보관된 메시지는 recall 색인(.recall/ 하위 디렉토리, 네임스페이스 디렉토리와 겹치지 않음)에도 증분 추가되어
+유사도 기반으로 다시 찾을 수 있습니다.
+같은 디렉토리를 여러 워커 프로세스가 함께 쓰므로 추가/봉인은 파일 잠금 안에서 합니다.
+"""
+
+import gzip
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Iterator, Tuple
+
+from src.memory.locking import FileLock
+from src.memory.recall_index import ArchiveRecallIndex
+from src.utils.logger import setup_logger
+
+logger = setup_logger("session_archive")
+
+ACTIVE_SEGMENT = "active.jsonl"
+SEGMENT_PATTERN = "segment-*.jsonl.gz"
+RECALL_DIR = ".recall"
+LOCK_FILE = ".lock"
+
+
+class SessionArchive:
+    """압축 세그먼트 기반 세션 아카이브"""
+    
+    def __init__(self, archive_dir: str = "data/archive", segment_bytes: int = 1024 * 1024):
+        """
+        초기화
+        
+        Args:
+            archive_dir: 아카이브 디렉토리
+            segment_bytes: 활성 세그먼트를 압축·봉인하는 크기 (바이트)
+        """
+        self.archive_dir = Path(archive_dir)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(str(self.archive_dir / LOCK_FILE))
+        self._recall_index = None
+    
+    @property
+    def active_path(self) -> Path:
+        """활성 세그먼트 경로"""
+        return self.archive_dir / ACTIVE_SEGMENT
+    
+    def _sealed_segments(self) -> List[Path]:
+        """봉인된 세그먼트 목록 (오래된 순)"""
+        return sorted(self.archive_dir.glob(SEGMENT_PATTERN))
+    
+    def append(self, messages: List[Dict[str, Any]]):
+        """
+        메시지 보관
+        
+        Args:
+            messages: 보관할 메시지 리스트 (오래된 순)
+        """
+        if not messages:
+            return
+        
+        lines = "".join(json.dumps(message, ensure_ascii=False) + "\n" for message in messages)
+        # 색인이 없던 기존 아카이브의 백필은 이번 메시지를 쓰기 전에 끝냄 (중복 색인 방지)
+        recall_index = self.recall_index
+        with self._file_lock.acquire(), self._lock:
+            with open(self.active_path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            
+            if self.active_path.stat().st_size >= self.segment_bytes:
+                self._seal()
+        
+        recall_index.add(messages)
+        logger.debug(f"메시지 {len(messages)}개 아카이브")
+    
+    def _seal(self):
+        """활성 세그먼트를 압축된 봉인 세그먼트로 교체 (파일 잠금과 lock 안에서 호출)"""
+        sealed = self._sealed_segments()
+        next_index = int(sealed[-1].name.split("-")[1].split(".")[0]) + 1 if sealed else 1
+        segment_path = self.archive_dir / f"segment-{next_index:06d}.jsonl.gz"
+        temp_path = segment_path.with_suffix(".tmp")
+        
+        with open(self.active_path, 'rb') as src, gzip.open(temp_path, 'wb') as dst:
+            dst.write(src.read())
+        os.replace(temp_path, segment_path)
+        self.active_path.unlink()
+        
+        logger.info(f"아카이브 세그먼트 봉인: {segment_path.name}")
+    
+    def _iter_segment(self, path: Path) -> Iterator[Dict[str, Any]]:
+        """세그먼트의 메시지 순회"""
+        opener = gzip.open if path.suffix == ".gz" else open
+        try:
+            with opener(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
+        except FileNotFoundError:
+            return
+    
+    def iter_messages(self) -> Iterator[Dict[str, Any]]:
+        """보관된 모든 메시지 순회 (오래된 순)"""
+        with self._lock:
+            paths = self._sealed_segments()
+            if self.active_path.exists():
+                paths.append(self.active_path)
+        
+        for path in paths:
+            yield from self._iter_segment(path)
+    
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        키워드 검색
+        
+        Args:
+            query: 검색어 (공백으로 구분된 모든 단어를 포함하는 메시지)
+            limit: 최대 결과 수
+        
+        Returns:
+            일치하는 메시지 리스트 (최신 순)
+        """
+        terms = [term.lower() for term in query.split() if term]
+        if not terms:
+            return []
+        
+        matches = []
+        for message in self.iter_messages():
+            content = str(message.get("content", "")).lower()
+            if all(term in content for term in terms):
+                matches.append(message)
+                if len(matches) > limit:
+                    matches.pop(0)
+        
+        return list(reversed(matches))
+    
+    @property
+    def recall_index(self) -> ArchiveRecallIndex:
+        """recall 색인 (처음 사용할 때 열고, 색인이 없던 기존 아카이브는 한 번 백필)"""
+        if self._recall_index is None:
+            # 다른 프로세스와 백필이 겹치지 않도록 파일 잠금 안에서 색인 디렉토리 확인
+            with self._file_lock.acquire(), self._lock:
+                if self._recall_index is None:
+                    index_dir = self.archive_dir / RECALL_DIR
+                    needs_backfill = not index_dir.exists()
+                    index = ArchiveRecallIndex(str(index_dir))
+                    if needs_backfill:
+                        paths = self._sealed_segments()
+                        if self.active_path.exists():
+                            paths.append(self.active_path)
+                        batch = []
+                        for path in paths:
+                            for message in self._iter_segment(path):
+                                batch.append(message)
+                                if len(batch) >= 1000:
+                                    index.add(batch)
+                                    batch = []
+                        index.add(batch)
+                        if len(index):
+                            logger.info(f"recall 색인 백필: 메시지 {len(index)}개")
+                    self._recall_index = index
+        return self._recall_index
+    
+    def recall(self, query: str, top_k: int = 3, min_score: float = 0.0) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        유사도 기반 검색
+        
+        Args:
+            query: 검색어 (현재 요청 등)
+            top_k: 최대 결과 수
+            min_score: 최소 유사도
+        
+        Returns:
+            [(메시지, 유사도)] 유사도 내림차순
+        """
+        return self.recall_index.search(query, top_k=top_k, min_score=min_score)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """아카이브 통계 (세그먼트 수, 디스크 사용량, recall 색인 크기)"""
+        with self._lock:
+            sealed = self._sealed_segments()
+            active_bytes = self.active_path.stat().st_size if self.active_path.exists() else 0
+            stats = {
+                "sealed_segments": len(sealed),
+                "sealed_bytes": sum(path.stat().st_size for path in sealed),
+                "active_bytes": active_bytes
+            }
+        stats["recall_index"] = self.recall_index.get_stats()
+        return stats
@@ -0,0 +1,463 @@
+"""
+Binary Memory Storage
+
+길이 접두(length-prefixed) 레코드 기반의 압축 바이너리 메모리 저장소입니다.
+
+저장 디렉토리 구성:
+    state.json              장기 메모리, 세션 요약, 세션별 파일/시작 행 (작은 문서, 원자적 교체)
+    sessions/<세션>.rec      [u32 길이][레코드] 가 이어진 추가 전용 메시지 로그
+    sessions/<세션>.idx      레코드 시작 위치 uint64 배열
+
+레코드는 msgpack이 설치되어 있으면 msgpack, 아니면 공백 없는 JSON으로 인코딩합니다.
+최근 메시지 조회는 위치 배열과 메시지 로그를 memory-map하여 필요한 레코드만 디코딩하므로
+전체 기록을 파싱하는 JSON 스냅샷과 달리 기록 길이와 무관하게 빠릅니다.
+창 밖으로 잘린 앞부분은 시작 행만 옮겨 두었다가, 충분히 쌓이면 새 파일로 다시 씁니다.
+"""
+
+import json
+import mmap
+import os
+import struct
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
+
+import numpy as np
+
+from src.memory.locking import FileLock
+from src.memory.storage import MemoryStorage, DEFAULT_NAMESPACE, namespace_dirname, trim_count
+from src.utils.logger import setup_logger
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성: 없으면 JSON 레코드 사용
+    msgpack = None
+
+logger = setup_logger("binary_storage")
+
+STATE_FILE = "state.json"
+SESSIONS_DIR = "sessions"
+RECORD_HEADER = struct.Struct("<I")
+OFFSET_DTYPE = np.dtype("<u8")
+
+# 잘려 나간 행이 이 수 이상이고 전체의 절반 이상이면 세션 파일을 다시 씀
+COMPACT_MIN_DEAD_ROWS = 1024
+
+
+def _encode(codec: str, record: Dict[str, Any]) -> bytes:
+    """레코드 인코딩"""
+    if codec == "msgpack":
+        return msgpack.packb(record, use_bin_type=True)
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _decode(codec: str, buffer) -> Dict[str, Any]:
+    """레코드 디코딩 (msgpack은 mmap 버퍼를 복사 없이 읽음)"""
+    if codec == "msgpack":
+        return msgpack.unpackb(buffer, raw=False)
+    return json.loads(bytes(buffer))
+
+
+class BinaryMemoryStorage(MemoryStorage):
+    """길이 접두 레코드 + memory-map 읽기 기반 메모리 저장소"""
+    
+    def __init__(self, storage_path: str = "data/memory.bin", migrate_from: str = None):
+        """
+        초기화
+        
+        Args:
+            storage_path: 저장 디렉토리 경로
+            migrate_from: 처음 생성 시 가져올 JSON 메모리 파일 경로 (한 번만 수행)
+        """
+        self.storage_path = Path(storage_path)
+        self.sessions_dir = self.storage_path / SESSIONS_DIR
+        self.sessions_dir.mkdir(parents=True, exist_ok=True)
+        self.state_path = self.storage_path / STATE_FILE
+        
+        self._file_lock = FileLock(str(self.storage_path.with_name(self.storage_path.name + ".lock")))
+        self._state: Dict[str, Any] = {}
+        self._state_id = None
+        
+        with self._file_lock.acquire(exclusive=True):
+            if not self.state_path.exists():
+                self._state = self._initial_state()
+                self._write_state()
+            self._load_state()
+            if self.codec == "msgpack" and msgpack is None:
+                raise RuntimeError(f"{self.storage_path}는 msgpack 형식입니다. msgpack 패키지를 설치하세요.")
+            # 비정상 종료로 어긋난 메시지 로그와 위치 배열 복구
+            for session_id in self._state["sessions"]:
+                self._repair(session_id)
+            if migrate_from:
+                self._migrate_from_json(Path(migrate_from))
+        
+        logger.info(f"바이너리 메모리 저장소 초기화: {self.storage_path} (레코드 형식: {self.codec})")
+    
+    @staticmethod
+    def _initial_state() -> Dict[str, Any]:
+        """초기 상태 문서"""
+        return {
+            "codec": "msgpack" if msgpack is not None else "json",
+            "sessions": {},
+            "long_term_memory": {},
+            "long_term_metadata": {},
+            "metadata": {"created_at": datetime.now().isoformat()}
+        }
+    
+    @property
+    def codec(self) -> str:
+        """레코드 인코딩 형식"""
+        return self._state["codec"]
+    
+    def _load_state(self):
+        """상태 문서가 (다른 프로세스에 의해) 교체되었으면 다시 로드 (잠금 안에서 호출)"""
+        stat = self.state_path.stat()
+        state_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if state_id != self._state_id:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self._state = json.load(f)
+            self._state_id = state_id
+    
+    def _write_state(self):
+        """상태 문서를 임시 파일 + fsync + rename으로 원자적으로 저장 (배타 잠금 안에서 호출)"""
+        temp_path = self.state_path.with_name(STATE_FILE + ".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._state, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.state_path)
+        stat = self.state_path.stat()
+        self._state_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    
+    # ------------------------------------------------------------------
+    # 세션 메시지 로그
+    # ------------------------------------------------------------------
+    
+    def _paths(self, entry: Dict[str, Any]) -> tuple:
+        """세션의 (메시지 로그, 위치 배열) 경로"""
+        return self.sessions_dir / (entry["file"] + ".rec"), self.sessions_dir / (entry["file"] + ".idx")
+    
+    def _rows(self, entry: Dict[str, Any]) -> int:
+        """세션 로그의 전체 행 수 (잘려 나간 앞부분 포함)"""
+        _, idx_path = self._paths(entry)
+        try:
+            return idx_path.stat().st_size // OFFSET_DTYPE.itemsize
+        except FileNotFoundError:
+            return 0
+    
+    def _ensure_session(self, session_id: str) -> Dict[str, Any]:
+        """세션 항목 생성 (배타 잠금 안에서 호출)"""
+        entry = self._state["sessions"].get(session_id)
+        if entry is None:
+            entry = {"file": f"{namespace_dirname(session_id)}-0", "generation": 0, "start": 0, "summary": None}
+            self._state["sessions"][session_id] = entry
+            self._write_state()
+        return entry
+    
+    def _read(self, entry: Dict[str, Any], start: int, end: int) -> List[Dict[str, Any]]:
+        """
+        [start, end) 행의 메시지 디코딩 (잠금 안에서 호출)
+        
+        위치 배열과 메시지 로그를 memory-map하여 요청한 행의 레코드만 읽습니다.
+        """
+        if end <= start:
+            return []
+        rec_path, idx_path = self._paths(entry)
+        offsets = np.memmap(idx_path, dtype=OFFSET_DTYPE, mode="r", shape=(end,))[start:end]
+        codec = self.codec
+        messages = []
+        with open(rec_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                for offset in offsets.tolist():
+                    (length,) = RECORD_HEADER.unpack_from(mapped, offset)
+                    body = view[offset + RECORD_HEADER.size:offset + RECORD_HEADER.size + length]
+                    messages.append(_decode(codec, body))
+                    body.release()
+        return messages
+    
+    def _append(self, entry: Dict[str, Any], messages: List[Dict[str, Any]]):
+        """
+        메시지 추가 (배타 잠금 안에서 호출)
+        
+        메시지 로그를 먼저 fsync하고 위치 배열을 나중에 씁니다.
+        위치 배열이 누락된 레코드는 다음 실행 시 _repair()가 로그를 읽어 복구합니다.
+        """
+        rec_path, idx_path = self._paths(entry)
+        codec = self.codec
+        offsets = []
+        with open(rec_path, 'ab') as f:
+            position = f.tell()
+            for message in messages:
+                body = _encode(codec, message)
+                f.write(RECORD_HEADER.pack(len(body)))
+                f.write(body)
+                offsets.append(position)
+                position += RECORD_HEADER.size + len(body)
+            f.flush()
+            os.fsync(f.fileno())
+        with open(idx_path, 'ab') as f:
+            f.write(np.asarray(offsets, dtype=OFFSET_DTYPE).tobytes())
+    
+    def _repair(self, session_id: str):
+        """
+        메시지 로그와 위치 배열 일치시키기 (배타 잠금 안에서 호출)
+        
+        끝이 잘린 레코드는 버리고, 로그에는 있지만 위치 배열에 없는 레코드는 위치를 추가합니다.
+        """
+        entry = self._state["sessions"][session_id]
+        rec_path, idx_path = self._paths(entry)
+        rec_size = rec_path.stat().st_size if rec_path.exists() else 0
+        rows = self._rows(entry)
+        offsets = np.fromfile(idx_path, dtype=OFFSET_DTYPE, count=rows) if rows else np.zeros(0, OFFSET_DTYPE)
+        
+        with open(rec_path, 'ab+') as rec:
+            def record_end(offset: int) -> Optional[int]:
+                """offset에서 시작하는 레코드의 끝 위치 (불완전하면 None)"""
+                if offset + RECORD_HEADER.size > rec_size:
+                    return None
+                rec.seek(offset)
+                (length,) = RECORD_HEADER.unpack(rec.read(RECORD_HEADER.size))
+                end = offset + RECORD_HEADER.size + length
+                return end if end <= rec_size else None
+            
+            # 위치 배열 끝에서부터 완전한 레코드를 가리키는 행까지 되돌림
+            valid_rows = len(offsets)
+            position = 0
+            while valid_rows:
+                end = record_end(int(offsets[valid_rows - 1]))
+                if end is not None:
+                    position = end
+                    break
+                valid_rows -= 1
+            
+            # 위치 배열 이후에 기록된 완전한 레코드 찾기
+            extra = []
+            while True:
+                end = record_end(position)
+                if end is None:
+                    break
+                extra.append(position)
+                position = end
+            
+            if valid_rows == len(offsets) and not extra and position == rec_size \
+                    and idx_path.exists() and idx_path.stat().st_size == rows * OFFSET_DTYPE.itemsize:
+                return
+            rec.truncate(position)
+        
+        repaired = np.concatenate((offsets[:valid_rows], np.asarray(extra, dtype=OFFSET_DTYPE)))
+        with open(idx_path, 'wb') as f:
+            f.write(repaired.astype(OFFSET_DTYPE).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        logger.warning(f"세션 로그 복구: {session_id} ({len(offsets)}행 → {len(repaired)}행)")
+    
+    def _compact(self, session_id: str, entry: Dict[str, Any]):
+        """
+        잘려 나간 앞부분을 제외하고 세션 파일을 새 세대로 다시 쓰기 (배타 잠금 안에서 호출)
+        
+        새 파일을 모두 쓴 뒤 상태 문서를 교체하고 이전 파일을 지우므로 중간에 중단돼도 안전합니다.
+        """
+        rows = self._rows(entry)
+        old_paths = self._paths(entry)
+        live = self._read(entry, entry["start"], rows)
+        
+        generation = entry.get("generation", 0) + 1
+        new_entry = dict(entry, file=f"{namespace_dirname(session_id)}-{generation}", generation=generation, start=0)
+        for path in self._paths(new_entry):
+            path.unlink(missing_ok=True)
+        self._append(new_entry, live)
+        
+        self._state["sessions"][session_id] = new_entry
+        self._write_state()
+        for path in old_paths:
+            path.unlink(missing_ok=True)
+        logger.debug(f"세션 로그 재작성: {session_id} ({rows}행 → {len(live)}행)")
+    
+    def get_session_memory(self, session_id: str = DEFAULT_NAMESPACE) -> list:
+        """세션 메모리 가져오기"""
+        with self._file_lock.acquire(exclusive=False):
+            self._load_state()
+            entry = self._state["sessions"].get(session_id)
+            if entry is None:
+                return []
+            return self._read(entry, entry["start"], self._rows(entry))
+    
+    def get_recent_session_memory(self, limit: int, session_id: str = DEFAULT_NAMESPACE) -> list:
+        """최근 세션 메시지 가져오기 (마지막 limit개 레코드만 디코딩)"""
+        if limit <= 0:
+            return []
+        with self._file_lock.acquire(exclusive=False):
+            self._load_state()
+            entry = self._state["sessions"].get(session_id)
+            if entry is None:
+                return []
+            rows = self._rows(entry)
+            return self._read(entry, max(entry["start"], rows - limit), rows)
+    
+    def add_session_memory(self, message: Dict[str, Any], session_id: str = DEFAULT_NAMESPACE):
+        """세션 메모리에 메시지 추가"""
+        with self._file_lock.acquire(exclusive=True):
+            self._load_state()
+            self._append(self._ensure_session(session_id), [message])
+    
+    def trim_session_memory(
+        self, keep: int, session_id: str = DEFAULT_NAMESPACE, before: Optional[str] = None,
+        on_remove: Optional[Callable[[list], None]] = None
+    ) -> list:
+        """최근 keep개만 남기고 앞부분 제거 (제거된 메시지 반환)"""
+        with self._file_lock.acquire(exclusive=True):
+            self._load_state()
+            entry = self._state["sessions"].get(session_id)
+            if entry is None:
+                return []
+            rows = self._rows(entry)
+            new_start = max(rows - max(keep, 0), entry["start"])
+            if new_start == entry["start"]:
+                return []
+            removed = self._read(entry, entry["start"], new_start)
+            if before is not None:
+                removed = removed[:trim_count(removed, 0, before)]
+                new_start = entry["start"] + len(removed)
+                if not removed:
+                    return []
+            if on_remove is not None:
+                on_remove(removed)
+            entry["start"] = new_start
+            if new_start >= COMPACT_MIN_DEAD_ROWS and new_start * 2 >= rows:
+                self._compact(session_id, entry)
+            else:
+                self._write_state()
+            return removed
+    
+    def clear_session_memory(self, session_id: str = DEFAULT_NAMESPACE):
+        """세션 메모리 초기화"""
+        with self._file_lock.acquire(exclusive=True):
+            self._load_state()
+            entry = self._state["sessions"].pop(session_id, None)
+            if entry is None:
+                return
+            self._write_state()
+            for path in self._paths(entry):
+                path.unlink(missing_ok=True)
+    
+    def get_session_summary(self, session_id: str = DEFAULT_NAMESPACE) -> Optional[Dict[str, Any]]:
+        """세션의 누적 대화 요약 가져오기"""
+        with self._file_lock.acquire(exclusive=False):
+            self._load_state()
+            entry = self._state["sessions"].get(session_id)
+            summary = entry.get("summary") if entry else None
+            return dict(summary) if summary else None
+    
+    def set_session_summary(self, summary: Dict[str, Any], session_id: str = DEFAULT_NAMESPACE):
+        """세션의 누적 대화 요약 저장"""
+        with self._file_lock.acquire(exclusive=True):
+            self._load_state()
+            self._ensure_session(session_id)["summary"] = summary
+            self._write_state()
+    
+    # ------------------------------------------------------------------
+    # 장기 메모리 (상태 문서에 저장)
+    # ------------------------------------------------------------------
+    
+    def get_long_term_memory(self, key: str = None) -> Any:
+        """장기 메모리 가져오기 (key가 None이면 전체 반환)"""
+        with self._file_lock.acquire(exclusive=False):
+            self._load_state()
+            long_term = self._state["long_term_memory"]
+            if key is None:
+                return dict(long_term)
+            return long_term.get(key)
+    
+    def set_long_term_memory(self, key: str, value: Any, expires_at: Optional[str] = None):
+        """장기 메모리 설정"""
+        now = datetime.now().isoformat()
+        with self._file_lock.acquire(exclusive=True):
+            self._load_state()
+            self._state["long_term_memory"][key] = value
+            meta = self._state["long_term_metadata"].setdefault(key, {"created_at": now, "hits": 0, "last_hit": None})
+            meta["updated_at"] = now
+            meta["expires_at"] = expires_at
+            self._write_state()
+    
+    def remove_long_term_memory(self, key: str):
+        """장기 메모리 삭제"""
+        with self._file_lock.acquire(exclusive=True):
+            self._load_state()
+            if key in self._state["long_term_memory"]:
+                del self._state["long_term_memory"][key]
+                self._state["long_term_metadata"].pop(key, None)
+                self._write_state()
+    
+    def get_long_term_metadata(self) -> Dict[str, Dict[str, Any]]:
+        """장기 메모리 항목별 메타데이터 가져오기"""
+        with self._file_lock.acquire(exclusive=False):
+            self._load_state()
+            metadata = self._state["long_term_metadata"]
+            return {key: dict(metadata.get(key, {})) for key in self._state["long_term_memory"]}
+    
+    def update_long_term_metadata(self, updates: Dict[str, Dict[str, Any]]):
+        """장기 메모리 메타데이터 갱신 (없는 키는 무시)"""
+        if not updates:
+            return
+        with self._file_lock.acquire(exclusive=True):
+            self._load_state()
+            for key, fields in updates.items():
+                if key in self._state["long_term_memory"]:
+                    self._state["long_term_metadata"].setdefault(key, {}).update(fields)
+            self._write_state()
+    
+    def get_long_term_version(self) -> Any:
+        """장기 메모리 변경 확인용 버전 (장기 메모리를 담은 상태 문서의 식별자)"""
+        with self._file_lock.acquire(exclusive=False):
+            self._load_state()
+            return self._state_id
+    
+    def _migrate_from_json(self, json_path: Path):
+        """
+        JSON 메모리 파일을 한 번만 가져오기 (배타 잠금 안에서 호출)
+        
+        Args:
+            json_path: JSON 메모리 파일 경로
+        """
+        if self._state["metadata"].get("migrated_from") is not None or not json_path.exists():
+            return
+        
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"JSON 메모리 마이그레이션 실패 ({json_path}): {e}")
+            return
+        
+        sessions = dict(data.get("sessions", {}))
+        if "session_memory" in data:
+            sessions.setdefault(DEFAULT_NAMESPACE, data["session_memory"])
+        for session_id, messages in sessions.items():
+            if messages:
+                self._append(self._ensure_session(session_id), messages)
+        for session_id, summary in data.get("summaries", {}).items():
+            self._ensure_session(session_id)["summary"] = summary
+        self._state["long_term_memory"].update(data.get("long_term_memory", {}))
+        self._state["long_term_metadata"].update(data.get("long_term_metadata", {}))
+        self._state["metadata"]["migrated_from"] = str(json_path)
+        self._write_state()
+        
+        logger.info(
+            f"JSON 메모리 마이그레이션 완료: 메시지 {sum(len(m) for m in sessions.values())}개, "
+            f"장기 메모리 {len(data.get('long_term_memory', {}))}개 ({json_path})"
+        )
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """저장소 통계 (디스크 사용량, 잠금 경합 포함)"""
+        return {
+            "backend": "binary",
+            "path": str(self.storage_path),
+            "codec": self.codec,
+            "disk_bytes": sum(path.stat().st_size for path in self.sessions_dir.iterdir())
+                          + self.state_path.stat().st_size,
+            "lock": self._file_lock.stats.to_dict()
+        }
+    
+    def close(self):
+        """파일 잠금 해제"""
+        self._file_lock.close()
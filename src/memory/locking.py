@@ -0,0 +1,141 @@
+"""
+Storage Locking
+
+메모리 저장소용 프로세스 간 advisory 파일 잠금과 잠금 경합 통계를 제공합니다.
+같은 데이터 디렉토리를 여러 uvicorn 워커가 함께 사용할 때 쓰기를 직렬화합니다.
+fcntl을 지원하지 않는 플랫폼에서는 프로세스 내부 잠금만 사용합니다.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class LockStats:
+    """잠금 획득 횟수, 경합 횟수, 대기 시간 통계"""
+
+    def __init__(self):
+        """초기화"""
+        self._lock = threading.Lock()
+        self.acquisitions = 0
+        self.contended = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, contended: bool):
+        """
+        잠금 획득 기록
+
+        Args:
+            wait: 획득까지 대기한 시간 (초)
+            contended: 즉시 획득하지 못하고 기다렸는지 여부
+        """
+        with self._lock:
+            self.acquisitions += 1
+            if contended:
+                self.contended += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """통계 딕셔너리"""
+        with self._lock:
+            return {
+                "acquisitions": self.acquisitions,
+                "contended": self.contended,
+                "contention_ratio": self.contended / self.acquisitions if self.acquisitions else 0.0,
+                "avg_wait_ms": self.total_wait / self.contended * 1000 if self.contended else 0.0,
+                "max_wait_ms": self.max_wait * 1000
+            }
+
+
+class FileLock:
+    """
+    재진입 가능한 프로세스 간 파일 잠금 (fcntl.flock)
+
+    같은 프로세스의 스레드는 내부 RLock으로 직렬화하고,
+    가장 바깥쪽 획득에서만 잠금 파일에 flock을 겁니다.
+    """
+
+    def __init__(self, lock_path: str):
+        """
+        초기화
+
+        Args:
+            lock_path: 잠금 파일 경로
+        """
+        self.lock_path = Path(lock_path)
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        self.stats = LockStats()
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._exclusive = False
+        self._fd = None
+
+    def _flock(self, exclusive: bool) -> bool:
+        """
+        flock 획득
+
+        Returns:
+            기다려야 했는지 여부
+        """
+        if fcntl is None:
+            return False
+        if self._fd is None:
+            self._fd = open(self.lock_path, 'a+')
+
+        mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        try:
+            fcntl.flock(self._fd.fileno(), mode | fcntl.LOCK_NB)
+            return False
+        except BlockingIOError:
+            fcntl.flock(self._fd.fileno(), mode)
+            return True
+
+    @contextmanager
+    def acquire(self, exclusive: bool = True):
+        """
+        잠금 획득 컨텍스트
+
+        Args:
+            exclusive: True면 쓰기(배타) 잠금, False면 읽기(공유) 잠금
+        """
+        start = time.perf_counter()
+        contended = not self._thread_lock.acquire(blocking=False)
+        if contended:
+            self._thread_lock.acquire()
+
+        try:
+            # 가장 바깥쪽 획득이거나 공유 → 배타 승격이 필요할 때만 flock 호출
+            if self._depth == 0 or (exclusive and not self._exclusive):
+                contended = self._flock(exclusive) or contended
+                self._exclusive = self._exclusive or exclusive
+                self.stats.record(time.perf_counter() - start, contended)
+        except Exception:
+            self._thread_lock.release()
+            raise
+
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                if fcntl is not None and self._fd is not None:
+                    fcntl.flock(self._fd.fileno(), fcntl.LOCK_UN)
+                self._exclusive = False
+            self._thread_lock.release()
+
+    def close(self):
+        """잠금 파일 닫기"""
+        with self._thread_lock:
+            if self._fd is not None:
+                self._fd.close()
+                self._fd = None
@@ -0,0 +1,187 @@
+"""
+Memory Namespaces
+
+사용자/세션 네임스페이스별 메모리 객체를 관리합니다.
+사용자마다 저장소 샤드 하나와 장기 메모리, 세션별 대화 창을 두며,
+사용자와 세션 캐시는 LRU로 제한되어 사용자 수가 늘어도 메모리 사용량이 일정하게 유지됩니다.
+캐시에서 밀려난 사용자의 샤드는 처리 중인 요청과 백그라운드 작업(요약/병합)이 모두 끝난 뒤에 닫습니다.
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Tuple
+
+from src.memory.persistent import PersistentMemory
+from src.memory.session import SessionMemory
+from src.memory.storage import DEFAULT_NAMESPACE, create_memory_storage, release_memory_storage
+from src.utils.config import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger("memory_namespaces")
+
+
+class UserNamespace:
+    """사용자 한 명의 저장소 샤드, 장기 메모리, 세션 캐시"""
+
+    def __init__(self, user_id: str, max_sessions: int):
+        """
+        초기화
+
+        Args:
+            user_id: 사용자 ID
+            max_sessions: 캐시에 유지할 최대 세션 수
+        """
+        self.user_id = user_id
+        self.max_sessions = max_sessions
+        self.storage = create_memory_storage(namespace=user_id)
+        self.persistent_memory = PersistentMemory(user_id=user_id, storage=self.storage)
+        self.sessions: "OrderedDict[str, SessionMemory]" = OrderedDict()
+        # 이 사용자의 메모리를 쓰고 있는 요청 수, 캐시에서 밀려났지만 요약이 진행 중인 세션
+        self.refs = 0
+        self.retired_sessions: List[SessionMemory] = []
+
+    def in_use(self) -> bool:
+        """요청이 쓰고 있거나 백그라운드 작업이 진행 중이라 샤드를 닫으면 안 되는지 여부"""
+        self.retired_sessions = [session for session in self.retired_sessions if session.is_busy()]
+        return (
+            self.refs > 0 or bool(self.retired_sessions) or self.persistent_memory.is_busy()
+            or any(session.is_busy() for session in self.sessions.values())
+        )
+
+    def get_session(self, session_id: str) -> SessionMemory:
+        """
+        세션 메모리 가져오기 (없으면 저장소에서 대화 창을 로드하여 생성)
+
+        Args:
+            session_id: 세션 ID
+
+        Returns:
+            SessionMemory 인스턴스
+        """
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = SessionMemory(storage=self.storage, session_id=session_id, user_id=self.user_id)
+            self.sessions[session_id] = session
+            # 밀려난 세션의 대화는 저장소에 남아 있어 다시 요청되면 재로드됨
+            while len(self.sessions) > self.max_sessions:
+                evicted_id, evicted = self.sessions.popitem(last=False)
+                if evicted.is_busy():
+                    self.retired_sessions.append(evicted)
+                logger.debug(f"세션 캐시에서 제거: {self.user_id}/{evicted_id}")
+        else:
+            self.sessions.move_to_end(session_id)
+        return session
+
+
+class MemoryNamespaces:
+    """사용자/세션 네임스페이스별 메모리 LRU 캐시"""
+
+    def __init__(self, max_users: int = None, max_sessions_per_user: int = None):
+        """
+        초기화
+
+        Args:
+            max_users: 캐시에 유지할 최대 사용자 수 (None이면 MEMORY_MAX_USERS)
+            max_sessions_per_user: 사용자별 최대 세션 수 (None이면 MEMORY_MAX_SESSIONS_PER_USER)
+        """
+        self.max_users = max_users or config.memory_max_users
+        self.max_sessions_per_user = max_sessions_per_user or config.memory_max_sessions_per_user
+        self._users: "OrderedDict[str, UserNamespace]" = OrderedDict()
+        # 캐시에서 밀려났지만 아직 쓰이고 있어 닫지 않은 사용자 (다시 요청되면 그대로 재사용)
+        self._retired: Dict[str, UserNamespace] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, user_id: str = None, session_id: str = None) -> Tuple[SessionMemory, PersistentMemory]:
+        """
+        네임스페이스의 메모리 가져오기
+
+        반환된 객체를 요청이 끝날 때까지 안전하게 쓰려면 use()를 사용합니다.
+        (get()은 참조를 잡지 않으므로, 그 사이 캐시에서 밀려나면 백그라운드 작업이 끝난 뒤 샤드가 닫힐 수 있음)
+
+        Args:
+            user_id: 사용자 ID (None이면 기본 네임스페이스)
+            session_id: 세션 ID (None이면 기본 세션)
+
+        Returns:
+            (세션 메모리, 장기 메모리)
+        """
+        namespace, session = self._acquire(user_id, session_id, hold=False)
+        return session, namespace.persistent_memory
+
+    @contextmanager
+    def use(self, user_id: str = None, session_id: str = None) -> Iterator[Tuple[SessionMemory, PersistentMemory]]:
+        """
+        요청을 처리하는 동안 네임스페이스의 메모리 사용 (그동안 캐시에서 밀려나도 샤드를 닫지 않음)
+
+        Args:
+            user_id: 사용자 ID (None이면 기본 네임스페이스)
+            session_id: 세션 ID (None이면 기본 세션)
+
+        Yields:
+            (세션 메모리, 장기 메모리)
+        """
+        namespace, session = self._acquire(user_id, session_id, hold=True)
+        try:
+            yield session, namespace.persistent_memory
+        finally:
+            with self._lock:
+                namespace.refs -= 1
+            self._close_retired()
+
+    def _acquire(self, user_id: str, session_id: str, hold: bool) -> Tuple[UserNamespace, SessionMemory]:
+        """사용자 네임스페이스와 세션 가져오기 (hold이면 참조 수 증가)"""
+        user_id = user_id or DEFAULT_NAMESPACE
+        session_id = session_id or DEFAULT_NAMESPACE
+
+        with self._lock:
+            namespace = self._users.get(user_id)
+            if namespace is None:
+                # 밀려났지만 아직 닫지 않은 샤드는 새로 열지 않고 되살림 (같은 저장소를 두 번 열지 않도록)
+                namespace = self._retired.pop(user_id, None) or UserNamespace(user_id, self.max_sessions_per_user)
+                self._users[user_id] = namespace
+                while len(self._users) > self.max_users:
+                    old = self._users.popitem(last=False)[1]
+                    self._retired[old.user_id] = old
+                    self.evictions += 1
+                    logger.debug(f"사용자 캐시에서 제거: {old.user_id}")
+            else:
+                self._users.move_to_end(user_id)
+            session = namespace.get_session(session_id)
+            if hold:
+                namespace.refs += 1
+
+        self._close_retired()
+        return namespace, session
+
+    def _close_retired(self):
+        """밀려난 사용자 중 더 이상 쓰이지 않는 샤드를 닫아 파일 핸들과 메모리 사본 해제"""
+        with self._lock:
+            idle = [ns for ns in self._retired.values() if not ns.in_use()]
+            for namespace in idle:
+                del self._retired[namespace.user_id]
+
+        # 기본 네임스페이스 저장소는 다른 컴포넌트와 공유하므로 유지
+        for namespace in idle:
+            if namespace.user_id != DEFAULT_NAMESPACE:
+                release_memory_storage(namespace.storage)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 통계"""
+        with self._lock:
+            memories = [ns.persistent_memory for ns in self._users.values()]
+            return {
+                "cached_users": len(self._users),
+                "retired_users": len(self._retired),
+                "cached_sessions": sum(len(ns.sessions) for ns in self._users.values()),
+                "max_users": self.max_users,
+                "max_sessions_per_user": self.max_sessions_per_user,
+                "evictions": self.evictions,
+                # 캐시에 있는 사용자들의 장기 메모리 상한/만료/병합 누계
+                "long_term": {
+                    "evictions": sum(m.evictions for m in memories),
+                    "expirations": sum(m.expirations for m in memories),
+                    "merges": sum(m.merges for m in memories)
+                }
+            }
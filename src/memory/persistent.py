@@ -2,48 +2,216 @@
 Persistent Memory
 
 장기 메모리를 관리합니다.
+네임스페이스(사용자)별로 항목 수와 바이트 상한을 두고, 항목별 만료 시각(TTL)을 지원합니다.
+상한을 넘으면 같은 항목으로 볼 수 있는 키를 먼저 병합(compaction)하고, 그래도 넘으면
+검색 적중 통계를 기준으로 LRU 또는 LFU 정책에 따라 오래된 항목을 제거합니다.
 """
 
-from typing import Dict, Any, List, Optional
-from src.memory.storage import MemoryStorage
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+from src.memory.storage import DEFAULT_NAMESPACE, create_memory_storage
+from src.utils.config import config
+from src.utils.text_search import HybridSearchIndex, char_ngrams, normalize_text
 from src.utils.logger import setup_logger
 from src.utils.openai_client import get_openai_client
 from src.prompts.templates import get_memory_save_prompt
 
 logger = setup_logger("persistent_memory")
 
+# 키 비교 시 무시하는 접두어 ("user_name" → "name", "사용자 이름" → "이름")
+KEY_PREFIXES = ("user_", "users_", "my_", "사용자의_", "사용자_", "나의_", "내_")
+
+# 주기적 compaction은 요청 스레드를 막지 않도록 백그라운드에서 실행
+_maintenance_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-maintenance")
+
+
+def canonical_key(key: str) -> str:
+    """
+    비슷한 키 비교용 정규화 (소문자, 구분자 통일, 사용자 접두어 제거)
+    
+    Args:
+        key: 장기 메모리 키
+    
+    Returns:
+        정규화된 키
+    """
+    canonical = re.sub(r"[\s\-.]+", "_", normalize_text(key)).strip("_")
+    stripped = True
+    while stripped:
+        stripped = False
+        for prefix in KEY_PREFIXES:
+            if canonical.startswith(prefix) and len(canonical) > len(prefix):
+                canonical = canonical[len(prefix):]
+                stripped = True
+    return canonical
+
+
+def key_similarity(a: str, b: str) -> float:
+    """정규화된 두 키의 문자 n-gram Jaccard 유사도"""
+    if a == b:
+        return 1.0
+    grams_a, grams_b = set(char_ngrams(a)), set(char_ngrams(b))
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+def value_text(value: Any) -> str:
+    """값 비교용 정규화 (딕셔너리/리스트는 키 순서를 고정한 JSON)"""
+    if not isinstance(value, str):
+        value = json.dumps(value, ensure_ascii=False, sort_keys=True)
+    return normalize_text(value)
+
+
+def fact_bytes(key: str, value: Any) -> int:
+    """항목이 차지하는 바이트 (저장 형식 기준)"""
+    return len(json.dumps([key, value], ensure_ascii=False).encode("utf-8"))
+
 
 class PersistentMemory:
     """장기 메모리 관리 클래스"""
     
-    def __init__(self):
-        """초기화"""
-        self.storage = MemoryStorage()
+    def __init__(self, user_id: str = DEFAULT_NAMESPACE, storage=None):
+        """
+        초기화
+        
+        Args:
+            user_id: 사용자 ID (사용자별 저장소 샤드 선택)
+            storage: 메모리 저장소 (None이면 user_id의 샤드 사용)
+        """
+        self.user_id = user_id
+        self.storage = storage or create_memory_storage(namespace=user_id)
         self.openai_client = get_openai_client()
-        logger.info("Persistent Memory 초기화 완료")
+        
+        # 장기 메모리 검색 색인 (remember/forget 시 증분 갱신)
+        self._index = HybridSearchIndex()
+        self._indexed: Dict[str, str] = {}
+        self._index_lock = threading.Lock()
+        # 마지막 동기화 시점의 저장소 버전/장기 메모리/가장 이른 만료 시각 (바뀐 게 없으면 검색 때 다시 읽지 않음)
+        self._synced_version = None
+        self._synced_memories: Dict[str, Any] = {}
+        self._next_expiry: Optional[str] = None
+        self.index_syncs = 0
+        
+        # 상한/만료/병합 관리 (조회 통계는 모아서 저장소에 기록)
+        self._maintenance_lock = threading.RLock()
+        self._pending_hits: Dict[str, int] = {}
+        self._pending_last_hit: Dict[str, str] = {}
+        self._writes = 0
+        self._compaction_future = None
+        self.evictions = 0
+        self.expirations = 0
+        self.merges = 0
+        self.merge_candidates: List[Dict[str, Any]] = []
+        self._sync_index()
+        
+        logger.info(f"Persistent Memory 초기화 완료 (User: {user_id}, 색인 {len(self._index)}개)")
+    
+    @staticmethod
+    def _fact_text(key: str, value: Any) -> str:
+        """색인할 텍스트 (키와 값을 함께 사용)"""
+        return f"{key}: {value}"
+    
+    def _sync_index(self) -> Dict[str, Any]:
+        """
+        저장소와 색인 동기화 (다른 프로세스나 경로로 바뀐 항목만 반영)
+        
+        저장소의 장기 메모리 버전이 마지막 동기화 때와 같고 만료 시각이 지난 항목도 없으면
+        저장소를 다시 읽지 않고 마지막으로 읽은 장기 메모리를 그대로 사용합니다.
+        
+        Returns:
+            현재 장기 메모리 전체 (읽기 전용)
+        """
+        # 버전은 읽기 전에 확인 (읽는 도중 바뀌면 다음 검색에서 다시 동기화)
+        version = self.storage.get_long_term_version()
+        now = datetime.now().isoformat()
+        with self._index_lock:
+            if (
+                version is not None and version == self._synced_version
+                and (self._next_expiry is None or self._next_expiry > now)
+            ):
+                return self._synced_memories
+        
+        memories, next_expiry = self._load_memories()
+        with self._index_lock:
+            for key in [key for key in self._indexed if key not in memories]:
+                self._index.remove(key)
+                del self._indexed[key]
+            for key, value in memories.items():
+                text = self._fact_text(key, value)
+                if self._indexed.get(key) != text:
+                    self._index.add(key, text)
+                    self._indexed[key] = text
+            self._synced_version = version
+            self._synced_memories = memories
+            self._next_expiry = next_expiry
+            self.index_syncs += 1
+        return memories
     
-    def remember(self, key: str, value: Any):
+    def remember(self, key: str, value: Any, ttl_seconds: float = None):
         """
         정보 기억하기
         
         Args:
             key: 키
             value: 값
+            ttl_seconds: 보관 기간 (초, None이면 MEMORY_DEFAULT_TTL_DAYS, 0 이하면 만료 없음)
         """
-        self.storage.set_long_term_memory(key, value)
+        if ttl_seconds is None:
+            ttl_seconds = config.memory_default_ttl_days * 86400
+        expires_at = (datetime.now() + timedelta(seconds=ttl_seconds)).isoformat() if ttl_seconds > 0 else None
+        
+        self.storage.set_long_term_memory(key, value, expires_at)
+        text = self._fact_text(key, value)
+        with self._index_lock:
+            self._index.add(key, text)
+            self._indexed[key] = text
         logger.info(f"장기 메모리 저장: {key}")
+        
+        self._enforce_quota(protect=key)
+        self._writes += 1
+        if config.memory_compact_every > 0 and self._writes % config.memory_compact_every == 0:
+            self._schedule_compaction()
     
     def recall(self, key: str = None) -> Any:
         """
-        정보 불러오기
+        정보 불러오기 (만료된 항목은 제거하고 제외)
         
         Args:
             key: 키 (None이면 전체)
         
         Returns:
-            저장된 값
+            저장된 값 (key가 None이면 {키: 값})
         """
-        return self.storage.get_long_term_memory(key)
+        memories, _ = self._load_memories()
+        if key is None:
+            return memories
+        return memories.get(key)
+    
+    def _load_memories(self) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        저장소에서 장기 메모리 전체를 읽고 만료된 항목 제거
+        
+        Returns:
+            ({키: 값}, 남은 항목 중 가장 이른 만료 시각 또는 None)
+        """
+        memories = self.storage.get_long_term_memory() or {}
+        now = datetime.now().isoformat()
+        expiries = {
+            k: meta["expires_at"] for k, meta in self.storage.get_long_term_metadata().items()
+            if k in memories and meta.get("expires_at")
+        }
+        for k in [k for k, expires_at in expiries.items() if expires_at <= now]:
+            self.storage.remove_long_term_memory(k)
+            memories.pop(k, None)
+            del expiries[k]
+            self.expirations += 1
+            logger.info(f"장기 메모리 만료: {k}")
+        return memories, min(expiries.values(), default=None)
     
     def forget(self, key: str):
         """
@@ -53,8 +221,228 @@ class PersistentMemory:
             key: 키
         """
         self.storage.remove_long_term_memory(key)
+        with self._index_lock:
+            self._index.remove(key)
+            self._indexed.pop(key, None)
+        with self._maintenance_lock:
+            self._pending_hits.pop(key, None)
+            self._pending_last_hit.pop(key, None)
         logger.info(f"장기 메모리 삭제: {key}")
     
+    def _record_hits(self, keys: List[str]):
+        """검색 적중 기록 (MEMORY_HIT_FLUSH_EVERY번마다 저장소에 반영)"""
+        if not keys:
+            return
+        now = datetime.now().isoformat()
+        with self._maintenance_lock:
+            for key in keys:
+                self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+                self._pending_last_hit[key] = now
+            if sum(self._pending_hits.values()) >= config.memory_hit_flush_every:
+                self.flush_hits()
+    
+    def flush_hits(self):
+        """모아 둔 검색 적중 통계를 저장소 메타데이터에 반영"""
+        with self._maintenance_lock:
+            if not self._pending_hits:
+                return
+            pending, last_hits = self._pending_hits, self._pending_last_hit
+            self._pending_hits, self._pending_last_hit = {}, {}
+            metadata = self.storage.get_long_term_metadata()
+            self.storage.update_long_term_metadata({
+                key: {"hits": (metadata[key].get("hits") or 0) + count, "last_hit": last_hits[key]}
+                for key, count in pending.items() if key in metadata
+            })
+    
+    def _usage(self, memories: Dict[str, Any]) -> Tuple[int, int]:
+        """(항목 수, 바이트)"""
+        return len(memories), sum(fact_bytes(k, v) for k, v in memories.items())
+    
+    def _over_quota(self, memories: Dict[str, Any]) -> bool:
+        """상한 초과 여부 (0 이하인 상한은 적용하지 않음)"""
+        count, size = self._usage(memories)
+        return (
+            (config.memory_max_facts > 0 and count > config.memory_max_facts)
+            or (config.memory_max_bytes > 0 and size > config.memory_max_bytes)
+        )
+    
+    def _eviction_order(self, metadata: Dict[str, Dict[str, Any]], keys: List[str]) -> List[str]:
+        """
+        제거 순서 (먼저 제거할 항목부터)
+        
+        LRU는 마지막 사용 시각(검색 적중 또는 저장) 순, LFU는 적중 수가 적은 순이며
+        적중 수가 같으면 마지막 사용 시각이 오래된 항목부터 제거합니다.
+        
+        Args:
+            metadata: 항목별 메타데이터
+            keys: 제거 후보 키
+        
+        Returns:
+            정렬된 키 리스트
+        """
+        def last_used(key: str) -> str:
+            meta = metadata.get(key, {})
+            return max(meta.get("last_hit") or "", meta.get("updated_at") or "")
+        
+        if config.memory_eviction_policy == "lfu":
+            return sorted(keys, key=lambda k: (metadata.get(k, {}).get("hits") or 0, last_used(k)))
+        return sorted(keys, key=last_used)
+    
+    def _enforce_quota(self, protect: str = None):
+        """
+        상한을 넘으면 비슷한 키를 병합하고, 그래도 넘으면 정책에 따라 항목 제거
+        
+        Args:
+            protect: 제거하지 않을 키 (방금 저장한 항목)
+        """
+        with self._maintenance_lock:
+            memories = self.recall()
+            if not self._over_quota(memories):
+                return
+            if self.compact():
+                memories = self.recall()
+            if not self._over_quota(memories):
+                return
+            
+            self.flush_hits()
+            metadata = self.storage.get_long_term_metadata()
+            for key in self._eviction_order(metadata, [k for k in memories if k != protect]):
+                if not self._over_quota(memories):
+                    break
+                memories.pop(key)
+                self.forget(key)
+                self.evictions += 1
+                logger.info(f"장기 메모리 상한 초과로 제거 ({config.memory_eviction_policy}): {key}")
+    
+    def is_busy(self) -> bool:
+        """백그라운드 compaction이 진행 중인지 여부"""
+        future = self._compaction_future
+        return future is not None and not future.done()
+    
+    def _schedule_compaction(self):
+        """백그라운드 compaction 예약 (이미 실행 중이면 생략)"""
+        with self._maintenance_lock:
+            if self._compaction_future is None or self._compaction_future.done():
+                self._compaction_future = _maintenance_executor.submit(self.compact)
+    
+    def compact(self, similarity: float = None) -> List[Dict[str, Any]]:
+        """
+        같은 항목을 가리키는 키를 하나로 병합 (예: "name"과 "user_name")
+        
+        정규화한 키가 같거나, 문자 n-gram 유사도가 기준 이상이면서 값도 같은 키들을 묶어
+        가장 최근에 저장된 항목의 키와 값을 남기고 적중 수는 합칩니다.
+        키만 비슷하고 값이 다른 경우("dentist_appointment_2026_10_01"과 "..._10_08")는
+        서로 다른 사실일 수 있으므로 지우지 않고 merge_candidates에 후보로만 남깁니다.
+        
+        Args:
+            similarity: 병합 기준 유사도 (None이면 MEMORY_COMPACT_SIMILARITY)
+        
+        Returns:
+            [{"kept": 남긴 키, "merged": [병합된 키...]}]
+        """
+        similarity = config.memory_compact_similarity if similarity is None else similarity
+        with self._maintenance_lock:
+            self.flush_hits()
+            memories = self.recall()
+            metadata = self.storage.get_long_term_metadata()
+            keys = list(memories)
+            canonical = [canonical_key(k) for k in keys]
+            values = [value_text(memories[k]) for k in keys]
+            candidates = []
+            
+            # 유사한 키끼리 묶기 (union-find)
+            parent = list(range(len(keys)))
+            
+            def find(i: int) -> int:
+                while parent[i] != i:
+                    parent[i] = parent[parent[i]]
+                    i = parent[i]
+                return i
+            
+            for i in range(len(keys)):
+                for j in range(i + 1, len(keys)):
+                    if canonical[i] == canonical[j]:
+                        parent[find(j)] = find(i)
+                        continue
+                    score = key_similarity(canonical[i], canonical[j])
+                    if score < similarity:
+                        continue
+                    if values[i] == values[j]:
+                        parent[find(j)] = find(i)
+                    else:
+                        candidates.append({"keys": [keys[i], keys[j]], "similarity": score})
+            self.merge_candidates = candidates
+            if candidates:
+                logger.info(f"장기 메모리 병합 후보 (값이 달라 유지): {[c['keys'] for c in candidates]}")
+            
+            groups: Dict[int, List[str]] = {}
+            for i, key in enumerate(keys):
+                groups.setdefault(find(i), []).append(key)
+            
+            results = []
+            for group in groups.values():
+                if len(group) < 2:
+                    continue
+                group.sort(key=lambda k: metadata.get(k, {}).get("updated_at") or "", reverse=True)
+                kept, merged = group[0], group[1:]
+                metas = [metadata.get(k, {}) for k in group]
+                self.storage.update_long_term_metadata({kept: {
+                    "hits": sum(meta.get("hits") or 0 for meta in metas),
+                    "last_hit": max((meta.get("last_hit") or "" for meta in metas), default="") or None,
+                    "created_at": min((meta["created_at"] for meta in metas if meta.get("created_at")), default=None)
+                }})
+                for key in merged:
+                    self.forget(key)
+                self.merges += len(merged)
+                results.append({"kept": kept, "merged": merged})
+                logger.info(f"장기 메모리 병합: {merged} → {kept}")
+            return results
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """장기 메모리 사용량과 상한/만료/병합 통계"""
+        count, size = self._usage(self.storage.get_long_term_memory() or {})
+        return {
+            "facts": count,
+            "bytes": size,
+            "max_facts": config.memory_max_facts,
+            "max_bytes": config.memory_max_bytes,
+            "eviction_policy": config.memory_eviction_policy,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "merges": self.merges,
+            "merge_candidates": len(self.merge_candidates),
+            "index_syncs": self.index_syncs,
+            "pending_hits": sum(self._pending_hits.values())
+        }
+    
+    def search(self, query: str, top_k: int = None) -> List[Tuple[str, Any]]:
+        """
+        질의와 관련된 장기 메모리 검색
+        
+        Args:
+            query: 검색어 (보통 사용자 입력)
+            top_k: 최대 결과 수 (None이면 MEMORY_TOP_K)
+        
+        Returns:
+            [(키, 값)] 관련도 순
+        """
+        top_k = top_k or config.memory_top_k
+        memories = self._sync_index()
+        with self._index_lock:
+            results = self._index.search(query, top_k)
+        results = [(key, memories[key]) for key, _ in results if key in memories]
+        self._record_hits([key for key, _ in results])
+        return results
+    
+    @staticmethod
+    def _parse_ttl(ttl_days: Any) -> Optional[float]:
+        """LLM이 제안한 보관 일수를 초로 변환 (없거나 잘못된 값이면 기본 TTL)"""
+        try:
+            days = float(ttl_days)
+        except (TypeError, ValueError):
+            return None
+        return days * 86400 if days > 0 else None
+    
     def analyze_and_remember(self, user_input: str, context: str = "") -> Optional[Dict[str, Any]]:
         """
         사용자 입력을 분석하여 필요한 경우 기억하기
@@ -70,7 +458,8 @@ class PersistentMemory:
             prompt = get_memory_save_prompt(user_input, context)
             result = self.openai_client.query_with_json(
                 system_prompt="당신은 사용자의 중요한 정보를 기억하는 메모리 관리자입니다.",
-                user_message=prompt
+                user_message=prompt,
+                call_site="memory_save"
             )
             
             if result and result.get("should_save"):
@@ -78,11 +467,11 @@ class PersistentMemory:
                 value = result.get("memory_value")
                 
                 if key and value:
-                    self.remember(key, value)
+                    self.remember(key, value, self._parse_ttl(result.get("ttl_days")))
                     return {"key": key, "value": value}
             
             return None
-            
+        
         except Exception as e:
             logger.error(f"메모리 분석 오류: {e}")
             return None
@@ -103,3 +492,26 @@ class PersistentMemory:
             memory_list.append(f"- {k}: {v}")
         
         return "\n".join(memory_list)
+    
+    def get_relevant_memory_string(self, query: str, top_k: int = None) -> str:
+        """
+        질의와 관련된 상위 k개 메모리만 담은 문자열 생성 (프롬프트용)
+        
+        관련 항목이 없으면 최근에 저장된 k개를 사용합니다.
+        
+        Args:
+            query: 검색어 (보통 사용자 입력)
+            top_k: 최대 항목 수 (None이면 MEMORY_TOP_K)
+        
+        Returns:
+            포맷팅된 메모리 내용
+        """
+        top_k = top_k or config.memory_top_k
+        results = self.search(query, top_k)
+        if not results:
+            memories = self.recall()
+            if not memories:
+                return "저장된 메모리가 없습니다."
+            results = list(memories.items())[-top_k:]
+        
+        return "\n".join(f"- {k}: {v}" for k, v in results)
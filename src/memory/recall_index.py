@@ -0,0 +1,327 @@
+"""
+Archive Recall Index
+
+아카이브된 대화 메시지를 다시 찾아오기 위한 디스크 기반 벡터/어휘 색인입니다.
+
+각 메시지는 문자 n-gram을 해싱한 벡터(기본 256차원, L2 정규화)로 변환되어
+float16 배열 파일에 추가되고, 같은 n-gram의 해시 키는 역색인용 배열에 추가됩니다.
+검색은 두 단계입니다.
+
+1. 어휘 단계: 검색어 n-gram 중 드문 키의 포스팅만 모아 IDF 합으로 후보를 고름
+2. 벡터 단계: 후보 행만 memmap으로 연 float16 벡터에서 읽어 IDF 가중 코사인으로 재정렬
+
+모든 파일은 추가 전용이라 색인 갱신 비용은 새 메시지 수에 비례하고,
+포스팅 정렬 배열은 처음 검색할 때 한 번 만든 뒤 새 행만 꼬리 배열로 이어 붙입니다.
+추가는 파일을 자르고 이어 쓰므로 여러 프로세스 사이에서도 파일 잠금으로 직렬화합니다.
+"""
+
+import json
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+from src.memory.locking import FileLock
+from src.utils.logger import setup_logger
+from src.utils.text_search import char_ngrams
+
+logger = setup_logger("recall_index")
+
+VECTORS_FILE = "vectors.f16"
+KEYS_FILE = "keys.u32"
+KEY_OFFSETS_FILE = "key_offsets.u64"
+TEXTS_FILE = "texts.jsonl"
+TEXT_OFFSETS_FILE = "text_offsets.u64"
+LOCK_FILE = "index.lock"
+
+# 어휘 키 해시 공간 (벡터 차원과 별개로 충돌이 드물도록 크게 둠)
+KEY_SPACE = 1 << 22
+# 색인에 저장하는 메시지 본문 최대 길이 (전체 원문은 아카이브 세그먼트에 있음)
+MAX_STORED_CHARS = 2000
+# 꼬리 포스팅이 전체의 이 비율을 넘으면 정렬 배열을 다시 만듦
+TAIL_REBUILD_RATIO = 0.2
+# 이 행 수 이하에 나오는 n-gram은 흔하더라도 후보 선택에 사용
+MIN_STOP_DF = 1000
+
+
+def _gram_hashes(text: str) -> np.ndarray:
+    """텍스트의 문자 n-gram 해시 (crc32)"""
+    grams = char_ngrams(text, sizes=(2, 3))
+    return np.fromiter(
+        (zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint32, count=len(grams)
+    )
+
+
+def _vectors_from_hashes(hashes: List[np.ndarray], dim: int) -> np.ndarray:
+    """텍스트별 n-gram 해시로 부호 해싱 벡터 생성"""
+    rows = np.repeat(np.arange(len(hashes)), [len(h) for h in hashes])
+    flat = np.concatenate(hashes) if hashes else np.zeros(0, dtype=np.uint32)
+    signs = np.where(flat >> 31, 1.0, -1.0)
+    vectors = np.bincount(
+        rows * dim + flat % dim, weights=signs, minlength=len(hashes) * dim
+    ).reshape(len(hashes), dim).astype(np.float32)
+    
+    vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def hashed_ngram_vectors(texts: List[str], dim: int = 256) -> np.ndarray:
+    """
+    문자 n-gram 해싱 벡터 (부호 해싱, 로그 tf, L2 정규화)
+    
+    Args:
+        texts: 텍스트 리스트
+        dim: 벡터 차원
+    
+    Returns:
+        (len(texts), dim) float32 배열
+    """
+    return _vectors_from_hashes([_gram_hashes(text) for text in texts], dim)
+
+
+class ArchiveRecallIndex:
+    """아카이브 메시지용 추가 전용 float16 벡터 + 해시 n-gram 역색인"""
+    
+    def __init__(self, index_dir: str, dim: int = 256):
+        """
+        초기화
+        
+        Args:
+            index_dir: 색인 디렉토리
+            dim: 벡터 차원
+        """
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(str(self.index_dir / LOCK_FILE))
+        self._rows = 0
+        self._vectors = np.zeros((0, dim), dtype=np.float16)
+        self._text_offsets = np.zeros(0, dtype=np.uint64)
+        self._dim_df = np.zeros(dim, dtype=np.int64)
+        
+        # 역색인: 정렬된 (키, 행) 배열 + 그 이후 추가된 행의 꼬리 배열
+        self._sorted_keys = None
+        self._sorted_rows = None
+        self._tail_keys = np.zeros(0, dtype=np.uint32)
+        self._tail_rows = np.zeros(0, dtype=np.int64)
+        self._refresh()
+    
+    def _path(self, name: str) -> Path:
+        return self.index_dir / name
+    
+    def __len__(self) -> int:
+        return self._rows
+    
+    def _file_rows(self) -> int:
+        """모든 행 정렬 파일에 완전히 기록된 행 수 (중단된 추가는 무시)"""
+        def rows(name: str, row_bytes: int) -> int:
+            path = self._path(name)
+            return path.stat().st_size // row_bytes if path.exists() else 0
+        
+        return min(
+            rows(VECTORS_FILE, self.dim * 2),
+            rows(KEY_OFFSETS_FILE, 8),
+            rows(TEXT_OFFSETS_FILE, 8)
+        )
+    
+    def _key_ends(self, rows: int) -> np.ndarray:
+        """행별 키 끝 위치 (lock 안에서 호출)"""
+        return np.memmap(self._path(KEY_OFFSETS_FILE), dtype=np.uint64, mode="r", shape=(rows,))
+    
+    def _row_keys(self, start: int, end: int) -> Tuple[np.ndarray, np.ndarray]:
+        """[start, end) 행의 (키, 행 번호) 배열 (lock 안에서 호출)"""
+        if end <= start:
+            return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.int64)
+        key_ends = np.asarray(self._key_ends(end), dtype=np.int64)
+        first = int(key_ends[start - 1]) if start else 0
+        last = int(key_ends[end - 1])
+        keys = np.array(np.memmap(self._path(KEYS_FILE), dtype=np.uint32, mode="r", shape=(last,))[first:])
+        counts = np.diff(np.concatenate(([first], key_ends[start:end])))
+        return keys, np.repeat(np.arange(start, end, dtype=np.int64), counts)
+    
+    def _refresh(self):
+        """파일에 추가된 행(다른 프로세스 포함)을 memmap과 꼬리 포스팅에 반영 (lock 안에서 호출)"""
+        rows = self._file_rows()
+        if rows <= self._rows:
+            return
+        
+        vectors = np.memmap(self._path(VECTORS_FILE), dtype=np.float16, mode="r", shape=(rows, self.dim))
+        self._dim_df += (np.asarray(vectors[self._rows:rows]) != 0).sum(axis=0)
+        self._vectors = vectors
+        self._text_offsets = np.memmap(self._path(TEXT_OFFSETS_FILE), dtype=np.uint64, mode="r", shape=(rows,))
+        
+        if self._sorted_keys is not None:
+            keys, key_rows = self._row_keys(self._rows, rows)
+            self._tail_keys = np.concatenate((self._tail_keys, keys))
+            self._tail_rows = np.concatenate((self._tail_rows, key_rows))
+        self._rows = rows
+        
+        if self._sorted_keys is not None and len(self._tail_keys) > TAIL_REBUILD_RATIO * len(self._sorted_keys):
+            self._build_postings()
+    
+    def _build_postings(self):
+        """전체 행의 키를 정렬해 역색인 배열 생성 (lock 안에서 호출)"""
+        keys, key_rows = self._row_keys(0, self._rows)
+        order = np.argsort(keys, kind="stable")
+        self._sorted_keys = keys[order]
+        self._sorted_rows = key_rows[order]
+        self._tail_keys = np.zeros(0, dtype=np.uint32)
+        self._tail_rows = np.zeros(0, dtype=np.int64)
+    
+    def add(self, messages: List[Dict[str, Any]]):
+        """
+        메시지 추가
+        
+        Args:
+            messages: 아카이브된 메시지 리스트
+        """
+        messages = [m for m in messages if str(m.get("content", "")).strip()]
+        if not messages:
+            return
+        
+        contents = [str(m["content"]) for m in messages]
+        hashes = [_gram_hashes(content) for content in contents]
+        vectors = _vectors_from_hashes(hashes, self.dim).astype(np.float16)
+        row_keys = [np.unique(h % KEY_SPACE).astype(np.uint32) for h in hashes]
+        
+        with self._file_lock.acquire(), self._lock:
+            self._refresh()
+            # 본문과 키를 먼저 쓰고 행 정렬 파일은 나중에 씀
+            # (행 수는 가장 짧은 행 정렬 파일 기준이라 중간에 중단돼도 일관됨)
+            text_offsets = []
+            with open(self._path(TEXTS_FILE), 'ab') as f:
+                position = f.tell()
+                for message, content in zip(messages, contents):
+                    record = {
+                        "role": message.get("role"),
+                        "content": content[:MAX_STORED_CHARS],
+                        "timestamp": message.get("timestamp")
+                    }
+                    line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+                    text_offsets.append(position)
+                    f.write(line)
+                    position += len(line)
+            
+            key_start = int(self._key_ends(self._rows)[-1]) if self._rows else 0
+            key_ends = key_start + np.cumsum([len(keys) for keys in row_keys])
+            with open(self._path(KEYS_FILE), 'ab') as f:
+                f.truncate(key_start * 4)
+                f.seek(0, os.SEEK_END)
+                f.write(np.concatenate(row_keys).tobytes())
+            
+            # 이전에 중단된 추가로 길게 남은 행 정렬 파일은 잘라내고 이어 씀
+            for name, data in (
+                (TEXT_OFFSETS_FILE, np.asarray(text_offsets, dtype=np.uint64)),
+                (KEY_OFFSETS_FILE, key_ends.astype(np.uint64)),
+                (VECTORS_FILE, vectors)
+            ):
+                row_bytes = data.itemsize * (data.shape[1] if data.ndim > 1 else 1)
+                with open(self._path(name), 'ab') as f:
+                    f.truncate(self._rows * row_bytes)
+                    f.seek(0, os.SEEK_END)
+                    f.write(data.tobytes())
+            self._refresh()
+    
+    def _read_message(self, row: int) -> Dict[str, Any]:
+        """행 번호의 메시지 읽기 (lock 안에서 호출)"""
+        with open(self._path(TEXTS_FILE), 'rb') as f:
+            f.seek(int(self._text_offsets[row]))
+            return json.loads(f.readline())
+    
+    def _postings(self, keys: np.ndarray) -> List[np.ndarray]:
+        """키별로 키가 들어 있는 행 번호 (lock 안에서 호출)"""
+        starts = np.searchsorted(self._sorted_keys, keys, side="left")
+        ends = np.searchsorted(self._sorted_keys, keys, side="right")
+        # 꼬리 배열은 정렬돼 있지 않으므로 검색어 키에 해당하는 부분만 한 번에 추림
+        tail = np.isin(self._tail_keys, keys)
+        tail_keys, tail_rows = self._tail_keys[tail], self._tail_rows[tail]
+        postings = []
+        for key, start, end in zip(keys, starts, ends):
+            rows = self._sorted_rows[start:end]
+            if len(tail_keys):
+                rows = np.concatenate((rows, tail_rows[tail_keys == key]))
+            postings.append(rows)
+        return postings
+    
+    def search(
+        self,
+        query: str,
+        top_k: int = 3,
+        min_score: float = 0.0,
+        candidates: int = 256,
+        max_df_ratio: float = 0.05
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        관련 메시지 검색
+        
+        Args:
+            query: 검색어
+            top_k: 최대 결과 수
+            min_score: 최소 코사인 유사도 (IDF 가중)
+            candidates: 어휘 단계에서 고를 후보 수
+            max_df_ratio: 이 비율(최소 MIN_STOP_DF행)보다 많은 행에 나오는 흔한 n-gram은 후보 선택에서 제외
+        
+        Returns:
+            [(메시지, 유사도)] 유사도 내림차순
+        """
+        if top_k <= 0:
+            return []
+        
+        query_hashes = _gram_hashes(query)
+        query_vector = _vectors_from_hashes([query_hashes], self.dim)[0]
+        query_keys = np.unique(query_hashes % KEY_SPACE).astype(np.uint32)
+        if not len(query_keys):
+            return []
+        
+        with self._lock:
+            self._refresh()
+            rows = self._rows
+            if not rows:
+                return []
+            if self._sorted_keys is None:
+                self._build_postings()
+            
+            # 1단계: 드문 n-gram 포스팅의 IDF 합으로 후보 선택
+            # 작은 색인에서는 흔한 n-gram도 포스팅이 짧으므로 모두 사용
+            max_df = max(int(rows * max_df_ratio), MIN_STOP_DF)
+            hit_rows, hit_weights = [], []
+            for posting in self._postings(query_keys):
+                if 0 < len(posting) <= max_df:
+                    hit_rows.append(posting)
+                    hit_weights.append(np.full(len(posting), np.log(1 + rows / len(posting))))
+            if not hit_rows:
+                return []
+            lexical = np.bincount(np.concatenate(hit_rows), weights=np.concatenate(hit_weights), minlength=rows)
+            candidate_rows = np.flatnonzero(lexical)
+            if len(candidate_rows) > candidates:
+                candidate_rows = candidate_rows[np.argpartition(-lexical[candidate_rows], candidates - 1)[:candidates]]
+            candidate_rows.sort()
+            
+            # 2단계: 후보 행만 float16 벡터로 IDF 가중 코사인 재계산
+            weighted_query = query_vector * np.log(1 + rows / (self._dim_df + 1)).astype(np.float32)
+            norm = np.linalg.norm(weighted_query)
+            if norm == 0:
+                return []
+            exact = np.asarray(self._vectors[candidate_rows], dtype=np.float32) @ (weighted_query / norm)
+            order = np.argsort(-exact, kind="stable")[:top_k]
+            hits = [(int(candidate_rows[i]), float(exact[i])) for i in order if exact[i] >= min_score]
+            
+            return [(self._read_message(row), score) for row, score in hits]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """색인 통계"""
+        return {
+            "rows": self._rows,
+            "disk_bytes": sum(
+                self._path(name).stat().st_size
+                for name in (VECTORS_FILE, KEYS_FILE, KEY_OFFSETS_FILE, TEXTS_FILE, TEXT_OFFSETS_FILE)
+                if self._path(name).exists()
+            )
+        }
@@ -2,28 +2,128 @@
 Session Memory
 
 단기 세션 메모리를 관리합니다.
+최근 대화는 개수/바이트 상한이 있는 링 버퍼로 유지하고,
+창 밖으로 밀려난 메시지는 압축 아카이브로 옮겨 검색할 수 있게 합니다.
+최근 몇 개를 제외한 오래된 턴은 백그라운드에서 누적 요약에 반영되며,
+get_context()는 요약과 최근 대화를 토큰 예산 안에서 조합합니다.
+여러 워커가 같은 세션을 처리할 수 있으므로, 대화 기록을 읽을 때는 저장소의 최근 메시지로
+대화 창을 먼저 갱신합니다.
 """
 
+import json
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
 from typing import Dict, Any, List, Optional
-from src.memory.storage import MemoryStorage
+from src.memory.archive import SessionArchive
+from src.memory.storage import DEFAULT_NAMESPACE, create_memory_storage, namespace_dirname
+from src.prompts.templates import get_conversation_summary_prompt
+from src.utils.config import config
 from src.utils.logger import setup_logger
+from src.utils.openai_client import get_openai_client
+from src.utils.tokens import estimate_tokens, truncate_to_tokens
 
 logger = setup_logger("session_memory")
 
+# 요약 갱신은 요청 처리와 분리된 공용 스레드에서 실행
+_summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="session-summary")
+
+
+def message_size(message: Dict[str, Any]) -> int:
+    """메시지의 직렬화 크기 (바이트)"""
+    return len(json.dumps(message, ensure_ascii=False).encode("utf-8"))
+
+
+def message_key(message: Dict[str, Any]) -> tuple:
+    """같은 메시지인지 비교하기 위한 키 (시각, 역할, 내용)"""
+    return message.get("timestamp"), message.get("role"), message.get("content")
+
+
+def format_message(message: Dict[str, Any]) -> Optional[str]:
+    """메시지를 프롬프트용 한 줄로 변환 (알 수 없는 역할은 None)"""
+    prefix = {"user": "User", "assistant": "Assistant", "system": "System"}.get(message["role"])
+    if prefix is None:
+        return None
+    return f"{prefix}: {message['content']}"
+
 
 class SessionMemory:
     """세션 메모리 관리 클래스"""
     
-    def __init__(self, max_history: int = 10):
+    def __init__(
+        self,
+        max_history: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        storage=None,
+        archive: Optional[SessionArchive] = None,
+        session_id: str = DEFAULT_NAMESPACE,
+        user_id: str = DEFAULT_NAMESPACE
+    ):
         """
         초기화
         
         Args:
-            max_history: 유지할 최대 대화 수
+            max_history: 대화 창에 유지할 최대 메시지 수 (None이면 SESSION_MAX_MESSAGES)
+            max_bytes: 대화 창의 최대 크기 (바이트, None이면 SESSION_MAX_BYTES)
+            storage: 메모리 저장소 (None이면 설정에 따라 생성)
+            archive: 세션 아카이브 (None이면 SESSION_ARCHIVE_DIR 아래 네임스페이스별 디렉토리)
+            session_id: 세션 ID
+            user_id: 사용자 ID (저장소 샤드 선택)
         """
-        self.storage = MemoryStorage()
-        self.max_history = max_history
-        logger.info(f"Session Memory 초기화 (Max History: {max_history})")
+        self.session_id = session_id
+        self.user_id = user_id
+        self.storage = storage or create_memory_storage(namespace=user_id)
+        self.archive = archive or SessionArchive(
+            self._archive_dir(), config.session_archive_segment_bytes
+        )
+        self.max_history = max_history or config.session_max_messages
+        self.max_bytes = max_bytes or config.session_max_bytes
+        
+        # 대화 창 링 버퍼 (추가 O(1), 최근 k개 조회 O(k))
+        self._window = deque()
+        self._window_bytes = 0
+        
+        # 누적 요약: covered_until 시각까지의 메시지가 요약에 반영됨
+        self.summary_enabled = config.session_summary_enabled
+        self.verbatim_messages = config.session_verbatim_messages
+        self._summary = self.storage.get_session_summary(self.session_id) or {"summary": "", "covered_until": ""}
+        self._evicted_unsummarized: List[Dict[str, Any]] = []
+        self._summary_lock = threading.Lock()
+        self._summary_future: Optional[Future] = None
+        self.summary_updates = 0
+        self.summary_failures = 0
+        
+        self._load_window()
+        
+        logger.info(
+            f"Session Memory 초기화 (User: {user_id}, Session: {session_id}, "
+            f"Max History: {self.max_history}, Max Bytes: {self.max_bytes})"
+        )
+    
+    def _archive_dir(self) -> str:
+        """네임스페이스별 아카이브 디렉토리 (기본 네임스페이스는 SESSION_ARCHIVE_DIR 그대로)"""
+        if self.user_id == DEFAULT_NAMESPACE and self.session_id == DEFAULT_NAMESPACE:
+            return config.session_archive_dir
+        return os.path.join(
+            config.session_archive_dir,
+            namespace_dirname(self.user_id),
+            namespace_dirname(self.session_id)
+        )
+    
+    def _load_window(self):
+        """저장소의 최근 메시지로 대화 창을 채우고 상한을 넘는 기존 기록은 아카이브"""
+        for message in self.storage.get_recent_session_memory(self.max_history, self.session_id):
+            self._window.append((message, message_size(message)))
+            self._window_bytes += self._window[-1][1]
+        
+        self._evict()
+        removed = self._trim_storage()
+        if removed:
+            logger.info(f"기존 세션 기록 {len(removed)}개 아카이브")
+        self._maybe_update_summary()
     
     def add_message(self, role: str, content: str, metadata: Dict[str, Any] = None):
         """
@@ -37,12 +137,16 @@ class SessionMemory:
         message = {
             "role": role,
             "content": content,
-            "timestamp": None,  # TODO: 타임스탬프 추가
+            "timestamp": datetime.now().isoformat(),
             "metadata": metadata or {}
         }
         
-        self.storage.add_session_memory(message)
+        self.storage.add_session_memory(message, self.session_id)
+        size = message_size(message)
+        self._window.append((message, size))
+        self._window_bytes += size
         self._prune_history()
+        self._maybe_update_summary()
         
         logger.debug(f"세션 메시지 추가: {role}")
     
@@ -54,13 +158,14 @@ class SessionMemory:
             limit: 가져올 개수 제한
         
         Returns:
-            메시지 리스트
+            메시지 리스트 (대화 창 안의 메시지, 오래된 순)
         """
-        history = self.storage.get_session_memory()
-        
+        self._refresh_window()
         if limit:
-            return history[-limit:]
-        return history
+            recent = [message for message, _ in islice(reversed(self._window), limit)]
+            recent.reverse()
+            return recent
+        return [message for message, _ in self._window]
     
     def get_context_string(self, limit: int = 5) -> str:
         """
@@ -72,31 +177,304 @@ class SessionMemory:
         Returns:
             포맷팅된 대화 기록
         """
-        history = self.get_history(limit)
-        context = []
+        lines = [format_message(msg) for msg in self.get_history(limit)]
+        return "\n".join(line for line in lines if line is not None)
+    
+    def get_context(self, token_budget: int = None, query: str = None) -> str:
+        """
+        토큰 예산 안에서 누적 요약, 관련 과거 대화, 최근 대화를 조합한 컨텍스트 (프롬프트용)
+        
+        요약은 예산의 절반까지 사용합니다. query가 주어지면 아카이브 recall 색인에서
+        찾은 관련 과거 메시지를 예산의 1/4까지 넣고, 나머지는 아직 요약되지 않은
+        최근 메시지를 최신 순으로 채웁니다. 긴 메시지는 잘라서 넣습니다.
+        
+        Args:
+            token_budget: 최대 토큰 수 (None이면 SESSION_CONTEXT_TOKENS)
+            query: 관련 과거 대화를 찾을 현재 요청 (None이면 생략)
+        
+        Returns:
+            포맷팅된 대화 맥락
+        """
+        budget = token_budget or config.session_context_tokens
+        self._refresh_window()
+        with self._summary_lock:
+            summary = self._summary["summary"]
+            recent = self._recent_unsummarized()
+        
+        header = ""
+        if summary:
+            header = f"(이전 대화 요약) {truncate_to_tokens(summary, budget // 2)}"
+        remaining = budget - estimate_tokens(header)
+        
+        recalled = self._recall_lines(query, recent, min(budget // 4, remaining)) if query else []
+        if recalled:
+            header = "\n".join(([header] if header else []) + ["(관련 이전 대화)"] + recalled)
+            remaining = budget - estimate_tokens(header)
+        
+        # 메시지 하나가 남은 예산을 독차지하지 않도록 개별 상한 적용
+        per_message = max(remaining // 3, 32)
+        lines = []
+        for message in reversed(recent):
+            line = format_message(message)
+            if line is None:
+                continue
+            line = truncate_to_tokens(line, per_message)
+            cost = estimate_tokens(line) + 1
+            if cost > remaining:
+                break
+            lines.append(line)
+            remaining -= cost
+        lines.reverse()
+        
+        return "\n".join(([header] if header else []) + lines)
+    
+    def _refresh_window(self):
+        """
+        저장소의 최근 메시지로 대화 창 갱신
+        
+        같은 세션의 요청이 다른 워커로 가면 그 워커가 추가한 메시지는 저장소에만 있으므로,
+        읽을 때마다 저장소의 최근 메시지와 비교해 달라졌으면 대화 창을 다시 만듭니다.
+        다른 워커가 저장소에서 정리해 창에서 빠진 메시지는 요약 대기열로 옮기고,
+        다른 워커가 더 나중 시점까지 갱신한 누적 요약이 있으면 그것을 사용합니다.
+        """
+        stored = self.storage.get_recent_session_memory(self.max_history, self.session_id)
+        window = [message for message, _ in self._window]
+        if stored == window:
+            return
+        
+        kept = {message_key(m) for m in stored}
+        dropped = [m for m in window if message_key(m) not in kept]
+        self._window = deque((message, message_size(message)) for message in stored)
+        self._window_bytes = sum(size for _, size in self._window)
+        evicted = self._evict()
+        
+        stored_summary = self.storage.get_session_summary(self.session_id)
+        with self._summary_lock:
+            if stored_summary and stored_summary.get("covered_until", "") > self._summary["covered_until"]:
+                self._summary = stored_summary
+            if self.summary_enabled:
+                pending = {message_key(m) for m in self._evicted_unsummarized}
+                self._evicted_unsummarized = [m for m in self._evicted_unsummarized if not self._is_summarized(m)]
+                self._evicted_unsummarized.extend(
+                    m for m in dropped + evicted
+                    if message_key(m) not in pending and not self._is_summarized(m)
+                )
+        logger.debug(f"저장소 기준으로 대화 창 갱신: 메시지 {len(self._window)}개")
+    
+    def _recall_lines(self, query: str, recent: List[Dict[str, Any]], budget: int) -> List[str]:
+        """
+        recall 색인에서 현재 요청과 관련된 과거 메시지를 찾아 예산 안의 줄로 변환
+        
+        Args:
+            query: 현재 요청
+            recent: 이미 컨텍스트에 들어가는 최근 메시지 (중복 제외용)
+            budget: 최대 토큰 수
+        
+        Returns:
+            포맷팅된 줄 리스트 (오래된 순)
+        """
+        if config.session_recall_top_k <= 0 or budget <= 0:
+            return []
+        try:
+            hits = self.archive.recall(query, config.session_recall_top_k, config.session_recall_min_score)
+        except Exception as e:
+            logger.warning(f"과거 대화 recall 실패: {e}")
+            return []
+        
+        seen = {(m.get("timestamp"), m.get("content")) for m in recent}
+        messages = [m for m, _ in hits if (m.get("timestamp"), m.get("content")) not in seen]
+        messages.sort(key=lambda m: m.get("timestamp") or "")
+        
+        lines = []
+        per_message = max(budget // max(len(messages), 1), 32)
+        for message in messages:
+            line = format_message(message)
+            if line is None:
+                continue
+            line = truncate_to_tokens(line, per_message)
+            cost = estimate_tokens(line) + 1
+            if cost > budget:
+                break
+            lines.append(line)
+            budget -= cost
+        return lines
+    
+    def _is_summarized(self, message: Dict[str, Any]) -> bool:
+        """누적 요약에 이미 반영된 메시지인지 여부 (summary lock 안에서 호출)"""
+        covered_until = self._summary["covered_until"]
+        return bool(covered_until) and (message.get("timestamp") or "") <= covered_until
+    
+    def _pending_summary(self) -> List[Dict[str, Any]]:
+        """원문 창에서 밀려났지만 아직 요약되지 않은 메시지 (summary lock 안에서 호출)"""
+        window = [message for message, _ in self._window]
+        verbatim_start = max(len(window) - self.verbatim_messages, 0)
+        return self._evicted_unsummarized + [
+            m for m in window[:verbatim_start] if not self._is_summarized(m)
+        ]
+    
+    def _recent_unsummarized(self) -> List[Dict[str, Any]]:
+        """요약되지 않은 메시지 + 항상 원문으로 유지하는 최근 메시지 (summary lock 안에서 호출)"""
+        verbatim = [message for message, _ in islice(reversed(self._window), self.verbatim_messages)]
+        verbatim.reverse()
+        return self._pending_summary() + verbatim
+    
+    def _maybe_update_summary(self):
+        """요약할 메시지가 충분히 쌓였으면 백그라운드 요약 갱신 시작"""
+        if not self.summary_enabled:
+            return
+        with self._summary_lock:
+            if self._summary_future is not None and not self._summary_future.done():
+                return
+            if len(self._pending_summary()) < config.session_summary_batch:
+                return
+            self._summary_future = _summary_executor.submit(self._update_summary)
+    
+    def _update_summary(self):
+        """밀려난 턴을 기존 요약에 반영 (백그라운드 스레드)"""
+        with self._summary_lock:
+            pending = self._pending_summary()
+            previous = self._summary["summary"]
+        if not pending:
+            return
+        
+        new_turns = "\n".join(line for line in map(format_message, pending) if line is not None)
+        try:
+            summary = get_openai_client().simple_query(
+                system_prompt="당신은 대화 내용을 간결하게 누적 요약하는 도우미입니다.",
+                user_message=get_conversation_summary_prompt(
+                    previous, new_turns, config.session_summary_max_chars
+                ),
+                call_site="conversation_summary"
+            )
+        except Exception as e:
+            self.summary_failures += 1
+            logger.warning(f"대화 요약 갱신 실패 (다음 턴에 재시도): {e}")
+            return
+        
+        covered_until = max((m.get("timestamp") or "") for m in pending)
+        state = {
+            "summary": summary.strip(),
+            "covered_until": covered_until,
+            "updated_at": datetime.now().isoformat()
+        }
+        with self._summary_lock:
+            self._summary = state
+            self._evicted_unsummarized = [
+                m for m in self._evicted_unsummarized if not self._is_summarized(m)
+            ]
+        self.storage.set_session_summary(state, self.session_id)
+        self.summary_updates += 1
+        logger.debug(f"대화 요약 갱신: 메시지 {len(pending)}개 반영")
+    
+    def is_busy(self) -> bool:
+        """백그라운드 요약 갱신이 진행 중인지 여부"""
+        future = self._summary_future
+        return future is not None and not future.done()
+    
+    def wait_for_summary(self, timeout: float = None):
+        """
+        진행 중인 요약 갱신이 끝날 때까지 대기 (테스트/벤치마크용)
+        
+        Args:
+            timeout: 최대 대기 시간 (초)
+        """
+        future = self._summary_future
+        if future is not None:
+            future.result(timeout=timeout)
+    
+    def search_archive(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        대화 창 밖으로 밀려난 과거 메시지 검색
         
-        for msg in history:
-            role = msg["role"]
-            content = msg["content"]
-            if role == "user":
-                context.append(f"User: {content}")
-            elif role == "assistant":
-                context.append(f"Assistant: {content}")
-            elif role == "system":
-                context.append(f"System: {content}")
+        Args:
+            query: 검색어
+            limit: 최대 결과 수
         
-        return "\n".join(context)
+        Returns:
+            일치하는 메시지 리스트 (최신 순)
+        """
+        return self.archive.search(query, limit)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """대화 창 및 아카이브 통계"""
+        return {
+            "user_id": self.user_id,
+            "session_id": self.session_id,
+            "window_messages": len(self._window),
+            "window_bytes": self._window_bytes,
+            "max_messages": self.max_history,
+            "max_bytes": self.max_bytes,
+            "summary_chars": len(self._summary["summary"]),
+            "summary_updates": self.summary_updates,
+            "summary_failures": self.summary_failures,
+            "archive": self.archive.get_stats()
+        }
     
     def clear(self):
-        """세션 초기화"""
-        self.storage.clear_session_memory()
+        """세션 초기화 (아카이브는 유지)"""
+        self.storage.clear_session_memory(self.session_id)
+        self._window.clear()
+        self._window_bytes = 0
+        with self._summary_lock:
+            self._summary = {"summary": "", "covered_until": ""}
+            self._evicted_unsummarized = []
         logger.info("세션 메모리 초기화됨")
     
+    def _evict(self) -> List[Dict[str, Any]]:
+        """
+        상한을 넘는 오래된 메시지를 대화 창에서 제거 (최신 메시지 하나는 항상 유지)
+        
+        Returns:
+            제거된 메시지 리스트 (오래된 순)
+        """
+        evicted = []
+        while len(self._window) > 1 and (
+            len(self._window) > self.max_history or self._window_bytes > self.max_bytes
+        ):
+            message, size = self._window.popleft()
+            self._window_bytes -= size
+            evicted.append(message)
+        return evicted
+    
     def _prune_history(self):
-        """오래된 기록 정리"""
-        history = self.storage.get_session_memory()
-        if len(history) > self.max_history:
-            # 저장소 구현에 따라 효율적인 방법으로 변경 필요
-            # 현재는 전체 로드 후 슬라이싱하여 재저장하는 방식이라 비효율적일 수 있음
-            # MemoryStorage에 prune 메서드를 추가하는 것이 좋음
-            pass
+        """대화 창을 넘는 기록을 아카이브로 이동하고 저장소에서 제거"""
+        evicted = self._evict()
+        if not evicted:
+            return
+        
+        # 아직 요약되지 않은 메시지는 요약 대기열에 남김 (요약을 끈 경우 아카이브에만 보관)
+        with self._summary_lock:
+            if self.summary_enabled:
+                self._evicted_unsummarized.extend(m for m in evicted if not self._is_summarized(m))
+        
+        removed = self._trim_storage()
+        logger.debug(f"세션 메시지 {len(evicted)}개를 창에서 제거, 저장소에서 {len(removed)}개 아카이브로 이동")
+    
+    def _trim_storage(self) -> List[Dict[str, Any]]:
+        """
+        대화 창의 가장 오래된 메시지보다 앞선 저장소 기록을 제거하고 제거된 메시지를 아카이브
+        
+        같은 세션을 여러 워커가 함께 쓰면 저장소에는 이 프로세스의 대화 창에 없는 메시지도 있으므로,
+        개수가 아니라 시각 기준으로 제거하고 저장소가 실제로 돌려준 메시지만 아카이브합니다.
+        (저장소에서 메시지를 제거하는 쪽이 아카이브하므로 메시지마다 한 번씩만 아카이브됨)
+        아카이브는 저장소 잠금 안에서 제거 전에 기록하므로, 아카이브에 실패하면 저장소에서도 지우지 않고
+        다음 정리 때 다시 시도합니다.
+        
+        Returns:
+            저장소에서 제거된 메시지 리스트 (오래된 순)
+        """
+        if not self._window:
+            return []
+        before = self._window[0][0].get("timestamp")
+        try:
+            if before:
+                return self.storage.trim_session_memory(
+                    0, self.session_id, before=before, on_remove=self.archive.append
+                )
+            # 시각이 없는 예전 기록은 개수 기준으로 제거
+            return self.storage.trim_session_memory(
+                len(self._window), self.session_id, on_remove=self.archive.append
+            )
+        except Exception as e:
+            logger.warning(f"세션 메시지 아카이브 실패, 저장소에 남겨 두고 다음에 다시 시도: {e}")
+            return []
@@ -0,0 +1,401 @@
+"""
+SQLite Memory Storage
+
+SQLite(WAL 모드) 기반 메모리 저장소입니다.
+세션, 메시지, 장기 메모리를 테이블로 나누어 저장하고
+인덱스를 사용해 필요한 행만 읽고 씁니다.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Any, Optional
+
+from src.memory.locking import FileLock
+from src.memory.storage import MemoryStorage, DEFAULT_NAMESPACE, trim_count
+from src.utils.logger import setup_logger
+
+logger = setup_logger("sqlite_storage")
+
+SCHEMA_VERSION = 3
+
+# 스키마 v3에서 장기 메모리에 추가된 항목별 메타데이터 열
+LONG_TERM_METADATA_COLUMNS = {
+    "created_at": "TEXT",
+    "expires_at": "TEXT",
+    "hits": "INTEGER NOT NULL DEFAULT 0",
+    "last_hit": "TEXT",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    summary TEXT
+);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL REFERENCES sessions(session_id),
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    timestamp TEXT,
+    metadata TEXT NOT NULL DEFAULT '{}'
+);
+
+CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id, id);
+
+CREATE TABLE IF NOT EXISTS long_term_memory (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    created_at TEXT,
+    expires_at TEXT,
+    hits INTEGER NOT NULL DEFAULT 0,
+    last_hit TEXT
+);
+"""
+
+
+class SQLiteMemoryStorage(MemoryStorage):
+    """SQLite 메모리 저장소"""
+    
+    def __init__(self, storage_path: str = "data/memory.db", migrate_from: str = None):
+        """
+        초기화
+        
+        Args:
+            storage_path: 데이터베이스 파일 경로
+            migrate_from: 처음 생성 시 가져올 JSON 메모리 파일 경로 (한 번만 수행)
+        """
+        self.storage_path = Path(storage_path)
+        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # 연결은 하나만 사용하고 lock으로 직렬화 (요청 스레드와 백그라운드 작업 공용)
+        # 쓰기는 파일 잠금으로 프로세스 간에도 직렬화 (읽기는 WAL 스냅샷으로 잠금 없이 수행)
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(str(self.storage_path.with_name(self.storage_path.name + ".lock")))
+        self._conn = sqlite3.connect(str(self.storage_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # 이 연결로 바꾼 장기 메모리 횟수 (다른 연결의 커밋은 PRAGMA data_version으로 확인)
+        self._long_term_writes = 0
+        
+        self._initialize_storage()
+        
+        if migrate_from:
+            self._migrate_from_json(Path(migrate_from))
+        
+        logger.info(f"SQLite 메모리 저장소 초기화: {self.storage_path}")
+    
+    def _initialize_storage(self):
+        """스키마 생성 및 WAL 설정"""
+        with self._file_lock.acquire(), self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.executescript(SCHEMA)
+            
+            now = datetime.now().isoformat()
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO metadata (key, value) VALUES ('created_at', ?)", (now,)
+                )
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO metadata (key, value) VALUES ('schema_version', ?)",
+                    (str(SCHEMA_VERSION),)
+                )
+            self._upgrade_schema()
+    
+    def _upgrade_schema(self):
+        """이전 버전 스키마 업그레이드 (lock 안에서 호출)"""
+        version = int(self._get_metadata("schema_version") or SCHEMA_VERSION)
+        if version >= SCHEMA_VERSION:
+            return
+        
+        with self._conn:
+            if version < 2:
+                columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+                if "summary" not in columns:
+                    self._conn.execute("ALTER TABLE sessions ADD COLUMN summary TEXT")
+            if version < 3:
+                columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(long_term_memory)")}
+                for column, definition in LONG_TERM_METADATA_COLUMNS.items():
+                    if column not in columns:
+                        self._conn.execute(f"ALTER TABLE long_term_memory ADD COLUMN {column} {definition}")
+                self._conn.execute("UPDATE long_term_memory SET created_at = updated_at WHERE created_at IS NULL")
+            self._conn.execute(
+                "UPDATE metadata SET value = ? WHERE key = 'schema_version'", (str(SCHEMA_VERSION),)
+            )
+        logger.info(f"SQLite 스키마 업그레이드: v{version} → v{SCHEMA_VERSION}")
+    
+    def _get_metadata(self, key: str) -> Any:
+        """메타데이터 값 조회"""
+        row = self._conn.execute("SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+    
+    def _migrate_from_json(self, json_path: Path):
+        """
+        JSON 메모리 파일을 한 번만 가져오기
+        
+        Args:
+            json_path: JSON 메모리 파일 경로
+        """
+        with self._file_lock.acquire(), self._lock:
+            if self._get_metadata("migrated_from") is not None or not json_path.exists():
+                return
+            
+            try:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.error(f"JSON 메모리 마이그레이션 실패 ({json_path}): {e}")
+                return
+            
+            sessions = dict(data.get("sessions", {}))
+            if "session_memory" in data:
+                sessions.setdefault(DEFAULT_NAMESPACE, data["session_memory"])
+            long_term = data.get("long_term_memory", {})
+            metadata = data.get("long_term_metadata", {})
+            now = datetime.now().isoformat()
+            
+            with self._conn:
+                for session_id, messages in sessions.items():
+                    if not messages:
+                        continue
+                    self._touch_session(session_id, now)
+                    self._conn.executemany(
+                        "INSERT INTO messages (session_id, role, content, timestamp, metadata) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        [self._message_row(session_id, message) for message in messages]
+                    )
+                for session_id, summary in data.get("summaries", {}).items():
+                    self._touch_session(session_id, now)
+                    self._conn.execute(
+                        "UPDATE sessions SET summary = ? WHERE session_id = ?",
+                        (json.dumps(summary, ensure_ascii=False), session_id)
+                    )
+                # 만료 시각/조회 기록도 함께 옮겨 TTL과 LRU/LFU 정리 기준을 유지
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO long_term_memory "
+                    "(key, value, updated_at, created_at, expires_at, hits, last_hit) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [self._long_term_row(key, value, metadata.get(key) or {}, now) for key, value in long_term.items()]
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO metadata (key, value) VALUES ('migrated_from', ?)",
+                    (str(json_path),)
+                )
+            
+            logger.info(
+                f"JSON 메모리 마이그레이션 완료: 메시지 {sum(len(m) for m in sessions.values())}개, "
+                f"장기 메모리 {len(long_term)}개 ({json_path})"
+            )
+    
+    @staticmethod
+    def _long_term_row(key: str, value: Any, meta: Dict[str, Any], now: str) -> tuple:
+        """JSON 장기 메모리 항목과 메타데이터를 long_term_memory 행으로 변환"""
+        updated_at = meta.get("updated_at") or now
+        return (
+            key,
+            json.dumps(value, ensure_ascii=False),
+            updated_at,
+            meta.get("created_at") or updated_at,
+            meta.get("expires_at"),
+            int(meta.get("hits") or 0),
+            meta.get("last_hit")
+        )
+    
+    def _touch_session(self, session_id: str, now: str):
+        """세션 행 생성 또는 갱신 시각 업데이트 (트랜잭션 안에서 호출)"""
+        self._conn.execute(
+            "INSERT INTO sessions (session_id, created_at, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET updated_at = excluded.updated_at",
+            (session_id, now, now)
+        )
+    
+    @staticmethod
+    def _message_row(session_id: str, message: Dict[str, Any]) -> tuple:
+        """메시지 딕셔너리를 messages 테이블 행으로 변환"""
+        return (
+            session_id,
+            message.get("role", ""),
+            message.get("content", ""),
+            message.get("timestamp"),
+            json.dumps(message.get("metadata") or {}, ensure_ascii=False)
+        )
+    
+    @staticmethod
+    def _row_to_message(row: sqlite3.Row) -> Dict[str, Any]:
+        """messages 테이블 행을 메시지 딕셔너리로 변환"""
+        return {
+            "role": row["role"],
+            "content": row["content"],
+            "timestamp": row["timestamp"],
+            "metadata": json.loads(row["metadata"]) if row["metadata"] else {}
+        }
+    
+    def get_session_memory(self, session_id: str = DEFAULT_NAMESPACE) -> list:
+        """세션 메모리 가져오기"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT role, content, timestamp, metadata FROM messages "
+                "WHERE session_id = ? ORDER BY id",
+                (session_id,)
+            ).fetchall()
+        return [self._row_to_message(row) for row in rows]
+    
+    def get_recent_session_memory(self, limit: int, session_id: str = DEFAULT_NAMESPACE) -> list:
+        """최근 세션 메시지 가져오기 (인덱스 역순 조회)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT role, content, timestamp, metadata FROM messages "
+                "WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                (session_id, limit)
+            ).fetchall()
+        return [self._row_to_message(row) for row in reversed(rows)]
+    
+    def add_session_memory(self, message: Dict[str, Any], session_id: str = DEFAULT_NAMESPACE):
+        """세션 메모리에 메시지 추가"""
+        now = datetime.now().isoformat()
+        with self._file_lock.acquire(), self._lock, self._conn:
+            self._touch_session(session_id, now)
+            self._conn.execute(
+                "INSERT INTO messages (session_id, role, content, timestamp, metadata) "
+                "VALUES (?, ?, ?, ?, ?)",
+                self._message_row(session_id, message)
+            )
+    
+    def trim_session_memory(
+        self, keep: int, session_id: str = DEFAULT_NAMESPACE, before: Optional[str] = None,
+        on_remove: Optional[Callable[[list], None]] = None
+    ) -> list:
+        """최근 메시지만 남기고 오래된 세션 메시지 제거"""
+        with self._file_lock.acquire(), self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT id, role, content, timestamp, metadata FROM messages "
+                "WHERE session_id = ? ORDER BY id DESC LIMIT -1 OFFSET ?",
+                (session_id, max(keep, 0))
+            ).fetchall()
+            rows.reverse()
+            removed = [self._row_to_message(row) for row in rows]
+            count = trim_count(removed, 0, before)
+            if not count:
+                return []
+            if on_remove is not None:
+                on_remove(removed[:count])
+            self._conn.execute(
+                "DELETE FROM messages WHERE session_id = ? AND id <= ?",
+                (session_id, rows[count - 1]["id"])
+            )
+        return removed[:count]
+    
+    def clear_session_memory(self, session_id: str = DEFAULT_NAMESPACE):
+        """세션 메모리 초기화"""
+        with self._file_lock.acquire(), self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self._conn.execute("UPDATE sessions SET summary = NULL WHERE session_id = ?", (session_id,))
+    
+    def get_session_summary(self, session_id: str = DEFAULT_NAMESPACE) -> Optional[Dict[str, Any]]:
+        """세션의 누적 대화 요약 가져오기"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return json.loads(row["summary"]) if row and row["summary"] else None
+    
+    def set_session_summary(self, summary: Dict[str, Any], session_id: str = DEFAULT_NAMESPACE):
+        """세션의 누적 대화 요약 저장"""
+        now = datetime.now().isoformat()
+        with self._file_lock.acquire(), self._lock, self._conn:
+            self._touch_session(session_id, now)
+            self._conn.execute(
+                "UPDATE sessions SET summary = ? WHERE session_id = ?",
+                (json.dumps(summary, ensure_ascii=False), session_id)
+            )
+    
+    def get_long_term_memory(self, key: str = None) -> Any:
+        """장기 메모리 가져오기 (key가 None이면 전체 반환)"""
+        with self._lock:
+            if key is None:
+                rows = self._conn.execute(
+                    "SELECT key, value FROM long_term_memory ORDER BY rowid"
+                ).fetchall()
+                return {row["key"]: json.loads(row["value"]) for row in rows}
+            
+            row = self._conn.execute(
+                "SELECT value FROM long_term_memory WHERE key = ?", (key,)
+            ).fetchone()
+        return json.loads(row["value"]) if row else None
+    
+    def set_long_term_memory(self, key: str, value: Any, expires_at: Optional[str] = None):
+        """장기 메모리 설정"""
+        now = datetime.now().isoformat()
+        with self._file_lock.acquire(), self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO long_term_memory (key, value, updated_at, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at, "
+                "expires_at = excluded.expires_at",
+                (key, json.dumps(value, ensure_ascii=False), now, now, expires_at)
+            )
+            self._long_term_writes += 1
+    
+    def remove_long_term_memory(self, key: str):
+        """장기 메모리 삭제"""
+        with self._file_lock.acquire(), self._lock, self._conn:
+            self._conn.execute("DELETE FROM long_term_memory WHERE key = ?", (key,))
+            self._long_term_writes += 1
+    
+    def get_long_term_metadata(self) -> Dict[str, Dict[str, Any]]:
+        """장기 메모리 항목별 메타데이터 가져오기"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, created_at, updated_at, expires_at, hits, last_hit FROM long_term_memory"
+            ).fetchall()
+        return {
+            row["key"]: {column: row[column] for column in ("created_at", "updated_at", "expires_at", "hits", "last_hit")}
+            for row in rows
+        }
+    
+    def update_long_term_metadata(self, updates: Dict[str, Dict[str, Any]]):
+        """장기 메모리 메타데이터 갱신 (없는 키는 무시)"""
+        if not updates:
+            return
+        with self._file_lock.acquire(), self._lock, self._conn:
+            for key, fields in updates.items():
+                fields = {column: value for column, value in fields.items() if column in LONG_TERM_METADATA_COLUMNS}
+                if fields:
+                    assignments = ", ".join(f"{column} = ?" for column in fields)
+                    self._conn.execute(
+                        f"UPDATE long_term_memory SET {assignments} WHERE key = ?",
+                        (*fields.values(), key)
+                    )
+                    if "expires_at" in fields:
+                        self._long_term_writes += 1
+    
+    def get_long_term_version(self) -> Any:
+        """장기 메모리 변경 확인용 버전 (다른 연결의 커밋 버전, 이 연결의 장기 메모리 변경 수)"""
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            return (data_version, self._long_term_writes)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """저장소 통계 (쓰기 잠금 경합 포함)"""
+        return {
+            "backend": "sqlite",
+            "path": str(self.storage_path),
+            "lock": self._file_lock.stats.to_dict()
+        }
+    
+    def close(self):
+        """데이터베이스 연결 종료"""
+        with self._lock:
+            self._conn.close()
+        self._file_lock.close()
@@ -2,123 +2,668 @@
 Memory Storage
 
 메모리 데이터를 저장하고 관리합니다.
+저장소 백엔드 인터페이스(MemoryStorage)와 JSON 파일 구현을 제공하며,
+create_memory_storage()가 MEMORY_BACKEND 설정에 따라 구현을 선택합니다.
 """
 
+import atexit
+import hashlib
 import json
 import os
+import re
+import threading
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional, List
 from datetime import datetime
 
+from src.memory.locking import FileLock
+
+
+DEFAULT_NAMESPACE = "default"
+
+
+def trim_count(messages: List[Dict[str, Any]], keep: int, before: Optional[str] = None) -> int:
+    """
+    앞에서부터 제거할 세션 메시지 수
+    
+    Args:
+        messages: 세션 메시지 (오래된 순)
+        keep: 남길 최근 메시지 수
+        before: 이 시각(ISO 문자열) 이후의 메시지를 만나면 거기서 멈춤 (None이면 개수만 사용)
+    
+    Returns:
+        제거할 메시지 수
+    """
+    count = max(len(messages) - max(keep, 0), 0)
+    if before is not None:
+        for i in range(count):
+            if (messages[i].get("timestamp") or "") >= before:
+                return i
+    return count
+
 
 class MemoryStorage:
-    """메모리 저장소 클래스"""
+    """
+    메모리 저장소 인터페이스
+    
+    저장소 하나가 사용자 네임스페이스 하나(장기 메모리 + 여러 세션의 대화)를 담습니다.
+    """
+    
+    def get_session_memory(self, session_id: str = DEFAULT_NAMESPACE) -> list:
+        """
+        세션 메모리 가져오기
+        
+        Args:
+            session_id: 세션 ID
+        """
+        raise NotImplementedError
+    
+    def get_recent_session_memory(self, limit: int, session_id: str = DEFAULT_NAMESPACE) -> list:
+        """
+        최근 세션 메시지 가져오기
+        
+        Args:
+            limit: 가져올 메시지 수
+            session_id: 세션 ID
+        
+        Returns:
+            오래된 순으로 정렬된 최근 메시지 리스트
+        """
+        return self.get_session_memory(session_id)[-limit:]
+    
+    def add_session_memory(self, message: Dict[str, Any], session_id: str = DEFAULT_NAMESPACE):
+        """
+        세션 메모리에 메시지 추가
+        
+        Args:
+            message: 메시지
+            session_id: 세션 ID
+        """
+        raise NotImplementedError
+    
+    def trim_session_memory(
+        self, keep: int, session_id: str = DEFAULT_NAMESPACE, before: Optional[str] = None,
+        on_remove: Optional[Callable[[list], None]] = None
+    ) -> list:
+        """
+        최근 메시지만 남기고 오래된 세션 메시지 제거
+        
+        여러 프로세스가 같은 세션에 메시지를 추가할 수 있으므로, 호출한 쪽의 대화 창 기준으로
+        지우려면 before를 함께 넘깁니다. 앞에서부터 before보다 오래된 메시지만 제거합니다.
+        
+        Args:
+            keep: 남길 최근 메시지 수
+            session_id: 세션 ID
+            before: 이 시각(ISO 문자열)보다 오래된 메시지만 제거 (None이면 개수만 사용)
+            on_remove: 제거할 메시지를 받아 실제로 제거하기 전에 잠금 안에서 호출 (예: 아카이브),
+                       예외가 나면 아무것도 제거하지 않고 그대로 전파
+        
+        Returns:
+            제거된 메시지 리스트 (오래된 순)
+        """
+        raise NotImplementedError
+    
+    def clear_session_memory(self, session_id: str = DEFAULT_NAMESPACE):
+        """
+        세션 메모리 초기화
+        
+        Args:
+            session_id: 세션 ID
+        """
+        raise NotImplementedError
+    
+    def get_session_summary(self, session_id: str = DEFAULT_NAMESPACE) -> Optional[Dict[str, Any]]:
+        """
+        세션의 누적 대화 요약 가져오기
+        
+        Args:
+            session_id: 세션 ID
+        
+        Returns:
+            {"summary": 요약문, "covered_until": 요약에 반영된 마지막 메시지 시각} 또는 None
+        """
+        raise NotImplementedError
+    
+    def set_session_summary(self, summary: Dict[str, Any], session_id: str = DEFAULT_NAMESPACE):
+        """
+        세션의 누적 대화 요약 저장
+        
+        Args:
+            summary: {"summary": 요약문, "covered_until": 요약에 반영된 마지막 메시지 시각}
+            session_id: 세션 ID
+        """
+        raise NotImplementedError
+    
+    def get_long_term_memory(self, key: str = None) -> Any:
+        """
+        장기 메모리 가져오기
+        
+        Args:
+            key: 특정 키 (None이면 전체 반환)
+        
+        Returns:
+            메모리 값
+        """
+        raise NotImplementedError
+    
+    def set_long_term_memory(self, key: str, value: Any, expires_at: Optional[str] = None):
+        """
+        장기 메모리 설정 (갱신 시각을 기록하고 만료 시각을 덮어씀, 조회 통계는 유지)
+        
+        Args:
+            key: 키
+            value: 값
+            expires_at: 만료 시각 (ISO 형식, None이면 만료 없음)
+        """
+        raise NotImplementedError
+    
+    def remove_long_term_memory(self, key: str):
+        """
+        장기 메모리 삭제
+        
+        Args:
+            key: 삭제할 키
+        """
+        raise NotImplementedError
+    
+    def get_long_term_metadata(self) -> Dict[str, Dict[str, Any]]:
+        """
+        장기 메모리 항목별 메타데이터 가져오기
+        
+        Returns:
+            {키: {"created_at", "updated_at", "expires_at", "hits", "last_hit"}}
+        """
+        raise NotImplementedError
+    
+    def update_long_term_metadata(self, updates: Dict[str, Dict[str, Any]]):
+        """
+        장기 메모리 메타데이터 갱신 (없는 키는 무시)
+        
+        Args:
+            updates: {키: {"hits": 누적 조회 수, "last_hit": 마지막 조회 시각, "expires_at": ...}}
+        """
+        raise NotImplementedError
+    
+    def get_long_term_version(self) -> Any:
+        """
+        장기 메모리 변경 확인용 버전 (다른 프로세스의 변경 포함)
+        
+        Returns:
+            이전 값과 같으면 장기 메모리가 바뀌지 않은 것 (None이면 알 수 없으므로 항상 다시 읽어야 함)
+        """
+        return None
     
-    def __init__(self, storage_path: str = None):
+    def get_stats(self) -> Dict[str, Any]:
+        """저장소 통계 (잠금 경합 등)"""
+        return {}
+
+
+class JSONMemoryStorage(MemoryStorage):
+    """
+    JSON 파일 메모리 저장소 (개발용)
+    
+    메모리 안의 사본을 기준 데이터로 사용하고 변경은 write-behind로 모아서 저장합니다.
+    각 변경은 먼저 저널 파일(<파일>.journal)에 기록되며, 타이머 또는 N회 변경마다
+    임시 파일 기록 → fsync → 원자적 rename으로 스냅샷을 교체한 뒤 저널을 비웁니다.
+    비정상 종료 후에는 스냅샷에 저널을 재적용하여 복구합니다.
+    
+    여러 프로세스가 같은 파일을 사용할 수 있도록 모든 접근은 파일 잠금(<파일>.lock)
+    아래에서 이루어지며, 다른 프로세스가 교체한 스냅샷이나 추가한 저널 항목은
+    접근 시점에 메모리 사본에 반영됩니다.
+    """
+    
+    def __init__(self, storage_path: str = None, flush_interval: float = None, flush_every: int = None):
         """
         초기화
         
         Args:
             storage_path: 저장 파일 경로
+            flush_interval: 변경 사항을 파일에 반영하는 주기 (초, None이면 MEMORY_FLUSH_INTERVAL)
+            flush_every: 이 횟수만큼 변경되면 즉시 반영 (None이면 MEMORY_FLUSH_EVERY)
         """
         if storage_path is None:
             storage_path = os.getenv("MEMORY_FILE", "data/memory.json")
+        if flush_interval is None:
+            flush_interval = float(os.getenv("MEMORY_FLUSH_INTERVAL", "2.0"))
+        if flush_every is None:
+            flush_every = int(os.getenv("MEMORY_FLUSH_EVERY", "20"))
         
         self.storage_path = Path(storage_path)
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        self.journal_path = self.storage_path.with_name(self.storage_path.name + ".journal")
+        self.flush_interval = flush_interval
+        self.flush_every = max(1, flush_every)
+        
+        self._file_lock = FileLock(str(self.storage_path.with_name(self.storage_path.name + ".lock")))
+        self._data = self._initial_data()
+        self._snapshot_id = None
+        self._journal_offset = 0
+        self._pending_mutations = 0
+        self._long_term_version = 0
+        
+        # 파일이 없으면 초기화, 있으면 스냅샷 로드 후 남은 저널 재적용
+        with self._file_lock.acquire(exclusive=True):
+            if not self.storage_path.exists():
+                self._write_snapshot()
+            self._sync()
+            if self._journal_offset:
+                print(f"메모리 저널 반영: 스냅샷에 기록되지 않은 변경 적용 ({self.journal_path})")
+                self._flush_locked()
         
-        # 파일이 없으면 초기화
-        if not self.storage_path.exists():
-            self._initialize_storage()
+        self._stop_event = threading.Event()
+        self._flusher = None
+        if self.flush_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, name="memory-flush", daemon=True)
+            self._flusher.start()
+        atexit.register(self.close)
     
-    def _initialize_storage(self):
-        """저장소 초기화"""
-        initial_data = {
-            "session_memory": [],
+    @staticmethod
+    def _initial_data() -> Dict[str, Any]:
+        """초기 데이터"""
+        return {
+            "sessions": {DEFAULT_NAMESPACE: []},
+            "summaries": {},
             "long_term_memory": {},
+            "long_term_metadata": {},
             "metadata": {
                 "created_at": datetime.now().isoformat(),
                 "last_updated": datetime.now().isoformat()
             }
         }
-        self._save(initial_data)
     
     def _load(self) -> Dict[str, Any]:
         """저장소에서 데이터 로드"""
         try:
             with open(self.storage_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                data = json.load(f)
         except Exception as e:
             print(f"메모리 로드 오류: {e}")
-            return {}
+            data = {}
+        sessions = data.setdefault("sessions", {})
+        # 이전 형식(단일 session_memory 리스트)은 기본 세션으로 취급
+        if "session_memory" in data:
+            sessions.setdefault(DEFAULT_NAMESPACE, data.pop("session_memory"))
+        data.setdefault("summaries", {})
+        data.setdefault("long_term_memory", {})
+        data.setdefault("long_term_metadata", {})
+        data.setdefault("metadata", {"created_at": datetime.now().isoformat()})
+        return data
+    
+    @staticmethod
+    def _file_id(path: Path) -> Optional[tuple]:
+        """파일 교체 여부 판별용 식별자 (inode, 수정 시각, 크기)"""
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    
+    def _sync(self):
+        """
+        다른 프로세스의 변경 반영 (잠금 안에서 호출)
+        
+        스냅샷이 교체되었으면 다시 로드하고, 저널에서 아직 적용하지 않은 항목을 적용합니다.
+        """
+        snapshot_id = self._file_id(self.storage_path)
+        if snapshot_id != self._snapshot_id:
+            self._data = self._load()
+            self._snapshot_id = snapshot_id
+            self._journal_offset = 0
+            self._long_term_version += 1
+        
+        try:
+            f = open(self.journal_path, 'rb')
+        except FileNotFoundError:
+            self._journal_offset = 0
+            return
+        
+        with f:
+            f.seek(self._journal_offset)
+            for line in f:
+                # 기록 도중 중단된 마지막 줄은 무시
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                self._apply(entry)
+                self._journal_offset += len(line)
+    
+    def _apply(self, entry: Dict[str, Any]):
+        """저널 항목을 메모리 사본에 적용 (잠금 안에서 호출)"""
+        op = entry["op"]
+        if op in ("set_long_term", "remove_long_term") or (
+            op == "update_long_term_meta" and any("expires_at" in fields for fields in entry["updates"].values())
+        ):
+            self._long_term_version += 1
+        sessions = self._data["sessions"]
+        session_id = entry.get("session_id", DEFAULT_NAMESPACE)
+        if op == "add_session":
+            sessions.setdefault(session_id, []).append(entry["message"])
+        elif op == "trim_session":
+            keep = entry["keep"]
+            messages = sessions.get(session_id, [])
+            sessions[session_id] = messages[len(messages) - keep:] if keep else []
+        elif op == "clear_session":
+            sessions.pop(session_id, None)
+            self._data["summaries"].pop(session_id, None)
+        elif op == "set_summary":
+            self._data["summaries"][session_id] = entry["summary"]
+        elif op == "set_long_term":
+            key = entry["key"]
+            self._data["long_term_memory"][key] = entry["value"]
+            # 이전 형식 저널 항목에는 시각이 없으므로 메타데이터만 비워 둠
+            if "updated_at" in entry:
+                meta = self._data["long_term_metadata"].setdefault(
+                    key, {"created_at": entry["updated_at"], "hits": 0, "last_hit": None}
+                )
+                meta["updated_at"] = entry["updated_at"]
+                meta["expires_at"] = entry.get("expires_at")
+        elif op == "remove_long_term":
+            self._data["long_term_memory"].pop(entry["key"], None)
+            self._data["long_term_metadata"].pop(entry["key"], None)
+        elif op == "update_long_term_meta":
+            for key, fields in entry["updates"].items():
+                if key in self._data["long_term_memory"]:
+                    self._data["long_term_metadata"].setdefault(key, {}).update(fields)
+    
+    def _mutate(self, entry: Dict[str, Any]):
+        """
+        변경 기록: 저널에 먼저 쓰고 메모리 사본에 적용 (배타 잠금 안에서 호출)
+        
+        Args:
+            entry: {"op": 변경 종류, ...인자}
+        """
+        with open(self.journal_path, 'ab') as journal:
+            journal.write(json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+            self._journal_offset = journal.tell()
+        
+        self._apply(entry)
+        self._pending_mutations += 1
+        if self._pending_mutations >= self.flush_every:
+            self._flush_locked()
+    
+    def _write_snapshot(self):
+        """메모리 사본을 임시 파일 + fsync + rename으로 원자적으로 저장 (배타 잠금 안에서 호출)"""
+        self._data["metadata"]["last_updated"] = datetime.now().isoformat()
+        temp_path = self.storage_path.with_name(self.storage_path.name + ".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.storage_path)
+        self._fsync_directory()
+        self._snapshot_id = self._file_id(self.storage_path)
     
-    def _save(self, data: Dict[str, Any]):
-        """저장소에 데이터 저장"""
+    def _flush_locked(self):
+        """스냅샷 저장 후 저널 비우기 (배타 잠금 안에서 호출)"""
         try:
-            data["metadata"]["last_updated"] = datetime.now().isoformat()
-            with open(self.storage_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self._write_snapshot()
+            # 스냅샷이 디스크에 확정된 뒤에만 저널 비우기
+            if self.journal_path.exists():
+                self.journal_path.unlink()
+            self._journal_offset = 0
+            self._pending_mutations = 0
         except Exception as e:
             print(f"메모리 저장 오류: {e}")
     
-    def get_session_memory(self) -> list:
+    def flush(self):
+        """변경 사항(다른 프로세스의 저널 포함)을 파일에 원자적으로 반영"""
+        with self._file_lock.acquire(exclusive=True):
+            self._sync()
+            if self._journal_offset:
+                self._flush_locked()
+    
+    def _fsync_directory(self):
+        """rename 결과가 디스크에 남도록 디렉토리 fsync (지원하지 않는 플랫폼은 무시)"""
+        try:
+            fd = os.open(self.storage_path.parent, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    
+    def _flush_loop(self):
+        """주기적으로 변경 사항 반영"""
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+    
+    def close(self):
+        """남은 변경 사항을 반영하고 백그라운드 반영 중지"""
+        if self._stop_event.is_set():
+            return
+        self._stop_event.set()
+        self.flush()
+        self._file_lock.close()
+        # 닫힌 샤드가 종료 시점까지 참조로 남지 않도록 해제
+        atexit.unregister(self.close)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """저장소 통계 (파일 잠금 경합 포함)"""
+        return {
+            "backend": "json",
+            "path": str(self.storage_path),
+            "pending_mutations": self._pending_mutations,
+            "lock": self._file_lock.stats.to_dict()
+        }
+    
+    def get_session_memory(self, session_id: str = DEFAULT_NAMESPACE) -> list:
         """세션 메모리 가져오기"""
-        data = self._load()
-        return data.get("session_memory", [])
+        with self._file_lock.acquire(exclusive=False):
+            self._sync()
+            return list(self._data["sessions"].get(session_id, []))
     
-    def add_session_memory(self, message: Dict[str, Any]):
+    def get_recent_session_memory(self, limit: int, session_id: str = DEFAULT_NAMESPACE) -> list:
+        """최근 세션 메시지 가져오기"""
+        with self._file_lock.acquire(exclusive=False):
+            self._sync()
+            return self._data["sessions"].get(session_id, [])[-limit:]
+    
+    def add_session_memory(self, message: Dict[str, Any], session_id: str = DEFAULT_NAMESPACE):
         """세션 메모리에 메시지 추가"""
-        data = self._load()
-        if "session_memory" not in data:
-            data["session_memory"] = []
-        data["session_memory"].append(message)
-        self._save(data)
+        with self._file_lock.acquire(exclusive=True):
+            self._sync()
+            self._mutate({"op": "add_session", "session_id": session_id, "message": message})
+    
+    def trim_session_memory(
+        self, keep: int, session_id: str = DEFAULT_NAMESPACE, before: Optional[str] = None,
+        on_remove: Optional[Callable[[list], None]] = None
+    ) -> list:
+        """최근 메시지만 남기고 오래된 세션 메시지 제거"""
+        with self._file_lock.acquire(exclusive=True):
+            self._sync()
+            messages = self._data["sessions"].get(session_id, [])
+            count = trim_count(messages, keep, before)
+            if not count:
+                return []
+            removed = messages[:count]
+            if on_remove is not None:
+                on_remove(removed)
+            self._mutate({"op": "trim_session", "session_id": session_id, "keep": len(messages) - count})
+            return removed
     
-    def clear_session_memory(self):
+    def clear_session_memory(self, session_id: str = DEFAULT_NAMESPACE):
         """세션 메모리 초기화"""
-        data = self._load()
-        data["session_memory"] = []
-        self._save(data)
+        with self._file_lock.acquire(exclusive=True):
+            self._sync()
+            self._mutate({"op": "clear_session", "session_id": session_id})
+    
+    def get_session_summary(self, session_id: str = DEFAULT_NAMESPACE) -> Optional[Dict[str, Any]]:
+        """세션의 누적 대화 요약 가져오기"""
+        with self._file_lock.acquire(exclusive=False):
+            self._sync()
+            summary = self._data["summaries"].get(session_id)
+            return dict(summary) if summary else None
+    
+    def set_session_summary(self, summary: Dict[str, Any], session_id: str = DEFAULT_NAMESPACE):
+        """세션의 누적 대화 요약 저장"""
+        with self._file_lock.acquire(exclusive=True):
+            self._sync()
+            self._mutate({"op": "set_summary", "session_id": session_id, "summary": summary})
     
     def get_long_term_memory(self, key: str = None) -> Any:
-        """
-        장기 메모리 가져오기
-        
-        Args:
-            key: 특정 키 (None이면 전체 반환)
-        
-        Returns:
-            메모리 값
-        """
-        data = self._load()
-        long_term = data.get("long_term_memory", {})
-        
-        if key is None:
-            return long_term
-        return long_term.get(key)
+        """장기 메모리 가져오기 (key가 None이면 전체 반환)"""
+        with self._file_lock.acquire(exclusive=False):
+            self._sync()
+            long_term = self._data["long_term_memory"]
+            if key is None:
+                return dict(long_term)
+            return long_term.get(key)
     
-    def set_long_term_memory(self, key: str, value: Any):
-        """
-        장기 메모리 설정
-        
-        Args:
-            key: 키
-            value: 값
-        """
-        data = self._load()
-        if "long_term_memory" not in data:
-            data["long_term_memory"] = {}
-        data["long_term_memory"][key] = value
-        self._save(data)
+    def set_long_term_memory(self, key: str, value: Any, expires_at: Optional[str] = None):
+        """장기 메모리 설정"""
+        with self._file_lock.acquire(exclusive=True):
+            self._sync()
+            self._mutate({
+                "op": "set_long_term",
+                "key": key,
+                "value": value,
+                "updated_at": datetime.now().isoformat(),
+                "expires_at": expires_at
+            })
     
     def remove_long_term_memory(self, key: str):
-        """
-        장기 메모리 삭제
-        
-        Args:
-            key: 삭제할 키
-        """
-        data = self._load()
-        if "long_term_memory" in data and key in data["long_term_memory"]:
-            del data["long_term_memory"][key]
-            self._save(data)
+        """장기 메모리 삭제"""
+        with self._file_lock.acquire(exclusive=True):
+            self._sync()
+            if key in self._data["long_term_memory"]:
+                self._mutate({"op": "remove_long_term", "key": key})
+    
+    def get_long_term_metadata(self) -> Dict[str, Dict[str, Any]]:
+        """장기 메모리 항목별 메타데이터 가져오기"""
+        with self._file_lock.acquire(exclusive=False):
+            self._sync()
+            metadata = self._data["long_term_metadata"]
+            return {key: dict(metadata.get(key, {})) for key in self._data["long_term_memory"]}
+    
+    def update_long_term_metadata(self, updates: Dict[str, Dict[str, Any]]):
+        """장기 메모리 메타데이터 갱신 (없는 키는 무시)"""
+        if not updates:
+            return
+        with self._file_lock.acquire(exclusive=True):
+            self._sync()
+            self._mutate({"op": "update_long_term_meta", "updates": updates})
+    
+    def get_long_term_version(self) -> Any:
+        """장기 메모리 변경 확인용 버전 (스냅샷 재로드와 장기 메모리 저널 항목 수)"""
+        with self._file_lock.acquire(exclusive=False):
+            self._sync()
+            return self._long_term_version
+
+
+# 프로세스 전역 저장소 레지스트리: (백엔드, 경로)마다 엔진 하나만 생성
+# 사용자 샤드는 네임스페이스 캐시(MemoryNamespaces)에서 밀려날 때 release_memory_storage()로 닫힘
+_storages: Dict[tuple, MemoryStorage] = {}
+_storages_lock = threading.Lock()
+
+
+def namespace_dirname(namespace: str) -> str:
+    """
+    네임스페이스 ID를 안전한 파일/디렉토리 이름으로 변환
+    
+    Args:
+        namespace: 사용자 또는 세션 ID
+    
+    Returns:
+        파일 이름으로 쓸 수 있는 문자열 (치환이 일어나면 충돌 방지용 해시 접미사 추가)
+    """
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", namespace)[:64].lstrip(".") or "_"
+    if safe != namespace:
+        safe += "-" + hashlib.sha1(namespace.encode("utf-8")).hexdigest()[:8]
+    return safe
+
+
+def _storage_path(backend: str, namespace: str) -> str:
+    """백엔드와 사용자 네임스페이스에 해당하는 샤드 경로"""
+    if backend == "sqlite":
+        base_path, suffix = os.getenv("MEMORY_DB", "data/memory.db"), ".db"
+    elif backend == "binary":
+        base_path, suffix = os.getenv("MEMORY_BIN", "data/memory.bin"), ".bin"
+    else:
+        base_path, suffix = os.getenv("MEMORY_FILE", "data/memory.json"), ".json"
+    
+    # 기본 네임스페이스는 기존 단일 파일을 그대로 사용
+    if namespace == DEFAULT_NAMESPACE:
+        return base_path
+    shard_dir = os.getenv("MEMORY_SHARD_DIR", "data/users")
+    return os.path.join(shard_dir, namespace_dirname(namespace) + suffix)
+
+
+def create_memory_storage(storage_path: str = None, backend: str = None, namespace: str = None) -> MemoryStorage:
+    """
+    설정에 따라 메모리 저장소 가져오기
+    
+    같은 백엔드와 경로에 대해서는 프로세스 안에서 항상 같은 인스턴스를 반환합니다.
+    
+    Args:
+        storage_path: 저장 경로 (None이면 백엔드와 네임스페이스에 따른 기본 경로)
+        backend: 저장소 백엔드 (json/sqlite/binary, None이면 MEMORY_BACKEND 사용)
+        namespace: 사용자 네임스페이스 (None이면 기본 네임스페이스)
+    
+    Returns:
+        MemoryStorage 구현 인스턴스
+    """
+    backend = (backend or os.getenv("MEMORY_BACKEND", "json")).lower()
+    if backend not in ("json", "sqlite", "binary"):
+        print(f"⚠️  경고: 알 수 없는 메모리 백엔드 '{backend}', json 사용")
+        backend = "json"
+    
+    if storage_path is None:
+        storage_path = _storage_path(backend, namespace or DEFAULT_NAMESPACE)
+    
+    registry_key = (backend, str(Path(storage_path).resolve()))
+    with _storages_lock:
+        storage = _storages.get(registry_key)
+        if storage is None:
+            # 기존 JSON 파일 가져오기는 기본 네임스페이스에만 적용
+            migrate_from = None
+            if not namespace or namespace == DEFAULT_NAMESPACE:
+                migrate_from = os.getenv("MEMORY_FILE", "data/memory.json")
+            if backend == "sqlite":
+                from src.memory.sqlite_storage import SQLiteMemoryStorage
+                
+                storage = SQLiteMemoryStorage(storage_path, migrate_from=migrate_from)
+            elif backend == "binary":
+                from src.memory.binary_storage import BinaryMemoryStorage
+                
+                storage = BinaryMemoryStorage(storage_path, migrate_from=migrate_from)
+            else:
+                storage = JSONMemoryStorage(storage_path)
+            _storages[registry_key] = storage
+        return storage
+
+
+def release_memory_storage(storage: MemoryStorage):
+    """
+    레지스트리에서 저장소를 제거하고 닫기 (네임스페이스 캐시에서 밀려날 때 사용)
+    
+    Args:
+        storage: create_memory_storage()로 얻은 저장소
+    """
+    with _storages_lock:
+        for key, registered in list(_storages.items()):
+            if registered is storage:
+                del _storages[key]
+                break
+        else:
+            return
+    storage.close()
+
+
+def get_storage_stats() -> Dict[str, Any]:
+    """
+    열려 있는 모든 저장소의 통계
+    
+    Returns:
+        {경로: 저장소 통계}
+    """
+    with _storages_lock:
+        storages = list(_storages.items())
+    return {path: storage.get_stats() for (_, path), storage in storages}
@@ -2,13 +2,14 @@
 Prompt Templates
 
 작업별 프롬프트 템플릿을 정의합니다.
+
+프롬프트 prefix 캐싱을 위해 모든 템플릿은 고정 내용(지침, 도구 스키마, 응답 형식)을
+앞에, 요청마다 바뀌는 내용(날짜, 대화 맥락, 사용자 요청)을 뒤에 배치합니다.
 """
 
 # Intent Classification 프롬프트
 INTENT_CLASSIFICATION_PROMPT = """사용자의 요청을 분석하여 의도를 파악하세요.
 
-사용자 요청: {user_input}
-
 다음 형식으로 응답하세요:
 ```json
 {{
@@ -21,13 +22,13 @@ INTENT_CLASSIFICATION_PROMPT = """사용자의 요청을 분석하여 의도를
   "confidence": 0.0-1.0
 }}
 ```
+
+사용자 요청: {user_input}
 """
 
 # Task Type 분류 프롬프트
 TASK_TYPE_CLASSIFICATION_PROMPT = """사용자의 요청을 분석하여 작업 타입을 결정하세요.
 
-사용자 요청: {user_input}
-
 ## 작업 타입
 1. **simple_query**: 일반적인 질문 (예: "파이썬에서 리스트 합치는 방법")
 2. **tool_required**: 외부 도구 필요 (예: "Notion에 할 일 추가")
@@ -44,17 +45,13 @@ TASK_TYPE_CLASSIFICATION_PROMPT = """사용자의 요청을 분석하여 작업
   "estimated_steps": 1
 }}
 ```
+
+사용자 요청: {user_input}
 """
 
 # Tool Selection# 도구 선택 프롬프트
 TOOL_SELECTION_PROMPT = """작업을 수행하기 위한 최적의 도구를 선택하고 파라미터를 생성하세요.
 
-{current_date_info}
-
-[이전 대화 맥락]:
-{context}
-
-작업: {task_description}
 사용 가능한 MCP 도구: {available_mcp_tools}
 {schema_details}
 
@@ -70,8 +67,7 @@ TOOL_SELECTION_PROMPT = """작업을 수행하기 위한 최적의 도구를 선
 3. **파라미터 이름을 임의로 변경하거나 추측하지 마세요**
 4. **스키마에 명시된 타입(string, number 등)을 준수하세요**
 5. **날짜는 YYYY-MM-DD 형식, 날짜+시간은 YYYY-MM-DDTHH:MM:SS 형식을 사용하세요**
-6. **"내일", "다음주" 등 상대적 날짜는 위의 현재 날짜 정보를 기준으로 계산하세요**
-7. **날짜/시간은 반드시 한국 시간대(KST, +09:00)를 포함해야 합니다.**
+6. **"내일", "다음주" 등 상대적 날짜는 아래의 현재 날짜 정보를 기준으로 계산하세요**
 7. **날짜/시간은 반드시 한국 시간대(KST, +09:00)를 포함해야 합니다.**
 8. **사용자 요청의 세부 정보를 반영하여 의미 있는 값을 생성하세요**
 9. **[중요] 사용자가 "그거", "이전 내용", "검색 결과" 등 문맥을 참조하는 경우, 반드시 [이전 대화 맥락]에서 구체적인 내용을 추출하여 파라미터에 포함하세요. (예: "맛집" -> 실제 찾은 식당 이름들 나열)**
@@ -93,6 +89,12 @@ TOOL_SELECTION_PROMPT = """작업을 수행하기 위한 최적의 도구를 선
   }}
 }}
 ```
+
+{current_date_info}
+[이전 대화 맥락]:
+{context}
+
+작업: {task_description}
 """
 
 # MCP Tool Parameter 생성 프롬프트
@@ -104,8 +106,6 @@ MCP_TOOL_PARAM_PROMPT = """MCP 도구 호출을 위한 파라미터를 생성하
 ## 파라미터 스키마 (각 파라미터의 설명을 주의 깊게 읽으세요!)
 {parameter_schema}
 
-사용자 요청: {user_request}
-
 ## 중요 지침
 1. **파라미터의 설명(description)을 보고 가장 적절한 필드에 데이터를 넣으세요.**
     - 검색 결과나 요약 내용이 있다면, 이를 담을 수 있는 필드(예: `description`, `body`, `content`, `summary` 등)를 찾아 상세히 기록하세요.
@@ -121,14 +121,13 @@ MCP_TOOL_PARAM_PROMPT = """MCP 도구 호출을 위한 파라미터를 생성하
   "param2": "value2"
 }}
 ```
+
+사용자 요청: {user_request}
 """
 
 # Web Search Query 생성 프롬프트
 WEB_SEARCH_QUERY_PROMPT = """웹 검색을 위한 최적의 검색어를 생성하세요.
 
-현재 날짜: {current_date}
-사용자 요청: {user_input}
-
 ## 중요사항
 1. "내일", "오늘", "어제" 같은 상대적 날짜는 절대 날짜로 변환하세요
 2. 날씨 검색 시 구체적인 날짜를 포함하세요
@@ -145,33 +144,34 @@ WEB_SEARCH_QUERY_PROMPT = """웹 검색을 위한 최적의 검색어를 생성
   }}
 }}
 ```
+
+현재 날짜: {current_date}
+사용자 요청: {user_input}
 """
 
 # Result Synthesis 프롬프트
 RESULT_SYNTHESIS_PROMPT = """여러 단계의 결과를 통합하여 최종 응답을 생성하세요.
 
-사용자 요청: {user_input}
-실행 단계들:
-{execution_steps}
-
 ## 응답 작성 가이드
 1. 사용자 질문에 직접적으로 답변
 2. 사용한 도구와 출처 명시
 3. 간결하고 명확하게 작성
 4. 불확실한 부분은 명시
 
+사용자 요청: {user_input}
+실행 단계들:
+{execution_steps}
+
 최종 응답을 작성하세요:
 """
 
 # Memory Save 판단 프롬프트
 MEMORY_SAVE_PROMPT = """사용자가 정보를 기억해달라고 요청했는지 판단하세요.
 
-사용자 요청: {user_input}
-[이전 대화 맥락]:
-{context}
-
 "기억해", "저장해", "메모해" 등의 명시적 요청이 있는지 확인하세요.
 
+같은 정보를 이미 저장한 적이 있다면 같은 키를 사용하세요 (예: "name"과 "user_name"을 섞어 쓰지 않기).
+
 **중요**: "그거", "방금 검색한 거" 등 대명사를 사용하는 경우, **[이전 대화 맥락]에서 구체적인 내용을 찾아 `memory_value`에 저장하세요.** (예: "방금 찾은 맛집" -> "A식당, B식당, C식당")
 
 다음 형식으로 응답하세요:
@@ -180,9 +180,14 @@ MEMORY_SAVE_PROMPT = """사용자가 정보를 기억해달라고 요청했는
   "should_save": true/false,
   "memory_key": "저장할 키",
   "memory_value": "저장할 값 (문맥에서 추출한 구체적 내용)",
+  "ttl_days": "유효 기간이 있는 정보(예: 이번 주 일정)면 보관할 일수, 계속 유효하면 null",
   "reasoning": "판단 이유"
 }}
 ```
+
+[이전 대화 맥락]:
+{context}
+사용자 요청: {user_input}
 """
 
 # Error Handling 프롬프트
@@ -212,8 +217,6 @@ ERROR_HANDLING_PROMPT = """오류가 발생했습니다. 대안을 제시하세
 # Task Decomposition 프롬프트 (복잡한 작업 분해)
 TASK_DECOMPOSITION_PROMPT = """복잡한 작업을 여러 단계로 분해하세요.
 
-사용자 요청: {user_input}
-
 ## 분해 기준
 1. 각 단계는 독립적으로 실행 가능해야 함
 2. 이전 단계의 결과가 다음 단계의 입력이 될 수 있음
@@ -236,6 +239,26 @@ TASK_DECOMPOSITION_PROMPT = """복잡한 작업을 여러 단계로 분해하세
   "total_steps": 단계 수
 }}
 ```
+
+사용자 요청: {user_input}
+"""
+
+
+# Conversation Summary 프롬프트 (대화 창에서 밀려난 턴을 누적 요약에 반영)
+CONVERSATION_SUMMARY_PROMPT = """기존 대화 요약에 새 대화 내용을 반영하여 갱신된 요약을 작성하세요.
+
+## 요약 작성 가이드
+1. 사용자가 밝힌 사실, 선호, 요청과 그에 대한 결론을 보존
+2. 이후 대화에서 대명사("그거", "아까 찾은 곳")로 가리킬 수 있는 구체적 대상(이름, 장소, 숫자) 유지
+3. 인사말, 중복 설명, 긴 검색 결과 본문은 생략
+4. {max_chars}자 이내의 한국어 문장으로 작성
+5. 요약문만 출력
+
+[기존 요약]:
+{summary}
+
+[새 대화]:
+{new_turns}
 """
 
 
@@ -267,22 +290,22 @@ def get_tool_selection_prompt(task_description: str, available_mcp_tools: list,
     """Tool selection 프롬프트 생성"""
     from datetime import datetime
     
-    tools_str = ", ".join(available_mcp_tools) if available_mcp_tools else "없음"
+    tools_str = ", ".join(sorted(available_mcp_tools)) if available_mcp_tools else "없음"
     
-    # 현재 날짜 정보
+    # 현재 날짜 정보 (요청마다 바뀌므로 프롬프트 끝에 배치됨)
     now = datetime.now()
-    current_date_info = f"""
-현재 날짜 및 시간 (KST): {now.strftime('%Y-%m-%d %H:%M:%S')}
+    current_date_info = f"""현재 날짜 및 시간 (KST): {now.strftime('%Y-%m-%d %H:%M')}
 - 오늘: {now.strftime('%Y-%m-%d')}
 - 현재 시각: {now.strftime('%H:%M')}
 - 시간대: Asia/Seoul (+09:00)
 """
     
     # 도구 스키마 정보를 상세하게 포맷팅
+    # 도구 순서가 호출마다 같아야 prefix 캐시가 재사용되므로 정렬하여 출력
     schema_details = ""
     if tools_schema:
         schema_details = "\n\n## 사용 가능한 도구 상세 정보:\n"
-        for tool_key, schema in tools_schema.items():
+        for tool_key, schema in sorted(tools_schema.items()):
             schema_details += f"\n### {tool_key}\n"
             schema_details += f"- 설명: {schema.get('description', '설명 없음')}\n"
             
@@ -344,3 +367,13 @@ def get_mcp_tool_param_prompt(tool_name: str, tool_description: str, parameter_s
         parameter_schema=parameter_schema,
         user_request=user_request
     )
+
+
+def get_conversation_summary_prompt(summary: str, new_turns: str, max_chars: int = 600) -> str:
+    """Conversation summary 갱신 프롬프트 생성"""
+    return format_prompt(
+        CONVERSATION_SUMMARY_PROMPT,
+        summary=summary or "(없음)",
+        new_turns=new_turns,
+        max_chars=max_chars
+    )
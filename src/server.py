@@ -6,13 +6,17 @@ FastAPI 기반의 웹 서버입니다.
 """
 
 import os
+import uuid
+from typing import Optional
 from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from src.agent.core import AIAgent
+from src.memory.storage import get_storage_stats
 from src.utils.config import config
 from src.utils.logger import setup_logger
+from src.utils.openai_client import get_openai_client
 
 # 로거 설정
 logger = setup_logger("server")
@@ -36,11 +40,14 @@ agent = None
 class ChatRequest(BaseModel):
     """채팅 요청 모델"""
     message: str
+    session_id: Optional[str] = None  # 없으면 새 세션 발급
+    user_id: Optional[str] = None  # 없으면 세션 ID를 사용자 네임스페이스로 사용
 
 
 class ChatResponse(BaseModel):
     """채팅 응답 모델"""
     response: str
+    session_id: str
 
 
 @app.on_event("startup")
@@ -68,14 +75,30 @@ async def chat(request: ChatRequest):
     if not agent:
         raise HTTPException(status_code=503, detail="Agent not initialized")
     
+    session_id = request.session_id or uuid.uuid4().hex
+    user_id = request.user_id or session_id
+    
     try:
-        response = agent.process_request(request.message)
-        return ChatResponse(response=response)
+        response = agent.process_request(request.message, session_id=session_id, user_id=user_id)
+        return ChatResponse(response=response, session_id=session_id)
     except Exception as e:
         logger.error(f"요청 처리 오류: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/stats")
+async def stats():
+    """성능 통계 엔드포인트 (호출 지점별 LLM 지연 시간/토큰/캐시 적중률, 엔드포인트 상태, 저장소 잠금 경합, 검색 연결 재사용)"""
+    client = get_openai_client()
+    return {
+        "llm": client.get_call_stats(),
+        "llm_endpoints": client.backend.get_stats(),
+        "memory": get_storage_stats(),
+        "memory_namespaces": agent.memory_namespaces.get_stats() if agent else {},
+        "tools": agent.executor.tool_router.get_stats() if agent else {}
+    }
+
+
 # 정적 파일 서빙 (항상 가장 마지막에 위치)
 # 프로젝트 루트의 static 디렉토리 찾기
 # 현재 파일: src/server.py -> 프로젝트 루트: ../
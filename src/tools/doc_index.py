@@ -0,0 +1,636 @@
+"""
+Document Index
+
+자체 문서/FAQ(HTML, Markdown)를 네트워크 없이 검색하기 위한 디스크 기반 BM25 역색인입니다.
+
+색인 디렉토리 구성:
+    index.lock              프로세스 간 쓰기 잠금 파일
+    manifest.json           세그먼트 목록, 세그먼트별 삭제 문서, 문서 ID → (세그먼트, 번호), 원본 파일 상태
+    seg-<번호>/terms.json    특징 → [게시 목록 시작 위치, 문서 빈도]
+    seg-<번호>/docs.u32      게시 목록 문서 번호 (uint32, 특징 순서로 연결)
+    seg-<번호>/tfs.f32       게시 목록 특징 빈도 (float32)
+    seg-<번호>/lengths.f32   문서 길이 (float32)
+    seg-<번호>/stored.rec    [u32 길이][JSON 레코드] 제목/URL/구절 (검색 결과로 반환할 때만 디코딩)
+    seg-<번호>/stored.idx    레코드 시작 위치 uint64 배열
+
+- 문서를 추가할 때마다 새 세그먼트를 쓰고(기존 세그먼트는 바꾸지 않음), 삭제/교체된 문서는
+  manifest의 삭제 목록으로만 표시 → 추가/삭제가 전체 재색인 없이 바로 반영
+- 세그먼트가 MAX_SEGMENTS를 넘으면 살아 있는 문서만 모아 하나로 병합
+- 질의 시에는 게시 목록/문서 길이를 memory-map하여 질의 특징의 구간만 읽음
+- 문서 빈도(df)는 삭제 표시된 문서를 포함한 근사값 (병합하면 정확해짐)
+- 여러 워커 프로세스가 같은 디렉토리를 쓰므로 manifest/세그먼트 쓰기와 정리는 파일 잠금 안에서 하고,
+  다른 프로세스가 manifest를 바꿨으면 쓰기/검색 전에 다시 읽음
+"""
+
+import html
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import struct
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+import numpy as np
+
+from src.memory.locking import FileLock
+from src.tools.page_fetcher import extract_main_text, split_passages
+from src.utils.config import config
+from src.utils.logger import setup_logger
+from src.utils.text_search import bm25_terms
+
+logger = setup_logger("doc_index")
+
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = "index.lock"
+SEGMENT_PREFIX = "seg-"
+RECORD_HEADER = struct.Struct("<I")
+DOC_DTYPE = np.dtype("<u4")
+FLOAT_DTYPE = np.dtype("<f4")
+OFFSET_DTYPE = np.dtype("<u8")
+
+# BM25 계수
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 색인할 원본 파일 확장자
+SOURCE_SUFFIXES = {".html": "html", ".htm": "html", ".md": "markdown", ".markdown": "markdown"}
+# 문서당 최대 본문 글자 수, 저장할 구절 길이, 검색 결과 스니펫 길이
+MAX_DOC_CHARS = 200000
+PASSAGE_CHARS = 300
+SNIPPET_CHARS = 300
+
+HTML_TITLE = re.compile(rb"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+MD_HEADING = re.compile(r"^\s{0,3}#{1,6}\s+(.*?)\s*#*\s*$")
+MD_FENCE = re.compile(r"^\s*(```|~~~)")
+MD_IMAGE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+MD_LINK = re.compile(r"\[([^\]]+)\]\([^)]*\)")
+MD_MARKUP = re.compile(r"(^\s*(>|[-*+]|\d+[.)])\s+)|[*_`]+|<[^>]+>")
+
+
+def parse_markdown(text: str) -> Tuple[str, List[str]]:
+    """
+    Markdown 문서를 제목과 본문 블록으로 변환
+    
+    문단(빈 줄로 구분)과 제목 줄을 블록으로 나누고 링크/강조/목록 기호를 제거합니다.
+    
+    Args:
+        text: Markdown 원문
+    
+    Returns:
+        (첫 번째 제목, 본문 블록 리스트)
+    """
+    title = ""
+    blocks = []
+    paragraph = []
+    in_fence = False
+    
+    def flush():
+        block = " ".join(" ".join(paragraph).split())
+        if block:
+            blocks.append(block)
+        paragraph.clear()
+    
+    for line in text.splitlines():
+        if MD_FENCE.match(line):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            paragraph.append(line)
+            continue
+        heading = MD_HEADING.match(line)
+        if heading:
+            flush()
+            heading_text = MD_MARKUP.sub("", MD_LINK.sub(r"\1", heading.group(1))).strip()
+            title = title or heading_text
+            paragraph.append(heading_text)
+            flush()
+        elif not line.strip():
+            flush()
+        else:
+            line = MD_LINK.sub(r"\1", MD_IMAGE.sub(r"\1", line))
+            paragraph.append(MD_MARKUP.sub("", line))
+    flush()
+    return title, blocks
+
+
+def parse_html(data: bytes) -> Tuple[str, List[str]]:
+    """
+    HTML 문서를 제목과 본문 블록으로 변환 (내비게이션/스크립트 등 제외)
+    
+    Args:
+        data: HTML 바이트
+    
+    Returns:
+        (<title> 또는 첫 블록, 본문 블록 리스트)
+    """
+    match = HTML_TITLE.search(data[:65536])
+    title = " ".join(html.unescape(match.group(1).decode("utf-8", errors="replace")).split()) if match else ""
+    blocks = extract_main_text(data, max_chars=MAX_DOC_CHARS)
+    return title or (blocks[0][:100] if blocks else ""), blocks
+
+
+def load_document(path: Path) -> Tuple[str, List[str]]:
+    """
+    원본 파일 읽기
+    
+    Args:
+        path: HTML/Markdown 파일 경로
+    
+    Returns:
+        (제목, 본문 블록 리스트), 제목이 없으면 파일 이름
+    """
+    if SOURCE_SUFFIXES[path.suffix.lower()] == "html":
+        title, blocks = parse_html(path.read_bytes())
+    else:
+        title, blocks = parse_markdown(path.read_text(encoding="utf-8", errors="replace"))
+    return title or path.stem, blocks
+
+
+def _idf(total_docs: int, df: int) -> float:
+    """BM25 역문서 빈도 (항상 양수, 삭제 표시된 문서를 포함한 df는 문서 수로 제한)"""
+    df = min(df, total_docs)
+    return math.log(1.0 + (total_docs - df + 0.5) / (df + 0.5))
+
+
+def _fsync_write(path: Path, data: bytes):
+    """파일 쓰기 + fsync"""
+    with open(path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _map_array(path: Path, dtype: np.dtype) -> np.ndarray:
+    """배열 파일 memory-map (빈 파일은 mmap할 수 없으므로 빈 배열)"""
+    if path.stat().st_size == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+class Segment:
+    """디스크에 기록된 변경 불가능한 색인 조각 (게시 목록/문서 길이/저장 필드를 memory-map)"""
+    
+    def __init__(self, path: Path, deleted: Iterable[int] = ()):
+        """
+        초기화
+        
+        Args:
+            path: 세그먼트 디렉토리
+            deleted: 삭제 표시된 문서 번호
+        """
+        self.path = path
+        self.name = path.name
+        with open(path / "terms.json", 'r', encoding='utf-8') as f:
+            self.terms: Dict[str, List[int]] = json.load(f)
+        self.docs = _map_array(path / "docs.u32", DOC_DTYPE)
+        self.tfs = _map_array(path / "tfs.f32", FLOAT_DTYPE)
+        self.doc_len = _map_array(path / "lengths.f32", FLOAT_DTYPE)
+        self.offsets = _map_array(path / "stored.idx", OFFSET_DTYPE)
+        with open(path / "stored.rec", 'rb') as f:
+            self._stored = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.set_deleted(deleted)
+    
+    @property
+    def size(self) -> int:
+        """삭제 표시를 포함한 문서 수"""
+        return len(self.doc_len)
+    
+    def set_deleted(self, deleted: Iterable[int]):
+        """
+        삭제 표시 갱신
+        
+        검색 중인 스레드가 이전 배열을 계속 쓸 수 있도록 배열을 새로 만들어 교체합니다.
+        """
+        live = np.ones(self.size, dtype=bool)
+        live[list(deleted)] = False
+        self.live_len = float(np.asarray(self.doc_len, dtype=np.float64)[live].sum()) if self.size else 0.0
+        self.live_count = int(live.sum())
+        self.live = live
+    
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """특징의 (문서 번호 배열, 빈도 배열), memory-map의 구간만 읽음"""
+        entry = self.terms.get(term)
+        if entry is None:
+            return np.empty(0, dtype=DOC_DTYPE), np.empty(0, dtype=FLOAT_DTYPE)
+        start, count = entry
+        return self.docs[start:start + count], self.tfs[start:start + count]
+    
+    def stored(self, local: int) -> Dict[str, Any]:
+        """저장 필드 디코딩 (제목, URL, 구절 등)"""
+        offset = int(self.offsets[local])
+        (length,) = RECORD_HEADER.unpack_from(self._stored, offset)
+        start = offset + RECORD_HEADER.size
+        return json.loads(self._stored[start:start + length])
+    
+    @staticmethod
+    def write(path: Path, records: List[Dict[str, Any]]):
+        """
+        문서 레코드로 새 세그먼트 쓰기
+        
+        임시 디렉토리에 모든 파일을 쓰고 fsync한 뒤 이름을 바꾸므로,
+        중간에 중단되어도 manifest가 가리키는 세그먼트는 항상 완전합니다.
+        
+        Args:
+            path: 세그먼트 디렉토리
+            records: [{"id", "url", "title", "passages", ...}]
+        """
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = np.zeros(len(records), dtype=FLOAT_DTYPE)
+        stored = bytearray()
+        offsets = np.zeros(len(records), dtype=OFFSET_DTYPE)
+        for local, record in enumerate(records):
+            # 제목은 두 번 넣어 본문보다 가중
+            text = " ".join([record["title"], record["title"], *record["passages"]])
+            terms = Counter(bm25_terms(text))
+            lengths[local] = sum(terms.values())
+            for term, tf in terms.items():
+                postings.setdefault(term, []).append((local, tf))
+            body = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            offsets[local] = len(stored)
+            stored += RECORD_HEADER.pack(len(body)) + body
+        
+        terms_table = {}
+        docs = np.zeros(sum(len(entries) for entries in postings.values()), dtype=DOC_DTYPE)
+        tfs = np.zeros(len(docs), dtype=FLOAT_DTYPE)
+        position = 0
+        for term in sorted(postings):
+            entries = postings[term]
+            terms_table[term] = [position, len(entries)]
+            docs[position:position + len(entries)] = [local for local, _ in entries]
+            tfs[position:position + len(entries)] = [tf for _, tf in entries]
+            position += len(entries)
+        
+        temp_path = path.with_name(path.name + ".tmp")
+        shutil.rmtree(temp_path, ignore_errors=True)
+        temp_path.mkdir(parents=True)
+        _fsync_write(temp_path / "terms.json", json.dumps(terms_table, ensure_ascii=False).encode("utf-8"))
+        _fsync_write(temp_path / "docs.u32", docs.tobytes())
+        _fsync_write(temp_path / "tfs.f32", tfs.tobytes())
+        _fsync_write(temp_path / "lengths.f32", lengths.tobytes())
+        _fsync_write(temp_path / "stored.rec", bytes(stored))
+        _fsync_write(temp_path / "stored.idx", offsets.tobytes())
+        os.replace(temp_path, path)
+
+
+class DocumentIndex:
+    """세그먼트 기반 증분 BM25 문서 색인"""
+    
+    def __init__(self, index_dir: str = None, max_segments: int = None):
+        """
+        초기화
+        
+        Args:
+            index_dir: 색인 디렉토리 (None이면 DOCS_INDEX_DIR)
+            max_segments: 병합 전까지 유지할 최대 세그먼트 수 (None이면 DOCS_INDEX_MAX_SEGMENTS)
+        """
+        self.index_dir = Path(index_dir or config.docs_index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.max_segments = max_segments or config.docs_index_max_segments
+        self.manifest_path = self.index_dir / MANIFEST_FILE
+        # 잠금 순서: 파일 잠금 → _lock
+        self._file_lock = FileLock(str(self.index_dir / LOCK_FILE))
+        self._lock = threading.Lock()
+        self._manifest: Dict[str, Any] = {"next_segment": 1, "segments": [], "docs": {}, "sources": {}}
+        # 마지막으로 읽거나 쓴 manifest 파일의 (inode, 수정 시각), 다른 프로세스의 변경 감지용
+        self._manifest_stamp: Optional[Tuple[int, int]] = None
+        # 검색 스레드는 이 튜플을 한 번 읽어 쓰고, 쓰기 쪽은 새 튜플로 교체
+        self._segments: Tuple[Segment, ...] = ()
+        self._queries = 0
+        self._query_time = 0.0
+        self._load()
+    
+    def __len__(self) -> int:
+        return len(self._manifest["docs"])
+    
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._manifest["docs"]
+    
+    def _load(self):
+        """manifest와 세그먼트 열기 (manifest에 없는 세그먼트/임시 디렉토리는 정리)"""
+        # 세그먼트 쓰기는 배타 잠금 안에서만 하므로, 잠금을 잡은 동안 manifest에 없는 디렉토리는 중단된 쓰기의 잔여물
+        with self._file_lock.acquire(), self._lock:
+            self._refresh()
+            names = {segment.name for segment in self._segments}
+            for path in self.index_dir.glob(SEGMENT_PREFIX + "*"):
+                if path.name not in names:
+                    shutil.rmtree(path, ignore_errors=True)
+        if self._segments:
+            logger.info(f"문서 색인 로드: 문서 {len(self)}개, 세그먼트 {len(self._segments)}개 ({self.index_dir})")
+    
+    def _stat_manifest(self) -> Optional[Tuple[int, int]]:
+        """manifest 파일의 (inode, 수정 시각), 없으면 None (rename으로 교체할 때마다 inode가 바뀜)"""
+        try:
+            stat = self.manifest_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+    
+    def _refresh(self):
+        """다른 프로세스가 manifest를 바꿨으면 다시 읽고 세그먼트 목록 갱신 (파일 잠금과 _lock 안에서 호출)"""
+        stamp = self._stat_manifest()
+        if stamp is None or stamp == self._manifest_stamp:
+            return
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            self._manifest = json.load(f)
+        # 이미 연 세그먼트는 삭제 표시만 갱신하고, 병합/정리로 사라진 세그먼트는 목록에서 뺌
+        opened = {segment.name: segment for segment in self._segments}
+        segments = []
+        for entry in self._manifest["segments"]:
+            segment = opened.get(entry["name"])
+            if segment is None:
+                segment = Segment(self.index_dir / entry["name"], entry["deleted"])
+            elif segment.size - segment.live_count != len(entry["deleted"]):
+                segment.set_deleted(entry["deleted"])
+            segments.append(segment)
+        self._segments = tuple(segments)
+        self._manifest_stamp = stamp
+    
+    def _write_manifest(self):
+        """manifest를 임시 파일 + fsync + rename으로 원자적으로 저장 (파일 잠금과 _lock 안에서 호출)"""
+        temp_path = self.manifest_path.with_suffix(".tmp")
+        _fsync_write(temp_path, json.dumps(self._manifest, ensure_ascii=False).encode("utf-8"))
+        os.replace(temp_path, self.manifest_path)
+        self._manifest_stamp = self._stat_manifest()
+    
+    def _segment_entry(self, name: str) -> Dict[str, Any]:
+        """manifest의 세그먼트 항목"""
+        return next(entry for entry in self._manifest["segments"] if entry["name"] == name)
+    
+    def _mark_deleted(self, doc_ids: Iterable[str]) -> int:
+        """문서에 삭제 표시 (_lock 안에서 호출, manifest는 호출한 쪽에서 저장)"""
+        touched = set()
+        count = 0
+        for doc_id in doc_ids:
+            location = self._manifest["docs"].pop(doc_id, None)
+            self._manifest["sources"].pop(doc_id, None)
+            if location is None:
+                continue
+            name, local = location
+            self._segment_entry(name)["deleted"].append(local)
+            touched.add(name)
+            count += 1
+        for segment in self._segments:
+            if segment.name in touched:
+                segment.set_deleted(self._segment_entry(segment.name)["deleted"])
+        return count
+    
+    def _drop_empty_segments(self):
+        """살아 있는 문서가 없는 세그먼트 제거 (파일 잠금과 _lock 안에서 호출)"""
+        empty = {segment.name for segment in self._segments if segment.live_count == 0}
+        if not empty:
+            return
+        self._manifest["segments"] = [entry for entry in self._manifest["segments"] if entry["name"] not in empty]
+        self._segments = tuple(segment for segment in self._segments if segment.name not in empty)
+        self._write_manifest()
+        for name in empty:
+            shutil.rmtree(self.index_dir / name, ignore_errors=True)
+    
+    def _append_segment(self, records: List[Dict[str, Any]]):
+        """새 세그먼트를 쓰고 manifest에 등록 (파일 잠금과 _lock 안에서 호출)"""
+        name = f"{SEGMENT_PREFIX}{self._manifest['next_segment']:06d}"
+        self._manifest["next_segment"] += 1
+        Segment.write(self.index_dir / name, records)
+        self._manifest["segments"].append({"name": name, "deleted": []})
+        for local, record in enumerate(records):
+            self._manifest["docs"][record["id"]] = [name, local]
+            if record.get("source") is not None:
+                self._manifest["sources"][record["id"]] = record["source"]
+        self._segments = self._segments + (Segment(self.index_dir / name),)
+    
+    def add_documents(self, documents: List[Dict[str, Any]]) -> int:
+        """
+        문서 추가 또는 교체 (한 번 호출에 세그먼트 하나)
+        
+        Args:
+            documents: [{"id", "url", "title", "text" 또는 "blocks", "source"(선택: 원본 파일 상태)}]
+        
+        Returns:
+            추가된 문서 수
+        """
+        records = {}
+        for doc in documents:
+            blocks = doc.get("blocks") or [doc.get("text", "")]
+            records[doc["id"]] = {
+                "id": doc["id"],
+                "url": doc.get("url", doc["id"]),
+                "title": doc.get("title", ""),
+                "passages": split_passages(blocks, PASSAGE_CHARS),
+                "source": doc.get("source"),
+            }
+        if not records:
+            return 0
+        
+        with self._file_lock.acquire(), self._lock:
+            self._refresh()
+            # 이전 버전은 삭제 표시만 하고 새 세그먼트에 다시 씀
+            self._mark_deleted(records)
+            self._append_segment(list(records.values()))
+            self._write_manifest()
+            self._drop_empty_segments()
+            if len(self._segments) > self.max_segments:
+                self._merge()
+        return len(records)
+    
+    def delete(self, doc_ids: Iterable[str]) -> int:
+        """
+        문서 삭제
+        
+        Args:
+            doc_ids: 문서 ID 목록
+        
+        Returns:
+            삭제된 문서 수
+        """
+        with self._file_lock.acquire(), self._lock:
+            self._refresh()
+            count = self._mark_deleted(doc_ids)
+            if count:
+                self._write_manifest()
+                self._drop_empty_segments()
+        return count
+    
+    def merge(self):
+        """모든 세그먼트를 살아 있는 문서만 모아 하나로 병합"""
+        with self._file_lock.acquire(), self._lock:
+            self._refresh()
+            self._merge()
+    
+    def _merge(self):
+        """세그먼트 병합 (파일 잠금과 _lock 안에서 호출)"""
+        if len(self._segments) <= 1 and all(segment.live_count == segment.size for segment in self._segments):
+            return
+        start_time = time.perf_counter()
+        old = self._segments
+        records = [
+            segment.stored(local)
+            for segment in old
+            for local in np.flatnonzero(segment.live).tolist()
+        ]
+        self._manifest["segments"] = []
+        self._segments = ()
+        if records:
+            self._append_segment(records)
+        self._write_manifest()
+        # 검색 중인 스레드가 이전 세그먼트를 참조할 수 있으므로 파일만 지우고 mmap은 참조가 사라질 때 해제
+        for segment in old:
+            shutil.rmtree(segment.path, ignore_errors=True)
+        logger.info(f"문서 색인 병합: 세그먼트 {len(old)}개 → {len(self._segments)}개, 문서 {len(records)}개 ({time.perf_counter() - start_time:.2f}s)")
+    
+    def sync_directory(self, source_dir: str, base_url: str = None) -> Dict[str, int]:
+        """
+        디렉토리의 HTML/Markdown 파일과 색인 동기화
+        
+        수정 시각/크기가 바뀐 파일과 새 파일만 다시 읽어 세그먼트 하나로 추가하고,
+        사라진 파일은 삭제합니다. 동기화 전체를 파일 잠금 안에서 하므로 여러 프로세스가 동시에
+        시작해도 한 프로세스만 색인하고 나머지는 그 결과를 읽습니다.
+        
+        Args:
+            source_dir: 원본 문서 디렉토리
+            base_url: 검색 결과 URL 접두 (None이면 file:// 경로)
+        
+        Returns:
+            {"added", "updated", "deleted", "unchanged"}
+        """
+        with self._file_lock.acquire():
+            with self._lock:
+                self._refresh()
+            return self._sync_directory(Path(source_dir), base_url)
+    
+    def _sync_directory(self, root: Path, base_url: Optional[str]) -> Dict[str, int]:
+        """디렉토리 동기화 (파일 잠금 안에서 호출)"""
+        sources = dict(self._manifest["sources"])
+        documents = []
+        seen = set()
+        counts = {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+        for path in sorted(root.rglob("*")):
+            if path.suffix.lower() not in SOURCE_SUFFIXES or not path.is_file():
+                continue
+            doc_id = path.relative_to(root).as_posix()
+            seen.add(doc_id)
+            stat = path.stat()
+            source = [stat.st_mtime_ns, stat.st_size]
+            if sources.get(doc_id) == source and doc_id in self:
+                counts["unchanged"] += 1
+                continue
+            try:
+                title, blocks = load_document(path)
+            except OSError as e:
+                logger.warning(f"문서 읽기 실패 ({path}): {e}")
+                continue
+            url = f"{base_url.rstrip('/')}/{quote(doc_id)}" if base_url else path.resolve().as_uri()
+            documents.append({"id": doc_id, "url": url, "title": title, "blocks": blocks, "source": source})
+            counts["updated" if doc_id in self else "added"] += 1
+        
+        removed = [doc_id for doc_id in sources if doc_id not in seen]
+        counts["deleted"] = self.delete(removed)
+        self.add_documents(documents)
+        logger.info(f"문서 색인 동기화 ({root}): {counts}")
+        return counts
+    
+    def search(self, query: str, top_k: int = 5, min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        BM25 검색
+        
+        점수는 질의 특징이 모두 평균 길이 문서에 한 번씩 나올 때의 점수로 나눈 값이라
+        질의와 무관하게 비슷한 범위(대략 0~1)를 가집니다.
+        
+        Args:
+            query: 검색어
+            top_k: 최대 결과 수
+            min_score: 최소 정규화 점수
+        
+        Returns:
+            [{"id", "title", "url", "snippet", "score"}] 점수 내림차순
+        """
+        start_time = time.perf_counter()
+        if self._stat_manifest() != self._manifest_stamp:
+            with self._file_lock.acquire(exclusive=False), self._lock:
+                self._refresh()
+        segments = self._segments
+        terms = sorted(set(bm25_terms(query)))
+        total_docs = sum(segment.live_count for segment in segments)
+        if not terms or not total_docs or top_k <= 0:
+            return []
+        avgdl = sum(segment.live_len for segment in segments) / total_docs or 1.0
+        
+        postings = [[segment.postings(term) for term in terms] for segment in segments]
+        dfs = [sum(len(per_segment[i][0]) for per_segment in postings) for i in range(len(terms))]
+        idfs = [_idf(total_docs, df) for df in dfs]
+        max_score = sum(idfs) * (BM25_K1 + 1)
+        
+        hits = []
+        for segment, per_segment in zip(segments, postings):
+            scores = np.zeros(segment.size, dtype=np.float32)
+            for idf, (docs, tfs) in zip(idfs, per_segment):
+                if not len(docs):
+                    continue
+                lengths = segment.doc_len[docs]
+                scores[docs] += idf * tfs * (BM25_K1 + 1) / (tfs + BM25_K1 * (1 - BM25_B + BM25_B * lengths / avgdl))
+            scores[~segment.live] = 0.0
+            candidates = np.flatnonzero(scores >= max(min_score * max_score, 1e-9))
+            if len(candidates) > top_k:
+                candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+            hits.extend((float(scores[local]), segment, int(local)) for local in candidates)
+        
+        hits.sort(key=lambda hit: -hit[0])
+        query_terms = set(terms)
+        results = []
+        for score, segment, local in hits[:top_k]:
+            record = segment.stored(local)
+            results.append({
+                "id": record["id"],
+                "title": record["title"],
+                "url": record["url"],
+                "snippet": self._best_passage(record["passages"], query_terms)[:SNIPPET_CHARS],
+                "score": score / max_score,
+            })
+        
+        with self._lock:
+            self._queries += 1
+            self._query_time += time.perf_counter() - start_time
+        return results
+    
+    @staticmethod
+    def _best_passage(passages: List[str], query_terms: set) -> str:
+        """질의 특징이 가장 많이 겹치는 구절"""
+        if not passages:
+            return ""
+        return max(passages, key=lambda passage: len(query_terms.intersection(bm25_terms(passage))))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """문서/세그먼트 수, 삭제 표시 수, 평균 질의 시간"""
+        segments = self._segments
+        with self._lock:
+            return {
+                "docs": len(self),
+                "segments": len(segments),
+                "deleted": sum(segment.size - segment.live_count for segment in segments),
+                "queries": self._queries,
+                "avg_query_ms": self._query_time / self._queries * 1000 if self._queries else 0.0,
+            }
+
+
+_document_index: Optional[DocumentIndex] = None
+_document_index_lock = threading.Lock()
+
+
+def get_document_index() -> DocumentIndex:
+    """
+    문서 색인 싱글톤 반환 (DOCS_SOURCE_DIR이 설정되어 있으면 처음 열 때 동기화)
+    
+    Returns:
+        DocumentIndex 인스턴스
+    """
+    global _document_index
+    with _document_index_lock:
+        if _document_index is None:
+            _document_index = DocumentIndex()
+            if config.docs_source_dir:
+                _document_index.sync_directory(config.docs_source_dir, config.docs_base_url or None)
+    return _document_index
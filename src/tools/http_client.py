@@ -0,0 +1,312 @@
+"""
+HTTP Client
+
+웹 검색 등 도구가 공유하는 HTTP 클라이언트입니다.
+호스트별 연결 풀과 keep-alive로 매 요청마다 TCP/TLS 연결을 새로 맺지 않고,
+연결/읽기 타임아웃을 따로 적용하며, 응답 본문은 상한까지만 읽습니다.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from src.utils.config import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger("http_client")
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+}
+CHUNK_SIZE = 16384
+
+
+class ResponseTooLarge(Exception):
+    """응답 본문이 크기 상한을 넘은 경우"""
+
+
+@dataclass
+class HTTPResponse:
+    """상한까지 읽은 HTTP 응답"""
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    encoding: Optional[str]
+    elapsed: float
+    truncated: bool = False
+    
+    @property
+    def text(self) -> str:
+        """본문 문자열"""
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+    
+    def raise_for_status(self):
+        """4xx/5xx 응답이면 requests.HTTPError 발생"""
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} 응답: {self.url}")
+
+
+@dataclass
+class ConnectionStats:
+    """연결 재사용 통계"""
+    requests: int = 0
+    new_connections: int = 0
+    errors: int = 0
+    truncated: int = 0
+    bytes_read: int = 0
+    total_latency: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    
+    def add(self, **counts):
+        """카운터 증가"""
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """통계 딕셔너리"""
+        with self._lock:
+            reused = max(self.requests - self.new_connections, 0)
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_ratio": reused / self.requests if self.requests else 0.0,
+                "errors": self.errors,
+                "truncated": self.truncated,
+                "bytes_read": self.bytes_read,
+                "avg_latency": self.total_latency / self.requests if self.requests else 0.0
+            }
+
+
+class _CountingAdapter(HTTPAdapter):
+    """새 연결 생성 횟수를 세는 HTTPAdapter"""
+    
+    def __init__(self, stats: ConnectionStats, **kwargs):
+        self._stats = stats
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        stats = self._stats
+        
+        def counting(pool_class):
+            class CountingPool(pool_class):
+                def _new_conn(self):
+                    stats.add(new_connections=1)
+                    return super()._new_conn()
+            return CountingPool
+        
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": counting(HTTPConnectionPool),
+            "https": counting(HTTPSConnectionPool)
+        }
+
+
+class HTTPClient:
+    """연결 풀 기반 HTTP 클라이언트 (동기/비동기)"""
+    
+    def __init__(
+        self,
+        connect_timeout: float = None,
+        read_timeout: float = None,
+        max_response_bytes: int = None,
+        pool_size: int = None
+    ):
+        """
+        초기화
+        
+        Args:
+            connect_timeout: 연결 타임아웃 (초)
+            read_timeout: 응답 대기/읽기 타임아웃 (초)
+            max_response_bytes: 응답 본문 최대 바이트
+            pool_size: 호스트별 최대 연결 수 (비동기 요청 동시 실행 수도 같음)
+        """
+        self.connect_timeout = connect_timeout if connect_timeout is not None else config.http_connect_timeout
+        self.read_timeout = read_timeout if read_timeout is not None else config.http_read_timeout
+        self.max_response_bytes = max_response_bytes or config.http_max_response_bytes
+        pool_size = pool_size or config.http_pool_size
+        
+        self.stats = ConnectionStats()
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = _CountingAdapter(self.stats, pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="http")
+        
+        logger.info(
+            f"HTTP 클라이언트 초기화: 연결 {self.connect_timeout}s / 읽기 {self.read_timeout}s, "
+            f"응답 상한 {self.max_response_bytes}바이트, 풀 {pool_size}"
+        )
+    
+    def request(
+        self,
+        method: str,
+        url: str,
+        max_bytes: int = None,
+        truncate: bool = True,
+        on_chunk: Callable[[bytes], bool] = None,
+        **kwargs
+    ) -> HTTPResponse:
+        """
+        HTTP 요청
+        
+        본문은 스트리밍으로 max_bytes까지만 읽고, 남은 부분은 연결을 닫아 버립니다.
+        
+        Args:
+            method: HTTP 메서드
+            url: 주소
+            max_bytes: 응답 본문 최대 바이트 (None이면 기본 상한)
+            truncate: True면 상한에서 자르고, False면 ResponseTooLarge 발생
+            on_chunk: 본문 조각을 받을 때마다 호출할 함수 (지정하면 본문을 보관하지 않음,
+                      True를 반환하면 나머지를 읽지 않고 중단)
+            **kwargs: requests에 전달할 인자 (data, params, headers 등)
+        
+        Returns:
+            HTTPResponse
+        
+        Raises:
+            requests.RequestException: 연결/타임아웃 오류
+            ResponseTooLarge: truncate=False이고 본문이 상한을 넘은 경우
+        """
+        max_bytes = max_bytes or self.max_response_bytes
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = (self.connect_timeout, self.read_timeout)
+        start_time = time.perf_counter()
+        
+        try:
+            with self.session.request(method, url, stream=True, **kwargs) as response:
+                # Content-Length로 미리 알 수 있으면 읽기 전에 거절
+                declared = int(response.headers.get("Content-Length") or 0)
+                if declared > max_bytes and not truncate:
+                    raise ResponseTooLarge(f"응답 크기 {declared}바이트가 상한 {max_bytes}바이트를 넘습니다: {url}")
+                
+                chunks = []
+                size = 0
+                truncated = False
+                stopped = False
+                for chunk in self._iter_chunks(response, available_only=on_chunk is not None):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        if not truncate:
+                            raise ResponseTooLarge(f"응답이 상한 {max_bytes}바이트를 넘습니다: {url}")
+                        chunk = chunk[:len(chunk) - (size - max_bytes)]
+                        size = max_bytes
+                        truncated = True
+                    if on_chunk is None:
+                        chunks.append(chunk)
+                    elif on_chunk(chunk):
+                        stopped = True
+                    if truncated or stopped:
+                        break
+                
+                content = b"".join(chunks)
+                if truncated or stopped:
+                    # 다 읽지 않은 연결은 재사용할 수 없으므로 닫음
+                    response.close()
+                if truncated:
+                    logger.warning(f"응답 본문을 {max_bytes}바이트에서 자름: {url}")
+                
+                result = HTTPResponse(
+                    url=response.url,
+                    status_code=response.status_code,
+                    headers=dict(response.headers),
+                    content=content,
+                    # charset이 명시되지 않은 text/* 응답에 requests가 붙이는 ISO-8859-1 대신 UTF-8 사용
+                    encoding=response.encoding if "charset" in response.headers.get("Content-Type", "") else None,
+                    elapsed=time.perf_counter() - start_time,
+                    truncated=truncated
+                )
+        except Exception:
+            self.stats.add(requests=1, errors=1, total_latency=time.perf_counter() - start_time)
+            raise
+        
+        self.stats.add(
+            requests=1,
+            truncated=int(truncated),
+            bytes_read=size,
+            total_latency=result.elapsed
+        )
+        return result
+    
+    @staticmethod
+    def _iter_chunks(response: requests.Response, available_only: bool = False):
+        """
+        본문 조각 반복
+        
+        available_only이면 조각 크기를 채울 때까지 기다리지 않고 도착한 만큼 바로 넘겨서
+        느리게 오는 응답도 호출자가 조각마다 시간 상한을 확인할 수 있게 합니다.
+        """
+        raw = response.raw
+        if not available_only or not hasattr(raw, "read1"):
+            yield from response.iter_content(CHUNK_SIZE)
+            return
+        while True:
+            chunk = raw.read1(CHUNK_SIZE, decode_content=True)
+            if not chunk:
+                return
+            yield chunk
+    
+    def get(self, url: str, **kwargs) -> HTTPResponse:
+        """GET 요청"""
+        return self.request("GET", url, **kwargs)
+    
+    def post(self, url: str, **kwargs) -> HTTPResponse:
+        """POST 요청"""
+        return self.request("POST", url, **kwargs)
+    
+    async def arequest(self, method: str, url: str, **kwargs) -> HTTPResponse:
+        """
+        비동기 HTTP 요청
+        
+        같은 연결 풀을 쓰는 전용 스레드 풀에서 실행하므로 이벤트 루프를 막지 않습니다.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: self.request(method, url, **kwargs))
+    
+    async def aget(self, url: str, **kwargs) -> HTTPResponse:
+        """비동기 GET 요청"""
+        return await self.arequest("GET", url, **kwargs)
+    
+    async def apost(self, url: str, **kwargs) -> HTTPResponse:
+        """비동기 POST 요청"""
+        return await self.arequest("POST", url, **kwargs)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """연결 재사용 통계"""
+        stats = self.stats.to_dict()
+        stats["timeouts"] = {"connect": self.connect_timeout, "read": self.read_timeout}
+        return stats
+    
+    def close(self):
+        """연결 풀과 스레드 풀 정리"""
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+# 싱글톤 인스턴스
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> HTTPClient:
+    """
+    HTTP 클라이언트 싱글톤 인스턴스 반환
+    
+    Returns:
+        HTTPClient 인스턴스
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = HTTPClient()
+        return _http_client
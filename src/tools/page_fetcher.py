@@ -0,0 +1,382 @@
+"""
+Page Fetcher
+
+검색 결과 상위 페이지를 동시에 가져와 본문만 추출하고, 질문과 관련된 구절을 골라냅니다.
+
+- 페이지마다 바이트/시간 상한을 두고, 본문은 받는 대로 lxml pull 파서에 넣어 추출
+  (충분한 본문을 얻으면 나머지는 받지 않음)
+- 내비게이션/광고처럼 링크 비중이 높은 블록과 script/style 등은 제외
+- 추출한 본문은 URL별로 캐시하고, 유효 시간이 지나면 ETag/Last-Modified로 조건부 요청
+- 본문을 구절로 나눠 BM25 + 문자 n-gram으로 질문과의 관련도 순위 계산
+- 파싱 프로세스 풀을 쓰면 PARSE_POOL_MIN_BYTES를 넘는 큰 본문만 bytes로 모아 별도 프로세스에서 추출
+  (요청 스레드가 GIL을 오래 잡지 않음, 그때까지의 본문 밀도로 필요한 만큼만 받음)
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Any, List, Optional
+
+from lxml import etree
+
+from src.tools.http_client import HTTPClient, get_http_client
+from src.tools.parse_pool import ParsePool, ParseTimeout, get_parse_pool
+from src.utils.config import config
+from src.utils.logger import setup_logger
+from src.utils.text_search import HybridSearchIndex
+
+logger = setup_logger("page_fetcher")
+
+# 페이지 동시 요청 (요청 스레드는 마감 시간까지만 기다림)
+_fetch_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="page-fetch")
+
+# 본문에서 제외할 요소와 본문 블록으로 볼 요소
+SKIP_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg", "iframe", "button", "select", "template"}
+BLOCK_TAGS = {"p", "li", "h1", "h2", "h3", "h4", "td", "th", "pre", "blockquote", "dd", "dt", "figcaption"}
+HEADING_TAGS = {"h1", "h2", "h3", "h4"}
+# 제목이 아닌 블록의 최소 글자 수, 링크 글자 비율 상한
+MIN_BLOCK_CHARS = 20
+MAX_LINK_DENSITY = 0.5
+META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+# 문서 전체를 추출할 때 파서에 넣는 단위 (충분한 본문을 얻으면 나머지는 넣지 않음)
+FEED_CHUNK_SIZE = 16384
+# 큰 본문을 프로세스 풀로 보낼 때, 받은 부분의 본문 밀도로 추정한 필요 바이트에 곱하는 여유 배수
+OFFLOAD_BYTES_MARGIN = 2
+
+
+class MainTextExtractor:
+    """HTML 조각을 받는 대로 파싱해 본문 블록을 추출하는 스트리밍 추출기"""
+    
+    def __init__(self, max_chars: int = 20000, encoding: str = None):
+        """
+        초기화
+        
+        Args:
+            max_chars: 추출할 최대 본문 글자 수 (넘으면 done)
+            encoding: 문서 인코딩 (None이면 첫 조각의 meta charset, 없으면 UTF-8)
+        """
+        self.max_chars = max_chars
+        self.encoding = encoding
+        self.blocks: List[str] = []
+        self.chars = 0
+        self._parser = None
+        self._skip_depth = 0
+    
+    @property
+    def done(self) -> bool:
+        """본문을 충분히 추출했는지 여부"""
+        return self.chars >= self.max_chars
+    
+    def feed(self, chunk: bytes) -> bool:
+        """
+        HTML 조각 입력
+        
+        Args:
+            chunk: HTML 바이트 조각
+        
+        Returns:
+            더 읽을 필요가 없으면 True
+        """
+        if self._parser is None:
+            if self.encoding is None:
+                match = META_CHARSET.search(chunk[:4096])
+                self.encoding = match.group(1).decode("ascii") if match else "utf-8"
+            self._parser = etree.HTMLPullParser(events=("start", "end"), encoding=self.encoding, remove_comments=True)
+        self._parser.feed(chunk)
+        self._drain()
+        return self.done
+    
+    def close(self) -> List[str]:
+        """
+        입력 종료
+        
+        Returns:
+            추출한 본문 블록 리스트
+        """
+        if self._parser is not None:
+            try:
+                self._parser.close()
+            except etree.XMLSyntaxError:
+                pass
+            self._drain()
+        return self.blocks
+    
+    def _drain(self):
+        """파서 이벤트 처리"""
+        for event, element in self._parser.read_events():
+            tag = element.tag if isinstance(element.tag, str) else ""
+            if event == "start":
+                if tag in SKIP_TAGS:
+                    self._skip_depth += 1
+                continue
+            
+            if tag in SKIP_TAGS:
+                self._skip_depth -= 1
+            elif tag in BLOCK_TAGS and self._skip_depth == 0 and not self.done:
+                self._add_block(element, tag)
+            
+            # 처리한 요소는 비워서 메모리 사용을 문서 크기와 무관하게 유지
+            if tag in BLOCK_TAGS or tag in SKIP_TAGS:
+                element.clear(keep_tail=True)
+    
+    def _add_block(self, element, tag: str):
+        """블록 요소의 텍스트를 본문으로 추가 (짧거나 링크 위주인 블록 제외)"""
+        text = " ".join("".join(element.itertext()).split())
+        if not text or (tag not in HEADING_TAGS and len(text) < MIN_BLOCK_CHARS):
+            return
+        link_chars = sum(len("".join(link.itertext()).strip()) for link in element.iter("a"))
+        if link_chars > MAX_LINK_DENSITY * len(text):
+            return
+        self.blocks.append(text)
+        self.chars += len(text)
+
+
+def extract_main_text(html: bytes, max_chars: int = 20000, encoding: str = None) -> List[str]:
+    """
+    HTML 문서 전체에서 본문 블록 추출
+    
+    Args:
+        html: HTML 바이트
+        max_chars: 최대 본문 글자 수
+        encoding: 문서 인코딩
+    
+    Returns:
+        본문 블록 리스트
+    """
+    extractor = MainTextExtractor(max_chars, encoding)
+    for offset in range(0, len(html), FEED_CHUNK_SIZE):
+        if extractor.feed(html[offset:offset + FEED_CHUNK_SIZE]):
+            break
+    return extractor.close()
+
+
+def split_passages(blocks: List[str], passage_chars: int = 500) -> List[str]:
+    """
+    본문 블록을 구절 길이에 맞게 묶기 (긴 블록은 문장 단위로 나눔)
+    
+    Args:
+        blocks: 본문 블록
+        passage_chars: 구절 최대 글자 수
+    
+    Returns:
+        구절 리스트
+    """
+    pieces = []
+    for block in blocks:
+        if len(block) <= passage_chars:
+            pieces.append(block)
+            continue
+        sentence = ""
+        for part in re.split(r"(?<=[.!?。])\s+", block):
+            if sentence and len(sentence) + len(part) + 1 > passage_chars:
+                pieces.append(sentence)
+                sentence = ""
+            sentence = f"{sentence} {part}".strip()[:passage_chars]
+        if sentence:
+            pieces.append(sentence)
+    
+    passages = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) + 1 > passage_chars:
+            passages.append(current)
+            current = ""
+        current = f"{current} {piece}".strip()
+    if current:
+        passages.append(current)
+    return passages
+
+
+def rank_passages(pages: List[Dict[str, Any]], query: str, top_k: int = 6, passage_chars: int = 500) -> List[Dict[str, str]]:
+    """
+    여러 페이지의 구절을 질문과의 관련도 순으로 정렬
+    
+    Args:
+        pages: [{"url", "title", "blocks"}]
+        query: 질문 또는 검색어
+        top_k: 반환할 구절 수
+        passage_chars: 구절 최대 글자 수
+    
+    Returns:
+        [{"url", "title", "text"}] 관련도 내림차순
+    """
+    index = HybridSearchIndex()
+    passages = []
+    for page in pages:
+        for text in split_passages(page["blocks"], passage_chars):
+            index.add(str(len(passages)), text)
+            passages.append({"url": page["url"], "title": page.get("title", ""), "text": text})
+    return [passages[int(doc_id)] for doc_id, _ in index.search(query, top_k=top_k)]
+
+
+class PageFetcher:
+    """검색 결과 페이지 동시 수집 + 본문 캐시"""
+    
+    def __init__(
+        self,
+        http_client: HTTPClient = None,
+        max_bytes: int = None,
+        timeout: float = None,
+        max_chars: int = 20000,
+        cache_ttl: float = None,
+        cache_size: int = 256,
+        parse_pool: ParsePool = None
+    ):
+        """
+        초기화
+        
+        Args:
+            http_client: HTTP 클라이언트 (None이면 공유 연결 풀)
+            max_bytes: 페이지당 최대 바이트
+            timeout: 페이지당 최대 시간 (초)
+            max_chars: 페이지당 최대 본문 글자 수
+            cache_ttl: 캐시된 본문을 재검증 없이 쓰는 시간 (초)
+            cache_size: 캐시할 최대 페이지 수
+            parse_pool: 본문 추출 프로세스 풀 (None이면 공유 풀, 작업 프로세스가 0개면 받는 대로 스트리밍 추출)
+        """
+        self.http_client = http_client or get_http_client()
+        self.max_bytes = max_bytes or config.deep_search_page_bytes
+        self.timeout = timeout or config.deep_search_page_timeout
+        self.max_chars = max_chars
+        self.cache_ttl = cache_ttl if cache_ttl is not None else config.deep_search_cache_ttl
+        self.cache_size = cache_size
+        self.parse_pool = parse_pool or get_parse_pool()
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"fetched": 0, "cache_hits": 0, "not_modified": 0, "errors": 0, "timeouts": 0, "early_stops": 0}
+    
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+    
+    def fetch(self, url: str) -> Optional[List[str]]:
+        """
+        페이지 본문 블록 가져오기
+        
+        Args:
+            url: 페이지 주소
+        
+        Returns:
+            본문 블록 리스트 (HTML이 아니거나 실패하면 None)
+        """
+        with self._lock:
+            cached = self._cache.get(url)
+            if cached is not None:
+                self._cache.move_to_end(url)
+        if cached is not None and time.time() - cached["fetched_at"] <= self.cache_ttl:
+            self._count("cache_hits")
+            return cached["blocks"]
+        
+        # 유효 시간이 지난 캐시는 조건부 요청으로 재검증
+        headers = {}
+        if cached is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        
+        extractor = MainTextExtractor(self.max_chars)
+        # 받는 대로 스트리밍 추출하다가, 본문이 PARSE_POOL_MIN_BYTES를 넘으면 나머지는 bytes로 모아
+        # 프로세스 풀에서 처음부터 추출 (작업 프로세스가 없으면 끝까지 스트리밍)
+        can_offload = self.parse_pool.max_workers > 0
+        offload = False
+        chunks = []
+        received = 0
+        byte_budget = None
+        budget_reached = False
+        started = time.perf_counter()
+        timed_out = False
+        
+        def on_chunk(chunk: bytes) -> bool:
+            nonlocal offload, received, byte_budget, budget_reached, timed_out
+            # 읽기 타임아웃은 조각 사이 간격에만 적용되므로 페이지 전체 시간은 여기서 제한
+            timed_out = time.perf_counter() - started > self.timeout
+            received += len(chunk)
+            if can_offload:
+                chunks.append(chunk)
+            if not offload:
+                if extractor.feed(chunk):
+                    return True
+                if can_offload and received >= self.parse_pool.min_bytes:
+                    # 지금까지 받은 부분의 본문 밀도로 max_chars를 채우는 데 필요한 바이트를 추정해 그만큼만 받음
+                    offload = True
+                    if extractor.chars:
+                        byte_budget = received * self.max_chars * OFFLOAD_BYTES_MARGIN // extractor.chars
+                return timed_out
+            budget_reached = byte_budget is not None and received >= byte_budget
+            return budget_reached or timed_out
+        
+        try:
+            response = self.http_client.get(
+                url,
+                headers=headers,
+                max_bytes=self.max_bytes,
+                on_chunk=on_chunk,
+                timeout=(self.http_client.connect_timeout, self.timeout)
+            )
+        except Exception as e:
+            self._count("errors")
+            logger.debug(f"페이지 가져오기 실패 ({url}): {e}")
+            return None
+        
+        if response.status_code == 304 and cached is not None:
+            self._count("not_modified")
+            blocks = cached["blocks"]
+        elif response.status_code >= 400 or "html" not in response.headers.get("Content-Type", "html"):
+            self._count("errors")
+            return None
+        else:
+            try:
+                if offload:
+                    blocks = self.parse_pool.run(extract_main_text, b"".join(chunks), self.max_chars)
+                else:
+                    blocks = extractor.close()
+            except ParseTimeout as e:
+                self._count("timeouts")
+                logger.debug(f"본문 추출 시간 초과 ({url}): {e}")
+                return None
+            self._count("fetched")
+            if timed_out:
+                self._count("timeouts")
+            elif extractor.done or budget_reached:
+                self._count("early_stops")
+        
+        with self._lock:
+            self._cache[url] = {
+                "blocks": blocks,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": time.time()
+            }
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return blocks
+    
+    def fetch_many(self, results: List[Dict[str, str]], deadline: float = None) -> List[Dict[str, Any]]:
+        """
+        여러 페이지를 동시에 가져오기
+        
+        Args:
+            results: 검색 결과 [{"title", "url", ...}]
+            deadline: 전체 마감 시간 (초, None이면 페이지당 시간 + 연결 타임아웃)
+        
+        Returns:
+            마감 시간 안에 본문을 얻은 페이지 [{"url", "title", "blocks"}] (검색 결과 순서)
+        """
+        deadline = deadline or self.timeout + self.http_client.connect_timeout
+        futures = [(result, _fetch_executor.submit(self.fetch, result["url"])) for result in results]
+        wait([future for _, future in futures], timeout=deadline)
+        
+        pages = []
+        for result, future in futures:
+            if future.done() and future.result():
+                pages.append({"url": result["url"], "title": result.get("title", ""), "blocks": future.result()})
+        return pages
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """수집 통계"""
+        with self._lock:
+            return dict(self._stats, cached_pages=len(self._cache))
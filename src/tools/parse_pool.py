@@ -0,0 +1,242 @@
+"""
+Parse Pool
+
+검색 결과 페이지 파싱/본문 추출처럼 CPU를 오래 쓰는 작업을 별도 프로세스에서 실행합니다.
+큰 페이지를 요청 스레드에서 파싱하면 GIL을 오래 잡아 동시에 처리 중인 다른 요청까지 느려지므로,
+일정 크기 이상의 입력은 제한된 크기의 ProcessPoolExecutor로 보냅니다.
+
+- 입력은 디코딩하지 않은 bytes 그대로 전달 (문자열 변환 복사 없음)
+- 작은 입력은 프로세스 간 전송 비용이 파싱보다 크므로 호출한 스레드에서 바로 실행
+- 작업 프로세스는 처음 필요할 때 백그라운드에서 시작하고, 준비될 때까지는 호출한 스레드에서 실행
+- 대기 중인 작업 수를 제한하고, 자리가 나지 않으면 작업 시간 제한까지만 기다림
+- 작업별 시간 제한: 작업 프로세스 안에서 타이머로 먼저 중단하고(POSIX), 그래도 끝나지 않으면
+  작업 프로세스를 종료하고 풀을 다시 만듦
+"""
+
+import multiprocessing
+import signal
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.config import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger("parse_pool")
+
+# 작업 프로세스 안의 시간 제한이 동작하지 않을 때 프로세스를 종료하기까지 더 기다리는 시간 (초)
+KILL_GRACE = 0.5
+# 작업 프로세스 수 대비 대기열 길이
+QUEUE_FACTOR = 2
+# forkserver가 미리 import해 둘 모듈 (작업 프로세스가 파서 모듈을 import하는 시간을 작업 시간에서 제외)
+PRELOAD_MODULES = ["src.tools.search_providers", "src.tools.page_fetcher"]
+
+
+class ParseTimeout(Exception):
+    """파싱 작업 시간 제한 초과 (또는 대기열이 가득 차 시간 안에 시작하지 못함)"""
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise ParseTimeout("작업 시간 제한 초과")
+
+
+def _run_limited(func: Callable, data: bytes, args: tuple, time_limit: float) -> Any:
+    """
+    작업 프로세스에서 시간 제한을 걸고 실행
+    
+    SIGALRM 처리기는 바이트코드 사이에서 실행되므로 입력을 조각 단위로 파싱하는 함수라면
+    조각 사이에서 중단됩니다. SIGALRM이 없는 플랫폼에서는 부모 프로세스의 강제 종료만 사용합니다.
+    """
+    if not hasattr(signal, "setitimer"):
+        return func(data, *args)
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, time_limit)
+    try:
+        return func(data, *args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _ready() -> bool:
+    """작업 프로세스 시작 확인용 빈 작업"""
+    return True
+
+
+def _mp_context():
+    """작업 프로세스 시작 방식 (스레드가 있는 프로세스를 fork하지 않도록 forkserver 우선)"""
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(PRELOAD_MODULES)
+    return context
+
+
+class ParsePool:
+    """시간 제한이 있는 파싱 전용 프로세스 풀"""
+    
+    def __init__(self, max_workers: int = None, task_timeout: float = None, min_bytes: int = None):
+        """
+        초기화
+        
+        Args:
+            max_workers: 작업 프로세스 수 (0이면 항상 호출한 스레드에서 실행, None이면 PARSE_POOL_WORKERS)
+            task_timeout: 작업당 시간 제한 (초, 대기열에서 기다리는 시간 포함)
+            min_bytes: 프로세스로 보낼 최소 입력 크기 (바이트)
+        """
+        self.max_workers = max_workers if max_workers is not None else config.parse_pool_workers
+        self.task_timeout = task_timeout or config.parse_pool_timeout
+        self.min_bytes = min_bytes if min_bytes is not None else config.parse_pool_min_bytes
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._starting: Optional[threading.Thread] = None
+        self._slots = threading.BoundedSemaphore(max(1, self.max_workers) * QUEUE_FACTOR)
+        self._lock = threading.Lock()
+        self._stats = {"inline": 0, "offloaded": 0, "timeouts": 0, "kills": 0, "broken": 0}
+        self._offload_time = 0.0
+    
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+    
+    def start(self, wait: bool = False):
+        """
+        작업 프로세스 시작 (이미 시작했거나 시작 중이면 무시)
+        
+        Args:
+            wait: 작업 프로세스가 준비될 때까지 기다릴지 여부
+        """
+        with self._lock:
+            if self._executor is not None or self.max_workers <= 0:
+                return
+            if self._starting is None:
+                self._starting = threading.Thread(target=self._start, name="parse-pool-start", daemon=True)
+                self._starting.start()
+            thread = self._starting
+        if wait:
+            thread.join()
+    
+    def _start(self):
+        """작업 프로세스 풀을 만들고 첫 프로세스가 작업을 받을 수 있을 때까지 대기 (시작 스레드)"""
+        start_time = time.perf_counter()
+        executor = None
+        try:
+            executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_mp_context())
+            executor.submit(_ready).result()
+            logger.info(f"파싱 프로세스 풀 시작: 작업 프로세스 {self.max_workers}개 ({time.perf_counter() - start_time:.2f}s)")
+        except Exception as e:
+            logger.warning(f"파싱 프로세스 풀 시작 실패, 요청 스레드에서 파싱: {e}")
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            executor = None
+            self.max_workers = 0
+        with self._lock:
+            self._executor = executor
+            self._starting = None
+    
+    def _kill(self, executor: ProcessPoolExecutor):
+        """끝나지 않는 작업이 있는 풀의 작업 프로세스를 종료하고 다음 작업부터 새 풀 사용"""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self._stats["kills"] += 1
+        # 어느 프로세스가 작업 중인지 알 수 없으므로 풀 전체를 종료 (같은 풀의 다른 작업도 ParseTimeout으로 실패)
+        for process in list((executor._processes or {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    def run(self, func: Callable, data: bytes, *args) -> Any:
+        """
+        파싱 함수 실행
+        
+        Args:
+            func: 모듈 최상위 함수 func(data, *args) (작업 프로세스로 pickle 가능해야 함)
+            data: 입력 바이트
+            *args: 추가 인자
+        
+        Returns:
+            func의 반환값
+        
+        Raises:
+            ParseTimeout: 작업 시간 제한 초과 (다른 작업 때문에 풀이 종료되어 결과를 받지 못한 경우 포함)
+        """
+        executor = None
+        if self.max_workers > 0 and len(data) >= self.min_bytes:
+            with self._lock:
+                executor = self._executor
+            if executor is None:
+                self.start()
+        if executor is None:
+            self._count("inline")
+            return func(data, *args)
+        
+        if not self._slots.acquire(timeout=self.task_timeout):
+            self._count("timeouts")
+            raise ParseTimeout("파싱 대기열이 가득 참")
+        start_time = time.perf_counter()
+        try:
+            future = executor.submit(_run_limited, func, data, args, self.task_timeout)
+            result = future.result(timeout=self.task_timeout + KILL_GRACE)
+        except ParseTimeout:
+            self._count("timeouts")
+            raise
+        except FutureTimeout:
+            self._count("timeouts")
+            logger.warning(f"파싱 작업이 {self.task_timeout + KILL_GRACE:.1f}s 안에 끝나지 않아 작업 프로세스 종료")
+            self._kill(executor)
+            raise ParseTimeout("작업 시간 제한 초과 (프로세스 종료)")
+        except (BrokenProcessPool, CancelledError):
+            # 다른 작업 때문에 풀이 종료된 경우: 시간 제한 없이 요청 스레드에서 다시 실행하지 않고 실패 처리
+            # (새 풀은 다음 작업부터 백그라운드에서 시작)
+            self._kill(executor)
+            self._count("broken")
+            raise ParseTimeout("작업 프로세스 풀이 종료되어 결과를 받지 못함")
+        finally:
+            self._slots.release()
+        
+        with self._lock:
+            self._stats["offloaded"] += 1
+            self._offload_time += time.perf_counter() - start_time
+        return result
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """실행 위치별 작업 수, 시간 초과/프로세스 종료/풀 종료로 잃은 작업 수, 프로세스 작업 평균 시간"""
+        with self._lock:
+            offloaded = self._stats["offloaded"]
+            return dict(
+                self._stats,
+                workers=self.max_workers,
+                avg_offload_ms=self._offload_time / offloaded * 1000 if offloaded else 0.0
+            )
+    
+    def shutdown(self):
+        """작업 프로세스 종료"""
+        with self._lock:
+            thread = self._starting
+        if thread is not None:
+            thread.join()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> ParsePool:
+    """
+    파싱 프로세스 풀 싱글톤 인스턴스 가져오기
+    
+    Returns:
+        ParsePool 인스턴스
+    """
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ParsePool()
+    return _parse_pool
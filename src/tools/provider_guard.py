@@ -0,0 +1,240 @@
+"""
+Provider Guard
+
+외부 검색 제공자 호출을 보호하는 회로 차단기와 적응형 요청 속도 제한기입니다.
+
+- CircuitBreaker: 연속 실패가 기준을 넘으면 열림(open) → 즉시 실패, 대기 시간이 지나면
+  반열림(half-open)으로 요청 하나만 시험 삼아 보내고 성공하면 닫힘, 실패하면 대기 시간을 늘려 다시 열림
+- AdaptiveRateLimiter: 토큰 버킷, 429/403 응답을 받으면 속도를 절반으로 줄이고 Retry-After 동안 차단,
+  성공이 이어지면 설정한 최대 속도까지 조금씩 회복 (AIMD)
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.config import config
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """연속 실패 기반 회로 차단기 (반열림 상태에서는 시험 요청 하나만 허용)"""
+    
+    def __init__(
+        self,
+        failure_threshold: int = None,
+        cooldown: float = None,
+        max_cooldown: float = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        초기화
+        
+        Args:
+            failure_threshold: 열림으로 바뀌는 연속 실패 수
+            cooldown: 열림 후 시험 요청까지 기다리는 시간 (초)
+            max_cooldown: 시험 요청이 계속 실패할 때 늘어나는 대기 시간의 상한 (초)
+            clock: 시간 함수 (테스트용)
+        """
+        self.failure_threshold = failure_threshold or config.search_breaker_failures
+        self.base_cooldown = cooldown if cooldown is not None else config.search_breaker_cooldown
+        self.max_cooldown = max(max_cooldown or config.search_breaker_max_cooldown, self.base_cooldown)
+        self.clock = clock
+        
+        self.state = CLOSED
+        self.cooldown = self.base_cooldown
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.open_for = 0.0
+        self.probe_started = None
+        self.opens = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+    
+    def _retry_in(self, now: float) -> float:
+        """시험 요청을 보낼 수 있을 때까지 남은 시간 (_lock 안에서 호출)"""
+        if self.state == OPEN:
+            return max(0.0, self.opened_at + self.open_for - now)
+        if self.state == HALF_OPEN and self.probe_started is not None:
+            # 시험 요청이 결과를 알리지 못한 채 끝난 경우를 대비해 대기 시간이 지나면 다시 허용
+            return max(0.0, self.probe_started + self.cooldown - now)
+        return 0.0
+    
+    def available(self) -> bool:
+        """지금 요청을 보낼 수 있는지 여부 (상태를 바꾸지 않음)"""
+        with self._lock:
+            return self._retry_in(self.clock()) == 0.0
+    
+    def retry_in(self) -> float:
+        """요청을 다시 보낼 수 있을 때까지 남은 시간 (초)"""
+        with self._lock:
+            return self._retry_in(self.clock())
+    
+    def allow(self) -> bool:
+        """
+        요청 허용 여부 (반열림 상태에서 허용하면 그 요청이 시험 요청)
+        
+        Returns:
+            허용되면 True, 열림 상태거나 시험 요청이 진행 중이면 False
+        """
+        with self._lock:
+            now = self.clock()
+            if self._retry_in(now) > 0.0:
+                self.rejected += 1
+                return False
+            if self.state != CLOSED:
+                self.state = HALF_OPEN
+                self.probe_started = now
+            return True
+    
+    def cancel(self):
+        """허용받은 요청을 보내지 않은 경우 시험 요청 자리 반납"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.probe_started = None
+    
+    def record_success(self):
+        """요청 성공 (반열림이면 닫힘)"""
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.cooldown = self.base_cooldown
+            self.probe_started = None
+    
+    def record_failure(self, trip: bool = False, open_for: float = None):
+        """
+        요청 실패
+        
+        Args:
+            trip: 연속 실패 수와 관계없이 바로 열지 여부 (요청 제한 응답 등)
+            open_for: 열려 있을 최소 시간 (초, 서버가 알려준 Retry-After)
+        """
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN:
+                # 시험 요청 실패: 대기 시간을 늘려 다시 열림
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            elif not trip and self.consecutive_failures < self.failure_threshold:
+                return
+            self.state = OPEN
+            self.opened_at = self.clock()
+            self.open_for = max(self.cooldown, open_for or 0.0)
+            self.probe_started = None
+            self.opens += 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """상태 딕셔너리"""
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "opens": self.opens,
+                "rejected": self.rejected,
+                "retry_in": self._retry_in(self.clock())
+            }
+
+
+class AdaptiveRateLimiter:
+    """요청 제한 응답에 따라 속도를 조절하는 토큰 버킷"""
+    
+    def __init__(
+        self,
+        rate: float = None,
+        burst: int = None,
+        min_rate: float = 0.05,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        초기화
+        
+        Args:
+            rate: 최대 (초기) 요청 속도 (초당 요청 수)
+            burst: 한 번에 몰아서 보낼 수 있는 요청 수
+            min_rate: 요청 제한을 반복해서 받아도 유지하는 최소 속도
+            clock: 시간 함수 (테스트용)
+        """
+        self.max_rate = rate or config.search_rate_limit
+        self.burst = burst or config.search_rate_burst
+        self.min_rate = min(min_rate, self.max_rate)
+        self.clock = clock
+        
+        self.rate = self.max_rate
+        self.tokens = float(self.burst)
+        self.updated_at = clock()
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self.delayed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+    
+    def _refill(self, now: float):
+        """경과 시간만큼 토큰 채우기 (_lock 안에서 호출)"""
+        self.tokens = min(float(self.burst), self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    def _wait(self, now: float) -> float:
+        """토큰 하나를 쓸 수 있을 때까지 남은 시간 (_lock 안에서 호출)"""
+        self._refill(now)
+        blocked = max(0.0, self.blocked_until - now)
+        return max(blocked, (1.0 - self.tokens) / self.rate if self.tokens < 1.0 else 0.0)
+    
+    def available(self, max_wait: float = 0.0) -> bool:
+        """max_wait 안에 요청을 보낼 수 있는지 여부 (토큰을 쓰지 않음)"""
+        with self._lock:
+            return self._wait(self.clock()) <= max_wait
+    
+    def reserve(self, max_wait: float = 0.0) -> Optional[float]:
+        """
+        요청 하나 예약
+        
+        Args:
+            max_wait: 기다릴 수 있는 최대 시간 (초)
+        
+        Returns:
+            요청 전에 기다려야 하는 시간 (초), max_wait 안에 보낼 수 없으면 None
+        """
+        with self._lock:
+            now = self.clock()
+            wait = self._wait(now)
+            if wait > max_wait:
+                self.rejected += 1
+                return None
+            # 토큰을 미리 써서(음수 허용) 동시에 예약한 요청이 같은 토큰을 쓰지 않도록 함
+            self.tokens -= 1.0
+            self.delayed += int(wait > 0)
+            return wait
+    
+    def on_success(self):
+        """요청 성공: 속도를 최대 속도의 10%씩 회복"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+    
+    def on_throttle(self, retry_after: float = None):
+        """
+        요청 제한 응답(429/403): 속도를 절반으로 줄이고 잠시 차단
+        
+        Args:
+            retry_after: 서버가 알려준 재시도 대기 시간 (초, None이면 줄인 속도의 요청 간격)
+        """
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * 0.5)
+            self.tokens = min(self.tokens, 0.0)
+            self.blocked_until = max(self.blocked_until, now + (retry_after if retry_after is not None else 1.0 / self.rate))
+            self.throttled += 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """상태 딕셔너리"""
+        with self._lock:
+            now = self.clock()
+            return {
+                "rate": self.rate,
+                "throttled": self.throttled,
+                "delayed": self.delayed,
+                "rejected": self.rejected,
+                "blocked_for": max(0.0, self.blocked_until - now)
+            }
@@ -0,0 +1,314 @@
+"""
+Query Builder
+
+사용자 요청을 LLM 없이 검색어로 바꾸는 로컬 검색어 생성기입니다.
+
+- "오늘", "내일", "이번 주", "다음 달" 같은 상대 날짜를 현재 날짜 기준 절대 날짜로 변환
+- "알려줘", "좀", "검색해줘" 같은 대화체 군더더기와 조사 제거
+- 지명/기관/시사 주제 사전(gazetteer)으로 개체 추출
+- 지시어("그거", "거기")나 긴 문장처럼 맥락 해석이 필요한 요청은 신뢰도를 낮춰 LLM에 맡김
+"""
+
+import json
+import re
+import unicodedata
+from datetime import date, timedelta
+from typing import Dict, Any, List, Optional
+
+from src.tools.search_cache import QUERY_TOKEN, strip_particle
+from src.utils.config import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger("query_builder")
+
+# 기본 개체 사전 (topic: 최신 정보가 필요한 주제), QUERY_GAZETTEER_FILE로 확장
+DEFAULT_GAZETTEER = {
+    "location": (
+        "서울 부산 대구 인천 광주 대전 울산 세종 제주 제주도 수원 성남 용인 창원 청주 천안 전주 포항 "
+        "김해 강릉 춘천 원주 경주 여수 속초 안동 목포 평창 경기도 강원 강원도 충청 전라 경상 "
+        "한국 대한민국 북한 일본 중국 미국 영국 프랑스 독일 대만 베트남 태국 "
+        "도쿄 오사카 후쿠오카 삿포로 베이징 상하이 홍콩 타이베이 방콕 다낭 싱가포르 뉴욕 런던 파리"
+    ).split(),
+    "organization": (
+        "삼성 삼성전자 sk하이닉스 lg전자 현대차 기아 네이버 카카오 쿠팡 한국은행 기상청 "
+        "애플 구글 마이크로소프트 엔비디아 테슬라 아마존 openai 코스피 코스닥 나스닥"
+    ).split(),
+    "topic": (
+        "날씨 기온 강수 미세먼지 태풍 폭염 한파 일기예보 예보 주가 주식 환율 금리 유가 시세 "
+        "뉴스 속보 경기 결과 순위 일정 선거 지진 교통"
+    ).split(),
+}
+
+# 상대 날짜 표현 (뒤에 붙은 조사까지 함께 치환)
+RELATIVE_DAYS = {"오늘": 0, "금일": 0, "내일": 1, "명일": 1, "모레": 2, "내일모레": 2, "글피": 3, "어제": -1, "그제": -2, "그저께": -2}
+RELATIVE_PERIODS = {"이번": 0, "다음": 1, "담": 1, "다다음": 2, "지난": -1, "저번": -1}
+RELATIVE_YEARS = {"올해": 0, "금년": 0, "내년": 1, "작년": -1, "지난해": -1}
+WEEKDAYS = "월화수목금토일"
+_PERIOD = "|".join(sorted(RELATIVE_PERIODS, key=len, reverse=True))
+_TAIL = r"(?:에는|에도|까지|부터|에|은|는|의|도)?(?!\w)"
+DATE_PATTERN = re.compile(
+    rf"(?<!\w)(?:"
+    rf"(?P<week_rel>{_PERIOD})\s*주\s*(?P<weekday>[{WEEKDAYS}])요일"
+    rf"|(?P<bare_rel>{_PERIOD})\s*(?P<rel_weekday>[{WEEKDAYS}])요일"
+    rf"|(?P<weekend_rel>{_PERIOD})?\s*주말"
+    rf"|(?P<week>{_PERIOD})\s*주"
+    rf"|(?P<month>{_PERIOD})\s*달"
+    rf"|(?P<year>{'|'.join(RELATIVE_YEARS)})"
+    rf"|(?P<day>{'|'.join(sorted(RELATIVE_DAYS, key=len, reverse=True))})"
+    rf"|(?P<bare_weekday>[{WEEKDAYS}])요일"
+    rf"){_TAIL}"
+)
+
+# 대화체 군더더기
+FILLER_WORDS = set(
+    "좀 혹시 그냥 한번 제발 줘 주세요 해줘 해주세요 부탁해 부탁해요 부탁합니다 궁금해 궁금해요 궁금합니다 "
+    "어때 어때요 어떤지 어떻대 뭐야 뭐예요 뭔가요 뭐지 있어 있나요 있어요 인가요 나요 검색 "
+    "please pls plz tell me search find show look up".split()
+)
+FILLER_PATTERN = re.compile(r"^(알려|찾아|검색해|말해|보여|가르쳐|알아봐|정리해|요약해)(줘|줘요|주세요|줄래|줄래요|봐|봐줘|봐요|주라|줘봐)?$")
+REQUEST_SUFFIX = re.compile(r"^(\w+?)해(?:줘|줘요|주세요|줄래|줄래요|봐|봐줘|봐요|주라|줄수)$")
+# 현재 시점을 뜻하는 단어 (검색어에서는 빼고 최신 정보 필터만 설정)
+NOW_WORDS = {"지금", "현재"}
+RECENCY_WORDS = {"최근", "최신", "요즘", "실시간"}
+# 이전 대화 맥락 없이는 해석할 수 없는 지시어, 해석하지 않은 모호한 시간 표현
+ANAPHORA_WORDS = {"그거", "그것", "이거", "이것", "저거", "저것", "거기", "그곳", "그때", "아까", "그분", "걔", "쟤", "방금", "지난번"}
+VAGUE_TIME_WORDS = {"며칠", "언젠가", "나중", "나중에", "다음번", "조만간"}
+# 화자 자신의 상황을 설명하는 대화체 (검색어로 줄이려면 문장 이해가 필요)
+CONVERSATIONAL_WORDS = {"내가", "제가", "나는", "저는", "나도", "저도", "우리", "우리가"}
+
+# 신뢰도 계산: 기본값, 개체/날짜 가산, 지시어/모호한 시간/대화체/긴 요청 감점
+BASE_CONFIDENCE = 0.7
+MAX_CONTENT_TOKENS = 6
+
+
+def _is_hangul(text: str) -> bool:
+    """모두 한글 음절인지 여부"""
+    return all("가" <= ch <= "힣" for ch in text)
+
+
+def _format_date(day: date) -> str:
+    """검색어용 날짜 표기 (예: 2024년 5월 3일)"""
+    return f"{day.year}년 {day.month}월 {day.day}일"
+
+
+def _format_range(start: date, end: date) -> str:
+    """검색어용 기간 표기 (예: 2024년 5월 6일~5월 12일)"""
+    end_text = _format_date(end) if end.year != start.year else f"{end.month}월 {end.day}일"
+    return f"{_format_date(start)}~{end_text}"
+
+
+def _add_months(day: date, months: int) -> date:
+    """월 단위 이동 (1일 기준)"""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def resolve_relative_date(match: re.Match, today: date) -> Dict[str, Any]:
+    """
+    상대 날짜 표현을 절대 날짜로 변환
+    
+    Args:
+        match: DATE_PATTERN 매치
+        today: 기준 날짜
+    
+    Returns:
+        {"text": 원문, "query": 검색어 표기, "start": ISO 날짜, "end": ISO 날짜}
+    """
+    monday = today - timedelta(days=today.weekday())
+    groups = match.groupdict()
+    
+    if groups["weekday"]:
+        start = end = monday + timedelta(weeks=RELATIVE_PERIODS[groups["week_rel"]], days=WEEKDAYS.index(groups["weekday"]))
+        text = _format_date(start)
+    elif groups["rel_weekday"]:
+        # "지난 월요일"은 오늘 이전, "다음 월요일"은 오늘 이후 가장 가까운 그 요일, "이번 월요일"은 이번 주
+        offset = RELATIVE_PERIODS[groups["bare_rel"]]
+        weekday = WEEKDAYS.index(groups["rel_weekday"])
+        if offset < 0:
+            start = today - timedelta(days=(today.weekday() - weekday - 1) % 7 + 1)
+        elif offset > 0:
+            start = today + timedelta(days=(weekday - today.weekday() - 1) % 7 + 1, weeks=offset - 1)
+        else:
+            start = monday + timedelta(days=weekday)
+        end = start
+        text = _format_date(start)
+    elif "주말" in match.group(0):
+        saturday = monday + timedelta(weeks=RELATIVE_PERIODS.get(groups["weekend_rel"] or "이번", 0), days=5)
+        start, end = saturday, saturday + timedelta(days=1)
+        text = _format_range(start, end)
+    elif groups["week"]:
+        start = monday + timedelta(weeks=RELATIVE_PERIODS[groups["week"]])
+        end = start + timedelta(days=6)
+        text = _format_range(start, end)
+    elif groups["month"]:
+        start = _add_months(today, RELATIVE_PERIODS[groups["month"]])
+        end = _add_months(start, 1) - timedelta(days=1)
+        text = f"{start.year}년 {start.month}월"
+    elif groups["year"]:
+        year = today.year + RELATIVE_YEARS[groups["year"]]
+        start, end = date(year, 1, 1), date(year, 12, 31)
+        text = f"{year}년"
+    elif groups["day"]:
+        start = end = today + timedelta(days=RELATIVE_DAYS[groups["day"]])
+        text = _format_date(start)
+    else:
+        # 요일만 있으면 오늘 이후 가장 가까운 그 요일
+        start = end = today + timedelta(days=(WEEKDAYS.index(groups["bare_weekday"]) - today.weekday()) % 7)
+        text = _format_date(start)
+    
+    return {"text": match.group(0).strip(), "query": text, "start": start.isoformat(), "end": end.isoformat()}
+
+
+class QueryBuilder:
+    """규칙 + 개체 사전 기반 로컬 검색어 생성기"""
+    
+    def __init__(self, gazetteer: Dict[str, List[str]] = None, gazetteer_file: str = None):
+        """
+        초기화
+        
+        Args:
+            gazetteer: 개체 사전 {유형: [이름, ...]} (None이면 기본 사전)
+            gazetteer_file: 추가 개체 사전 JSON 파일 (None이면 QUERY_GAZETTEER_FILE 설정)
+        """
+        self.entities: Dict[str, str] = {}
+        for entity_type, names in (gazetteer or DEFAULT_GAZETTEER).items():
+            self.add_entities(entity_type, names)
+        
+        gazetteer_file = config.query_gazetteer_file if gazetteer_file is None else gazetteer_file
+        if gazetteer_file:
+            try:
+                with open(gazetteer_file, 'r', encoding='utf-8') as f:
+                    for entity_type, names in json.load(f).items():
+                        self.add_entities(entity_type, names)
+            except Exception as e:
+                logger.warning(f"개체 사전 파일 로드 실패 ({gazetteer_file}): {e}")
+    
+    def add_entities(self, entity_type: str, names: List[str]):
+        """
+        개체 사전에 이름 추가
+        
+        Args:
+            entity_type: 개체 유형 (location, organization, topic 등)
+            names: 이름 리스트 (띄어쓰기가 있는 이름은 두 어절까지 인식)
+        """
+        for name in names:
+            self.entities[unicodedata.normalize("NFKC", name).lower()] = entity_type
+    
+    def _strip_particle(self, token: str) -> str:
+        """조사 제거 (사전에 있는 단어와 모호한 한 글자 조사는 보수적으로 처리)"""
+        if not _is_hangul(token) or token in self.entities:
+            return token
+        return strip_particle(token, self.entities)
+    
+    def build(self, user_input: str, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        사용자 요청에서 검색어 생성
+        
+        Args:
+            user_input: 사용자 입력
+            today: 기준 날짜 (None이면 오늘)
+        
+        Returns:
+            {
+                "query": str,
+                "filters": {"language": str, "time_range": "recent" (최신 정보가 필요할 때)},
+                "entities": [{"text": str, "type": str}],
+                "dates": [{"text", "query", "start", "end"}],
+                "confidence": float (0~1, 낮으면 LLM으로 생성),
+                "source": "local"
+            }
+        """
+        today = today or date.today()
+        text = unicodedata.normalize("NFKC", user_input).strip()
+        
+        # 상대 날짜는 절대 날짜로 치환하고, 나머지 구간은 토큰 단위로 정리
+        pieces: List[str] = []
+        dates = []
+        tokens: List[str] = []
+        position = 0
+        for match in list(DATE_PATTERN.finditer(text)) + [None]:
+            end = match.start() if match else len(text)
+            tokens.extend(QUERY_TOKEN.findall(text[position:end]))
+            if match is None:
+                break
+            pieces.extend(self._clean(tokens))
+            tokens = []
+            resolved = resolve_relative_date(match, today)
+            dates.append(resolved)
+            pieces.append(resolved["query"])
+            position = match.end()
+        pieces.extend(self._clean(tokens))
+        
+        words = {token.lower() for token in pieces + QUERY_TOKEN.findall(text)}
+        recent = bool(dates) or bool(words & (NOW_WORDS | RECENCY_WORDS))
+        pieces = [token for token in pieces if token.lower() not in NOW_WORDS]
+        lowered = [token.lower() for token in pieces]
+        
+        # 개체 추출 (두 어절 이름 우선)
+        entities = []
+        index = 0
+        while index < len(lowered):
+            pair = " ".join(lowered[index:index + 2])
+            if index + 1 < len(lowered) and pair in self.entities:
+                entities.append({"text": " ".join(pieces[index:index + 2]), "type": self.entities[pair]})
+                index += 2
+                continue
+            if lowered[index] in self.entities:
+                entities.append({"text": pieces[index], "type": self.entities[lowered[index]]})
+            index += 1
+        recent = recent or any(entity["type"] == "topic" for entity in entities)
+        
+        return {
+            "query": " ".join(pieces),
+            "filters": dict(
+                {"language": "ko" if any(_is_hangul(ch) for ch in text) else "en"},
+                **({"time_range": "recent"} if recent else {})
+            ),
+            "entities": entities,
+            "dates": dates,
+            "confidence": self._confidence(pieces, words, entities, dates),
+            "source": "local"
+        }
+    
+    def _clean(self, tokens: List[str]) -> List[str]:
+        """군더더기 제거 + 조사 제거"""
+        cleaned = []
+        for token in tokens:
+            if token.lower() in FILLER_WORDS or FILLER_PATTERN.match(token):
+                continue
+            # "추천해줘" → "추천", "검색해줘" → "검색"(군더더기)
+            request = REQUEST_SUFFIX.match(token)
+            token = request.group(1) if request else self._strip_particle(token)
+            if token.lower() not in FILLER_WORDS:
+                cleaned.append(token)
+        return cleaned
+    
+    def _confidence(self, pieces: List[str], words: set, entities: List[Dict[str, str]], dates: List[Dict[str, Any]]) -> float:
+        """로컬 검색어 신뢰도 (맥락이 필요한 표현이나 긴 문장이면 낮음)"""
+        if not pieces:
+            return 0.0
+        confidence = BASE_CONFIDENCE + (0.2 if entities else 0.0) + (0.1 if dates else 0.0)
+        confidence -= 0.5 * len(words & ANAPHORA_WORDS)
+        confidence -= 0.3 * len(words & VAGUE_TIME_WORDS)
+        # 날짜로 해석하지 못하고 남은 기간 표현("지난", "다음")은 LLM에 맡김
+        confidence -= 0.5 * len({piece.lower() for piece in pieces} & set(RELATIVE_PERIODS))
+        confidence -= 0.2 * len(words & CONVERSATIONAL_WORDS)
+        confidence -= 0.1 * max(0, len(pieces) - MAX_CONTENT_TOKENS)
+        return round(min(1.0, max(0.0, confidence)), 2)
+
+
+# 싱글톤 인스턴스
+_query_builder = None
+
+
+def get_query_builder() -> QueryBuilder:
+    """
+    로컬 검색어 생성기 싱글톤 인스턴스 가져오기
+    
+    Returns:
+        QueryBuilder 인스턴스
+    """
+    global _query_builder
+    if _query_builder is None:
+        _query_builder = QueryBuilder()
+    return _query_builder
@@ -15,10 +15,16 @@ logger = setup_logger("tool_router")
 class ToolRouter:
     """도구 라우터 클래스"""
     
-    def __init__(self):
-        """초기화"""
-        self.mcp_client = MCPClient()
-        self.web_search = WebSearch()
+    def __init__(self, web_search: Optional[WebSearch] = None, mcp_client: Optional[MCPClient] = None):
+        """
+        초기화
+        
+        Args:
+            web_search: 웹 검색 도구 (None이면 기본 설정으로 생성)
+            mcp_client: MCP 클라이언트 (None이면 기본 설정으로 생성)
+        """
+        self.mcp_client = mcp_client or MCPClient()
+        self.web_search = web_search or WebSearch()
         logger.info("Tool Router 초기화 완료")
     
     def route_tool_call(
@@ -83,21 +89,25 @@ class ToolRouter:
             
         return result
     
-    def _handle_web_search(self, user_input: str, params: Dict[str, Any]) -> str:
-        """웹 검색 처리"""
+    def _handle_web_search(self, user_input: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """웹 검색 처리 (검색 결과로 작성한 답변과, 그대로 사용자에게 보낼 수 있는지 여부 반환)"""
         # 1. 검색어 생성 (파라미터에 query가 없으면 자동 생성)
         query = params.get("query")
         if not query:
             query_info = self.web_search.generate_query(user_input)
             query = query_info.get("query", user_input)
         
-        # 2. 검색 실행
-        results = self.web_search.search(query)
-        
-        # 3. 결과 요약
-        summary = self.web_search.summarize_results(results, query)
+        # 2. 검색 실행 (모든 제공자가 실패하면 예외 → 실행기가 LLM으로 fallback)
+        results = self.web_search.search(query, providers=params.get("providers"))
         
-        return summary
+        # 3. 결과 요약: 검색어가 아니라 사용자 질문에 답함 (LLM 답변이면 결과 통합 단계에서 다시 쓰지 않음)
+        return self.web_search.answer_from_results(
+            results, user_input or query, deep=params.get("deep"), search_query=query
+        )
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """도구 통계"""
+        return {"web_search": self.web_search.get_stats()}
     
     def get_available_tools(self) -> List[str]:
         """사용 가능한 모든 도구 목록 반환"""
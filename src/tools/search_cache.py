@@ -0,0 +1,314 @@
+"""
+Search Cache
+
+웹 검색 파이프라인(검색어 생성 → 검색 → 요약)의 단계별 결과 캐시입니다.
+키는 공백/대소문자/조사를 정규화한 검색어이고 (c++, 3.12 같은 기호 표기는 유지), 단계(kind)마다 TTL이 다르며,
+만료 후 일정 시간까지는 이전 값을 바로 반환하면서 백그라운드에서 갱신합니다
+(stale-while-revalidate). 캐시는 파일에 저장되어 재시작 후에도 유지됩니다.
+"""
+
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Collection, Dict, Optional
+
+from src.utils.config import config
+from src.utils.logger import setup_logger
+from src.utils.text_search import normalize_text
+
+logger = setup_logger("search_cache")
+
+# 만료된 항목의 백그라운드 갱신 (요청 스레드를 막지 않음)
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="search-refresh")
+
+# 어절 끝에서 떼어 낼 조사 (긴 것부터 비교)
+KOREAN_PARTICLES = sorted(
+    "에서는 으로는 에게서 이라고 라고 에서 에게 한테 으로 까지 부터 처럼 보다 이랑 하고 "
+    "의 은 는 이 가 을 를 에 로 와 과 도 만 랑".split(),
+    key=len, reverse=True
+)
+# 조사일 수도, 단어 일부일 수도 있는 한 글자 조사 ("고양이", "경기도")는 어간이 알려진 단어일 때만 제거
+AMBIGUOUS_PARTICLES = {"이", "가", "도", "만", "로", "와", "과", "랑"}
+
+# 검색어 토큰 (3.13, c++, gpt-4o 같은 표기 유지)
+QUERY_TOKEN = re.compile(r"\w[\w.+#'-]*\w|\w[+#]*")
+
+# 저장 파일 쓰기 최소 간격 (초), 나머지는 종료 시 저장
+SAVE_INTERVAL = 1.0
+
+
+def _is_hangul(text: str) -> bool:
+    """모두 한글 음절인지 여부"""
+    return all("가" <= ch <= "힣" for ch in text)
+
+
+def strip_particle(token: str, known: Collection[str] = ()) -> str:
+    """
+    어절 끝의 조사 제거
+    
+    Args:
+        token: 한글 어절
+        known: 모호한 한 글자 조사를 떼어도 되는 어간 (개체 사전 등)
+    
+    Returns:
+        조사를 뗀 어절 (어간이 한 글자만 남거나, 모호한 조사인데 어간을 모르면 그대로)
+    """
+    for particle in KOREAN_PARTICLES:
+        # 어간이 한 글자만 남는 경우("주가", "나이")는 조사가 아닐 가능성이 높아 유지
+        if token.endswith(particle) and len(token) - len(particle) >= 2:
+            stem = token[:-len(particle)]
+            if particle in AMBIGUOUS_PARTICLES and stem not in known:
+                return token
+            return stem
+    return token
+
+
+def normalize_query(query: str) -> str:
+    """
+    캐시 키용 검색어 정규화
+    
+    "서울의 날씨는?"과 "서울  날씨"처럼 공백, 대소문자, 문장 부호, 조사만 다른 검색어를 같은 키로 만듭니다.
+    "c++"/"c#"처럼 기호가 뜻을 바꾸는 토큰은 그대로 두고, 단어 일부일 수 있는 한 글자 조사는 떼지 않습니다.
+    
+    Args:
+        query: 검색어
+    
+    Returns:
+        정규화된 검색어
+    """
+    tokens = []
+    for token in QUERY_TOKEN.findall(normalize_text(query)):
+        tokens.append(strip_particle(token) if _is_hangul(token) else token)
+    return " ".join(tokens)
+
+
+class SearchCache:
+    """단계별 TTL과 stale-while-revalidate를 지원하는 영구 검색 캐시"""
+    
+    def __init__(
+        self,
+        cache_path: Optional[str] = None,
+        ttls: Dict[str, float] = None,
+        stale_ttl: float = None,
+        max_entries: int = None
+    ):
+        """
+        초기화
+        
+        Args:
+            cache_path: 저장 파일 경로 (빈 문자열이면 저장하지 않음, None이면 설정값)
+            ttls: 단계별 유효 시간 (초) {"query": ..., "results": ..., "summary": ...}
+            stale_ttl: 만료 후 이전 값을 반환하며 갱신할 수 있는 시간 (초)
+            max_entries: 최대 항목 수 (넘으면 가장 오래 사용하지 않은 항목 제거)
+        """
+        if cache_path is None:
+            cache_path = config.search_cache_file
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.ttls = ttls or {
+            "query": config.search_result_ttl,
+            "results": config.search_result_ttl,
+            "summary": config.search_summary_ttl
+        }
+        self.stale_ttl = stale_ttl if stale_ttl is not None else config.search_stale_ttl
+        self.max_entries = max_entries or config.search_cache_max_entries
+        
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._dirty = False
+        self._last_save = 0.0
+        
+        self._load()
+        if self.cache_path:
+            atexit.register(self.save)
+        logger.info(f"검색 캐시 초기화: {len(self._entries)}개 항목 ({self.cache_path or '메모리 전용'})")
+    
+    def _kind_stats(self, kind: str) -> Dict[str, int]:
+        """단계별 통계 딕셔너리 (없으면 생성, _lock 안에서 호출)"""
+        return self._stats.setdefault(kind, {
+            "hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0
+        })
+    
+    def get(self, kind: str, key: str) -> Optional[tuple]:
+        """
+        캐시 조회
+        
+        Args:
+            kind: 단계 (query/results/summary)
+            key: 정규화된 키
+        
+        Returns:
+            (값, 유효 여부) 또는 None (없거나 stale 허용 시간까지 지난 경우)
+        """
+        cache_key = f"{kind}:{key}"
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            stats = self._kind_stats(kind)
+            if entry is None or now - entry["stored_at"] > self.ttls[kind] + self.stale_ttl:
+                stats["misses"] += 1
+                return None
+            self._entries.move_to_end(cache_key)
+            fresh = now - entry["stored_at"] <= self.ttls[kind]
+            stats["hits" if fresh else "stale_hits"] += 1
+            return entry["value"], fresh
+    
+    def put(self, kind: str, key: str, value: Any):
+        """
+        캐시 저장
+        
+        Args:
+            kind: 단계
+            key: 정규화된 키
+            value: JSON으로 저장 가능한 값
+        """
+        with self._lock:
+            cache_key = f"{kind}:{key}"
+            self._entries[cache_key] = {"value": value, "stored_at": time.time()}
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+            save_due = time.time() - self._last_save >= SAVE_INTERVAL
+        if save_due:
+            self.save()
+    
+    def get_or_load(
+        self,
+        kind: str,
+        key: str,
+        loader: Callable[[], Any],
+        cacheable: Callable[[Any], bool] = None
+    ) -> Any:
+        """
+        캐시 조회 후 없으면 loader로 채우기
+        
+        만료된 값은 그대로 반환하고 loader를 백그라운드에서 실행해 갱신합니다.
+        loader가 예외를 던지면 캐시에 저장하지 않고 예외를 그대로 전달합니다.
+        
+        Args:
+            kind: 단계
+            key: 정규화된 키
+            loader: 값을 새로 만드는 함수
+            cacheable: 새 값을 저장할지 판단하는 함수 (None이면 항상 저장)
+        
+        Returns:
+            캐시된 값 또는 loader 결과
+        """
+        cached = self.get(kind, key)
+        if cached is not None:
+            value, fresh = cached
+            if not fresh:
+                self._schedule_refresh(kind, key, loader, cacheable)
+            return value
+        
+        value = loader()
+        if cacheable is None or cacheable(value):
+            self.put(kind, key, value)
+        return value
+    
+    def _schedule_refresh(
+        self,
+        kind: str,
+        key: str,
+        loader: Callable[[], Any],
+        cacheable: Callable[[Any], bool] = None
+    ):
+        """만료된 항목을 백그라운드에서 갱신 (같은 키는 한 번만)"""
+        cache_key = f"{kind}:{key}"
+        with self._lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+        
+        def refresh():
+            try:
+                value = loader()
+                if cacheable is None or cacheable(value):
+                    self.put(kind, key, value)
+                with self._lock:
+                    self._kind_stats(kind)["refreshes"] += 1
+            except Exception as e:
+                logger.warning(f"검색 캐시 갱신 실패 ({kind}: {key}): {e}")
+                with self._lock:
+                    self._kind_stats(kind)["refresh_errors"] += 1
+            finally:
+                with self._lock:
+                    self._refreshing.discard(cache_key)
+        
+        _refresh_executor.submit(refresh)
+    
+    def _load(self):
+        """저장 파일에서 아직 쓸 수 있는 항목 로드"""
+        if not self.cache_path or not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except Exception as e:
+            logger.warning(f"검색 캐시 파일 로드 실패, 빈 캐시로 시작: {e}")
+            return
+        
+        now = time.time()
+        for cache_key, entry in entries.items():
+            kind = cache_key.split(":", 1)[0]
+            if kind in self.ttls and now - entry["stored_at"] <= self.ttls[kind] + self.stale_ttl:
+                self._entries[cache_key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def save(self):
+        """변경된 캐시를 임시 파일 + rename으로 저장"""
+        if not self.cache_path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = dict(self._entries)
+            self._dirty = False
+            self._last_save = time.time()
+        
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_path.with_name(self.cache_path.name + f".{os.getpid()}.tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_path, self.cache_path)
+        except Exception as e:
+            logger.error(f"검색 캐시 저장 실패: {e}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """단계별 적중률 통계"""
+        with self._lock:
+            stats = {}
+            for kind, counts in self._stats.items():
+                lookups = counts["hits"] + counts["stale_hits"] + counts["misses"]
+                stats[kind] = dict(
+                    counts,
+                    hit_ratio=(counts["hits"] + counts["stale_hits"]) / lookups if lookups else 0.0
+                )
+            return {"entries": len(self._entries), "kinds": stats}
+
+
+# 싱글톤 인스턴스
+_search_cache = None
+
+
+def get_search_cache() -> SearchCache:
+    """
+    검색 캐시 싱글톤 인스턴스 가져오기
+    
+    Returns:
+        SearchCache 인스턴스
+    """
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = SearchCache()
+    return _search_cache
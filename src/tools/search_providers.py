@@ -0,0 +1,886 @@
+"""
+Search Providers
+
+여러 검색 백엔드(HTML/JSON)를 같은 인터페이스로 감싸고, 동시에 질의해 결과를 합칩니다.
+
+- 제공자마다 지연 시간/실패율 통계를 유지하고, 점수가 높은 제공자부터 골라 질의
+- 전체 마감 시간 안에서 동시 실행, 첫 유효 응답 이후에는 짧은 유예 시간만 더 기다림
+- URL 기준으로 중복을 제거하고 제공자 가중치를 반영한 순위 융합(RRF)으로 정렬
+- 모든 제공자가 실패하면 SearchProviderError (실행기가 LLM 대체 경로로 넘어감)
+- 제공자별 회로 차단기와 429/403에 맞춰 줄어드는 요청 속도 제한 (차단 중이면 기다리지 않고 바로 실패)
+- HTML 결과 페이지는 lxml pull 파서로 필요한 결과 수만큼만 파싱 (구조가 바뀌면 BeautifulSoup),
+  큰 페이지는 파싱 프로세스 풀에서 처리
+- 1차 제공자(자체 문서 색인 등)를 먼저 질의해 결과가 충분하면 웹 제공자는 질의하지 않음
+"""
+
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, List, Optional, Union
+from urllib.parse import urlsplit, urlunsplit, parse_qs, parse_qsl, urlencode
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from src.tools.doc_index import DocumentIndex, get_document_index
+from src.tools.http_client import HTTPClient, HTTPResponse, get_http_client
+from src.tools.parse_pool import ParsePool, ParseTimeout, get_parse_pool
+from src.tools.provider_guard import AdaptiveRateLimiter, CircuitBreaker
+from src.utils.config import config
+from src.utils.logger import setup_logger
+from src.utils.text_search import HybridSearchIndex
+
+logger = setup_logger("search_providers")
+
+# 제공자 질의 실행 (요청 스레드는 마감 시간까지만 기다림)
+_provider_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="search-provider")
+
+# 순위 융합 상수 (Reciprocal Rank Fusion)
+RRF_K = 60
+# 통계 지수 이동 평균 계수
+EWMA_ALPHA = 0.2
+# N번 검색마다 선택되지 않은 제공자 하나를 추가로 질의해 상태 확인
+PROBE_EVERY = 10
+
+# 요청 제한으로 보는 응답 상태 (DuckDuckGo는 차단 시 403도 사용)
+THROTTLE_STATUS = {429, 403}
+
+# DuckDuckGo 결과 블록 안의 제목 링크/스니펫
+RESULT_TITLE_XPATH = ".//a[contains(concat(' ', normalize-space(@class), ' '), ' result__a ')]"
+RESULT_SNIPPET_XPATH = ".//*[contains(concat(' ', normalize-space(@class), ' '), ' result__snippet ')]"
+# BeautifulSoup 대체 경로에서 찾을 결과 제목 링크/스니펫 클래스
+RESULT_LINK_CLASS = re.compile(r"^(result__a|result-link|result-title)$")
+RESULT_SNIPPET_CLASS = re.compile(r"snippet")
+# 결과 페이지를 파서에 넣는 단위 (필요한 결과를 찾으면 나머지는 넣지 않음)
+PARSE_CHUNK_SIZE = 16384
+
+
+class SearchProviderError(Exception):
+    """검색 제공자 실패 (모든 제공자가 실패하면 WebSearch.search에서 발생)"""
+
+
+class ProviderThrottled(SearchProviderError):
+    """제공자가 요청을 제한함 (429/403)"""
+    
+    def __init__(self, provider: str, status_code: int, retry_after: float = None):
+        """
+        초기화
+        
+        Args:
+            provider: 제공자 이름
+            status_code: 응답 상태 코드
+            retry_after: 서버가 알려준 재시도 대기 시간 (초)
+        """
+        super().__init__(f"{provider}: 요청 제한 ({status_code})" + (f", {retry_after:.0f}초 후 재시도" if retry_after else ""))
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 대기 시간(초)으로 변환"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def canonical_url(url: str) -> str:
+    """
+    중복 제거용 URL 정규화
+    
+    스킴/www/끝 슬래시/프래그먼트/utm 파라미터 차이를 없앱니다.
+    
+    Args:
+        url: 주소
+    
+    Returns:
+        정규화된 주소
+    """
+    parts = urlsplit(unwrap_redirect(url))
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not k.startswith("utm_")))
+    return urlunsplit(("", host, parts.path.rstrip("/"), query, ""))
+
+
+def unwrap_redirect(url: str) -> str:
+    """DuckDuckGo 리다이렉트 링크(//duckduckgo.com/l/?uddg=...)를 실제 주소로 변환"""
+    parts = urlsplit(url)
+    if parts.netloc.endswith("duckduckgo.com") and parts.path.startswith("/l/"):
+        target = parse_qs(parts.query).get("uddg")
+        if target:
+            return target[0]
+    if url.startswith("//"):
+        return "https:" + url
+    return url
+
+
+@dataclass
+class ProviderStats:
+    """제공자별 지연 시간/실패 통계"""
+    calls: int = 0
+    successes: int = 0
+    failures: int = 0
+    empty: int = 0
+    deadline_misses: int = 0
+    ewma_latency: float = 0.0
+    ewma_success: float = 1.0
+    last_used: float = 0.0
+    last_error: Optional[str] = None
+    
+    def record(self, latency: float, success: bool, empty: bool = False, error: str = None):
+        """호출 결과 반영"""
+        self.calls += 1
+        self.last_used = time.time()
+        if success:
+            self.successes += 1
+            self.empty += int(empty)
+        else:
+            self.failures += 1
+            self.last_error = error
+        alpha = EWMA_ALPHA if self.calls > 1 else 1.0
+        self.ewma_latency += alpha * (latency - self.ewma_latency)
+        self.ewma_success += alpha * ((1.0 if success and not empty else 0.0) - self.ewma_success)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """통계 딕셔너리"""
+        return {
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "empty": self.empty,
+            "deadline_misses": self.deadline_misses,
+            "avg_latency": self.ewma_latency,
+            "success_rate": self.ewma_success,
+            "last_error": self.last_error
+        }
+
+
+class ParseStats:
+    """결과 페이지 파싱 시간 통계 (파서별)"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.parses: Dict[str, int] = {}
+        self.total_time: Dict[str, float] = {}
+        self.fallbacks = 0
+    
+    def record(self, parser: str, elapsed: float, fallback: bool = False):
+        """파싱 1회 기록"""
+        with self._lock:
+            self.parses[parser] = self.parses.get(parser, 0) + 1
+            self.total_time[parser] = self.total_time.get(parser, 0.0) + elapsed
+            self.fallbacks += int(fallback)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """통계 딕셔너리 (파서별 횟수/평균 시간(ms), BeautifulSoup 대체 횟수)"""
+        with self._lock:
+            return {
+                "parsers": {
+                    parser: {"parses": count, "avg_ms": self.total_time[parser] / count * 1000}
+                    for parser, count in self.parses.items()
+                },
+                "fallbacks": self.fallbacks
+            }
+
+
+class SearchProvider:
+    """검색 제공자 기본 클래스"""
+    
+    name = "base"
+    # 요청 속도 제한 대상 여부 (외부 서비스를 호출하는 제공자)
+    rate_limited = True
+    
+    def __init__(self, weight: float = 1.0):
+        """
+        초기화
+        
+        Args:
+            weight: 결과 병합 시 가중치
+        """
+        self.weight = weight
+        # 읽기 타임아웃 (None이면 HTTP 클라이언트 기본값, SearchFanout이 마감 시간으로 설정)
+        self.timeout: Optional[float] = None
+    
+    def request_timeout(self) -> Optional[tuple]:
+        """HTTP 요청 타임아웃 (연결, 읽기)"""
+        if self.timeout is None:
+            return None
+        return (min(self.http_client.connect_timeout, self.timeout), self.timeout)
+    
+    def check_response(self, response: HTTPResponse):
+        """
+        응답 상태 확인
+        
+        Raises:
+            ProviderThrottled: 429/403 응답 (회로 차단기를 바로 열고 요청 속도를 줄임)
+            requests.HTTPError: 그 밖의 4xx/5xx 응답
+        """
+        if response.status_code in THROTTLE_STATUS:
+            raise ProviderThrottled(self.name, response.status_code, parse_retry_after(response.headers.get("Retry-After")))
+        response.raise_for_status()
+    
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        """
+        검색
+        
+        Args:
+            query: 검색어
+            max_results: 최대 결과 수
+        
+        Returns:
+            [{"title", "snippet", "url"}] (실패 시 예외)
+        """
+        raise NotImplementedError
+
+
+class DuckDuckGoHTMLProvider(SearchProvider):
+    """DuckDuckGo HTML 검색"""
+    
+    name = "duckduckgo_html"
+    
+    def __init__(self, http_client: HTTPClient = None, url: str = "https://html.duckduckgo.com/html/", weight: float = 1.0):
+        super().__init__(weight)
+        self.http_client = http_client or get_http_client()
+        self.url = url
+        self.parse_stats = ParseStats()
+    
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        response = self.http_client.post(self.url, data={'q': query}, timeout=self.request_timeout())
+        self.check_response(response)
+        return self.parse(
+            response.content, max_results, encoding=response.encoding, stats=self.parse_stats, pool=get_parse_pool()
+        )
+    
+    @staticmethod
+    def parse(
+        html: Union[bytes, str],
+        max_results: int,
+        encoding: str = None,
+        stats: "ParseStats" = None,
+        pool: ParsePool = None
+    ) -> List[Dict[str, str]]:
+        """
+        결과 페이지 파싱
+        
+        lxml pull 파서로 결과 블록이 끝날 때마다 추출하고 필요한 개수를 채우면 나머지는 파싱하지 않습니다.
+        결과 블록을 하나도 찾지 못하면 (페이지 구조 변경 등) BeautifulSoup 전체 파싱으로 다시 시도합니다.
+        
+        Args:
+            html: 결과 페이지 (bytes 권장, 디코딩 복사 없음)
+            max_results: 최대 결과 수
+            encoding: bytes 인코딩 (None이면 UTF-8)
+            stats: 파싱 시간 통계 (None이면 기록하지 않음)
+            pool: 큰 페이지를 파싱할 프로세스 풀 (None이면 호출한 스레드에서 파싱)
+        
+        Returns:
+            검색 결과 리스트
+        
+        Raises:
+            ParseTimeout: 프로세스 풀의 작업 시간 제한 초과
+        """
+        if isinstance(html, str):
+            html = html.encode("utf-8")
+            encoding = "utf-8"
+        
+        run = pool.run if pool is not None else (lambda func, *args: func(*args))
+        start_time = time.perf_counter()
+        try:
+            results = run(_parse_duckduckgo_lxml, html, max_results, encoding or "utf-8")
+        except ParseTimeout:
+            raise
+        except Exception as e:
+            logger.warning(f"lxml 결과 파싱 실패, BeautifulSoup 사용: {e}")
+            results = []
+        parser = "lxml"
+        
+        if not results:
+            results = run(_parse_duckduckgo_soup, html, max_results)
+            parser = "beautifulsoup"
+        
+        if stats is not None:
+            stats.record(parser, time.perf_counter() - start_time, fallback=parser != "lxml")
+        return results
+
+
+def _has_class(element, name: str) -> bool:
+    """class 속성에 name 토큰이 있는지 여부"""
+    return name in (element.get("class") or "").split()
+
+
+def _parse_duckduckgo_lxml(html: bytes, max_results: int, encoding: str) -> List[Dict[str, str]]:
+    """lxml pull 파서로 결과 블록 추출 (필요한 개수를 채우면 중단)"""
+    parser = etree.HTMLPullParser(events=("end",), tag="div", encoding=encoding)
+    results = []
+    for offset in range(0, len(html), PARSE_CHUNK_SIZE):
+        parser.feed(html[offset:offset + PARSE_CHUNK_SIZE])
+        for _, div in parser.read_events():
+            if not _has_class(div, "result"):
+                continue
+            title_tag = next(iter(div.xpath(RESULT_TITLE_XPATH)), None)
+            if title_tag is not None:
+                title = "".join(title_tag.itertext()).strip()
+                link = title_tag.get("href", "")
+                snippet_tag = next(iter(div.xpath(RESULT_SNIPPET_XPATH)), None)
+                snippet = "".join(snippet_tag.itertext()).strip() if snippet_tag is not None else ""
+                if title and link:
+                    results.append({"title": title, "snippet": snippet, "url": unwrap_redirect(link)})
+            div.clear(keep_tail=True)
+            if len(results) >= max_results:
+                return results
+    return results
+
+
+def _parse_duckduckgo_soup(html: bytes, max_results: int) -> List[Dict[str, str]]:
+    """
+    BeautifulSoup 전체 트리 파싱 (lxml 경로가 결과를 찾지 못한 경우)
+    
+    결과 블록 구조에 의존하지 않고 결과 제목 링크와 그 뒤의 스니펫을 찾으므로
+    블록 태그/클래스가 바뀐 페이지도 처리합니다.
+    """
+    soup = BeautifulSoup(html, 'lxml')
+    
+    results = []
+    for title_tag in soup.find_all('a', class_=RESULT_LINK_CLASS):
+        # 제목과 링크
+        title = title_tag.get_text(strip=True)
+        link = title_tag.get('href', '')
+        
+        # 스니펫 (다음 결과 제목 이전에 있는 것만)
+        snippet_tag = title_tag.find_next(class_=RESULT_SNIPPET_CLASS)
+        if snippet_tag is not None and snippet_tag.find_previous('a', class_=RESULT_LINK_CLASS) is not title_tag:
+            snippet_tag = None
+        snippet = snippet_tag.get_text(strip=True) if snippet_tag else ""
+        
+        if title and link:
+            results.append({"title": title, "snippet": snippet, "url": unwrap_redirect(link)})
+            if len(results) >= max_results:
+                break
+    return results
+
+
+class DuckDuckGoLiteProvider(SearchProvider):
+    """DuckDuckGo Lite 검색 (표 형식의 가벼운 HTML)"""
+    
+    name = "duckduckgo_lite"
+    
+    def __init__(self, http_client: HTTPClient = None, url: str = "https://lite.duckduckgo.com/lite/", weight: float = 0.9):
+        super().__init__(weight)
+        self.http_client = http_client or get_http_client()
+        self.url = url
+    
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        response = self.http_client.post(self.url, data={'q': query}, timeout=self.request_timeout())
+        self.check_response(response)
+        return self.parse(response.text, max_results)
+    
+    @staticmethod
+    def parse(html: str, max_results: int) -> List[Dict[str, str]]:
+        """결과 표 파싱 (링크 행 다음의 result-snippet 셀이 스니펫)"""
+        soup = BeautifulSoup(html, 'lxml')
+        
+        results = []
+        for link_tag in soup.find_all('a', class_='result-link'):
+            title = link_tag.get_text(strip=True)
+            link = link_tag.get('href', '')
+            row = link_tag.find_parent('tr')
+            snippet_tag = row.find_next('td', class_='result-snippet') if row else None
+            snippet = snippet_tag.get_text(strip=True) if snippet_tag else ""
+            
+            if title and link:
+                results.append({"title": title, "snippet": snippet, "url": unwrap_redirect(link)})
+                if len(results) >= max_results:
+                    break
+        return results
+
+
+class WikipediaProvider(SearchProvider):
+    """위키백과 검색 API (JSON)"""
+    
+    name = "wikipedia"
+    
+    def __init__(self, http_client: HTTPClient = None, lang: str = None, weight: float = 0.7):
+        super().__init__(weight)
+        self.http_client = http_client or get_http_client()
+        self.lang = lang or config.wikipedia_lang
+    
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        response = self.http_client.get(
+            f"https://{self.lang}.wikipedia.org/w/api.php",
+            params={"action": "query", "list": "search", "srsearch": query, "srlimit": max_results, "format": "json"},
+            timeout=self.request_timeout()
+        )
+        self.check_response(response)
+        return [
+            {
+                "title": item["title"],
+                "snippet": BeautifulSoup(item.get("snippet", ""), 'lxml').get_text(),
+                "url": f"https://{self.lang}.wikipedia.org/wiki/" + item["title"].replace(" ", "_")
+            }
+            for item in json.loads(response.text).get("query", {}).get("search", [])[:max_results]
+        ]
+
+
+class SearxNGProvider(SearchProvider):
+    """SearxNG 메타 검색 인스턴스 (JSON 형식 응답)"""
+    
+    name = "searxng"
+    
+    def __init__(self, http_client: HTTPClient = None, base_url: str = None, weight: float = 1.0):
+        super().__init__(weight)
+        self.http_client = http_client or get_http_client()
+        self.base_url = (base_url or config.searxng_url).rstrip("/")
+    
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        if not self.base_url:
+            raise SearchProviderError("SEARXNG_URL이 설정되지 않았습니다.")
+        response = self.http_client.get(
+            f"{self.base_url}/search", params={"q": query, "format": "json"}, timeout=self.request_timeout()
+        )
+        self.check_response(response)
+        return [
+            {"title": item.get("title", ""), "snippet": item.get("content", ""), "url": item["url"]}
+            for item in json.loads(response.text).get("results", [])[:max_results]
+            if item.get("url")
+        ]
+
+
+class LocalSearchProvider(SearchProvider):
+    """
+    네트워크 없이 동작하는 로컬 대체 제공자
+    
+    미리 준비한 문서({"title", "snippet", "url"})를 BM25 + 문자 n-gram으로 검색합니다.
+    오프라인 개발/테스트용이며, 지연 시간과 실패를 흉내 낼 수 있습니다.
+    """
+    
+    name = "local"
+    rate_limited = False
+    
+    def __init__(
+        self,
+        documents: List[Dict[str, str]] = None,
+        weight: float = 0.5,
+        latency: float = 0.0,
+        fail: bool = False,
+        name: str = None
+    ):
+        """
+        초기화
+        
+        Args:
+            documents: 검색 대상 문서 (None이면 SEARCH_LOCAL_FILE의 JSON 목록)
+            weight: 결과 병합 시 가중치
+            latency: 응답 전 대기 시간 (초)
+            fail: True면 항상 실패
+            name: 제공자 이름 (같은 종류를 여러 개 쓸 때)
+        """
+        super().__init__(weight)
+        if name:
+            self.name = name
+        self.latency = latency
+        self.fail = fail
+        if documents is None:
+            documents = []
+            if config.search_local_file:
+                with open(config.search_local_file, 'r', encoding='utf-8') as f:
+                    documents = json.load(f)
+        self.documents = {doc["url"]: doc for doc in documents}
+        self.index = HybridSearchIndex()
+        for url, doc in self.documents.items():
+            self.index.add(url, f"{doc['title']} {doc.get('snippet', '')}")
+    
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail:
+            raise SearchProviderError(f"{self.name}: 실패하도록 설정됨")
+        return [dict(self.documents[url]) for url, _ in self.index.search(query, top_k=max_results)]
+
+
+class DocIndexProvider(SearchProvider):
+    """
+    자체 문서/FAQ 색인 제공자
+    
+    DOCS_SOURCE_DIR의 HTML/Markdown 문서를 디스크 기반 BM25 색인(DocumentIndex)으로 검색합니다.
+    네트워크 없이 수 ms 안에 응답하므로 1차 제공자(SEARCH_FIRST_TIER)로 쓰기 좋습니다.
+    """
+    
+    name = "docs"
+    rate_limited = False
+    
+    def __init__(self, index: DocumentIndex = None, weight: float = 1.0, min_score: float = None, name: str = None):
+        """
+        초기화
+        
+        Args:
+            index: 문서 색인 (None이면 DOCS_INDEX_DIR 싱글톤)
+            weight: 결과 병합 시 가중치
+            min_score: 결과로 낼 최소 정규화 점수 (None이면 DOCS_MIN_SCORE)
+            name: 제공자 이름 (색인을 여러 개 쓸 때)
+        """
+        super().__init__(weight)
+        if name:
+            self.name = name
+        self.index = index or get_document_index()
+        self.min_score = min_score if min_score is not None else config.docs_min_score
+    
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        return [
+            {"title": hit["title"], "snippet": hit["snippet"], "url": hit["url"]}
+            for hit in self.index.search(query, top_k=max_results, min_score=self.min_score)
+        ]
+
+
+PROVIDER_CLASSES = {
+    cls.name: cls
+    for cls in (
+        DuckDuckGoHTMLProvider, DuckDuckGoLiteProvider, WikipediaProvider, SearxNGProvider,
+        LocalSearchProvider, DocIndexProvider
+    )
+}
+# HTTP 클라이언트를 쓰지 않는 제공자
+OFFLINE_PROVIDERS = (LocalSearchProvider, DocIndexProvider)
+
+
+def create_search_providers(names: List[str] = None, http_client: HTTPClient = None) -> List[SearchProvider]:
+    """
+    설정에 따라 검색 제공자 생성
+    
+    Args:
+        names: 제공자 이름 목록 (None이면 SEARCH_FIRST_TIER + SEARCH_PROVIDERS)
+        http_client: 웹 제공자가 공유할 HTTP 클라이언트
+    
+    Returns:
+        SearchProvider 리스트
+    """
+    providers = []
+    for name in dict.fromkeys(names or config.search_first_tier + config.search_providers):
+        cls = PROVIDER_CLASSES.get(name)
+        if cls is None:
+            logger.warning(f"알 수 없는 검색 제공자: {name}")
+            continue
+        providers.append(cls() if cls in OFFLINE_PROVIDERS else cls(http_client=http_client))
+    return providers
+
+
+class SearchFanout:
+    """여러 검색 제공자 동시 질의 및 결과 병합"""
+    
+    def __init__(
+        self,
+        providers: List[SearchProvider],
+        fanout: int = None,
+        deadline: float = None,
+        grace: float = None,
+        first_tier: List[str] = None
+    ):
+        """
+        초기화
+        
+        Args:
+            providers: 검색 제공자 (앞쪽일수록 통계가 같을 때 우선)
+            fanout: 한 번에 질의할 제공자 수
+            deadline: 전체 마감 시간 (초)
+            grace: 첫 유효 응답 이후 다른 제공자를 더 기다리는 시간 (초)
+            first_tier: 먼저 질의할 제공자 이름 (None이면 SEARCH_FIRST_TIER)
+        """
+        if not providers:
+            raise ValueError("검색 제공자가 하나 이상 필요합니다.")
+        self.providers = {provider.name: provider for provider in providers}
+        self.fanout = fanout or config.search_fanout
+        self.deadline = deadline if deadline is not None else config.search_deadline
+        self.grace = grace if grace is not None else config.search_grace
+        self.stats = {name: ProviderStats() for name in self.providers}
+        self.breakers = {name: CircuitBreaker() for name in self.providers}
+        self.limiters = {name: AdaptiveRateLimiter() for name in self.providers if self.providers[name].rate_limited}
+        self.max_wait = config.search_rate_max_wait
+        self.first_tier = [
+            name for name in (first_tier if first_tier is not None else config.search_first_tier)
+            if name in self.providers
+        ]
+        self.first_tier_min_results = config.search_first_tier_min_results
+        self.first_tier_hits = 0
+        self._lock = threading.Lock()
+        self._searches = 0
+        
+        # 마감 시간이 지난 요청을 작업 스레드가 계속 기다리지 않도록 읽기 타임아웃을 마감 시간으로 제한
+        for provider in providers:
+            if provider.timeout is None:
+                provider.timeout = self.deadline
+        
+        logger.info(f"검색 제공자: {', '.join(self.providers)} (동시 {self.fanout}개, 마감 {self.deadline}s)")
+    
+    def _score(self, name: str) -> float:
+        """선택 점수: 가중치 × 최근 성공률 ÷ (1 + 최근 지연 시간/마감 시간)"""
+        stats = self.stats[name]
+        return self.providers[name].weight * stats.ewma_success / (1.0 + stats.ewma_latency / max(self.deadline, 1e-6))
+    
+    def _available(self, name: str) -> bool:
+        """제공자에 지금 요청을 보낼 수 있는지 여부"""
+        limiter = self.limiters.get(name)
+        return self.breakers[name].available() and (limiter is None or limiter.available(self.max_wait))
+    
+    def _admit(self, name: str) -> Optional[float]:
+        """
+        요청 허가 (회로 차단기 + 요청 속도 제한)
+        
+        Returns:
+            요청 전 대기 시간 (초), 보낼 수 없으면 None
+        """
+        if not self.breakers[name].allow():
+            return None
+        limiter = self.limiters.get(name)
+        wait = limiter.reserve(self.max_wait) if limiter is not None else 0.0
+        if wait is None:
+            self.breakers[name].cancel()
+        return wait
+    
+    def select(self, names: List[str] = None, exclude: List[str] = ()) -> List[SearchProvider]:
+        """
+        이번 검색에 질의할 제공자 선택
+        
+        Args:
+            names: 요청에서 지정한 제공자 (None이면 통계 기반 선택)
+            exclude: 통계 기반 선택에서 뺄 제공자 (이미 질의한 1차 제공자)
+        
+        Returns:
+            SearchProvider 리스트
+        """
+        if names:
+            unknown = [name for name in names if name not in self.providers]
+            if unknown:
+                raise SearchProviderError(f"알 수 없는 검색 제공자: {', '.join(unknown)}")
+            return [self.providers[name] for name in names]
+        
+        # 회로 차단기가 열렸거나 요청 제한으로 기다려야 하는 제공자는 제외
+        order = [name for name in self.providers if name not in exclude and self._available(name)]
+        with self._lock:
+            self._searches += 1
+            ranked = sorted(order, key=lambda name: (-self._score(name), order.index(name)))
+            selected = ranked[:self.fanout]
+            rest = ranked[self.fanout:]
+            # 점수가 낮아 밀려난 제공자도 가끔 질의해 회복 여부 확인
+            if rest and self._searches % PROBE_EVERY == 0:
+                selected.append(min(rest, key=lambda name: self.stats[name].last_used))
+        return [self.providers[name] for name in selected]
+    
+    def search(self, query: str, max_results: int = 5, providers: List[str] = None) -> List[Dict[str, str]]:
+        """
+        선택한 제공자에 동시 질의 후 병합
+        
+        1차 제공자가 설정되어 있고 요청에서 제공자를 지정하지 않았으면 1차 제공자를 먼저 질의하고,
+        결과가 SEARCH_FIRST_TIER_MIN_RESULTS개 미만일 때만 나머지 제공자를 질의해 뒤에 붙입니다.
+        
+        Args:
+            query: 검색어
+            max_results: 최대 결과 수
+            providers: 질의할 제공자 이름 (None이면 1차 제공자 → 통계 기반 선택)
+        
+        Returns:
+            병합된 검색 결과 (결과 수가 0일 수 있음)
+        
+        Raises:
+            SearchProviderError: 선택한 모든 제공자가 실패하거나 마감 시간을 넘긴 경우
+        """
+        if providers or not self.first_tier:
+            return self._search(query, max_results, providers)
+        
+        try:
+            first = self._search(query, max_results, self.first_tier)
+        except SearchProviderError as e:
+            logger.warning(f"1차 검색 제공자 실패, 웹 제공자로 진행: {e}")
+            first = []
+        if len(first) >= min(self.first_tier_min_results, max_results):
+            with self._lock:
+                self.first_tier_hits += 1
+            return first
+        if len(self.first_tier) == len(self.providers):
+            return first
+        
+        try:
+            web = self._search(query, max_results, exclude=self.first_tier)
+        except SearchProviderError:
+            if first:
+                return first
+            raise
+        # 1차 제공자 결과를 앞에 두고 같은 URL의 웹 결과는 제외
+        seen = {canonical_url(result["url"]) for result in first}
+        return (first + [result for result in web if canonical_url(result["url"]) not in seen])[:max_results]
+    
+    def _search(
+        self,
+        query: str,
+        max_results: int,
+        providers: List[str] = None,
+        exclude: List[str] = ()
+    ) -> List[Dict[str, str]]:
+        """
+        제공자 한 묶음 동시 질의 후 병합
+        
+        Args:
+            query: 검색어
+            max_results: 최대 결과 수
+            providers: 질의할 제공자 이름 (None이면 통계 기반 선택)
+            exclude: 통계 기반 선택에서 뺄 제공자
+        
+        Returns:
+            병합된 검색 결과
+        
+        Raises:
+            SearchProviderError: 선택한 모든 제공자가 실패하거나 마감 시간을 넘긴 경우
+        """
+        start_time = time.perf_counter()
+        deadline_at = start_time + self.deadline
+        futures = {}
+        blocked = []
+        for provider in self.select(providers, exclude):
+            wait_time = self._admit(provider.name)
+            if wait_time is None:
+                blocked.append(provider.name)
+                continue
+            futures[_provider_executor.submit(self._timed_search, provider, query, max_results, wait_time)] = provider
+        
+        # 보낼 수 있는 제공자가 없으면 기다리지 않고 바로 실패 (실행기가 LLM으로 fallback)
+        if not futures:
+            retry_in = min((self.breakers[name].retry_in() for name in providers or self.providers), default=0.0)
+            raise SearchProviderError(
+                f"사용 가능한 검색 제공자 없음 (차단/요청 제한: {', '.join(blocked or providers or self.providers)}, "
+                f"{retry_in:.0f}초 후 재시도)"
+            )
+        
+        responses: Dict[str, List[Dict[str, str]]] = {}
+        errors = []
+        first_good_at = None
+        pending = set(futures)
+        while pending:
+            now = time.perf_counter()
+            wait_until = deadline_at if first_good_at is None else min(deadline_at, first_good_at + self.grace)
+            if now >= wait_until:
+                break
+            done, pending = wait(pending, timeout=wait_until - now, return_when=FIRST_COMPLETED)
+            for future in done:
+                provider = futures[future]
+                results, latency, error = future.result()
+                self._record_guard(provider.name, error)
+                error = (str(error) or type(error).__name__) if error is not None else None
+                with self._lock:
+                    self.stats[provider.name].record(latency, error is None, empty=not results, error=error)
+                if error is not None:
+                    errors.append(f"{provider.name}: {error}")
+                    logger.warning(f"검색 제공자 실패 ({provider.name}, {latency:.2f}s): {error}")
+                    continue
+                responses[provider.name] = results
+                if results and first_good_at is None:
+                    first_good_at = time.perf_counter()
+        
+        # 마감 시간까지 응답하지 않은 제공자는 지연 시간을 마감 시간으로 기록 (늦게 끝난 결과는 버림)
+        for future in pending:
+            provider = futures[future]
+            with self._lock:
+                stats = self.stats[provider.name]
+                if first_good_at is None:
+                    stats.record(self.deadline, False, error="마감 시간 초과")
+                stats.deadline_misses += 1
+            if first_good_at is None:
+                self.breakers[provider.name].record_failure()
+                errors.append(f"{provider.name}: 마감 시간 초과")
+            else:
+                # 다른 제공자가 응답해 기다리지 않은 경우 시험 요청 자리만 반납
+                self.breakers[provider.name].cancel()
+        
+        if not responses:
+            raise SearchProviderError("모든 검색 제공자 실패 - " + "; ".join(errors))
+        
+        merged = self.merge(responses, max_results)
+        logger.info(
+            f"검색 결과 {len(merged)}개 ({', '.join(f'{name} {len(r)}' for name, r in responses.items())}, "
+            f"{time.perf_counter() - start_time:.2f}s)"
+        )
+        return merged
+    
+    def _record_guard(self, name: str, error: Optional[Exception]):
+        """회로 차단기/요청 속도 제한기에 결과 반영"""
+        limiter = self.limiters.get(name)
+        if error is None:
+            self.breakers[name].record_success()
+            if limiter is not None:
+                limiter.on_success()
+        elif isinstance(error, ProviderThrottled):
+            logger.warning(f"검색 제공자 요청 제한 ({name}), 차단 후 속도 감소: {error}")
+            self.breakers[name].record_failure(trip=True, open_for=error.retry_after)
+            if limiter is not None:
+                limiter.on_throttle(error.retry_after)
+        else:
+            self.breakers[name].record_failure()
+    
+    @staticmethod
+    def _timed_search(provider: SearchProvider, query: str, max_results: int, wait_time: float = 0.0) -> tuple:
+        """제공자 질의 (요청 속도 제한 대기 후, 예외를 결과로 변환)"""
+        if wait_time > 0:
+            time.sleep(wait_time)
+        start_time = time.perf_counter()
+        try:
+            results = provider.search(query, max_results)
+            return results, time.perf_counter() - start_time, None
+        except Exception as e:
+            return [], time.perf_counter() - start_time, e
+    
+    def merge(self, responses: Dict[str, List[Dict[str, str]]], max_results: int) -> List[Dict[str, str]]:
+        """
+        URL 기준 중복 제거 + 가중 순위 융합
+        
+        Args:
+            responses: 제공자별 결과
+            max_results: 최대 결과 수
+        
+        Returns:
+            점수 순 결과 (각 항목에 providers 목록 포함)
+        """
+        merged: Dict[str, Dict[str, Any]] = {}
+        scores: Dict[str, float] = {}
+        for name, results in responses.items():
+            weight = self.providers[name].weight
+            for rank, result in enumerate(results):
+                key = canonical_url(result["url"])
+                scores[key] = scores.get(key, 0.0) + weight / (RRF_K + rank + 1)
+                entry = merged.get(key)
+                if entry is None:
+                    merged[key] = dict(result, providers=[name])
+                    continue
+                entry["providers"].append(name)
+                # 더 긴 스니펫 사용
+                if len(result.get("snippet", "")) > len(entry.get("snippet", "")):
+                    entry["snippet"] = result["snippet"]
+        
+        ranked = sorted(merged, key=lambda key: -scores[key])
+        return [merged[key] for key in ranked[:max_results]]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """제공자별 통계, 현재 선택 점수, 회로 차단기/요청 속도 상태 (결과 페이지를 파싱하는 제공자는 파싱 시간 포함)"""
+        with self._lock:
+            stats = {
+                name: dict(provider_stats.to_dict(), score=self._score(name))
+                for name, provider_stats in self.stats.items()
+            }
+        for name, provider in self.providers.items():
+            stats[name]["breaker"] = self.breakers[name].to_dict()
+            if name in self.limiters:
+                stats[name]["rate_limit"] = self.limiters[name].to_dict()
+            if getattr(provider, "parse_stats", None) is not None:
+                stats[name]["parse"] = provider.parse_stats.to_dict()
+            if isinstance(provider, DocIndexProvider):
+                stats[name]["index"] = provider.index.get_stats()
+            if name in self.first_tier:
+                stats[name]["first_tier_hits"] = self.first_tier_hits
+        return stats
@@ -4,10 +4,17 @@ Web Search Module
 웹 검색 기능을 제공합니다.
 """
 
-import json
-import requests
+import asyncio
+import hashlib
+import threading
+from datetime import datetime
 from typing import Dict, Any, Optional, List
-from bs4 import BeautifulSoup
+from src.tools.http_client import HTTPClient, get_http_client
+from src.tools.page_fetcher import PageFetcher, rank_passages
+from src.tools.query_builder import QueryBuilder, get_query_builder
+from src.tools.search_cache import SearchCache, get_search_cache, normalize_query
+from src.tools.search_providers import SearchFanout, SearchProviderError, create_search_providers
+from src.utils.config import config
 from src.utils.logger import setup_logger
 from src.utils.openai_client import get_openai_client
 from src.prompts.templates import WEB_SEARCH_QUERY_PROMPT, format_prompt
@@ -19,12 +26,35 @@ logger = setup_logger("web_search")
 class WebSearch:
     """웹 검색 클래스"""
     
-    def __init__(self):
-        """초기화"""
+    def __init__(
+        self,
+        http_client: HTTPClient = None,
+        cache: SearchCache = None,
+        fanout: SearchFanout = None,
+        page_fetcher: PageFetcher = None,
+        query_builder: QueryBuilder = None,
+        max_results: int = 5
+    ):
+        """
+        초기화
+        
+        Args:
+            http_client: HTTP 클라이언트 (None이면 공유 연결 풀 사용)
+            cache: 검색 캐시 (None이면 공유 캐시 사용)
+            fanout: 검색 제공자 묶음 (None이면 SEARCH_PROVIDERS 설정으로 생성)
+            page_fetcher: 상위 결과 페이지 수집기 (None이면 생성)
+            query_builder: 로컬 검색어 생성기 (None이면 QUERY_BUILDER 설정에 따라 공유 생성기 또는 사용 안 함)
+            max_results: 최대 검색 결과 수
+        """
         self.openai_client = get_openai_client()
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        }
+        self.http_client = http_client or get_http_client()
+        self.cache = cache or get_search_cache()
+        self.fanout = fanout or SearchFanout(create_search_providers(http_client=self.http_client))
+        self.page_fetcher = page_fetcher or PageFetcher(self.http_client)
+        self.query_builder = query_builder or (get_query_builder() if config.query_builder else None)
+        self.max_results = max_results
+        self._query_lock = threading.Lock()
+        self._query_stats = {"requests": 0, "local": 0, "llm_calls": 0}
         logger.info("Web Search 모듈 초기화 완료")
     
     def generate_query(self, user_input: str) -> Dict[str, Any]:
@@ -41,20 +71,27 @@ class WebSearch:
                 "filters": dict
             }
         """
+        self._count_query("requests")
+        
+        # 상대 날짜 변환/군더더기 제거로 충분한 요청은 LLM 없이 처리
+        if self.query_builder is not None:
+            local = self.query_builder.build(user_input)
+            if local["confidence"] >= config.query_builder_min_confidence:
+                self._count_query("local")
+                logger.info(f"검색어 생성 (로컬, 신뢰도 {local['confidence']}): {local['query']}")
+                return local
+            logger.debug(f"로컬 검색어 신뢰도 낮음 ({local['confidence']}), LLM으로 생성")
+        
         try:
-            from datetime import datetime
-            
             # 현재 날짜 및 시간
             current_date = datetime.now().strftime("%Y년 %m월 %d일 (%A)")
             
-            prompt = format_prompt(
-                WEB_SEARCH_QUERY_PROMPT, 
-                user_input=user_input,
-                current_date=current_date
-            )
-            result = self.openai_client.query_with_json(
-                system_prompt=get_system_prompt(),
-                user_message=prompt
+            # 생성된 검색어는 날짜에 따라 달라지므로 날짜를 키에 포함
+            result = self.cache.get_or_load(
+                "query",
+                f"{current_date}|{normalize_query(user_input)}",
+                lambda: self._generate_query(user_input, current_date),
+                cacheable=bool
             )
             
             if result:
@@ -68,113 +105,161 @@ class WebSearch:
             logger.error(f"검색어 생성 오류: {e}")
             return {"query": user_input, "filters": {}}
     
-    def search(self, query: str) -> List[Dict[str, str]]:
+    def _generate_query(self, user_input: str, current_date: str) -> Optional[Dict[str, Any]]:
+        """LLM으로 검색어 생성 (캐시 미스 시 호출)"""
+        self._count_query("llm_calls")
+        prompt = format_prompt(
+            WEB_SEARCH_QUERY_PROMPT, 
+            user_input=user_input,
+            current_date=current_date
+        )
+        return self.openai_client.query_with_json(
+            system_prompt=get_system_prompt(),
+            user_message=prompt,
+            call_site="web_query"
+        )
+    
+    def _count_query(self, name: str):
+        with self._query_lock:
+            self._query_stats[name] += 1
+    
+    def get_query_stats(self) -> Dict[str, Any]:
+        """검색어 생성 통계 (로컬 처리 비율, 검색 요청당 LLM 호출 비율)"""
+        with self._query_lock:
+            stats = dict(self._query_stats)
+        requests = stats["requests"]
+        stats["local_ratio"] = stats["local"] / requests if requests else 0.0
+        stats["llm_call_rate"] = stats["llm_calls"] / requests if requests else 0.0
+        return stats
+    
+    def search(self, query: str, providers: List[str] = None) -> List[Dict[str, str]]:
         """
         웹 검색 실행
         
         Args:
             query: 검색어
+            providers: 질의할 검색 제공자 이름 (None이면 제공자 통계에 따라 선택)
         
         Returns:
             검색 결과 리스트
             [
-                {"title": "제목", "snippet": "내용", "url": "주소"}
+                {"title": "제목", "snippet": "내용", "url": "주소", "providers": [...]}
             ]
+        
+        Raises:
+            SearchProviderError: 모든 검색 제공자가 실패한 경우 (실행기가 LLM으로 fallback)
         """
         logger.info(f"웹 검색 실행: {query}")
         
+        key = normalize_query(query)
+        if providers:
+            key += "@" + ",".join(providers)
+        
         try:
-            # DuckDuckGo HTML 검색
-            url = "https://html.duckduckgo.com/html/"
-            data = {'q': query}
-            
-            response = requests.post(url, data=data, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            # BeautifulSoup으로 파싱
-            soup = BeautifulSoup(response.text, 'lxml')
-            
-            results = []
-            # 검색 결과 추출
-            for result_div in soup.find_all('div', class_='result')[:5]:  # 상위 5개
-                try:
-                    # 제목과 링크
-                    title_tag = result_div.find('a', class_='result__a')
-                    if not title_tag:
-                        continue
-                    
-                    title = title_tag.get_text(strip=True)
-                    link = title_tag.get('href', '')
-                    
-                    # 스니펫
-                    snippet_tag = result_div.find('a', class_='result__snippet')
-                    snippet = snippet_tag.get_text(strip=True) if snippet_tag else ""
-                    
-                    if title and link:
-                        results.append({
-                            "title": title,
-                            "snippet": snippet,
-                            "url": link
-                        })
-                        
-                except Exception as e:
-                    logger.debug(f"결과 파싱 오류: {e}")
-                    continue
-            
-            logger.info(f"검색 결과 {len(results)}개 발견")
-            return results
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"검색 요청 오류: {e}")
-            # Fallback: 모의 데이터
-            return self._get_fallback_results(query)
-        except Exception as e:
-            logger.error(f"검색 처리 오류: {e}")
-            return self._get_fallback_results(query)
+            # 결과가 없는 응답(차단 페이지 등)은 캐시하지 않음
+            return self.cache.get_or_load(
+                "results", key, lambda: self.fanout.search(query, self.max_results, providers), cacheable=bool
+            )
+        except SearchProviderError as e:
+            logger.error(f"검색 실패: {e}")
+            raise
     
-    def _get_fallback_results(self, query: str) -> List[Dict[str, str]]:
+    async def asearch(self, query: str, providers: List[str] = None) -> List[Dict[str, str]]:
         """
-        Fallback 검색 결과 (네트워크 오류 시)
+        웹 검색 비동기 실행 (이벤트 루프를 막지 않음)
         
         Args:
             query: 검색어
+            providers: 질의할 검색 제공자 이름
         
         Returns:
-            모의 검색 결과
+            검색 결과 리스트 (search()와 동일)
         """
-        logger.warning("Fallback 검색 결과 사용")
-        return [
-            {
-                "title": f"{query} 관련 정보",
-                "snippet": f"{query}에 대한 정보를 찾을 수 없습니다. 인터넷 연결을 확인해주세요.",
-                "url": "https://duckduckgo.com/?q=" + query.replace(" ", "+")
-            }
-        ]
+        return await asyncio.to_thread(self.search, query, providers)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """웹 검색 통계 (검색어 생성 LLM 호출 비율, HTTP 연결 재사용, 단계별 캐시 적중률, 제공자별 지연 시간/실패율, 파싱 프로세스 풀)"""
+        return {
+            "query": self.get_query_stats(),
+            "http": self.http_client.get_stats(),
+            "cache": self.cache.get_stats(),
+            "providers": self.fanout.get_stats(),
+            "pages": self.page_fetcher.get_stats(),
+            "parse_pool": self.page_fetcher.parse_pool.get_stats()
+        }
+    
+    def deep_passages(self, results: List[Dict[str, str]], query: str) -> List[Dict[str, str]]:
+        """
+        상위 검색 결과 페이지 본문에서 질문과 관련된 구절 찾기
+        
+        Args:
+            results: 검색 결과 리스트
+            query: 질문 또는 검색어
+        
+        Returns:
+            [{"url", "title", "text"}] 관련도 내림차순
+        """
+        pages = self.page_fetcher.fetch_many(results[:config.deep_search_pages])
+        passages = rank_passages(pages, query, top_k=config.deep_search_passages)
+        logger.info(f"본문 구절 {len(passages)}개 선택 (페이지 {len(pages)}/{min(len(results), config.deep_search_pages)}개)")
+        return passages
     
-    def summarize_results(self, results: List[Dict[str, str]], original_query: str) -> str:
+    def summarize_results(self, results: List[Dict[str, str]], original_query: str, deep: bool = None) -> str:
         """
         검색 결과 요약 및 정보 추출
         
         Args:
             results: 검색 결과 리스트
-            original_query: 원본 검색어
+            original_query: 사용자 질문
+            deep: 상위 페이지 본문 구절도 함께 요약할지 여부 (None이면 DEEP_SEARCH 설정)
         
         Returns:
             요약된 텍스트
         """
+        return self.answer_from_results(results, original_query, deep)["text"]
+    
+    def answer_from_results(
+        self,
+        results: List[Dict[str, str]],
+        original_query: str,
+        deep: bool = None,
+        search_query: str = None
+    ) -> Dict[str, Any]:
+        """
+        검색 결과로 질문에 대한 답변 작성
+        
+        Args:
+            results: 검색 결과 리스트
+            original_query: 사용자 질문 (답변 대상)
+            deep: 상위 페이지 본문 구절도 함께 요약할지 여부 (None이면 DEEP_SEARCH 설정)
+            search_query: 결과를 찾은 검색어 (본문 구절 선택과 캐시 키에 사용, None이면 질문과 같음)
+        
+        Returns:
+            {
+                "text": 답변 (요약 실패 시 검색 결과 목록),
+                "is_answer": 사용자에게 그대로 보낼 수 있는 LLM 답변인지 여부
+            }
+        """
         if not results:
-            return "검색 결과가 없습니다."
+            return {"text": "검색 결과가 없습니다.", "is_answer": False}
+        deep = config.deep_search if deep is None else deep
         
         # 검색 결과를 텍스트로 변환
         results_text = ""
         for i, res in enumerate(results[:5]):
             results_text += f"{i+1}. {res['title']}\n   {res['snippet']}\n   출처: {res['url']}\n\n"
         
-        # LLM을 사용하여 정보 추출 및 요약
-        prompt = f"""다음 검색 결과를 바탕으로 '{original_query}'에 대한 답변을 작성해주세요.
-
-검색 결과:
-{results_text}
+        def summarize() -> str:
+            context = results_text
+            if deep:
+                passages = self.deep_passages(results, search_query or original_query)
+                if passages:
+                    context += "본문 발췌:\n" + "".join(
+                        f"- {passage['text']}\n  출처: {passage['url']}\n" for passage in passages
+                    )
+            
+            # LLM을 사용하여 정보 추출 및 요약 (고정 지침을 앞에, 검색 결과를 뒤에 배치)
+            prompt = f"""아래 검색 결과를 바탕으로 질문에 대한 답변을 작성해주세요.
 
 ## 요구사항
 1. 검색 결과에서 핵심 정보를 추출하세요
@@ -182,15 +267,32 @@ class WebSearch:
 3. 출처를 명시하세요
 4. 정보가 불충분하면 그 사실을 명시하세요
 
+질문: {original_query}
+
+검색 결과:
+{context}
 답변:"""
+            return self.openai_client.simple_query(
+                system_prompt="당신은 웹 검색 결과를 분석하여 필요한 정보만 추출하는 전문가입니다.",
+                user_message=prompt,
+                call_site="web_summary"
+            )
+        
+        # 같은 질문이라도 검색어(상대 날짜를 푼 날짜 등)나 검색 결과(출처)가 바뀌면 요약을 새로 만듦
+        sources = hashlib.sha1("\n".join(res['url'] for res in results[:5]).encode("utf-8")).hexdigest()[:12]
+        key = normalize_query(original_query)
+        if search_query and normalize_query(search_query) != key:
+            key += f"|{normalize_query(search_query)}"
         
         try:
-            summary = self.openai_client.simple_query(
-                system_prompt="당신은 웹 검색 결과를 분석하여 필요한 정보만 추출하는 전문가입니다.",
-                user_message=prompt
+            summary = self.cache.get_or_load(
+                "summary",
+                f"{key}#{sources}{'+deep' if deep else ''}",
+                summarize,
+                cacheable=bool
             )
             logger.info("검색 결과 요약 완료")
-            return summary
+            return {"text": summary, "is_answer": True}
         except Exception as e:
             logger.error(f"결과 요약 오류: {e}")
-            return results_text
+            return {"text": results_text, "is_answer": False}
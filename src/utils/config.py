@@ -25,6 +25,35 @@ class Config:
         # OpenAI 설정
         self.openai_api_key = os.getenv("OPENAI_API_KEY", "")
         self.openai_model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        self.openai_base_url = os.getenv("OPENAI_BASE_URL", "")
+        self.openai_organization = os.getenv("OPENAI_ORGANIZATION", "")
+        
+        # OpenAI 호환 엔드포인트 레지스트리 (로컬 vLLM/llama.cpp 서버 등)
+        self.llm_endpoints = self._parse_llm_endpoints()
+        self.llm_health_interval = float(os.getenv("LLM_HEALTH_INTERVAL", "30"))
+        
+        # Hedged 요청 설정 (호출 지점별 활성화는 모델 라우팅의 hedge 옵션)
+        self.llm_hedge_percentile = float(os.getenv("LLM_HEDGE_PERCENTILE", "90"))
+        self.llm_hedge_budget = float(os.getenv("LLM_HEDGE_BUDGET", "0.1"))
+        self.llm_hedge_min_samples = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+        self.llm_hedge_window = int(os.getenv("LLM_HEDGE_WINDOW", "200"))
+        self.llm_hedge_workers = int(os.getenv("LLM_HEDGE_WORKERS", "8"))
+        
+        # 사용 불가로 확인된 모델을 후보에서 빼 두는 시간 (초, 지나면 다시 시도)
+        self.llm_unavailable_ttl = float(os.getenv("LLM_UNAVAILABLE_TTL", "600"))
+        
+        # 호출 지점별 모델 라우팅 설정
+        self.model_routes = self._parse_model_routes()
+        self.model_profile = os.getenv("MODEL_PROFILE", "")
+        
+        # LLM 백엔드 설정 (openai/record/replay)
+        self.llm_backend = os.getenv("LLM_BACKEND", "openai")
+        self.llm_cassette = os.getenv("LLM_CASSETTE", "data/llm_cassette.jsonl")
+        replay_latency = os.getenv("LLM_REPLAY_LATENCY", "recorded")
+        self.llm_replay_latency = replay_latency if replay_latency == "recorded" else float(replay_latency)
+        self.llm_replay_jitter = float(os.getenv("LLM_REPLAY_JITTER", "0"))
+        self.llm_replay_seed = int(os.getenv("LLM_REPLAY_SEED", "0"))
+        self.llm_replay_strict = os.getenv("LLM_REPLAY_STRICT", "true").lower() == "true"
         
         # MCP 서버 설정
         self.mcp_servers = self._parse_mcp_servers()
@@ -34,6 +63,109 @@ class Config:
         
         # 메모리 설정
         self.memory_file = os.getenv("MEMORY_FILE", "data/memory.json")
+        
+        # 세션 대화 창 상한 (개수/바이트) 및 창 밖으로 밀려난 메시지 아카이브
+        self.session_max_messages = int(os.getenv("SESSION_MAX_MESSAGES", "50"))
+        self.session_max_bytes = int(os.getenv("SESSION_MAX_BYTES", "65536"))
+        self.session_archive_dir = os.getenv("SESSION_ARCHIVE_DIR", "data/archive")
+        self.session_archive_segment_bytes = int(os.getenv("SESSION_ARCHIVE_SEGMENT_BYTES", "1048576"))
+        
+        # 누적 대화 요약: 최근 N개 메시지만 원문으로 유지하고 나머지는 요약에 반영
+        self.session_summary_enabled = os.getenv("SESSION_SUMMARY", "true").lower() == "true"
+        self.session_verbatim_messages = int(os.getenv("SESSION_VERBATIM_MESSAGES", "6"))
+        self.session_summary_batch = int(os.getenv("SESSION_SUMMARY_BATCH", "2"))
+        self.session_summary_max_chars = int(os.getenv("SESSION_SUMMARY_MAX_CHARS", "600"))
+        self.session_context_tokens = int(os.getenv("SESSION_CONTEXT_TOKENS", "1500"))
+        
+        # 아카이브 recall: 현재 요청과 관련된 과거 메시지를 컨텍스트에 추가
+        self.session_recall_top_k = int(os.getenv("SESSION_RECALL_TOP_K", "3"))
+        self.session_recall_min_score = float(os.getenv("SESSION_RECALL_MIN_SCORE", "0.15"))
+        
+        # 사용자/세션 네임스페이스 캐시 상한 (LRU)
+        self.memory_max_users = int(os.getenv("MEMORY_MAX_USERS", "256"))
+        self.memory_max_sessions_per_user = int(os.getenv("MEMORY_MAX_SESSIONS_PER_USER", "8"))
+        
+        # 메모리 스텝에서 프롬프트에 넣을 관련 장기 메모리 수
+        self.memory_top_k = int(os.getenv("MEMORY_TOP_K", "5"))
+        
+        # 장기 메모리 네임스페이스별 상한 (항목 수/바이트), 기본 TTL, 초과 시 제거 정책
+        self.memory_max_facts = int(os.getenv("MEMORY_MAX_FACTS", "200"))
+        self.memory_max_bytes = int(os.getenv("MEMORY_MAX_BYTES", "32768"))
+        self.memory_default_ttl_days = float(os.getenv("MEMORY_DEFAULT_TTL_DAYS", "0"))
+        self.memory_eviction_policy = os.getenv("MEMORY_EVICTION_POLICY", "lru").lower()
+        if self.memory_eviction_policy not in ("lru", "lfu"):
+            print(f"⚠️  경고: MEMORY_EVICTION_POLICY '{self.memory_eviction_policy}'는 지원하지 않습니다. lru를 사용합니다.")
+            self.memory_eviction_policy = "lru"
+        # 조회 통계는 모아서 기록하고, N번 저장마다 비슷한 키 병합(compaction) 실행
+        self.memory_hit_flush_every = int(os.getenv("MEMORY_HIT_FLUSH_EVERY", "10"))
+        self.memory_compact_every = int(os.getenv("MEMORY_COMPACT_EVERY", "50"))
+        self.memory_compact_similarity = float(os.getenv("MEMORY_COMPACT_SIMILARITY", "0.8"))
+        
+        # 웹 검색 HTTP 클라이언트: 연결/읽기 타임아웃(초), 응답 본문 상한, 호스트별 연결 풀 크기
+        self.http_connect_timeout = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+        self.http_read_timeout = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+        self.http_max_response_bytes = int(os.getenv("HTTP_MAX_RESPONSE_BYTES", "2097152"))
+        self.http_pool_size = int(os.getenv("HTTP_POOL_SIZE", "10"))
+        
+        # 웹 검색 캐시: 단계별 유효 시간(초), 만료 후 이전 값을 반환하며 갱신하는 시간(초), 저장 파일
+        self.search_cache_file = os.getenv("SEARCH_CACHE_FILE", "data/search_cache.json")
+        self.search_result_ttl = float(os.getenv("SEARCH_RESULT_TTL", "1800"))
+        self.search_summary_ttl = float(os.getenv("SEARCH_SUMMARY_TTL", "600"))
+        self.search_stale_ttl = float(os.getenv("SEARCH_STALE_TTL", "3600"))
+        self.search_cache_max_entries = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2000"))
+        
+        # 검색 제공자: 사용할 제공자(앞쪽 우선), 동시 질의 수, 전체 마감 시간(초), 첫 유효 응답 후 유예 시간(초)
+        self.search_providers = [
+            name.strip() for name in os.getenv("SEARCH_PROVIDERS", "duckduckgo_html,duckduckgo_lite,wikipedia").split(",")
+            if name.strip()
+        ]
+        self.search_fanout = int(os.getenv("SEARCH_FANOUT", "2"))
+        self.search_deadline = float(os.getenv("SEARCH_DEADLINE", "4.0"))
+        self.search_grace = float(os.getenv("SEARCH_GRACE", "0.3"))
+        self.searxng_url = os.getenv("SEARXNG_URL", "")
+        self.wikipedia_lang = os.getenv("WIKIPEDIA_LANG", "ko")
+        self.search_local_file = os.getenv("SEARCH_LOCAL_FILE", "")
+        # 1차 제공자: 먼저 질의해 결과가 N개 이상이면 웹 제공자를 질의하지 않음 (요청에서 제공자를 지정하면 무시)
+        self.search_first_tier = [
+            name.strip() for name in os.getenv("SEARCH_FIRST_TIER", "").split(",")
+            if name.strip()
+        ]
+        self.search_first_tier_min_results = int(os.getenv("SEARCH_FIRST_TIER_MIN_RESULTS", "1"))
+        
+        # 자체 문서 색인(docs 제공자): 색인 디렉토리, 원본 HTML/Markdown 디렉토리(처음 열 때 동기화),
+        # 결과 URL 접두, 병합 전 최대 세그먼트 수, 결과로 낼 최소 정규화 BM25 점수(0~1)
+        self.docs_index_dir = os.getenv("DOCS_INDEX_DIR", "data/docs_index")
+        self.docs_source_dir = os.getenv("DOCS_SOURCE_DIR", "")
+        self.docs_base_url = os.getenv("DOCS_BASE_URL", "")
+        self.docs_index_max_segments = int(os.getenv("DOCS_INDEX_MAX_SEGMENTS", "8"))
+        self.docs_min_score = float(os.getenv("DOCS_MIN_SCORE", "0.1"))
+        
+        # 검색 제공자 보호: 회로 차단기(연속 실패 수, 대기 시간(초), 최대 대기 시간(초))와
+        # 제공자별 요청 속도 제한(초당 요청 수, 버스트, 토큰을 기다릴 최대 시간(초))
+        self.search_breaker_failures = int(os.getenv("SEARCH_BREAKER_FAILURES", "3"))
+        self.search_breaker_cooldown = float(os.getenv("SEARCH_BREAKER_COOLDOWN", "30"))
+        self.search_breaker_max_cooldown = float(os.getenv("SEARCH_BREAKER_MAX_COOLDOWN", "600"))
+        self.search_rate_limit = float(os.getenv("SEARCH_RATE_LIMIT", "2.0"))
+        self.search_rate_burst = int(os.getenv("SEARCH_RATE_BURST", "5"))
+        self.search_rate_max_wait = float(os.getenv("SEARCH_RATE_MAX_WAIT", "0.5"))
+        
+        # 심층 검색: 상위 N개 페이지 본문을 동시에 가져와 관련 구절을 요약 프롬프트에 추가
+        self.deep_search = os.getenv("DEEP_SEARCH", "false").lower() == "true"
+        self.deep_search_pages = int(os.getenv("DEEP_SEARCH_PAGES", "3"))
+        self.deep_search_page_bytes = int(os.getenv("DEEP_SEARCH_PAGE_BYTES", "524288"))
+        self.deep_search_page_timeout = float(os.getenv("DEEP_SEARCH_PAGE_TIMEOUT", "3.0"))
+        self.deep_search_passages = int(os.getenv("DEEP_SEARCH_PASSAGES", "6"))
+        self.deep_search_cache_ttl = float(os.getenv("DEEP_SEARCH_CACHE_TTL", "600"))
+        
+        # 파싱 프로세스 풀: 작업 프로세스 수(0이면 요청 스레드에서 파싱), 작업당 시간 제한(초), 프로세스로 보낼 최소 크기(바이트)
+        self.parse_pool_workers = int(os.getenv("PARSE_POOL_WORKERS", "2"))
+        self.parse_pool_timeout = float(os.getenv("PARSE_POOL_TIMEOUT", "2.0"))
+        self.parse_pool_min_bytes = int(os.getenv("PARSE_POOL_MIN_BYTES", "65536"))
+        
+        # 로컬 검색어 생성: 상대 날짜 변환/군더더기 제거/개체 사전, 신뢰도가 기준 미만일 때만 LLM 사용
+        self.query_builder = os.getenv("QUERY_BUILDER", "true").lower() == "true"
+        self.query_builder_min_confidence = float(os.getenv("QUERY_BUILDER_MIN_CONFIDENCE", "0.6"))
+        self.query_gazetteer_file = os.getenv("QUERY_GAZETTEER_FILE", "")
     
     def _parse_mcp_servers(self) -> Dict[str, Dict[str, str]]:
         """
@@ -75,6 +207,267 @@ class Config:
         # 설정 없음
         return {}
     
+    def _parse_model_routes(self) -> Dict[str, Any]:
+        """
+        모델 라우팅 설정 파싱
+        
+        우선순위:
+        1. model_routes.json 파일
+        2. MODEL_ROUTES 환경변수 (JSON 문자열)
+        
+        Returns:
+            라우팅 설정 딕셔너리
+            {
+                "routes": {
+                    "call_site": {
+                        "model": "모델 이름",
+                        "temperature": 0.0,
+                        "max_tokens": 300,
+                        "fallbacks": ["대체 모델"]
+                    }
+                },
+                "profiles": {
+                    "profile_name": {"call_site": {...}}
+                }
+            }
+        """
+        json_file = "model_routes.json"
+        if os.path.exists(json_file):
+            try:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    routes = json.load(f)
+                    return self._validate_model_routes(routes, source="model_routes.json")
+            except json.JSONDecodeError as e:
+                print(f"⚠️  경고: {json_file} 파싱 오류: {e}")
+            except Exception as e:
+                print(f"⚠️  경고: {json_file} 읽기 오류: {e}")
+        
+        model_routes_str = os.getenv("MODEL_ROUTES", "")
+        if model_routes_str:
+            try:
+                routes = json.loads(model_routes_str)
+                return self._validate_model_routes(routes, source="환경변수")
+            except json.JSONDecodeError as e:
+                print(f"⚠️  경고: MODEL_ROUTES 환경변수 파싱 오류: {e}")
+        
+        return {"routes": {}, "profiles": {}}
+    
+    def _validate_model_routes(self, routes: Any, source: str) -> Dict[str, Any]:
+        """
+        모델 라우팅 설정 유효성 검증
+        
+        Args:
+            routes: 라우팅 설정
+            source: 설정 출처 (로깅용)
+        
+        Returns:
+            검증된 라우팅 설정
+        """
+        if not isinstance(routes, dict):
+            print(f"⚠️  경고: {source}의 모델 라우팅 설정이 올바른 딕셔너리 형식이 아닙니다.")
+            return {"routes": {}, "profiles": {}}
+        
+        def validate_table(table: Any, label: str) -> Dict[str, Dict[str, Any]]:
+            validated = {}
+            if not isinstance(table, dict):
+                print(f"⚠️  경고: {label} 설정이 올바르지 않습니다.")
+                return validated
+            
+            for site, route in table.items():
+                if not isinstance(route, dict):
+                    print(f"⚠️  경고: 호출 지점 '{site}'의 라우팅 설정이 올바르지 않습니다.")
+                    continue
+                
+                # 값 하나가 잘못되어도 설정 로드 전체가 실패하지 않도록 해당 호출 지점만 건너뜀
+                try:
+                    validated_route = {}
+                    if route.get("model"):
+                        validated_route["model"] = str(route["model"])
+                    if route.get("temperature") is not None:
+                        validated_route["temperature"] = float(route["temperature"])
+                    if route.get("max_tokens") is not None:
+                        validated_route["max_tokens"] = int(route["max_tokens"])
+                    if "endpoints" in route:
+                        endpoints = route["endpoints"]
+                        if isinstance(endpoints, str):
+                            endpoints = [endpoints]
+                        validated_route["endpoints"] = [str(e) for e in endpoints]
+                    if "hedge" in route:
+                        validated_route["hedge"] = bool(route["hedge"])
+                    if route.get("hedge_budget") is not None:
+                        validated_route["hedge_budget"] = float(route["hedge_budget"])
+                    if "hedge_endpoints" in route:
+                        hedge_endpoints = route["hedge_endpoints"]
+                        if isinstance(hedge_endpoints, str):
+                            hedge_endpoints = [hedge_endpoints]
+                        validated_route["hedge_endpoints"] = [str(e) for e in hedge_endpoints]
+                    if "fallbacks" in route:
+                        fallbacks = route["fallbacks"]
+                        if isinstance(fallbacks, str):
+                            fallbacks = [fallbacks]
+                        validated_route["fallbacks"] = [str(m) for m in fallbacks]
+                except (ValueError, TypeError) as e:
+                    print(f"⚠️  경고: {label}의 호출 지점 '{site}' 라우팅 설정 값이 올바르지 않아 건너뜁니다: {e}")
+                    continue
+                
+                validated[site] = validated_route
+            return validated
+        
+        validated_routes = {
+            "routes": validate_table(routes.get("routes", {}), "routes"),
+            "profiles": {}
+        }
+        
+        profiles = routes.get("profiles", {})
+        if isinstance(profiles, dict):
+            for name, table in profiles.items():
+                validated_routes["profiles"][name] = validate_table(table, f"프로필 '{name}'")
+        
+        if validated_routes["routes"] or validated_routes["profiles"]:
+            print(f"✓ 모델 라우팅 설정 로드 완료 ({source}):")
+            for site, route in validated_routes["routes"].items():
+                print(f"  - {site}: {route.get('model', self.openai_model)}")
+            if validated_routes["profiles"]:
+                print(f"  - 프로필: {', '.join(validated_routes['profiles'].keys())}")
+        
+        return validated_routes
+    
+    def _parse_llm_endpoints(self) -> Dict[str, Dict[str, Any]]:
+        """
+        OpenAI 호환 엔드포인트 설정 파싱
+        
+        우선순위:
+        1. llm_endpoints.json 파일
+        2. LLM_ENDPOINTS 환경변수 (JSON 문자열)
+        3. OPENAI_API_KEY / OPENAI_BASE_URL 로 구성한 단일 엔드포인트
+        
+        Returns:
+            엔드포인트 딕셔너리
+            {
+                "endpoint_name": {
+                    "base_url": "http://127.0.0.1:8080/v1" 또는 None,
+                    "api_key": "API 키",
+                    "organization": "조직 ID" 또는 None,
+                    "weight": 1.0,
+                    "timeout": 60.0,
+                    "max_retries": 2,
+                    "models": ["제공 모델"] (비어 있으면 모든 모델)
+                }
+            }
+        """
+        json_file = "llm_endpoints.json"
+        if os.path.exists(json_file):
+            try:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    endpoints = json.load(f)
+                    validated = self._validate_llm_endpoints(endpoints, source="llm_endpoints.json")
+                    if validated:
+                        return validated
+            except json.JSONDecodeError as e:
+                print(f"⚠️  경고: {json_file} 파싱 오류: {e}")
+            except Exception as e:
+                print(f"⚠️  경고: {json_file} 읽기 오류: {e}")
+        
+        endpoints_str = os.getenv("LLM_ENDPOINTS", "")
+        if endpoints_str:
+            try:
+                endpoints = json.loads(endpoints_str)
+                validated = self._validate_llm_endpoints(endpoints, source="환경변수")
+                if validated:
+                    return validated
+            except json.JSONDecodeError as e:
+                print(f"⚠️  경고: LLM_ENDPOINTS 환경변수 파싱 오류: {e}")
+        
+        # 기본: 단일 OpenAI 엔드포인트
+        return {
+            "openai": {
+                "base_url": self.openai_base_url or None,
+                "api_key": self.openai_api_key,
+                "organization": self.openai_organization or None,
+                "weight": 1.0,
+                "timeout": 60.0,
+                "max_retries": 2,
+                "models": []
+            }
+        }
+    
+    def _validate_llm_endpoints(self, endpoints: Any, source: str) -> Dict[str, Dict[str, Any]]:
+        """
+        OpenAI 호환 엔드포인트 설정 유효성 검증
+        
+        Args:
+            endpoints: 엔드포인트 설정
+            source: 설정 출처 (로깅용)
+        
+        Returns:
+            검증된 엔드포인트 딕셔너리
+        """
+        if not isinstance(endpoints, dict):
+            print(f"⚠️  경고: {source}의 LLM 엔드포인트 설정이 올바른 딕셔너리 형식이 아닙니다.")
+            return {}
+        
+        validated_endpoints = {}
+        for name, endpoint in endpoints.items():
+            if not isinstance(endpoint, dict):
+                print(f"⚠️  경고: LLM 엔드포인트 '{name}'의 설정이 올바르지 않습니다.")
+                continue
+            
+            base_url = endpoint.get("base_url") or None
+            
+            # API 키: 직접 지정 > 지정한 환경변수 > OPENAI_API_KEY
+            api_key = endpoint.get("api_key")
+            if not api_key:
+                api_key = os.getenv(endpoint.get("api_key_env", "OPENAI_API_KEY"), "")
+            if not api_key and base_url:
+                # 로컬 추론 서버는 대부분 키를 검사하지 않음
+                api_key = "EMPTY"
+            
+            models = endpoint.get("models", [])
+            if isinstance(models, str):
+                models = [models]
+            
+            # 값 하나가 잘못되어도 설정 로드 전체가 실패하지 않도록 해당 엔드포인트만 건너뜀
+            try:
+                validated_endpoints[name] = {
+                    "base_url": base_url,
+                    "api_key": api_key,
+                    "organization": endpoint.get("organization") or None,
+                    "weight": float(endpoint.get("weight", 1.0)),
+                    "timeout": float(endpoint.get("timeout", 60.0)),
+                    "max_retries": int(endpoint.get("max_retries", 2)),
+                    "models": [str(m) for m in models]
+                }
+            except (ValueError, TypeError) as e:
+                print(f"⚠️  경고: LLM 엔드포인트 '{name}'의 설정 값이 올바르지 않아 건너뜁니다: {e}")
+                continue
+        
+        if validated_endpoints:
+            print(f"✓ LLM 엔드포인트 설정 로드 완료 ({source}):")
+            for name, cfg in validated_endpoints.items():
+                print(f"  - {name}: {cfg['base_url'] or 'OpenAI'} (weight={cfg['weight']})")
+        
+        return validated_endpoints
+    
+    def get_model_route(self, call_site: str, profile: str = None) -> Dict[str, Any]:
+        """
+        호출 지점의 모델 라우팅 설정 가져오기
+        
+        Args:
+            call_site: 호출 지점 이름 (예: intent, synthesis)
+            profile: 라우팅 프로필 이름 (None이면 MODEL_PROFILE 사용)
+        
+        Returns:
+            라우팅 설정 딕셔너리 (설정이 없으면 빈 딕셔너리)
+        """
+        if profile is None:
+            profile = self.model_profile
+        
+        route = dict(self.model_routes["routes"].get(call_site, {}))
+        if profile:
+            override = self.model_routes["profiles"].get(profile, {}).get(call_site, {})
+            route.update(override)
+        return route
+    
     def _validate_mcp_servers(self, servers: Any, source: str) -> Dict[str, Dict[str, str]]:
         """
         MCP 서버 설정 유효성 검증
@@ -167,9 +560,16 @@ class Config:
         """
         is_valid = True
         
-        if not self.openai_api_key or self.openai_api_key == "your_openai_api_key_here":
-            print("❌ OPENAI_API_KEY가 설정되지 않았습니다.")
-            is_valid = False
+        # 재생 모드는 API 키 없이 동작, 로컬 엔드포인트는 자체 키 사용
+        if self.llm_backend.lower() != "replay":
+            for name, endpoint in self.llm_endpoints.items():
+                api_key = endpoint["api_key"]
+                if not api_key or api_key == "your_openai_api_key_here":
+                    if name == "openai":
+                        print("❌ OPENAI_API_KEY가 설정되지 않았습니다.")
+                    else:
+                        print(f"❌ LLM 엔드포인트 '{name}'의 API 키가 설정되지 않았습니다.")
+                    is_valid = False
         
         if not self.openai_model:
             print("❌ OPENAI_MODEL이 설정되지 않았습니다.")
@@ -182,6 +582,10 @@ class Config:
         return (
             f"Config(\n"
             f"  openai_model={self.openai_model},\n"
+            f"  model_routes={list(self.model_routes['routes'].keys())},\n"
+            f"  model_profile={self.model_profile or None},\n"
+            f"  llm_backend={self.llm_backend},\n"
+            f"  llm_endpoints={list(self.llm_endpoints.keys())},\n"
             f"  mcp_servers={list(self.mcp_servers.keys())},\n"
             f"  log_level={self.log_level},\n"
             f"  memory_file={self.memory_file}\n"
@@ -0,0 +1,564 @@
+"""
+LLM Backends
+
+OpenAIClient가 사용하는 Chat completion 백엔드입니다.
+실제 API 호출(여러 OpenAI 호환 엔드포인트 간 부하 분산/장애 조치) 외에
+요청/응답 기록(record), 기록 재생(replay), 단위 테스트용 스크립트 응답(scripted)
+백엔드를 제공합니다.
+
+모든 백엔드는 chat.completions.create()와 같은 키워드 인자를 받아
+다음 형식의 딕셔너리를 반환합니다.
+    {
+        "content": str,
+        "model": str,
+        "usage": {"prompt_tokens": int, "completion_tokens": int, "cached_tokens": int}
+    }
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, Union
+
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+from src.utils.config import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger("llm_backends")
+
+
+class CassetteMissError(Exception):
+    """재생할 기록이 없는 요청"""
+
+
+class NoEndpointAvailableError(Exception):
+    """요청한 모델을 처리할 수 있는 정상 엔드포인트가 없음"""
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """
+    요청 식별 키 생성 (기록/재생 매칭용)
+
+    Args:
+        request: chat completion 요청 인자
+
+    Returns:
+        요청 내용의 SHA-256 해시
+    """
+    canonical = {
+        "model": request.get("model"),
+        "messages": request.get("messages"),
+        "temperature": request.get("temperature"),
+        "max_tokens": request.get("max_tokens"),
+        "response_format": request.get("response_format"),
+    }
+    payload = json.dumps(canonical, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def empty_usage() -> Dict[str, int]:
+    """빈 토큰 사용량"""
+    return {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+
+
+class LLMBackend:
+    """Chat completion 백엔드 기본 클래스"""
+
+    name = "base"
+
+    def create(self, **kwargs) -> Dict[str, Any]:
+        """
+        Chat completion 실행
+
+        Args:
+            **kwargs: chat.completions.create 인자 (model, messages, temperature, ...)
+                      endpoints: 선호 엔드포인트 이름 목록 (엔드포인트 풀에서만 사용)
+
+        Returns:
+            정규화된 응답 딕셔너리
+        """
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        """백엔드 통계 반환"""
+        return {}
+
+
+class OpenAIBackend(LLMBackend):
+    """단일 OpenAI 호환 엔드포인트 백엔드"""
+
+    name = "openai"
+
+    def __init__(
+        self,
+        api_key: str = None,
+        base_url: str = None,
+        organization: str = None,
+        timeout: float = 60.0,
+        max_retries: int = 2
+    ):
+        """
+        초기화
+
+        Args:
+            api_key: API 키 (None이면 OPENAI_API_KEY 사용)
+            base_url: API 주소 (None이면 OpenAI 기본 주소, 로컬 서버는 http://host:port/v1)
+            organization: OpenAI 조직 ID
+            timeout: 요청 타임아웃 (초)
+            max_retries: SDK 내부 재시도 횟수
+        """
+        from openai import OpenAI
+
+        self.base_url = base_url
+        self.client = OpenAI(
+            api_key=api_key or config.openai_api_key,
+            base_url=base_url,
+            organization=organization,
+            timeout=timeout,
+            max_retries=max_retries
+        )
+
+    def create(self, **kwargs) -> Dict[str, Any]:
+        """OpenAI API 호출"""
+        kwargs.pop("endpoints", None)
+        response = self.client.chat.completions.create(**kwargs)
+
+        usage = getattr(response, "usage", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+
+        return {
+            "content": response.choices[0].message.content,
+            "model": getattr(response, "model", kwargs.get("model")),
+            "usage": {
+                "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+                "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+                "cached_tokens": getattr(details, "cached_tokens", 0) or 0
+            }
+        }
+
+
+class RecordingBackend(LLMBackend):
+    """다른 백엔드의 요청/응답 쌍을 카세트 파일(JSONL)에 기록하는 백엔드"""
+
+    name = "record"
+
+    def __init__(self, inner: LLMBackend, cassette_path: str):
+        """
+        초기화
+
+        Args:
+            inner: 실제 요청을 처리할 백엔드
+            cassette_path: 기록할 카세트 파일 경로
+        """
+        self.inner = inner
+        self.cassette_path = Path(cassette_path)
+        self.cassette_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        logger.info(f"LLM 요청 기록 모드: {self.cassette_path}")
+
+    def create(self, **kwargs) -> Dict[str, Any]:
+        """요청 실행 후 기록"""
+        start_time = time.perf_counter()
+        response = self.inner.create(**kwargs)
+        latency = time.perf_counter() - start_time
+
+        entry = {
+            "key": request_key(kwargs),
+            "request": kwargs,
+            "response": response,
+            "latency": round(latency, 4)
+        }
+
+        with self._lock:
+            with open(self.cassette_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        """내부 백엔드 통계 반환"""
+        return self.inner.get_stats()
+
+
+class EndpointPool(LLMBackend):
+    """
+    여러 OpenAI 호환 엔드포인트를 묶은 백엔드
+
+    모델을 제공하는 정상 엔드포인트 중 가중치에 따라 무작위로 선택하고,
+    연결 오류/타임아웃/5xx/429 발생 시 다음 엔드포인트로 장애 조치합니다.
+    비정상 엔드포인트는 백그라운드 헬스 체크가 성공하면 다시 사용됩니다.
+    모델을 처리할 다른 엔드포인트가 없으면 비정상 엔드포인트도 마지막 수단으로 시도합니다.
+    """
+
+    name = "openai"
+
+    # 다른 엔드포인트로 넘어갈 오류 (요청 자체의 오류는 그대로 전파)
+    FAILOVER_ERRORS = (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError)
+
+    def __init__(
+        self,
+        endpoints: Dict[str, Dict[str, Any]],
+        health_interval: float = 30.0,
+        retry_after: float = 60.0,
+        seed: int = None
+    ):
+        """
+        초기화
+
+        Args:
+            endpoints: 엔드포인트 설정 (config.llm_endpoints 형식)
+            health_interval: 헬스 체크 주기 (초, 0이면 비활성화)
+            retry_after: 헬스 체크 없이도 비정상 엔드포인트를 다시 시도하기까지의 시간 (초)
+            seed: 가중치 선택 난수 시드
+        """
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.retry_after = retry_after
+        self.health_interval = health_interval
+
+        self.endpoints: Dict[str, Dict[str, Any]] = {}
+        for name, endpoint in endpoints.items():
+            self.endpoints[name] = {
+                "backend": OpenAIBackend(
+                    api_key=endpoint.get("api_key"),
+                    base_url=endpoint.get("base_url"),
+                    organization=endpoint.get("organization"),
+                    timeout=endpoint.get("timeout", 60.0),
+                    max_retries=endpoint.get("max_retries", 2)
+                ),
+                "weight": max(float(endpoint.get("weight", 1.0)), 0.0),
+                "models": set(endpoint.get("models", [])),
+                "healthy": True,
+                "unhealthy_since": None,
+                "requests": 0,
+                "failures": 0,
+                "total_latency": 0.0
+            }
+
+        self._stop_event = threading.Event()
+        self._health_thread = None
+        if health_interval > 0 and len(self.endpoints) > 1:
+            self._health_thread = threading.Thread(target=self._health_loop, daemon=True)
+            self._health_thread.start()
+
+        logger.info(f"LLM 엔드포인트 풀 초기화: {list(self.endpoints.keys())}")
+
+    def _candidates(self, model: str, preferred: Optional[List[str]]) -> List[str]:
+        """
+        요청을 시도할 엔드포인트 순서 결정
+
+        Args:
+            model: 요청 모델
+            preferred: 선호 엔드포인트 이름 목록 (None이면 전체)
+
+        Returns:
+            시도 순서대로 정렬된 엔드포인트 이름 리스트
+        """
+        names = preferred if preferred else list(self.endpoints.keys())
+        now = time.monotonic()
+
+        healthy = []
+        recovering = []
+        cooling = []
+        with self._lock:
+            for name in names:
+                endpoint = self.endpoints.get(name)
+                if endpoint is None:
+                    continue
+                if endpoint["models"] and model not in endpoint["models"]:
+                    continue
+                if endpoint["healthy"]:
+                    # 가중치 기반 무작위 순서 (weight가 클수록 앞에 올 확률이 높음)
+                    weight = endpoint["weight"] or 1e-9
+                    healthy.append((self._random.random() ** (1.0 / weight), name))
+                elif now - endpoint["unhealthy_since"] >= self.retry_after:
+                    recovering.append(name)
+                else:
+                    cooling.append((endpoint["unhealthy_since"], name))
+
+            # 풀 전체에 이 모델을 처리할 다른 엔드포인트가 없으면 retry_after 전이라도 오래전에 실패한 것부터 재시도
+            # (엔드포인트가 하나뿐일 때 한 번의 타임아웃으로 retry_after 동안 모든 요청이 거부되지 않도록)
+            if not healthy and not recovering and not any(
+                (endpoint["healthy"] or now - endpoint["unhealthy_since"] >= self.retry_after)
+                and (not endpoint["models"] or model in endpoint["models"])
+                for endpoint in self.endpoints.values()
+            ):
+                return [name for _, name in sorted(cooling)]
+
+        healthy.sort(reverse=True)
+        return [name for _, name in healthy] + recovering
+
+    def _mark(self, name: str, healthy: bool, latency: float = None):
+        """엔드포인트 상태 갱신"""
+        with self._lock:
+            endpoint = self.endpoints[name]
+            if healthy:
+                if not endpoint["healthy"]:
+                    logger.info(f"LLM 엔드포인트 복구: {name}")
+                endpoint["healthy"] = True
+                endpoint["unhealthy_since"] = None
+                if latency is not None:
+                    endpoint["requests"] += 1
+                    endpoint["total_latency"] += latency
+            else:
+                endpoint["failures"] += 1
+                if endpoint["healthy"]:
+                    logger.warning(f"LLM 엔드포인트 비정상 처리: {name}")
+                endpoint["healthy"] = False
+                endpoint["unhealthy_since"] = time.monotonic()
+
+    def create(self, **kwargs) -> Dict[str, Any]:
+        """엔드포인트를 선택하여 요청 (실패 시 다음 엔드포인트로 장애 조치)"""
+        preferred = kwargs.pop("endpoints", None)
+        model = kwargs.get("model")
+
+        candidates = self._candidates(model, preferred)
+        if not candidates:
+            raise NoEndpointAvailableError(f"모델 '{model}'을 처리할 정상 엔드포인트가 없습니다.")
+
+        last_error = None
+        for name in candidates:
+            endpoint = self.endpoints[name]
+            start_time = time.perf_counter()
+            try:
+                response = endpoint["backend"].create(**kwargs)
+            except self.FAILOVER_ERRORS as e:
+                logger.warning(f"LLM 엔드포인트 '{name}' 요청 실패, 다음 엔드포인트 시도: {e}")
+                self._mark(name, healthy=False)
+                last_error = e
+                continue
+
+            self._mark(name, healthy=True, latency=time.perf_counter() - start_time)
+            response["endpoint"] = name
+            return response
+
+        raise NoEndpointAvailableError(f"모든 엔드포인트 요청 실패 (모델: {model}): {last_error}")
+
+    def check_health(self, name: str) -> bool:
+        """
+        엔드포인트 헬스 체크 (모델 목록 조회)
+
+        Args:
+            name: 엔드포인트 이름
+
+        Returns:
+            정상 여부
+        """
+        backend = self.endpoints[name]["backend"]
+        try:
+            backend.client.with_options(timeout=5.0, max_retries=0).models.list()
+        except Exception as e:
+            logger.debug(f"LLM 엔드포인트 헬스 체크 실패 ({name}): {e}")
+            self._mark(name, healthy=False)
+            return False
+
+        self._mark(name, healthy=True)
+        return True
+
+    def _health_loop(self):
+        """비정상 엔드포인트와 로컬 엔드포인트를 주기적으로 점검"""
+        while not self._stop_event.wait(self.health_interval):
+            for name, endpoint in list(self.endpoints.items()):
+                if not endpoint["healthy"] or endpoint["backend"].base_url:
+                    self.check_health(name)
+
+    def close(self):
+        """헬스 체크 스레드 종료"""
+        self._stop_event.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """엔드포인트별 상태 및 통계 반환"""
+        with self._lock:
+            return {
+                name: {
+                    "healthy": endpoint["healthy"],
+                    "weight": endpoint["weight"],
+                    "requests": endpoint["requests"],
+                    "failures": endpoint["failures"],
+                    "avg_latency": (
+                        endpoint["total_latency"] / endpoint["requests"] if endpoint["requests"] else 0.0
+                    )
+                }
+                for name, endpoint in self.endpoints.items()
+            }
+
+
+class ReplayBackend(LLMBackend):
+    """카세트 파일에 기록된 응답을 재생하는 백엔드 (네트워크 사용 안 함)"""
+
+    name = "replay"
+
+    def __init__(
+        self,
+        cassette_path: str,
+        latency: Union[str, float] = "recorded",
+        jitter: float = 0.0,
+        seed: int = 0,
+        strict: bool = True
+    ):
+        """
+        초기화
+
+        Args:
+            cassette_path: 카세트 파일 경로
+            latency: 모의 지연 시간 ("recorded"면 기록된 지연 시간, 숫자면 고정 초, 0이면 지연 없음)
+            jitter: 지연 시간에 더할 무작위 편차 (초, ±jitter 범위)
+            seed: 지연 편차 난수 시드 (재현 가능한 벤치마크용)
+            strict: True면 기록에 없는 요청에서 CassetteMissError 발생,
+                    False면 같은 모델의 기록을 순서대로 재사용
+        """
+        self.cassette_path = Path(cassette_path)
+        self.latency = latency
+        self.jitter = jitter
+        self.strict = strict
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._all_entries: List[Dict[str, Any]] = []
+        self._load()
+
+    def _load(self):
+        """카세트 파일 로드"""
+        if not self.cassette_path.exists():
+            logger.warning(f"카세트 파일이 없습니다: {self.cassette_path}")
+            return
+
+        with open(self.cassette_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                self._entries.setdefault(entry["key"], []).append(entry)
+                self._all_entries.append(entry)
+
+        logger.info(f"LLM 재생 모드: {len(self._all_entries)}개 기록 로드 ({self.cassette_path})")
+
+    def _next_entry(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """요청에 맞는 기록 선택 (같은 요청이 여러 번 기록된 경우 순서대로 순환)"""
+        key = request_key(kwargs)
+
+        with self._lock:
+            candidates = self._entries.get(key)
+            if not candidates:
+                if self.strict or not self._all_entries:
+                    raise CassetteMissError(f"카세트에 기록되지 않은 요청입니다 (key={key[:12]})")
+                key = "__loose__"
+                candidates = self._all_entries
+
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            return candidates[cursor % len(candidates)]
+
+    def _simulated_latency(self, entry: Dict[str, Any]) -> float:
+        """모의 지연 시간 계산"""
+        if self.latency == "recorded":
+            base = float(entry.get("latency", 0.0))
+        else:
+            base = float(self.latency)
+
+        with self._lock:
+            offset = self._random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        return max(0.0, base + offset)
+
+    def create(self, **kwargs) -> Dict[str, Any]:
+        """기록된 응답 재생"""
+        entry = self._next_entry(kwargs)
+
+        delay = self._simulated_latency(entry)
+        if delay > 0:
+            time.sleep(delay)
+
+        return dict(entry["response"])
+
+
+class ScriptedBackend(LLMBackend):
+    """미리 정한 응답을 돌려주는 단위 테스트용 백엔드"""
+
+    name = "scripted"
+
+    def __init__(
+        self,
+        responses: Union[List[Union[str, Dict[str, Any]]], Callable[[Dict[str, Any]], Union[str, Dict[str, Any]]]] = None,
+        default: Optional[str] = None
+    ):
+        """
+        초기화
+
+        Args:
+            responses: 순서대로 반환할 응답 리스트, 또는 요청 인자를 받아 응답을 만드는 함수
+                       응답이 Exception 인스턴스면 그대로 발생시킴
+            default: 응답 리스트가 소진된 뒤 반환할 기본 응답 (None이면 오류)
+        """
+        self.responses = responses if responses is not None else []
+        self.default = default
+        self.calls: List[Dict[str, Any]] = []
+        self._index = 0
+        self._lock = threading.Lock()
+
+    def create(self, **kwargs) -> Dict[str, Any]:
+        """다음 스크립트 응답 반환"""
+        with self._lock:
+            self.calls.append(kwargs)
+
+            if callable(self.responses):
+                response = None
+            elif self._index < len(self.responses):
+                response = self.responses[self._index]
+                self._index += 1
+            elif self.default is not None:
+                response = self.default
+            else:
+                raise CassetteMissError(f"스크립트 응답이 소진되었습니다 ({len(self.calls)}번째 호출)")
+
+        if callable(self.responses):
+            # 응답 함수는 lock 밖에서 호출 (느린 응답을 흉내 내는 함수가 동시 호출을 막지 않도록)
+            response = self.responses(kwargs)
+
+        if isinstance(response, Exception):
+            raise response
+        if isinstance(response, dict):
+            return {
+                "content": response.get("content", ""),
+                "model": response.get("model", kwargs.get("model")),
+                "usage": response.get("usage", empty_usage())
+            }
+        return {"content": str(response), "model": kwargs.get("model"), "usage": empty_usage()}
+
+
+def create_backend(mode: str = None) -> LLMBackend:
+    """
+    설정에 따라 LLM 백엔드 생성
+
+    Args:
+        mode: 백엔드 모드 (openai/record/replay, None이면 LLM_BACKEND 설정 사용)
+
+    Returns:
+        LLMBackend 인스턴스
+    """
+    mode = (mode or config.llm_backend).lower()
+
+    if mode == "record":
+        return RecordingBackend(
+            EndpointPool(config.llm_endpoints, config.llm_health_interval),
+            config.llm_cassette
+        )
+
+    if mode == "replay":
+        return ReplayBackend(
+            config.llm_cassette,
+            latency=config.llm_replay_latency,
+            jitter=config.llm_replay_jitter,
+            seed=config.llm_replay_seed,
+            strict=config.llm_replay_strict
+        )
+
+    if mode != "openai":
+        logger.warning(f"알 수 없는 LLM 백엔드: {mode}, openai 사용")
+    return EndpointPool(config.llm_endpoints, config.llm_health_interval)
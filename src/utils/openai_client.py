@@ -5,10 +5,15 @@ OpenAI API와 통신하는 클라이언트입니다.
 """
 
 import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import Dict, Any, Optional, List
-from openai import OpenAI
+from openai import NotFoundError, PermissionDeniedError, BadRequestError
 from src.utils.config import config
 from src.utils.logger import setup_logger
+from src.utils.llm_backends import LLMBackend, NoEndpointAvailableError, create_backend
 
 logger = setup_logger("openai_client")
 
@@ -16,56 +21,385 @@ logger = setup_logger("openai_client")
 class OpenAIClient:
     """OpenAI API 클라이언트"""
     
-    def __init__(self):
-        """초기화"""
-        self.client = OpenAI(api_key=config.openai_api_key)
+    DEFAULT_TEMPERATURE = 0.7
+    
+    def __init__(self, profile: str = None, backend: LLMBackend = None):
+        """
+        초기화
+        
+        Args:
+            profile: 모델 라우팅 프로필 이름 (None이면 MODEL_PROFILE 사용)
+            backend: Chat completion 백엔드 (None이면 LLM_BACKEND 설정에 따라 생성)
+        """
+        self.backend = backend or create_backend()
         self.model = config.openai_model
-        logger.info(f"OpenAI Client 초기화 완료 (모델: {self.model})")
+        self.profile = profile if profile is not None else config.model_profile
+        
+        # 사용 불가로 확인된 모델 → 다시 시도할 시각 (그때까지는 바로 fallback)
+        self._unavailable_models: Dict[str, float] = {}
+        
+        # 호출 지점별 통계
+        self.call_stats: Dict[str, Dict[str, Any]] = {}
+        self._stats_lock = threading.Lock()
+        
+        # 호출 지점별 최근 지연 시간 (hedging 기준 백분위수 계산용)
+        self._latencies: Dict[str, deque] = {}
+        self._hedge_executor = None
+        self._hedge_executor_lock = threading.Lock()
+        
+        logger.info(
+            f"OpenAI Client 초기화 완료 (모델: {self.model}, 프로필: {self.profile or '기본'}, "
+            f"백엔드: {self.backend.name})"
+        )
+    
+    def set_profile(self, profile: str = ""):
+        """
+        모델 라우팅 프로필 변경
+        
+        Args:
+            profile: 프로필 이름 (빈 문자열이면 기본 라우팅)
+        """
+        if profile and profile not in config.model_routes["profiles"]:
+            logger.warning(f"알 수 없는 라우팅 프로필: {profile}")
+        self.profile = profile
+        logger.info(f"모델 라우팅 프로필 변경: {profile or '기본'}")
+    
+    def resolve_route(self, call_site: str = None) -> Dict[str, Any]:
+        """
+        호출 지점에 적용할 모델 설정 결정
+        
+        Args:
+            call_site: 호출 지점 이름
+        
+        Returns:
+            {"models": [우선순위 순 모델 목록], "temperature": float | None,
+             "max_tokens": int | None, "endpoints": [선호 엔드포인트] | None,
+             "hedge": bool, "hedge_budget": float, "hedge_endpoints": [엔드포인트] | None}
+        """
+        route = config.get_model_route(call_site, self.profile) if call_site else {}
+        
+        models = [route.get("model", self.model)]
+        for fallback in route.get("fallbacks", []) + [self.model]:
+            if fallback not in models:
+                models.append(fallback)
+        
+        return {
+            "models": models,
+            "temperature": route.get("temperature"),
+            "max_tokens": route.get("max_tokens"),
+            "endpoints": route.get("endpoints"),
+            "hedge": route.get("hedge", False),
+            "hedge_budget": route.get("hedge_budget", config.llm_hedge_budget),
+            "hedge_endpoints": route.get("hedge_endpoints")
+        }
     
     def chat_completion(
         self,
         messages: List[Dict[str, str]],
-        temperature: float = 0.7,
+        temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
-        json_mode: bool = False
+        json_mode: bool = False,
+        call_site: Optional[str] = None
     ) -> str:
         """
         Chat completion 요청
         
         Args:
             messages: 메시지 리스트 [{"role": "user", "content": "..."}]
-            temperature: 온도 (0.0-2.0)
-            max_tokens: 최대 토큰 수
+            temperature: 온도 (0.0-2.0, None이면 라우팅 설정 또는 기본값)
+            max_tokens: 최대 토큰 수 (None이면 라우팅 설정)
             json_mode: JSON 모드 활성화
+            call_site: 호출 지점 이름 (모델 라우팅 및 통계용)
         
         Returns:
             응답 텍스트
         """
-        try:
-            kwargs = {
-                "model": self.model,
-                "messages": messages,
-                "temperature": temperature,
+        route = self.resolve_route(call_site)
+        
+        if temperature is None:
+            temperature = route["temperature"]
+        if temperature is None:
+            temperature = self.DEFAULT_TEMPERATURE
+        if max_tokens is None:
+            max_tokens = route["max_tokens"]
+        
+        candidates = [m for m in route["models"] if not self._is_marked_unavailable(m)]
+        if not candidates:
+            # 모든 모델이 사용 불가로 표시된 경우 기본 모델로 재시도
+            candidates = [self.model]
+        
+        last_error = None
+        for index, model in enumerate(candidates):
+            try:
+                kwargs = {
+                    "model": model,
+                    "messages": messages,
+                    "temperature": temperature,
+                }
+                
+                if max_tokens:
+                    kwargs["max_tokens"] = max_tokens
+                
+                if json_mode:
+                    kwargs["response_format"] = {"type": "json_object"}
+                
+                # 라우팅에 지정된 엔드포인트는 기본 모델로 fallback할 때는 적용하지 않음
+                if route["endpoints"] and model == route["models"][0]:
+                    kwargs["endpoints"] = route["endpoints"]
+                
+                logger.debug(f"OpenAI API 호출: {len(messages)} 메시지 (호출 지점: {call_site or '-'}, 모델: {model})")
+                
+                start_time = time.perf_counter()
+                response = self._create(kwargs, call_site, route)
+                latency = time.perf_counter() - start_time
+                
+                content = response["content"]
+                usage = response["usage"]
+                logger.debug(
+                    f"OpenAI API 응답: {len(content)} 문자 ({latency:.2f}s, "
+                    f"프롬프트 토큰 {usage['prompt_tokens']}, 캐시 토큰 {usage['cached_tokens']})"
+                )
+                
+                self._record_call(call_site, model, latency, usage, fallback=model != route["models"][0])
+                
+                return content
+                
+            except Exception as e:
+                if isinstance(e, NoEndpointAvailableError) and index < len(candidates) - 1:
+                    # 엔드포인트 일시 장애: 모델은 사용 불가로 표시하지 않고 다음 모델 시도
+                    logger.warning(f"모델 {model}을 처리할 엔드포인트 없음, 대체 모델로 재시도: {e}")
+                    last_error = e
+                    continue
+                
+                if self._is_model_unavailable(e) and index < len(candidates) - 1:
+                    logger.warning(f"모델 사용 불가 ({model}), 대체 모델로 재시도: {e}")
+                    self._mark_unavailable(model)
+                    last_error = e
+                    continue
+                
+                logger.error(f"OpenAI API 오류: {e}")
+                raise
+        
+        raise last_error
+    
+    def _create(self, kwargs: Dict[str, Any], call_site: Optional[str], route: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        백엔드 호출 (hedging이 설정된 호출 지점은 지연 시 중복 요청)
+        
+        Args:
+            kwargs: 백엔드 요청 인자
+            call_site: 호출 지점 이름
+            route: resolve_route() 결과
+        
+        Returns:
+            백엔드 응답 딕셔너리
+        """
+        site = call_site or "default"
+        hedge_delay = self._hedge_delay(site) if route["hedge"] else None
+        
+        if hedge_delay is None:
+            response, latency = self._timed_create(kwargs)
+            self._observe_latency(site, latency)
+            return response
+        
+        return self._hedged_create(kwargs, site, route, hedge_delay)
+    
+    def _timed_create(self, kwargs: Dict[str, Any]):
+        """백엔드 호출 후 (응답, 지연 시간) 반환"""
+        start_time = time.perf_counter()
+        response = self.backend.create(**kwargs)
+        return response, time.perf_counter() - start_time
+    
+    def _hedged_create(
+        self,
+        kwargs: Dict[str, Any],
+        site: str,
+        route: Dict[str, Any],
+        hedge_delay: float
+    ) -> Dict[str, Any]:
+        """
+        Hedged 요청: 첫 요청이 hedge_delay 안에 끝나지 않으면 중복 요청을 보내고 먼저 온 응답 사용
+        
+        동기 SDK 호출은 중간에 중단할 수 없으므로, 늦은 요청은 아직 시작 전이면 취소하고
+        이미 진행 중이면 응답을 버립니다. 버린 요청도 끝나면 지연 시간은 표본에 넣습니다.
+        (느린 요청이 빠지면 백분위수가 낮게 치우쳐 hedging이 점점 잦아짐)
+        """
+        with self._hedge_executor_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=config.llm_hedge_workers,
+                    thread_name_prefix="llm-hedge"
+                )
+            executor = self._hedge_executor
+        
+        primary = executor.submit(self._timed_create, dict(kwargs))
+        done, _ = wait([primary], timeout=hedge_delay)
+        
+        if done or not self._take_hedge_budget(site, route["hedge_budget"]):
+            response, latency = primary.result()
+            self._observe_latency(site, latency)
+            return response
+        
+        hedge_kwargs = dict(kwargs)
+        if route["hedge_endpoints"]:
+            hedge_kwargs["endpoints"] = route["hedge_endpoints"]
+        
+        logger.debug(f"Hedged 요청 전송 (호출 지점: {site}, 대기 {hedge_delay:.2f}s 초과)")
+        hedge = executor.submit(self._timed_create, hedge_kwargs)
+        
+        pending = {primary, hedge}
+        errors = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response, latency = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                
+                for loser in pending:
+                    if not loser.cancel():
+                        loser.add_done_callback(lambda late: self._observe_late(site, late))
+                
+                with self._stats_lock:
+                    if future is hedge:
+                        self._site_stats(site)["hedge_wins"] += 1
+                self._observe_latency(site, latency)
+                return response
+        
+        raise errors[0]
+    
+    def _hedge_delay(self, site: str) -> Optional[float]:
+        """
+        Hedging 대기 시간 계산 (관측된 지연 시간의 백분위수)
+        
+        Returns:
+            대기 시간 (초), 표본이 부족하면 None
+        """
+        with self._stats_lock:
+            samples = list(self._latencies.get(site, ()))
+        
+        if len(samples) < config.llm_hedge_min_samples:
+            return None
+        
+        samples.sort()
+        index = min(len(samples) - 1, int(len(samples) * config.llm_hedge_percentile / 100))
+        return samples[index]
+    
+    def _take_hedge_budget(self, site: str, budget: float) -> bool:
+        """호출 지점의 hedging 예산(전체 호출 대비 추가 요청 비율) 내에서 중복 요청 허용 여부 결정"""
+        with self._stats_lock:
+            stats = self._site_stats(site)
+            if stats["hedges"] + 1 > budget * (stats["calls"] + 1):
+                return False
+            stats["hedges"] += 1
+            return True
+    
+    def _observe_late(self, site: str, future):
+        """Hedging에서 진 요청이 성공적으로 끝나면 지연 시간 표본 추가 (hedge 스레드에서 호출)"""
+        if not future.cancelled() and future.exception() is None:
+            self._observe_latency(site, future.result()[1])
+    
+    def _observe_latency(self, site: str, latency: float):
+        """호출 지점의 지연 시간 표본 추가"""
+        with self._stats_lock:
+            if site not in self._latencies:
+                self._latencies[site] = deque(maxlen=config.llm_hedge_window)
+            self._latencies[site].append(latency)
+    
+    def _mark_unavailable(self, model: str):
+        """모델을 LLM_UNAVAILABLE_TTL 동안 후보에서 제외 (권한 부여/배포 후에는 다시 사용되도록)"""
+        with self._stats_lock:
+            self._unavailable_models[model] = time.monotonic() + config.llm_unavailable_ttl
+    
+    def _is_marked_unavailable(self, model: str) -> bool:
+        """모델이 사용 불가로 표시되어 있는지 여부 (만료된 표시는 제거)"""
+        with self._stats_lock:
+            retry_at = self._unavailable_models.get(model)
+            if retry_at is None:
+                return False
+            if time.monotonic() >= retry_at:
+                del self._unavailable_models[model]
+                return False
+            return True
+    
+    @staticmethod
+    def _is_model_unavailable(error: Exception) -> bool:
+        """모델이 존재하지 않거나 접근 권한이 없는 오류인지 판단"""
+        if isinstance(error, (NotFoundError, PermissionDeniedError)):
+            return True
+        if isinstance(error, BadRequestError):
+            return getattr(error, "code", None) in ("model_not_found", "model_not_available")
+        return False
+    
+    def _record_call(
+        self,
+        call_site: Optional[str],
+        model: str,
+        latency: float,
+        usage: Dict[str, int],
+        fallback: bool = False
+    ):
+        """호출 지점별 통계 기록"""
+        with self._stats_lock:
+            stats = self._site_stats(call_site or "default")
+            stats["calls"] += 1
+            stats["total_latency"] += latency
+            stats["prompt_tokens"] += usage["prompt_tokens"]
+            stats["completion_tokens"] += usage["completion_tokens"]
+            stats["cached_tokens"] += usage["cached_tokens"]
+            if fallback:
+                stats["fallbacks"] += 1
+            stats["models"][model] = stats["models"].get(model, 0) + 1
+    
+    def _site_stats(self, site: str) -> Dict[str, Any]:
+        """호출 지점 통계 딕셔너리 (없으면 생성, _stats_lock 안에서 호출)"""
+        return self.call_stats.setdefault(site, {
+            "calls": 0,
+            "fallbacks": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "total_latency": 0.0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "cached_tokens": 0,
+            "models": {}
+        })
+    
+    def get_call_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        호출 지점별 통계 반환
+        
+        Returns:
+            {call_site: {"calls", "fallbacks", "hedges", "hedge_wins", "avg_latency", "prompt_tokens",
+                         "completion_tokens", "cached_tokens", "cached_ratio", "models"}}
+        """
+        with self._stats_lock:
+            call_stats = {site: dict(stats) for site, stats in self.call_stats.items()}
+        
+        report = {}
+        for site, stats in call_stats.items():
+            report[site] = {
+                "calls": stats["calls"],
+                "fallbacks": stats["fallbacks"],
+                "hedges": stats["hedges"],
+                "hedge_wins": stats["hedge_wins"],
+                "avg_latency": stats["total_latency"] / stats["calls"] if stats["calls"] else 0.0,
+                "prompt_tokens": stats["prompt_tokens"],
+                "completion_tokens": stats["completion_tokens"],
+                "cached_tokens": stats["cached_tokens"],
+                "cached_ratio": (
+                    stats["cached_tokens"] / stats["prompt_tokens"] if stats["prompt_tokens"] else 0.0
+                ),
+                "models": dict(stats["models"])
             }
-            
-            if max_tokens:
-                kwargs["max_tokens"] = max_tokens
-            
-            if json_mode:
-                kwargs["response_format"] = {"type": "json_object"}
-            
-            logger.debug(f"OpenAI API 호출: {len(messages)} 메시지")
-            
-            response = self.client.chat.completions.create(**kwargs)
-            
-            content = response.choices[0].message.content
-            logger.debug(f"OpenAI API 응답: {len(content)} 문자")
-            
-            return content
-            
-        except Exception as e:
-            logger.error(f"OpenAI API 오류: {e}")
-            raise
+        return report
+    
+    def reset_call_stats(self):
+        """호출 통계 초기화 (hedging용 지연 시간 표본은 유지)"""
+        with self._stats_lock:
+            self.call_stats = {}
     
     def parse_json_response(self, response: str) -> Optional[Dict[str, Any]]:
         """
@@ -90,13 +424,14 @@ class OpenAIClient:
             logger.debug(f"원본 응답: {response}")
             return None
     
-    def simple_query(self, system_prompt: str, user_message: str) -> str:
+    def simple_query(self, system_prompt: str, user_message: str, call_site: str = None) -> str:
         """
         간단한 질의응답
         
         Args:
             system_prompt: 시스템 프롬프트
             user_message: 사용자 메시지
+            call_site: 호출 지점 이름 (모델 라우팅용)
         
         Returns:
             응답 텍스트
@@ -105,12 +440,13 @@ class OpenAIClient:
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_message}
         ]
-        return self.chat_completion(messages)
+        return self.chat_completion(messages, call_site=call_site)
     
     def query_with_json(
         self,
         system_prompt: str,
-        user_message: str
+        user_message: str,
+        call_site: str = None
     ) -> Optional[Dict[str, Any]]:
         """
         JSON 응답을 요청하는 질의
@@ -118,6 +454,7 @@ class OpenAIClient:
         Args:
             system_prompt: 시스템 프롬프트
             user_message: 사용자 메시지
+            call_site: 호출 지점 이름 (모델 라우팅용)
         
         Returns:
             파싱된 JSON 딕셔너리
@@ -127,7 +464,7 @@ class OpenAIClient:
             {"role": "user", "content": user_message}
         ]
         
-        response = self.chat_completion(messages, json_mode=True)
+        response = self.chat_completion(messages, json_mode=True, call_site=call_site)
         return self.parse_json_response(response)
 
 
@@ -146,3 +483,16 @@ def get_openai_client() -> OpenAIClient:
     if _client_instance is None:
         _client_instance = OpenAIClient()
     return _client_instance
+
+
+def set_openai_client(client: Optional[OpenAIClient]):
+    """
+    싱글톤 인스턴스 교체 (테스트/벤치마크에서 재생·스크립트 백엔드 주입용)
+    
+    컴포넌트는 생성 시점에 클라이언트를 가져가므로 컴포넌트 생성 전에 호출해야 합니다.
+    
+    Args:
+        client: 사용할 OpenAIClient (None이면 다음 호출 시 설정에 따라 새로 생성)
+    """
+    global _client_instance
+    _client_instance = client
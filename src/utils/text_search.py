@@ -0,0 +1,300 @@
+"""
+Text Search Utility
+
+형태소 분석기 없이 한국어/영어 텍스트를 검색하기 위한 로컬 색인입니다.
+단어와 문자 n-gram을 특징으로 사용하여 BM25 점수와 TF-IDF 코사인 유사도를
+NumPy로 계산하고, 두 점수를 결합해 상위 문서를 찾습니다.
+문서는 하나씩 추가/삭제할 수 있어 전체 재색인이 필요 없습니다.
+"""
+
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize_text(text: str) -> str:
+    """검색용 정규화 (유니코드 NFKC, 소문자, 공백 정리)"""
+    text = unicodedata.normalize("NFKC", str(text)).lower()
+    return " ".join(text.split())
+
+
+def word_tokens(text: str) -> List[str]:
+    """단어 토큰 (문자/숫자 연속 구간)"""
+    return WORD_PATTERN.findall(normalize_text(text))
+
+
+def char_ngrams(text: str, sizes: Iterable[int] = (2, 3)) -> List[str]:
+    """
+    단어 경계를 포함한 문자 n-gram
+    
+    조사가 붙은 한국어 어절("서울에서", "서울은")도 앞부분 n-gram이 겹치도록
+    각 단어 앞뒤에 경계 기호를 붙여 n-gram을 만듭니다.
+    
+    Args:
+        text: 원문
+        sizes: n-gram 길이들
+    
+    Returns:
+        n-gram 리스트
+    """
+    grams = []
+    for word in word_tokens(text):
+        padded = f"^{word}$"
+        for n in sizes:
+            if len(padded) < n:
+                continue
+            grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+def bm25_terms(text: str) -> List[str]:
+    """BM25용 특징 (단어 + 문자 bigram)"""
+    return word_tokens(text) + char_ngrams(text, sizes=(2,))
+
+
+class InvertedIndex:
+    """증분 추가/삭제가 가능한 역색인"""
+    
+    def __init__(self, analyzer: Callable[[str], List[str]]):
+        """
+        초기화
+        
+        Args:
+            analyzer: 텍스트를 특징 리스트로 바꾸는 함수
+        """
+        self.analyzer = analyzer
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_terms: Dict[int, Counter] = {}
+        self.doc_len = np.zeros(16, dtype=np.float32)
+        self.total_len = 0.0
+        self._norms = None
+    
+    @property
+    def num_docs(self) -> int:
+        """색인된 문서 수"""
+        return len(self.doc_terms)
+    
+    def _ensure_capacity(self, slot: int):
+        """문서 길이 배열 확장"""
+        if slot >= len(self.doc_len):
+            grown = np.zeros(max(slot + 1, len(self.doc_len) * 2), dtype=np.float32)
+            grown[:len(self.doc_len)] = self.doc_len
+            self.doc_len = grown
+    
+    def add(self, slot: int, text: str):
+        """
+        문서 추가 (같은 슬롯이 있으면 교체)
+        
+        Args:
+            slot: 문서 슬롯 번호
+            text: 문서 텍스트
+        """
+        self.remove(slot)
+        terms = Counter(self.analyzer(text))
+        self._ensure_capacity(slot)
+        self.doc_terms[slot] = terms
+        length = float(sum(terms.values()))
+        self.doc_len[slot] = length
+        self.total_len += length
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[slot] = tf
+        self._norms = None
+    
+    def remove(self, slot: int):
+        """
+        문서 삭제
+        
+        Args:
+            slot: 문서 슬롯 번호
+        """
+        terms = self.doc_terms.pop(slot, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(slot, None)
+                if not posting:
+                    del self.postings[term]
+        self.total_len -= float(self.doc_len[slot])
+        self.doc_len[slot] = 0.0
+        self._norms = None
+    
+    def _idf(self, df: int) -> float:
+        """역문서 빈도 (BM25와 TF-IDF 공용, 항상 양수)"""
+        n = self.num_docs
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+    
+    def _posting_arrays(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """특징의 (슬롯 배열, tf 배열)"""
+        posting = self.postings.get(term)
+        if not posting:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        slots = np.fromiter(posting.keys(), dtype=np.int64, count=len(posting))
+        tfs = np.fromiter(posting.values(), dtype=np.float32, count=len(posting))
+        return slots, tfs
+    
+    def bm25(self, query: str, k1: float = 1.2, b: float = 0.75) -> np.ndarray:
+        """
+        BM25 점수
+        
+        Args:
+            query: 검색어
+            k1: tf 포화 계수
+            b: 문서 길이 정규화 계수
+        
+        Returns:
+            슬롯별 점수 배열
+        """
+        scores = np.zeros(len(self.doc_len), dtype=np.float32)
+        if not self.num_docs:
+            return scores
+        
+        avgdl = self.total_len / self.num_docs or 1.0
+        for term in set(self.analyzer(query)):
+            slots, tfs = self._posting_arrays(term)
+            if not len(slots):
+                continue
+            idf = self._idf(len(slots))
+            lengths = self.doc_len[slots]
+            scores[slots] += idf * tfs * (k1 + 1) / (tfs + k1 * (1 - b + b * lengths / avgdl))
+        return scores
+    
+    def _doc_norms(self) -> np.ndarray:
+        """문서 TF-IDF 벡터 크기 (색인이 바뀌면 다시 계산)"""
+        if self._norms is None:
+            norms = np.zeros(len(self.doc_len), dtype=np.float32)
+            for term, posting in self.postings.items():
+                idf = self._idf(len(posting))
+                slots, tfs = self._posting_arrays(term)
+                norms[slots] += (tfs * idf) ** 2
+            self._norms = np.sqrt(norms)
+        return self._norms
+    
+    def tfidf_cosine(self, query: str) -> np.ndarray:
+        """
+        TF-IDF 코사인 유사도
+        
+        Args:
+            query: 검색어
+        
+        Returns:
+            슬롯별 유사도 배열 (0~1)
+        """
+        scores = np.zeros(len(self.doc_len), dtype=np.float32)
+        if not self.num_docs:
+            return scores
+        
+        query_norm = 0.0
+        for term, qtf in Counter(self.analyzer(query)).items():
+            slots, tfs = self._posting_arrays(term)
+            if not len(slots):
+                continue
+            idf = self._idf(len(slots))
+            weight = qtf * idf
+            query_norm += weight ** 2
+            scores[slots] += weight * tfs * idf
+        
+        norms = self._doc_norms()
+        denominator = norms * math.sqrt(query_norm)
+        np.divide(scores, denominator, out=scores, where=denominator > 0)
+        return scores
+
+
+class HybridSearchIndex:
+    """BM25 + 문자 n-gram TF-IDF 결합 검색 색인"""
+    
+    def __init__(self, bm25_weight: float = 0.5):
+        """
+        초기화
+        
+        Args:
+            bm25_weight: 결합 점수에서 BM25 비중 (나머지는 TF-IDF 코사인)
+        """
+        self.bm25_weight = bm25_weight
+        self.bm25_index = InvertedIndex(bm25_terms)
+        self.tfidf_index = InvertedIndex(char_ngrams)
+        self._slots: Dict[str, int] = {}
+        self._doc_ids: List[str] = []
+        self._free_slots: List[int] = []
+    
+    def __len__(self) -> int:
+        return len(self._slots)
+    
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._slots
+    
+    def add(self, doc_id: str, text: str):
+        """
+        문서 추가 또는 교체
+        
+        Args:
+            doc_id: 문서 ID
+            text: 문서 텍스트
+        """
+        slot = self._slots.get(doc_id)
+        if slot is None:
+            if self._free_slots:
+                slot = self._free_slots.pop()
+                self._doc_ids[slot] = doc_id
+            else:
+                slot = len(self._doc_ids)
+                self._doc_ids.append(doc_id)
+            self._slots[doc_id] = slot
+        
+        self.bm25_index.add(slot, text)
+        self.tfidf_index.add(slot, text)
+    
+    def remove(self, doc_id: str):
+        """
+        문서 삭제
+        
+        Args:
+            doc_id: 문서 ID
+        """
+        slot = self._slots.pop(doc_id, None)
+        if slot is None:
+            return
+        self.bm25_index.remove(slot)
+        self.tfidf_index.remove(slot)
+        self._doc_ids[slot] = None
+        self._free_slots.append(slot)
+    
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[str, float]]:
+        """
+        검색
+        
+        Args:
+            query: 검색어
+            top_k: 최대 결과 수
+        
+        Returns:
+            [(문서 ID, 점수)] 점수 내림차순, 점수가 0인 문서 제외
+        """
+        if not self._slots or top_k <= 0:
+            return []
+        
+        size = len(self._doc_ids)
+        bm25 = self.bm25_index.bm25(query)[:size]
+        cosine = self.tfidf_index.tfidf_cosine(query)[:size]
+        
+        # BM25는 최댓값으로 나누어 코사인(0~1)과 같은 범위로 맞춤
+        max_bm25 = float(bm25.max()) if size else 0.0
+        if max_bm25 > 0:
+            bm25 = bm25 / max_bm25
+        scores = self.bm25_weight * bm25 + (1 - self.bm25_weight) * cosine
+        
+        candidates = np.flatnonzero(scores > 0)
+        if not len(candidates):
+            return []
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        
+        return [(self._doc_ids[slot], float(scores[slot])) for slot in candidates]
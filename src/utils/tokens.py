@@ -0,0 +1,52 @@
+"""
+Token Utility
+
+토크나이저 없이 프롬프트 토큰 수를 보수적으로 추정합니다.
+영문/숫자는 약 4자당 1토큰, 한글 등 비 ASCII 문자는 1자당 1토큰으로 계산합니다.
+"""
+
+import math
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토큰 수 추정
+
+    Args:
+        text: 텍스트
+
+    Returns:
+        추정 토큰 수
+    """
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, marker: str = "…") -> str:
+    """
+    추정 토큰 수가 상한을 넘지 않도록 뒷부분 자르기
+
+    Args:
+        text: 텍스트
+        max_tokens: 최대 토큰 수
+        marker: 잘린 경우 끝에 붙일 표시
+
+    Returns:
+        잘린 텍스트
+    """
+    if max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    # 이분 탐색으로 상한에 맞는 가장 긴 앞부분 찾기
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) + 1 <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low].rstrip() + marker
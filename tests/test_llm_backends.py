@@ -0,0 +1,258 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import httpx
+from openai import APIConnectionError, APITimeoutError, NotFoundError
+
+from src.utils.llm_backends import (
+    CassetteMissError,
+    EndpointPool,
+    NoEndpointAvailableError,
+    RecordingBackend,
+    ReplayBackend,
+    ScriptedBackend,
+)
+from src.utils.config import config
+from src.utils.openai_client import OpenAIClient
+
+
+def make_request(content: str) -> dict:
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [{"role": "user", "content": content}],
+        "temperature": 0.0,
+    }
+
+
+class TestLLMBackends(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cassette = os.path.join(self.tmpdir.name, "cassette.jsonl")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_record_then_replay(self):
+        """기록한 요청/응답 쌍을 재생 백엔드가 그대로 돌려주는지 테스트"""
+        recorder = RecordingBackend(ScriptedBackend(["첫 번째", "두 번째"]), self.cassette)
+        recorder.create(**make_request("a"))
+        recorder.create(**make_request("b"))
+
+        with open(self.cassette, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        replay = ReplayBackend(self.cassette, latency=0)
+        self.assertEqual(replay.create(**make_request("b"))["content"], "두 번째")
+        self.assertEqual(replay.create(**make_request("a"))["content"], "첫 번째")
+
+    def test_replay_miss_raises(self):
+        """기록에 없는 요청은 strict 모드에서 오류"""
+        RecordingBackend(ScriptedBackend(["응답"]), self.cassette).create(**make_request("a"))
+
+        replay = ReplayBackend(self.cassette, latency=0)
+        with self.assertRaises(CassetteMissError):
+            replay.create(**make_request("없는 요청"))
+
+        loose = ReplayBackend(self.cassette, latency=0, strict=False)
+        self.assertEqual(loose.create(**make_request("없는 요청"))["content"], "응답")
+
+    def test_replay_latency_is_deterministic(self):
+        """같은 시드면 같은 모의 지연 시간을 사용"""
+        with open(self.cassette, "w", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "key": "unused",
+                "request": {},
+                "response": {"content": "x", "model": "m", "usage": {}},
+                "latency": 0.02,
+            }) + "\n")
+
+        first = ReplayBackend(self.cassette, jitter=0.01, seed=7)
+        second = ReplayBackend(self.cassette, jitter=0.01, seed=7)
+        entry = first._all_entries[0]
+        self.assertEqual(
+            [first._simulated_latency(entry) for _ in range(5)],
+            [second._simulated_latency(entry) for _ in range(5)],
+        )
+
+        fixed = ReplayBackend(self.cassette, latency=0.03, strict=False)
+        start = time.perf_counter()
+        fixed.create(**make_request("a"))
+        self.assertGreaterEqual(time.perf_counter() - start, 0.03)
+
+    def test_scripted_backend_with_client(self):
+        """OpenAIClient가 스크립트 백엔드로 JSON 응답을 파싱하고 호출 수를 집계"""
+        backend = ScriptedBackend(['{"task_type": "web_search"}', "안녕하세요"])
+        client = OpenAIClient(backend=backend)
+
+        result = client.query_with_json("system", "오늘 날씨", call_site="task_type")
+        self.assertEqual(result, {"task_type": "web_search"})
+        self.assertEqual(client.simple_query("system", "인사", call_site="llm_step"), "안녕하세요")
+
+        self.assertEqual(len(backend.calls), 2)
+        self.assertEqual(backend.calls[0]["response_format"], {"type": "json_object"})
+        self.assertEqual(client.get_call_stats()["task_type"]["calls"], 1)
+
+        with self.assertRaises(CassetteMissError):
+            client.simple_query("system", "더 이상 응답 없음")
+
+    def test_endpoint_pool_failover(self):
+        """연결 오류가 난 엔드포인트를 건너뛰고 다음 엔드포인트로 장애 조치"""
+        pool = EndpointPool({
+            "local": {"base_url": "http://127.0.0.1:9/v1", "api_key": "EMPTY", "weight": 100, "models": ["small"]},
+            "hosted": {"api_key": "test", "weight": 1},
+        }, health_interval=0, seed=1)
+
+        connection_error = APIConnectionError(request=httpx.Request("POST", "http://127.0.0.1:9/v1"))
+        pool.endpoints["local"]["backend"] = ScriptedBackend([connection_error])
+        pool.endpoints["hosted"]["backend"] = ScriptedBackend(default="hosted 응답")
+
+        response = pool.create(**{**make_request("a"), "model": "small"})
+        self.assertEqual(response["content"], "hosted 응답")
+        self.assertEqual(response["endpoint"], "hosted")
+        self.assertFalse(pool.get_stats()["local"]["healthy"])
+
+        # 비정상 엔드포인트는 retry_after 전까지 후보에서 제외
+        with self.assertRaises(NoEndpointAvailableError):
+            pool.create(**{**make_request("b"), "model": "small", "endpoints": ["local"]})
+
+        # 모델 제공 목록에 없는 엔드포인트로는 라우팅하지 않음
+        # (처리할 수 있는 엔드포인트가 비정상 하나뿐이면 그 엔드포인트를 마지막 수단으로 재시도)
+        pool.endpoints["local"]["backend"] = ScriptedBackend(lambda kwargs: connection_error)
+        pool.endpoints["hosted"]["models"] = {"gpt-4o-mini"}
+        with self.assertRaises(NoEndpointAvailableError):
+            pool.create(**{**make_request("c"), "model": "small"})
+        self.assertEqual(len(pool.endpoints["local"]["backend"].calls), 1)
+        self.assertEqual(len(pool.endpoints["hosted"]["backend"].calls), 1)
+
+    def test_invalid_endpoint_values_are_skipped(self):
+        """숫자로 변환할 수 없는 값이 있는 엔드포인트만 건너뛰고 나머지는 로드"""
+        endpoints = config._validate_llm_endpoints({
+            "local": {"base_url": "http://127.0.0.1:8080/v1", "weight": "heavy"},
+            "slow": {"base_url": "http://127.0.0.1:8081/v1", "timeout": None},
+            "hosted": {"api_key": "test", "weight": "2", "models": "gpt-4o-mini"},
+        }, source="test")
+        self.assertEqual(list(endpoints), ["hosted"])
+        self.assertEqual((endpoints["hosted"]["weight"], endpoints["hosted"]["models"]), (2.0, ["gpt-4o-mini"]))
+
+    def test_single_endpoint_pool_retries_after_failure(self):
+        """엔드포인트가 하나뿐이면 실패 직후에도 다음 요청을 거부하지 않고 다시 시도"""
+        pool = EndpointPool({"openai": {"api_key": "test"}}, health_interval=0)
+        timeout_error = APITimeoutError(request=httpx.Request("POST", "https://api.openai.com/v1"))
+        backend = ScriptedBackend([timeout_error, "복구된 응답"])
+        pool.endpoints["openai"]["backend"] = backend
+
+        with self.assertRaises(NoEndpointAvailableError):
+            pool.create(**make_request("a"))
+        self.assertFalse(pool.get_stats()["openai"]["healthy"])
+
+        response = pool.create(**make_request("b"))
+        self.assertEqual(response["content"], "복구된 응답")
+        self.assertEqual(len(backend.calls), 2)
+        self.assertTrue(pool.get_stats()["openai"]["healthy"])
+
+    def test_hedged_request_uses_first_response(self):
+        """첫 요청이 관측된 p90보다 늦으면 중복 요청을 보내고 먼저 온 응답을 사용"""
+        def respond(kwargs):
+            if len(backend.calls) == 1:
+                time.sleep(0.5)
+                return "느린 응답"
+            return "빠른 응답"
+
+        backend = ScriptedBackend(respond)
+        client = OpenAIClient(backend=backend)
+
+        original_routes = config.model_routes
+        config.model_routes = {"routes": {"intent": {"hedge": True, "hedge_budget": 1.0}}, "profiles": {}}
+        try:
+            for _ in range(config.llm_hedge_min_samples):
+                client._observe_latency("intent", 0.01)
+
+            start = time.perf_counter()
+            content = client.simple_query("system", "질문", call_site="intent")
+            elapsed = time.perf_counter() - start
+        finally:
+            config.model_routes = original_routes
+
+        self.assertEqual(content, "빠른 응답")
+        self.assertLess(elapsed, 0.4)
+        stats = client.get_call_stats()["intent"]
+        self.assertEqual(stats["hedges"], 1)
+        self.assertEqual(stats["hedge_wins"], 1)
+
+        # 진 느린 요청도 끝나면 지연 시간 표본에 들어감
+        deadline = time.perf_counter() + 2.0
+        while len(client._latencies["intent"]) < config.llm_hedge_min_samples + 2 and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        self.assertGreaterEqual(max(client._latencies["intent"]), 0.5)
+
+
+
+class TestModelRouting(unittest.TestCase):
+    def setUp(self):
+        self.original_routes = config.model_routes
+        config.model_routes = config._validate_model_routes({
+            "routes": {
+                "planner": {"model": "big-model", "fallbacks": "mid-model", "temperature": 0.2},
+                "broken": {"model": "x", "temperature": "hot"},
+                "bad_endpoints": {"endpoints": 3},
+            },
+            "profiles": {"cheap": {"planner": {"model": "mid-model", "max_tokens": "200"}}},
+        }, source="test")
+
+    def tearDown(self):
+        config.model_routes = self.original_routes
+
+    def test_invalid_route_values_are_skipped(self):
+        """값을 변환할 수 없는 호출 지점만 건너뛰고 나머지 라우팅은 로드"""
+        self.assertEqual(set(config.model_routes["routes"]), {"planner"})
+        self.assertEqual(config.model_routes["profiles"]["cheap"]["planner"]["max_tokens"], 200)
+        self.assertEqual(config._validate_model_routes([], source="test"), {"routes": {}, "profiles": {}})
+
+    def test_resolve_route_with_profile_and_fallbacks(self):
+        """호출 지점 모델 → fallbacks → 기본 모델 순서, 프로필이 있으면 프로필 설정 우선"""
+        client = OpenAIClient(profile="", backend=ScriptedBackend())
+        route = client.resolve_route("planner")
+        self.assertEqual(route["models"], ["big-model", "mid-model", client.model])
+        self.assertEqual(route["temperature"], 0.2)
+        self.assertEqual(client.resolve_route("unknown")["models"], [client.model])
+
+        client.set_profile("cheap")
+        route = client.resolve_route("planner")
+        self.assertEqual(route["models"][0], "mid-model")
+        self.assertEqual(route["max_tokens"], 200)
+
+    def test_unavailable_model_falls_back_until_ttl_expires(self):
+        """없는 모델은 대체 모델로 재시도하고 TTL 동안 건너뛰며, TTL이 지나면 다시 시도"""
+        not_found = NotFoundError(
+            "model not found",
+            response=httpx.Response(404, request=httpx.Request("POST", "http://localhost/v1")),
+            body=None
+        )
+
+        def respond(kwargs):
+            if kwargs["model"] == "big-model":
+                raise not_found
+            return kwargs["model"]
+
+        backend = ScriptedBackend(respond)
+        client = OpenAIClient(profile="", backend=backend)
+        original_ttl = config.llm_unavailable_ttl
+        config.llm_unavailable_ttl = 60
+        try:
+            self.assertEqual(client.simple_query("system", "계획", call_site="planner"), "mid-model")
+            self.assertEqual(client.simple_query("system", "계획", call_site="planner"), "mid-model")
+            self.assertEqual([call["model"] for call in backend.calls], ["big-model", "mid-model", "mid-model"])
+            self.assertEqual(client.get_call_stats()["planner"]["fallbacks"], 2)
+
+            client._unavailable_models["big-model"] = time.monotonic() - 1
+            client.simple_query("system", "계획", call_site="planner")
+            self.assertEqual(backend.calls[3]["model"], "big-model")
+        finally:
+            config.llm_unavailable_ttl = original_ttl
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,639 @@
+import atexit
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from unittest import mock
+
+from src.memory.archive import SessionArchive
+from src.memory.namespaces import MemoryNamespaces
+from src.memory.persistent import PersistentMemory
+from src.memory.session import SessionMemory
+from src.memory.storage import (
+    JSONMemoryStorage, create_memory_storage, get_storage_stats, release_memory_storage
+)
+from src.utils.config import config
+from src.utils.llm_backends import ScriptedBackend
+from src.utils.openai_client import OpenAIClient, set_openai_client
+from src.utils.tokens import estimate_tokens
+from src.memory.sqlite_storage import SQLiteMemoryStorage
+from src.memory.binary_storage import BinaryMemoryStorage
+
+
+def make_message(role: str, content: str) -> dict:
+    return {"role": role, "content": content, "timestamp": None, "metadata": {}}
+
+
+class StorageContractMixin:
+    """모든 저장소 백엔드가 지켜야 하는 동작"""
+
+    def make_storage(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.storage = self.make_storage()
+
+    def tearDown(self):
+        if hasattr(self.storage, "close"):
+            self.storage.close()
+        self.tmpdir.cleanup()
+
+    def test_session_memory(self):
+        """세션 메시지 추가/최근 조회/초기화"""
+        for i in range(5):
+            self.storage.add_session_memory(make_message("user", f"메시지 {i}"))
+
+        history = self.storage.get_session_memory()
+        self.assertEqual([m["content"] for m in history], [f"메시지 {i}" for i in range(5)])
+
+        recent = self.storage.get_recent_session_memory(2)
+        self.assertEqual([m["content"] for m in recent], ["메시지 3", "메시지 4"])
+
+        removed = self.storage.trim_session_memory(2)
+        self.assertEqual([m["content"] for m in removed], ["메시지 0", "메시지 1", "메시지 2"])
+        self.assertEqual(len(self.storage.get_session_memory()), 2)
+
+        self.storage.clear_session_memory()
+        for i in range(4):
+            message = make_message("user", f"메시지 {i}")
+            message["timestamp"] = f"2026-10-19T10:00:0{i}"
+            self.storage.add_session_memory(message)
+        def fail(messages):
+            raise OSError("디스크 가득 참")
+
+        with self.assertRaises(OSError):
+            self.storage.trim_session_memory(0, before="2026-10-19T10:00:02", on_remove=fail)
+        self.assertEqual(len(self.storage.get_session_memory()), 4)
+        archived = []
+        removed = self.storage.trim_session_memory(0, before="2026-10-19T10:00:02", on_remove=archived.extend)
+        self.assertEqual([m["content"] for m in removed], ["메시지 0", "메시지 1"])
+        self.assertEqual(archived, removed)
+        self.assertEqual([m["content"] for m in self.storage.get_session_memory()], ["메시지 2", "메시지 3"])
+
+        self.storage.clear_session_memory()
+        self.assertEqual(self.storage.get_session_memory(), [])
+
+    def test_long_term_memory(self):
+        """장기 메모리 설정/덮어쓰기/삭제"""
+        self.storage.set_long_term_memory("이름", "김철수")
+        self.storage.set_long_term_memory("취미", ["등산", "독서"])
+        self.storage.set_long_term_memory("이름", "이영희")
+
+        self.assertEqual(self.storage.get_long_term_memory("이름"), "이영희")
+        self.assertEqual(
+            self.storage.get_long_term_memory(),
+            {"이름": "이영희", "취미": ["등산", "독서"]}
+        )
+
+        version = self.storage.get_long_term_version()
+        self.assertEqual(self.storage.get_long_term_version(), version)
+        self.storage.remove_long_term_memory("이름")
+        self.assertIsNone(self.storage.get_long_term_memory("이름"))
+        self.assertNotEqual(self.storage.get_long_term_version(), version)
+
+    def test_long_term_metadata(self):
+        """항목별 생성/갱신/만료 시각과 조회 통계"""
+        self.storage.set_long_term_memory("일정", "회의", expires_at="2099-01-01T00:00:00")
+        self.storage.update_long_term_metadata({"일정": {"hits": 3, "last_hit": "2024-01-01T00:00:00"}, "없음": {"hits": 1}})
+        self.storage.set_long_term_memory("일정", "출장")
+
+        meta = self.storage.get_long_term_metadata()
+        self.assertEqual(list(meta), ["일정"])
+        self.assertEqual(meta["일정"]["hits"], 3)
+        self.assertIsNone(meta["일정"]["expires_at"])
+        self.assertLessEqual(meta["일정"]["created_at"], meta["일정"]["updated_at"])
+
+        self.storage.remove_long_term_memory("일정")
+        self.assertEqual(self.storage.get_long_term_metadata(), {})
+
+
+class TestJSONMemoryStorage(StorageContractMixin, unittest.TestCase):
+    def make_storage(self):
+        return JSONMemoryStorage(os.path.join(self.tmpdir.name, "memory.json"))
+
+    def test_write_behind_and_journal_recovery(self):
+        """변경은 모아서 저장되고, 비정상 종료 시 저널로 복구"""
+        path = os.path.join(self.tmpdir.name, "wb.json")
+        storage = JSONMemoryStorage(path, flush_interval=0, flush_every=100)
+        atexit.unregister(storage.close)
+        storage.add_session_memory(make_message("user", "저장 전 메시지"))
+        storage.set_long_term_memory("이름", "김철수")
+
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["sessions"]["default"], [])
+
+        # flush 없이 종료된 상황: 새 인스턴스가 저널을 재적용
+        recovered = JSONMemoryStorage(path, flush_interval=0)
+        try:
+            self.assertEqual([m["content"] for m in recovered.get_session_memory()], ["저장 전 메시지"])
+            self.assertEqual(recovered.get_long_term_memory("이름"), "김철수")
+            self.assertFalse(os.path.exists(path + ".journal"))
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(len(json.load(f)["sessions"]["default"]), 1)
+        finally:
+            recovered.close()
+
+    def test_instances_on_same_file_see_each_other(self):
+        """같은 파일을 쓰는 다른 인스턴스(다른 프로세스)의 변경 반영"""
+        path = os.path.join(self.tmpdir.name, "shared.json")
+        first = JSONMemoryStorage(path, flush_interval=0, flush_every=3)
+        second = JSONMemoryStorage(path, flush_interval=0, flush_every=3)
+        try:
+            for i in range(5):
+                first.set_long_term_memory(f"a{i}", i)
+                second.set_long_term_memory(f"b{i}", i)
+            self.assertEqual(len(first.get_long_term_memory()), 10)
+            self.assertEqual(len(second.get_long_term_memory()), 10)
+            self.assertGreater(first.get_stats()["lock"]["acquisitions"], 0)
+        finally:
+            first.close()
+            second.close()
+
+        reopened = JSONMemoryStorage(path, flush_interval=0)
+        try:
+            self.assertEqual(len(reopened.get_long_term_memory()), 10)
+        finally:
+            reopened.close()
+
+
+class TestSQLiteMemoryStorage(StorageContractMixin, unittest.TestCase):
+    def make_storage(self):
+        return SQLiteMemoryStorage(os.path.join(self.tmpdir.name, "memory.db"))
+
+    def test_wal_mode(self):
+        """WAL 저널 모드 사용"""
+        mode = self.storage._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode.lower(), "wal")
+
+    def test_migrate_from_json_once(self):
+        """JSON 파일을 처음 한 번만 가져오기"""
+        json_path = os.path.join(self.tmpdir.name, "legacy.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "session_memory": [make_message("user", "안녕"), make_message("assistant", "안녕하세요")],
+                "summaries": {"s2": {"summary": "인사", "covered_until": "2026-10-19T10:00:00"}},
+                "long_term_memory": {"이름": "김철수", "일정": "내일 회의"},
+                "long_term_metadata": {
+                    "일정": {"created_at": "2026-10-01T09:00:00", "updated_at": "2026-10-02T09:00:00",
+                             "expires_at": "2026-10-20T09:00:00", "hits": 3, "last_hit": "2026-10-18T09:00:00"},
+                },
+                "metadata": {},
+            }, f, ensure_ascii=False)
+
+        db_path = os.path.join(self.tmpdir.name, "migrated.db")
+        storage = SQLiteMemoryStorage(db_path, migrate_from=json_path)
+        try:
+            self.assertEqual([m["content"] for m in storage.get_session_memory()], ["안녕", "안녕하세요"])
+            self.assertEqual(storage.get_long_term_memory(), {"이름": "김철수", "일정": "내일 회의"})
+            self.assertEqual(storage.get_session_summary("s2")["summary"], "인사")
+            metadata = storage.get_long_term_metadata()
+            self.assertEqual(metadata["일정"], {
+                "created_at": "2026-10-01T09:00:00", "updated_at": "2026-10-02T09:00:00",
+                "expires_at": "2026-10-20T09:00:00", "hits": 3, "last_hit": "2026-10-18T09:00:00",
+            })
+            self.assertIsNone(metadata["이름"]["expires_at"])
+            self.assertEqual(metadata["이름"]["created_at"], metadata["이름"]["updated_at"])
+            storage.clear_session_memory()
+        finally:
+            storage.close()
+
+        # 다시 열어도 JSON을 재수입하지 않음
+        storage = SQLiteMemoryStorage(db_path, migrate_from=json_path)
+        try:
+            self.assertEqual(storage.get_session_memory(), [])
+        finally:
+            storage.close()
+
+    def test_factory_selects_backend(self):
+        """MEMORY_BACKEND 값에 따라 백엔드 선택"""
+        storage = create_memory_storage(os.path.join(self.tmpdir.name, "f.db"), backend="sqlite")
+        try:
+            self.assertIsInstance(storage, SQLiteMemoryStorage)
+        finally:
+            storage.close()
+        storage = create_memory_storage(os.path.join(self.tmpdir.name, "f.json"), backend="json")
+        self.assertIsInstance(storage, JSONMemoryStorage)
+        self.assertIs(create_memory_storage(os.path.join(self.tmpdir.name, "f.json"), backend="json"), storage)
+        storage.close()
+
+
+class TestBinaryMemoryStorage(StorageContractMixin, unittest.TestCase):
+    def make_storage(self):
+        return BinaryMemoryStorage(os.path.join(self.tmpdir.name, "memory.bin"))
+
+    def test_trim_compaction_and_reopen(self):
+        """잘린 앞부분이 쌓이면 새 파일로 다시 쓰고, 다시 열어도 유지"""
+        path = os.path.join(self.tmpdir.name, "compact.bin")
+        storage = BinaryMemoryStorage(path)
+        try:
+            for i in range(2100):
+                storage.add_session_memory(make_message("user", f"메시지 {i}"), session_id="s")
+            self.assertEqual(len(storage.trim_session_memory(1900, session_id="s")), 200)
+            removed = storage.trim_session_memory(50, session_id="s")
+            self.assertEqual(removed[-1]["content"], "메시지 2049")
+            self.assertEqual(len(os.listdir(os.path.join(path, "sessions"))), 2)
+        finally:
+            storage.close()
+
+        storage = BinaryMemoryStorage(path)
+        try:
+            history = storage.get_session_memory(session_id="s")
+            self.assertEqual(len(history), 50)
+            self.assertEqual(storage.get_recent_session_memory(1, session_id="s")[0]["content"], "메시지 2099")
+        finally:
+            storage.close()
+
+    def test_repair_torn_tail(self):
+        """비정상 종료로 잘린 레코드는 버리고, 위치 배열이 빠진 레코드는 복구"""
+        path = os.path.join(self.tmpdir.name, "torn.bin")
+        storage = BinaryMemoryStorage(path)
+        for i in range(3):
+            storage.add_session_memory(make_message("user", f"메시지 {i}"))
+        storage.close()
+
+        sessions_dir = os.path.join(path, "sessions")
+        rec_path = next(os.path.join(sessions_dir, n) for n in os.listdir(sessions_dir) if n.endswith(".rec"))
+        idx_path = rec_path[:-4] + ".idx"
+        # 마지막 레코드의 위치가 기록되지 않았고, 그 뒤에 불완전한 레코드가 남은 상황
+        with open(idx_path, "r+b") as f:
+            f.truncate(2 * 8)
+        with open(rec_path, "ab") as f:
+            f.write(b"\xff\x00\x00\x00{")
+
+        storage = BinaryMemoryStorage(path)
+        try:
+            self.assertEqual([m["content"] for m in storage.get_session_memory()], ["메시지 0", "메시지 1", "메시지 2"])
+            storage.add_session_memory(make_message("user", "메시지 3"))
+            self.assertEqual(storage.get_recent_session_memory(1)[0]["content"], "메시지 3")
+        finally:
+            storage.close()
+
+    def test_migrate_from_json_once(self):
+        """JSON 파일을 처음 한 번만 가져오기"""
+        json_path = os.path.join(self.tmpdir.name, "legacy.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "sessions": {"default": [make_message("user", "안녕")]},
+                "summaries": {"default": {"text": "인사", "messages": 1}},
+                "long_term_memory": {"이름": "김철수"},
+                "metadata": {},
+            }, f, ensure_ascii=False)
+
+        path = os.path.join(self.tmpdir.name, "migrated.bin")
+        storage = BinaryMemoryStorage(path, migrate_from=json_path)
+        try:
+            self.assertEqual([m["content"] for m in storage.get_session_memory()], ["안녕"])
+            self.assertEqual(storage.get_session_summary()["text"], "인사")
+            self.assertEqual(storage.get_long_term_memory(), {"이름": "김철수"})
+            storage.clear_session_memory()
+        finally:
+            storage.close()
+
+        storage = BinaryMemoryStorage(path, migrate_from=json_path)
+        try:
+            self.assertEqual(storage.get_session_memory(), [])
+        finally:
+            storage.close()
+
+
+class TestSessionWindow(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.storage = JSONMemoryStorage(os.path.join(self.tmpdir.name, "memory.json"))
+        self.archive = SessionArchive(os.path.join(self.tmpdir.name, "archive"), segment_bytes=512)
+
+    def tearDown(self):
+        self.storage.close()
+        self.tmpdir.cleanup()
+
+    def test_count_cap_moves_old_messages_to_archive(self):
+        """개수 상한을 넘는 메시지는 아카이브로 이동하고 검색 가능"""
+        session = SessionMemory(max_history=3, max_bytes=10 ** 6, storage=self.storage, archive=self.archive)
+        for i in range(20):
+            session.add_message("user", f"질문 {i}번 서울 날씨")
+
+        self.assertEqual([m["content"] for m in session.get_history()], [f"질문 {i}번 서울 날씨" for i in (17, 18, 19)])
+        self.assertEqual(len(self.storage.get_session_memory()), 3)
+        self.assertGreater(session.get_stats()["archive"]["sealed_segments"], 0)
+
+        results = session.search_archive("14번 날씨")
+        self.assertEqual([m["content"] for m in results], ["질문 14번 서울 날씨"])
+        self.assertEqual(len(list(self.archive.iter_messages())), 17)
+
+    def test_byte_cap_and_reload(self):
+        """바이트 상한 적용 및 재시작 시 기존 기록 정리"""
+        for i in range(10):
+            self.storage.add_session_memory(make_message("user", "가" * 100 + str(i)))
+
+        session = SessionMemory(max_history=10, max_bytes=800, storage=self.storage, archive=self.archive)
+        stats = session.get_stats()
+        self.assertLessEqual(stats["window_bytes"], 800)
+        self.assertEqual(len(self.storage.get_session_memory()), stats["window_messages"])
+        self.assertEqual(len(list(self.archive.iter_messages())), 10 - stats["window_messages"])
+        self.assertTrue(session.get_history(1)[0]["content"].endswith("9"))
+
+    def test_workers_sharing_a_session_do_not_lose_messages(self):
+        """같은 세션을 쓰는 다른 워커의 메시지는 창 크기만큼 잘리지 않고, 제거된 메시지는 한 번씩 아카이브"""
+        worker_a = SessionMemory(max_history=3, max_bytes=10 ** 6, storage=self.storage, archive=self.archive)
+        worker_b = SessionMemory(max_history=3, max_bytes=10 ** 6, storage=self.storage, archive=self.archive)
+        for i in range(6):
+            worker_a.add_message("user", f"A {i}")
+            worker_b.add_message("user", f"B {i}")
+
+        stored = [m["content"] for m in self.storage.get_session_memory()]
+        archived = [m["content"] for m in self.archive.iter_messages()]
+        self.assertIn("B 3", stored)
+        self.assertEqual(sorted(stored + archived), sorted(f"{w} {i}" for w in "AB" for i in range(6)))
+
+    def test_context_includes_other_workers_turns(self):
+        """같은 세션의 다른 워커가 추가한 턴도 대화 기록과 컨텍스트에 포함"""
+        worker_a = SessionMemory(max_history=4, max_bytes=10 ** 6, storage=self.storage, archive=self.archive)
+        worker_b = SessionMemory(max_history=4, max_bytes=10 ** 6, storage=self.storage, archive=self.archive)
+        worker_a.add_message("user", "A 서울 날씨 알려줘")
+        worker_b.add_message("assistant", "B 서울은 맑습니다")
+        worker_a.add_message("user", "A 내일은?")
+
+        self.assertEqual([m["content"] for m in worker_b.get_history()],
+                         ["A 서울 날씨 알려줘", "B 서울은 맑습니다", "A 내일은?"])
+        self.assertIn("B 서울은 맑습니다", worker_a.get_context())
+
+        for i in range(3):
+            worker_b.add_message("user", f"B {i}")
+        self.assertEqual([m["content"] for m in worker_a.get_history()], ["A 내일은?", "B 0", "B 1", "B 2"])
+
+    def test_archive_failure_keeps_messages_in_storage(self):
+        """아카이브 기록에 실패하면 저장소에서 지우지 않고, 다음 정리 때 아카이브"""
+        session = SessionMemory(max_history=3, max_bytes=10 ** 6, storage=self.storage, archive=self.archive)
+        with mock.patch.object(self.archive, "append", side_effect=OSError("디스크 가득 참")):
+            for i in range(5):
+                session.add_message("user", f"질문 {i}")
+        self.assertEqual(len(self.storage.get_session_memory()), 5)
+        self.assertEqual(list(self.archive.iter_messages()), [])
+
+        session.add_message("user", "질문 5")
+        self.assertEqual([m["content"] for m in self.storage.get_session_memory()], ["질문 3", "질문 4", "질문 5"])
+        self.assertEqual([m["content"] for m in self.archive.iter_messages()], ["질문 0", "질문 1", "질문 2"])
+
+
+    def test_rolling_summary_and_token_budget(self):
+        """원문 창에서 밀려난 턴은 요약에 반영되고, 컨텍스트는 예산 안에서 조합"""
+        backend = ScriptedBackend([], default="사용자는 서울 날씨와 맛집을 물었다.")
+        set_openai_client(OpenAIClient(backend=backend))
+        with mock.patch.object(config, "session_verbatim_messages", 2), \
+                mock.patch.object(config, "session_summary_batch", 2):
+            session = SessionMemory(max_history=10, storage=self.storage, archive=self.archive)
+            for i in range(3):
+                session.add_message("user", f"질문 {i}")
+                session.add_message("assistant", "아주 긴 답변 " * 200)
+                session.wait_for_summary(timeout=5)
+
+            self.assertGreaterEqual(len(backend.calls), 1)
+            context = session.get_context(token_budget=300)
+            self.assertTrue(context.startswith("(이전 대화 요약) 사용자는 서울 날씨"))
+            self.assertIn("User: 질문 2", context)
+            self.assertNotIn("User: 질문 0", context)
+            self.assertLessEqual(estimate_tokens(context), 300)
+
+            # 요약은 세션과 함께 저장되어 재시작 후에도 유지
+            reloaded = SessionMemory(max_history=10, storage=self.storage, archive=self.archive)
+            self.assertTrue(reloaded.get_context().startswith("(이전 대화 요약)"))
+
+    def test_archive_recall_in_context(self):
+        """창 밖으로 밀려난 관련 턴을 recall 색인으로 찾아 컨텍스트에 추가"""
+        with mock.patch.object(config, "session_summary_enabled", False):
+            session = SessionMemory(max_history=4, storage=self.storage, archive=self.archive)
+            session.add_message("user", "우리 강아지 이름은 초코야")
+            for i in range(30):
+                session.add_message("user", f"질문 {i}번 서울 날씨 알려줘")
+
+            context = session.get_context(query="강아지 이름이 뭐였지?")
+            self.assertIn("(관련 이전 대화)", context)
+            self.assertIn("User: 우리 강아지 이름은 초코야", context)
+            self.assertNotIn("(관련 이전 대화)", session.get_context())
+
+        # 색인은 디스크에 누적되어 다시 열어도 유지되고, 색인이 없던 아카이브는 백필
+        self.assertEqual(len(SessionArchive(self.archive.archive_dir).recall_index), 27)
+        shutil.rmtree(os.path.join(self.archive.archive_dir, ".recall"))
+        hits = SessionArchive(self.archive.archive_dir).recall("초코 강아지", top_k=1)
+        self.assertEqual(hits[0][0]["content"], "우리 강아지 이름은 초코야")
+
+
+class NamespaceFixtureMixin:
+    """임시 디렉토리의 사용자 샤드와 스크립트 LLM 클라이언트"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        root = self.tmpdir.name
+        self.patches = [
+            mock.patch.dict(os.environ, {
+                "MEMORY_BACKEND": "json",
+                "MEMORY_FILE": os.path.join(root, "memory.json"),
+                "MEMORY_SHARD_DIR": os.path.join(root, "users"),
+                "MEMORY_FLUSH_INTERVAL": "0",
+            }),
+            mock.patch.object(config, "session_archive_dir", os.path.join(root, "archive")),
+        ]
+        for patch in self.patches:
+            patch.start()
+        set_openai_client(OpenAIClient(backend=ScriptedBackend([], default="{}")))
+
+    def tearDown(self):
+        for path, _ in get_storage_stats().items():
+            if path.startswith(self.tmpdir.name):
+                release_memory_storage(create_memory_storage(path))
+        for patch in reversed(self.patches):
+            patch.stop()
+        self.tmpdir.cleanup()
+
+
+class TestMemoryNamespaces(NamespaceFixtureMixin, unittest.TestCase):
+    def test_users_and_sessions_are_isolated(self):
+        """사용자별 장기 메모리와 세션별 대화 분리"""
+        namespaces = MemoryNamespaces(max_users=4, max_sessions_per_user=4)
+
+        alice_chat, alice_memory = namespaces.get("alice", "s1")
+        bob_chat, bob_memory = namespaces.get("bob", "s1")
+        alice_other_chat, alice_memory_again = namespaces.get("alice", "s2")
+
+        alice_chat.add_message("user", "앨리스 대화")
+        bob_chat.add_message("user", "밥 대화")
+        alice_memory.remember("이름", "앨리스")
+
+        self.assertIs(alice_memory, alice_memory_again)
+        self.assertEqual([m["content"] for m in bob_chat.get_history()], ["밥 대화"])
+        self.assertEqual(alice_other_chat.get_history(), [])
+        self.assertIsNone(bob_memory.recall("이름"))
+        self.assertNotEqual(alice_memory.storage.storage_path, bob_memory.storage.storage_path)
+
+    def test_memory_step_uses_relevant_facts(self):
+        """관련된 장기 메모리만 프롬프트 문자열에 포함"""
+        _, memory = MemoryNamespaces().get("carol", "s")
+        memory.remember("좋아하는 음식", "떡볶이")
+        memory.remember("거주지", "부산")
+        memory.remember("직업", "교사")
+        memory.forget("직업")
+
+        text = memory.get_relevant_memory_string("떡볶이 맛집 알려줘", top_k=1)
+        self.assertEqual(text, "- 좋아하는 음식: 떡볶이")
+        self.assertEqual(memory.search("교사"), [])
+
+    def test_lru_eviction_releases_shards(self):
+        """사용자 캐시 상한을 넘으면 오래된 샤드를 닫고, 다시 요청하면 저장된 내용을 로드"""
+        namespaces = MemoryNamespaces(max_users=2, max_sessions_per_user=1)
+        for user in ("u1", "u2", "u3"):
+            chat, memory = namespaces.get(user, "s")
+            chat.add_message("user", f"{user} 메시지")
+            memory.remember("사용자", user)
+
+        stats = namespaces.get_stats()
+        self.assertEqual(stats["cached_users"], 2)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertFalse(any(path.endswith("u1.json") for path in get_storage_stats()))
+
+        chat, memory = namespaces.get("u1", "s")
+        self.assertEqual(memory.recall("사용자"), "u1")
+        self.assertEqual([m["content"] for m in chat.get_history()], ["u1 메시지"])
+
+    def test_eviction_waits_for_requests_in_use(self):
+        """요청이 쓰고 있는 사용자는 캐시에서 밀려나도 샤드를 닫지 않고, 요청이 끝난 뒤에 닫음"""
+        namespaces = MemoryNamespaces(max_users=1, max_sessions_per_user=1)
+        with namespaces.use("u1", "s") as (chat, memory):
+            namespaces.get("u2", "s")
+            self.assertEqual(namespaces.get_stats()["retired_users"], 1)
+            self.assertTrue(any(path.endswith("u1.json") for path in get_storage_stats()))
+            # 밀려난 뒤에도 같은 저장소에 계속 기록 가능
+            chat.add_message("user", "u1 메시지")
+            memory.remember("사용자", "u1")
+
+        stats = namespaces.get_stats()
+        self.assertEqual(stats["retired_users"], 0)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertFalse(any(path.endswith("u1.json") for path in get_storage_stats()))
+
+        chat, memory = namespaces.get("u1", "s")
+        self.assertEqual(memory.recall("사용자"), "u1")
+        self.assertEqual([m["content"] for m in chat.get_history()], ["u1 메시지"])
+
+    def test_retired_user_is_reused_when_requested_again(self):
+        """닫히기 전에 다시 요청된 사용자는 새로 열지 않고 같은 메모리 객체를 되살림"""
+        namespaces = MemoryNamespaces(max_users=1, max_sessions_per_user=1)
+        with namespaces.use("u1", "s") as (_, memory):
+            namespaces.get("u2", "s")
+            _, again = namespaces.get("u1", "s")
+            self.assertIs(again, memory)
+            # 대신 밀려난 u2는 쓰는 요청이 없어 바로 닫힘
+            self.assertEqual(namespaces.get_stats()["retired_users"], 0)
+            self.assertFalse(any(path.endswith("u2.json") for path in get_storage_stats()))
+        self.assertTrue(any(path.endswith("u1.json") for path in get_storage_stats()))
+
+
+class TestLongTermMemoryPolicy(NamespaceFixtureMixin, unittest.TestCase):
+    def make_memory(self, user: str) -> PersistentMemory:
+        return MemoryNamespaces().get(user, "s")[1]
+
+    def test_count_quota_evicts_least_recently_used(self):
+        """항목 수 상한을 넘으면 최근에 검색되지 않은 항목부터 제거"""
+        with mock.patch.object(config, "memory_max_facts", 3), \
+                mock.patch.object(config, "memory_eviction_policy", "lru"):
+            memory = self.make_memory("lru")
+            memory.remember("좋아하는 음식", "떡볶이")
+            memory.remember("거주지", "부산")
+            memory.remember("직업", "교사")
+            memory.search("떡볶이")
+            memory.remember("취미", "등산")
+
+            self.assertEqual(sorted(memory.recall()), ["좋아하는 음식", "직업", "취미"])
+            self.assertEqual(memory.get_stats()["evictions"], 1)
+            self.assertEqual(memory.storage.get_long_term_metadata()["좋아하는 음식"]["hits"], 1)
+
+    def test_byte_quota_with_lfu(self):
+        """바이트 상한을 넘으면 적중 수가 적은 항목부터 제거"""
+        with mock.patch.object(config, "memory_max_bytes", 200), \
+                mock.patch.object(config, "memory_eviction_policy", "lfu"):
+            memory = self.make_memory("lfu")
+            memory.remember("a", "가" * 20)
+            memory.remember("b", "나" * 20)
+            for _ in range(3):
+                memory.search("가" * 20)
+            memory.remember("c", "다" * 20)
+
+            self.assertEqual(sorted(memory.recall()), ["a", "c"])
+            self.assertLessEqual(memory.get_stats()["bytes"], 200)
+
+    def test_ttl_expiry(self):
+        """만료된 항목은 조회/검색에서 빠지고 저장소에서 제거"""
+        memory = self.make_memory("ttl")
+        memory.remember("이번 주 일정", "목요일 회의", ttl_seconds=0.01)
+        memory.remember("이름", "김철수")
+        time.sleep(0.05)
+
+        self.assertEqual(memory.recall(), {"이름": "김철수"})
+        self.assertEqual(memory.search("회의 일정"), [])
+        self.assertIsNone(memory.storage.get_long_term_memory("이번 주 일정"))
+        self.assertEqual(memory.get_stats()["expirations"], 1)
+
+    def test_compaction_merges_similar_keys(self):
+        """비슷한 키는 가장 최근 값으로 병합하고 적중 수는 합산"""
+        memory = self.make_memory("compact")
+        memory.remember("name", "김철수")
+        memory.search("name 김철수")
+        memory.remember("사용자 거주지", "서울")
+        memory.remember("User-Name", "김영희")
+        memory.remember("거주지", "부산")
+        memory.remember("직업", "교사")
+        memory.flush_hits()
+
+        merges = memory.compact()
+        self.assertEqual(
+            sorted((m["kept"], tuple(m["merged"])) for m in merges),
+            [("User-Name", ("name",)), ("거주지", ("사용자 거주지",))]
+        )
+        self.assertEqual(memory.recall(), {"User-Name": "김영희", "거주지": "부산", "직업": "교사"})
+        self.assertEqual(memory.storage.get_long_term_metadata()["User-Name"]["hits"], 1)
+        self.assertEqual(memory.search("이름 name")[0][0], "User-Name")
+
+    def test_search_rereads_storage_only_after_changes(self):
+        """저장소가 바뀌지 않으면 검색마다 다시 읽지 않고, 다른 인스턴스의 변경과 만료는 반영"""
+        memory = self.make_memory("sync")
+        memory.remember("취미", "등산")
+        memory.search("취미")
+        syncs = memory.index_syncs
+        for _ in range(5):
+            self.assertEqual(memory.search("취미")[0], ("취미", "등산"))
+        self.assertEqual(memory.index_syncs, syncs)
+
+        other = JSONMemoryStorage(str(memory.storage.storage_path), flush_interval=0)
+        try:
+            other.set_long_term_memory("거주지", "부산")
+        finally:
+            other.close()
+        self.assertEqual(memory.search("거주지")[0], ("거주지", "부산"))
+
+        memory.remember("약속", "오늘 저녁 약속", ttl_seconds=0.2)
+        self.assertIn("약속", dict(memory.search("약속")))
+        time.sleep(0.3)
+        self.assertNotIn("약속", dict(memory.search("약속")))
+        self.assertEqual(memory.expirations, 1)
+
+    def test_compaction_keeps_distinct_facts_with_similar_keys(self):
+        """키만 비슷하고 값이 다른 항목은 지우지 않고 후보로만 보고, 값까지 같으면 병합"""
+        memory = self.make_memory("dated")
+        memory.remember("dentist_appointment_2026_10_01", "오전 10시 강남 치과")
+        memory.remember("dentist_appointment_2026_10_08", "오후 3시 강남 치과")
+
+        self.assertEqual(memory.compact(), [])
+        self.assertEqual(len(memory.recall()), 2)
+        self.assertEqual(memory.merge_candidates[0]["keys"], ["dentist_appointment_2026_10_01", "dentist_appointment_2026_10_08"])
+
+        memory.remember("dentist_appointment_2026_10_09", "오후 3시 강남 치과")
+        merges = memory.compact()
+        self.assertEqual(merges, [{"kept": "dentist_appointment_2026_10_09", "merged": ["dentist_appointment_2026_10_08"]}])
+        self.assertIn("dentist_appointment_2026_10_01", memory.recall())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from src.utils.text_search import HybridSearchIndex, char_ngrams
+
+
+FACTS = {
+    "이름": "김철수",
+    "거주지": "서울 강남구",
+    "좋아하는 음식": "김치찌개와 떡볶이",
+    "직업": "백엔드 개발자",
+    "반려동물": "고양이 두 마리 (나비, 초코)",
+}
+
+
+class TestHybridSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = HybridSearchIndex()
+        for key, value in FACTS.items():
+            self.index.add(key, f"{key}: {value}")
+
+    def test_korean_without_tokenizer(self):
+        """조사가 붙은 어절도 문자 n-gram으로 일치"""
+        self.assertEqual(self.index.search("서울에서 가까운 곳", 1)[0][0], "거주지")
+        self.assertEqual(self.index.search("떡볶이 먹고 싶다", 1)[0][0], "좋아하는 음식")
+        self.assertIn("^서울", char_ngrams("서울에서"))
+
+    def test_top_k_and_no_match(self):
+        """상위 k개만 반환하고 관련 없는 문서는 제외"""
+        self.assertLessEqual(len(self.index.search("고양이 이름", 2)), 2)
+        self.assertEqual(self.index.search("zzz"), [])
+
+    def test_incremental_update(self):
+        """추가/교체/삭제가 즉시 검색에 반영"""
+        self.index.remove("직업")
+        self.assertEqual(self.index.search("개발자"), [])
+
+        self.index.add("직업", "직업: 데이터 엔지니어")
+        self.index.add("거주지", "거주지: 부산 해운대")
+        self.assertEqual(self.index.search("엔지니어", 1)[0][0], "직업")
+        self.assertEqual(self.index.search("서울"), [])
+        self.assertEqual(len(self.index), len(FACTS))
+
+
+if __name__ == '__main__':
+    unittest.main()
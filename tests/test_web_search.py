@@ -0,0 +1,663 @@
+import asyncio
+import os
+import signal
+import tempfile
+import threading
+import time
+import unittest
+
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from src.agent.executor import ChainExecutor
+from src.agent.synthesizer import ResultSynthesizer
+from src.tools.doc_index import DocumentIndex
+from src.tools.http_client import HTTPClient, ResponseTooLarge
+from src.tools.page_fetcher import PageFetcher, extract_main_text
+from src.tools.parse_pool import ParsePool, ParseTimeout
+from src.tools.provider_guard import AdaptiveRateLimiter, CircuitBreaker
+from src.tools.query_builder import QueryBuilder
+from src.tools.router import ToolRouter
+from src.tools.search_cache import SearchCache, normalize_query
+from src.tools.search_providers import (
+    DocIndexProvider, DuckDuckGoHTMLProvider, LocalSearchProvider, ParseStats, SearchFanout, SearchProviderError,
+    _parse_duckduckgo_soup, canonical_url
+)
+from src.tools.web_search import WebSearch
+from src.utils.llm_backends import ScriptedBackend
+from src.utils.openai_client import OpenAIClient, set_openai_client
+
+RESULT_PAGE = """<html><body>
+<div class="result"><a class="result__a" href="//duckduckgo.com/l/?uddg=https%3A%2F%2Fexample.com%2Fseoul">서울 날씨</a>
+<a class="result__snippet">맑음, 최고 23도</a></div>
+<div class="result"><a class="result__a" href="https://example.com/busan">부산 날씨</a>
+<a class="result__snippet">흐림</a></div>
+</body></html>""".encode("utf-8")
+
+ARTICLE_PAGE = """<html><head><meta charset="utf-8"><script>var tracking = "날씨";</script></head><body>
+<nav><ul><li><a href="/">홈</a></li><li><a href="/weather">날씨 메뉴</a></li></ul></nav>
+<article><h1>서울 주간 날씨</h1>
+<p>서울은 내일 오전부터 비가 내리고 최고 기온은 18도로 평년보다 낮겠습니다.</p>
+<p><a href="/a">관련 기사 서울 날씨 더보기 링크 모음</a> 보기</p>
+<p>주말에는 맑고 일교차가 10도 이상 크게 벌어지겠습니다. 건강 관리에 유의하세요.</p></article>
+<footer><p>Copyright 2024 날씨 뉴스 All rights reserved.</p></footer>
+</body></html>""".encode("utf-8")
+
+LONG_ARTICLE_BODY = ("<p>" + "주간 예보 상세 설명입니다. 내일은 전국이 대체로 맑겠습니다. " * 4 + "</p>\n").encode("utf-8") * 2000
+
+
+def spin_parse(data: bytes, seconds: float) -> int:
+    """시간 제한 테스트용 파싱 흉내 (바이트코드 사이에서 SIGALRM으로 중단 가능)"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+    return len(data)
+
+
+def stuck_parse(data: bytes, seconds: float) -> int:
+    """작업 프로세스 안의 시간 제한이 듣지 않는 파싱 흉내"""
+    signal.signal(signal.SIGALRM, signal.SIG_IGN)
+    time.sleep(seconds)
+    return len(data)
+
+
+def crash_parse(data: bytes) -> int:
+    """작업 프로세스가 죽는 파싱 흉내"""
+    os._exit(1)
+
+
+class FakeSearchHandler(BaseHTTPRequestHandler):
+    """keep-alive를 지원하는 DuckDuckGo HTML 결과 페이지 흉내"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path == "/throttled/":
+            self._reply(b"Too Many Requests", status=429, headers={"Retry-After": "30"})
+        else:
+            self._reply(RESULT_PAGE)
+
+    def do_GET(self):
+        if self.path == "/article":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self._reply(ARTICLE_PAGE, etag='"v1"')
+        elif self.path == "/long":
+            # 본문이 아주 긴 기사 (프로세스 풀로 보낼 만큼 큰 페이지)
+            self._reply(ARTICLE_PAGE.replace(b"<footer>", LONG_ARTICLE_BODY + b"<footer>"))
+        elif self.path == "/slow":
+            # 조각을 천천히 보내는 페이지 (전체 시간 상한 확인)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.end_headers()
+            try:
+                for _ in range(20):
+                    self.wfile.write(("<p>" + "느린 페이지 본문입니다. " * 5 + "</p>").encode("utf-8"))
+                    self.wfile.flush()
+                    time.sleep(0.05)
+            except OSError:
+                pass
+            self.close_connection = True
+        else:
+            self._reply(b"x" * 100000 if self.path == "/large" else RESULT_PAGE)
+
+    def _reply(self, body: bytes, etag: str = None, status: int = 200, headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    """클라이언트가 응답 도중 연결을 끊어도 (크기 상한) 오류를 출력하지 않음"""
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+class TestWebSearchHTTP(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = QuietHTTPServer(("127.0.0.1", 0), FakeSearchHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.backend = ScriptedBackend([], default="서울은 맑음")
+        set_openai_client(OpenAIClient(backend=self.backend))
+        self.http_client = HTTPClient(connect_timeout=1, read_timeout=2, max_response_bytes=50000, pool_size=4)
+        self.cache = SearchCache(cache_path="")
+        self.provider = DuckDuckGoHTMLProvider(self.http_client, url=self.base_url + "/html/")
+        self.web_search = WebSearch(http_client=self.http_client, cache=self.cache, fanout=SearchFanout([self.provider]))
+
+    def tearDown(self):
+        self.http_client.close()
+        set_openai_client(None)
+
+    def test_search_reuses_connection(self):
+        """연속 검색은 keep-alive 연결 하나를 재사용"""
+        for i in range(5):
+            results = self.web_search.search(f"서울 날씨 {i}")
+        self.assertEqual([r["title"] for r in results], ["서울 날씨", "부산 날씨"])
+
+        stats = self.web_search.get_stats()["http"]
+        self.assertEqual(stats["requests"], 5)
+        self.assertEqual(stats["new_connections"], 1)
+        self.assertEqual(stats["reused_connections"], 4)
+
+    def test_asearch(self):
+        """비동기 검색 동시 실행"""
+        async def run():
+            return await asyncio.gather(*(self.web_search.asearch(f"검색 {i}") for i in range(4)))
+
+        for results in asyncio.run(run()):
+            self.assertEqual(results[0]["url"], "https://example.com/seoul")
+        self.assertLessEqual(self.http_client.get_stats()["new_connections"], 4)
+
+    def test_response_size_cap(self):
+        """응답 본문은 상한에서 자르거나 거절"""
+        response = self.http_client.get(self.base_url + "/large")
+        self.assertTrue(response.truncated)
+        self.assertEqual(len(response.content), 50000)
+        with self.assertRaises(ResponseTooLarge):
+            self.http_client.get(self.base_url + "/large", truncate=False)
+        self.assertEqual(self.http_client.get_stats()["truncated"], 1)
+
+    def test_connection_error_raises(self):
+        """연결 실패 시 가짜 결과 대신 예외 (실행기가 LLM으로 fallback)"""
+        self.provider.url = "http://127.0.0.1:9/html/"
+        with self.assertRaises(SearchProviderError):
+            self.web_search.search("서울 날씨")
+        self.assertEqual(self.http_client.get_stats()["errors"], 1)
+        self.assertEqual(self.web_search.get_stats()["providers"]["duckduckgo_html"]["failures"], 1)
+
+    def test_throttled_provider_fails_fast(self):
+        """429 응답이면 회로 차단기가 열려 다음 검색은 요청 없이 바로 실패"""
+        self.provider.url = self.base_url + "/throttled/"
+        with self.assertRaises(SearchProviderError):
+            self.web_search.search("서울 날씨")
+
+        start = time.perf_counter()
+        with self.assertRaises(SearchProviderError):
+            self.web_search.search("부산 날씨")
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertEqual(self.http_client.get_stats()["requests"], 1)
+
+        stats = self.web_search.get_stats()["providers"]["duckduckgo_html"]
+        self.assertEqual(stats["breaker"]["state"], "open")
+        self.assertGreater(stats["breaker"]["retry_in"], 25)
+        self.assertEqual(stats["rate_limit"]["throttled"], 1)
+
+    def test_cached_pipeline(self):
+        """조사/공백만 다른 질문은 검색어 생성·검색·요약을 다시 하지 않음"""
+        self.web_search.query_builder = None
+        self.backend.responses = ['{"query": "서울 날씨", "filters": {}}']
+        for question in ("서울의 날씨는?", "  서울  날씨는"):
+            query = self.web_search.generate_query(question)["query"]
+            summary = self.web_search.summarize_results(self.web_search.search(query), question)
+            self.assertEqual(summary, "서울은 맑음")
+
+        self.assertEqual(len(self.backend.calls), 2)
+        self.assertEqual(self.http_client.get_stats()["requests"], 1)
+        kinds = self.web_search.get_stats()["cache"]["kinds"]
+        self.assertEqual({kind: stats["hit_ratio"] for kind, stats in kinds.items()},
+                         {"query": 0.5, "results": 0.5, "summary": 0.5})
+
+    def test_router_answers_the_user_question(self):
+        """실행기의 웹 검색 단계는 생성한 검색어가 아니라 사용자 질문으로 요약"""
+        router = ToolRouter(web_search=self.web_search, mcp_client=mock.Mock())
+        with mock.patch("src.tools.router.ToolRouter", return_value=router), \
+                mock.patch("src.memory.persistent.PersistentMemory"):
+            executor = ChainExecutor()
+        question = "내일 부산 날씨 좀 알려줘"
+        step = executor.execute_step({"step": 1, "action": "검색", "tool": "web_search"}, question)
+
+        self.assertEqual(step.output, "서울은 맑음")
+        self.assertTrue(step.is_answer)
+        prompt = self.backend.calls[-1]["messages"][-1]["content"]
+        self.assertIn(f"질문: {question}", prompt)
+
+        # 같은 검색어라도 질문이 다르면 요약을 새로 만듦
+        query = self.web_search.generate_query(question)["query"]
+        router.route_tool_call("web_search", "search", {"query": query}, "내일 부산 비 와?")
+        self.assertEqual(len(self.backend.calls), 2)
+        self.assertEqual(self.http_client.get_stats()["requests"], 1)
+
+    def test_local_query_builder(self):
+        """단순한 요청은 로컬에서 검색어를 만들고, 맥락이 필요한 요청만 LLM 호출"""
+        self.backend.responses = ['{"query": "2024 아이폰 출시일", "filters": {}}']
+        info = self.web_search.generate_query("내일 부산 날씨 좀 알려줘")
+        self.assertEqual(info["source"], "local")
+        self.assertRegex(info["query"], r"^\d{4}년 \d{1,2}월 \d{1,2}일 부산 날씨$")
+        self.assertEqual(self.web_search.generate_query("그거 언제 나온다고 했지?")["query"], "2024 아이폰 출시일")
+
+        stats = self.web_search.get_stats()["query"]
+        self.assertEqual((stats["requests"], stats["local"], stats["llm_calls"]), (2, 1, 1))
+        self.assertEqual(stats["llm_call_rate"], 0.5)
+
+    def test_stale_while_revalidate(self):
+        """만료된 결과는 바로 반환하고 백그라운드에서 갱신"""
+        self.cache.ttls["results"] = 0.05
+        self.web_search.search("부산 날씨")
+        time.sleep(0.1)
+        self.assertEqual(self.web_search.search("부산 날씨")[0]["title"], "서울 날씨")
+        for _ in range(50):
+            if self.cache.get_stats()["kinds"]["results"]["refreshes"]:
+                break
+            time.sleep(0.02)
+        self.assertEqual(self.cache.get_stats()["kinds"]["results"]["stale_hits"], 1)
+        self.assertEqual(self.http_client.get_stats()["requests"], 2)
+
+    def test_deep_search_passages(self):
+        """상위 페이지 본문에서 관련 구절을 골라 요약 프롬프트에 추가"""
+        fetcher = PageFetcher(self.http_client, timeout=2, cache_ttl=0)
+        web_search = WebSearch(
+            http_client=self.http_client,
+            cache=self.cache,
+            fanout=SearchFanout([LocalSearchProvider([
+                {"title": "서울 주간 날씨", "snippet": "비 소식", "url": self.base_url + "/article"}
+            ])]),
+            page_fetcher=fetcher
+        )
+        results = web_search.search("서울 날씨")
+        web_search.summarize_results(results, "서울 내일 최고 기온", deep=True)
+
+        prompt = self.backend.calls[-1]["messages"][-1]["content"]
+        self.assertIn("본문 발췌:", prompt)
+        self.assertIn("최고 기온은 18도", prompt)
+        self.assertNotIn("Copyright", prompt)
+
+        # 유효 시간이 지난 본문은 ETag로 재검증
+        self.assertTrue(fetcher.fetch(self.base_url + "/article"))
+        self.assertEqual(fetcher.get_stats()["fetched"], 1)
+        self.assertEqual(fetcher.get_stats()["not_modified"], 1)
+
+    def test_large_page_offload_stops_early(self):
+        """큰 페이지는 프로세스 풀에서 추출하되, 본문 글자 수 상한을 채울 만큼만 받음"""
+        pool = ParsePool(max_workers=1, task_timeout=2.0, min_bytes=16384)
+        pool.start(wait=True)
+        try:
+            fetcher = PageFetcher(self.http_client, timeout=2, max_bytes=len(LONG_ARTICLE_BODY) * 2, max_chars=20000, parse_pool=pool)
+            blocks = fetcher.fetch(self.base_url + "/long")
+        finally:
+            pool.shutdown()
+        self.assertEqual(blocks[0], "서울 주간 날씨")
+        self.assertGreaterEqual(sum(len(block) for block in blocks), 20000)
+        self.assertEqual(fetcher.get_stats()["early_stops"], 1)
+        self.assertEqual(pool.get_stats()["offloaded"], 1)
+        self.assertLess(self.http_client.get_stats()["bytes_read"], len(LONG_ARTICLE_BODY) // 4)
+
+    def test_page_time_limit(self):
+        """느리게 오는 페이지는 시간 상한에서 받은 만큼만 사용"""
+        fetcher = PageFetcher(self.http_client, timeout=0.3)
+        start = time.perf_counter()
+        blocks = fetcher.fetch(self.base_url + "/slow")
+        self.assertLess(time.perf_counter() - start, 0.8)
+        self.assertTrue(0 < len(blocks) < 20)
+        self.assertEqual(fetcher.get_stats()["timeouts"], 1)
+
+
+class TestSearchCache(unittest.TestCase):
+    def test_normalize_query(self):
+        """공백, 대소문자, 문장 부호, 조사 정규화"""
+        self.assertEqual(normalize_query("  서울의   날씨는? "), "서울 날씨")
+        self.assertEqual(normalize_query("Python 3.12 릴리스를"), "python 3.12 릴리스")
+        self.assertEqual(normalize_query("주가 나이"), "주가 나이")
+
+        # 기호가 뜻을 바꾸는 토큰과 단어 일부일 수 있는 한 글자 조사는 유지
+        keys = {normalize_query(q) for q in ("C++ 강의", "C# 강의", "C 강의")}
+        self.assertEqual(len(keys), 3)
+        self.assertNotEqual(normalize_query("고양이 분양"), normalize_query("고양 분양"))
+        self.assertEqual(normalize_query("경기도 날씨"), "경기도 날씨")
+
+    def test_persistence(self):
+        """재시작 후에도 유효한 항목 유지, 만료된 항목은 버림"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.json")
+            cache = SearchCache(cache_path=path, ttls={"results": 60, "summary": 0}, stale_ttl=0)
+            cache.put("results", "서울 날씨", [{"title": "t", "snippet": "", "url": "u"}])
+            cache.put("summary", "서울 날씨", "요약")
+            cache.save()
+
+            reloaded = SearchCache(cache_path=path, ttls={"results": 60, "summary": 0}, stale_ttl=0)
+            self.assertEqual(reloaded.get("results", "서울 날씨"), ([{"title": "t", "snippet": "", "url": "u"}], True))
+            self.assertIsNone(reloaded.get("summary", "서울 날씨"))
+
+class TestAnswerSynthesis(unittest.TestCase):
+    def setUp(self):
+        self.backend = ScriptedBackend([], default="통합 응답")
+        set_openai_client(OpenAIClient(backend=self.backend))
+
+    def tearDown(self):
+        set_openai_client(None)
+
+    def test_web_search_answer_skips_synthesis(self):
+        """웹 검색 요약이 이미 답변이면 결과 통합 LLM을 다시 호출하지 않음"""
+        step = {"step_number": 1, "status": "completed", "output": "부산은 맑음", "tool_used": "web_search", "is_answer": True}
+        result = {"status": "completed", "steps": [step], "final_output": "부산은 맑음"}
+        self.assertEqual(ResultSynthesizer().synthesize("부산 날씨", result), "부산은 맑음")
+        self.assertEqual(len(self.backend.calls), 0)
+
+        # 실패한 검색 뒤 LLM fallback 답변도 그대로 사용
+        failed = {"step_number": 1, "status": "failed", "output": None, "tool_used": "web_search", "is_answer": False}
+        fallback = {"step_number": 1, "status": "fallback", "output": "LLM 답변", "tool_used": "llm", "is_answer": True}
+        result = {"status": "completed", "steps": [failed, fallback], "final_output": "LLM 답변"}
+        self.assertEqual(ResultSynthesizer().synthesize("부산 날씨", result), "LLM 답변")
+
+        # 요약에 실패한 검색 결과 목록이나 여러 단계 결과는 통합
+        step = dict(step, output="1. 부산 날씨\n   출처: https://example.com", is_answer=False)
+        result = {"status": "completed", "steps": [step], "final_output": step["output"]}
+        self.assertEqual(ResultSynthesizer().synthesize("부산 날씨", result), "통합 응답")
+        self.assertEqual(len(self.backend.calls), 1)
+
+
+class TestQueryBuilder(unittest.TestCase):
+    def test_relative_dates_and_filler(self):
+        """상대 날짜는 절대 날짜로, 대화체 군더더기와 조사는 제거"""
+        builder = QueryBuilder(gazetteer_file="")
+        today = date(2024, 5, 1)  # 수요일
+        cases = {
+            "내일 부산 날씨 알려줘": "2024년 5월 2일 부산 날씨",
+            "이번 주말 제주도 날씨 어때?": "2024년 5월 4일~5월 5일 제주도 날씨",
+            "다음 주 금요일에 삼성전자 주가는": "2024년 5월 10일 삼성전자 주가",
+            "지난 달 환율 좀 검색해줘": "2024년 4월 환율",
+            "고양이 사료 추천해줘": "고양이 사료 추천",
+        }
+        for user_input, query in cases.items():
+            result = builder.build(user_input, today)
+            self.assertEqual(result["query"], query)
+            self.assertGreaterEqual(result["confidence"], 0.6)
+
+        result = builder.build("이번 주에 서울이 더워?", today)
+        self.assertEqual(result["dates"][0]["start"], "2024-04-29")
+        self.assertEqual(result["dates"][0]["end"], "2024-05-05")
+        self.assertEqual(result["entities"], [{"text": "서울", "type": "location"}])
+        self.assertLess(builder.build("그거 다시 찾아줘", today)["confidence"], 0.6)
+
+    def test_relative_weekday_without_week(self):
+        """"지난 월요일"은 지난 날짜로, 해석하지 못한 기간 표현이 남으면 신뢰도를 낮춤"""
+        builder = QueryBuilder(gazetteer_file="")
+        monday = date(2026, 10, 19)
+        self.assertEqual(builder.build("지난 월요일 코스피 종가", monday)["query"], "2026년 10월 12일 코스피 종가")
+        self.assertEqual(builder.build("저번 금요일 코스피 종가", monday)["query"], "2026년 10월 16일 코스피 종가")
+        self.assertEqual(builder.build("다음 월요일 날씨", monday)["query"], "2026년 10월 26일 날씨")
+        self.assertEqual(builder.build("이번 수요일 날씨", monday)["query"], "2026년 10월 21일 날씨")
+        self.assertLess(builder.build("지난 회의 코스피 종가", monday)["confidence"], 0.6)
+
+
+class TestMainTextExtraction(unittest.TestCase):
+    def test_skips_boilerplate(self):
+        """script/nav/footer와 링크 위주 블록 제외"""
+        blocks = extract_main_text(ARTICLE_PAGE)
+        self.assertEqual(blocks[0], "서울 주간 날씨")
+        self.assertEqual(len(blocks), 3)
+        self.assertFalse(any("tracking" in b or "메뉴" in b or "더보기" in b for b in blocks))
+
+    def test_streaming_matches_whole_document(self):
+        """작은 조각으로 나눠 넣어도 같은 결과, 글자 수 상한에서 멈춤"""
+        from src.tools.page_fetcher import MainTextExtractor
+        extractor = MainTextExtractor()
+        for i in range(0, len(ARTICLE_PAGE), 7):
+            extractor.feed(ARTICLE_PAGE[i:i + 7])
+        self.assertEqual(extractor.close(), extract_main_text(ARTICLE_PAGE))
+        self.assertEqual(len(extract_main_text(ARTICLE_PAGE, max_chars=5)), 1)
+
+
+LOCAL_DOCS = [
+    {"title": "서울 날씨 예보", "snippet": "서울 내일 맑음", "url": "https://weather.example.com/seoul"},
+    {"title": "부산 날씨 예보", "snippet": "부산 내일 비", "url": "https://weather.example.com/busan"},
+    {"title": "서울 맛집", "snippet": "종로 칼국수", "url": "https://food.example.com/seoul"},
+]
+
+
+class TestParsePool(unittest.TestCase):
+    def setUp(self):
+        self.pool = ParsePool(max_workers=1, task_timeout=0.3, min_bytes=1024)
+        self.pool.start(wait=True)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_large_input_is_offloaded(self):
+        """작은 입력은 호출한 스레드에서, 큰 입력은 작업 프로세스에서 파싱"""
+        self.assertEqual(self.pool.run(extract_main_text, ARTICLE_PAGE), extract_main_text(ARTICLE_PAGE))
+        page = ARTICLE_PAGE.replace(b"<footer>", b"<p>" + "주간 예보 상세 설명입니다. ".encode("utf-8") * 200 + b"</p><footer>")
+        self.assertEqual(self.pool.run(extract_main_text, page), extract_main_text(page))
+        stats = self.pool.get_stats()
+        self.assertEqual((stats["inline"], stats["offloaded"]), (1, 1))
+
+    @unittest.skipUnless(hasattr(signal, "setitimer"), "SIGALRM 필요")
+    def test_runaway_parse_is_stopped(self):
+        """시간 제한을 넘은 작업은 작업 프로세스 안에서 중단, 그래도 끝나지 않으면 프로세스를 종료"""
+        data = b"x" * 2048
+        with self.assertRaises(ParseTimeout):
+            self.pool.run(spin_parse, data, 5.0)
+        self.assertEqual(self.pool.get_stats()["kills"], 0)
+
+        start = time.perf_counter()
+        with self.assertRaises(ParseTimeout):
+            self.pool.run(stuck_parse, data, 30.0)
+        self.assertLess(time.perf_counter() - start, 3.0)
+        self.assertEqual(self.pool.get_stats()["kills"], 1)
+        self.assertEqual(self.pool.run(spin_parse, data, 0.0), len(data))
+
+    def test_broken_pool_fails_instead_of_running_inline(self):
+        """작업 프로세스가 죽으면 시간 제한 없는 재실행 대신 ParseTimeout, 다음 작업은 새 풀에서"""
+        with self.assertRaises(ParseTimeout):
+            self.pool.run(crash_parse, b"x" * 2048)
+        self.assertEqual(self.pool.get_stats()["broken"], 1)
+        self.assertEqual(self.pool.get_stats()["inline"], 0)
+
+        self.pool.start(wait=True)
+        self.assertEqual(self.pool.run(spin_parse, b"x" * 2048, 0.0), 2048)
+        self.assertEqual(self.pool.get_stats()["offloaded"], 1)
+
+
+class TestResultParsing(unittest.TestCase):
+    def test_lxml_stops_after_max_results(self):
+        """lxml 경로가 필요한 개수만 추출하고 파싱 시간을 기록"""
+        stats = ParseStats()
+        page = RESULT_PAGE.replace(b"</body>", b"<div class=\"result\"><b>" * 5000 + b"</body>")
+        results = DuckDuckGoHTMLProvider.parse(page, 1, stats=stats)
+        self.assertEqual(results, [{"title": "서울 날씨", "snippet": "맑음, 최고 23도", "url": "https://example.com/seoul"}])
+        self.assertEqual(DuckDuckGoHTMLProvider.parse(RESULT_PAGE, 5), _parse_duckduckgo_soup(RESULT_PAGE, 5))
+        self.assertEqual(stats.to_dict()["parsers"]["lxml"]["parses"], 1)
+        self.assertEqual(stats.to_dict()["fallbacks"], 0)
+
+    def test_beautifulsoup_fallback_on_layout_change(self):
+        """결과 블록 구조가 바뀌면 BeautifulSoup 경로로 결과 제목 링크를 찾음"""
+        stats = ParseStats()
+        page = RESULT_PAGE.replace(b'<div class="result">', b'<article class="web-result">').replace(b"</div>", b"</article>")
+        results = DuckDuckGoHTMLProvider.parse(page, 5, stats=stats)
+        self.assertEqual([r["url"] for r in results], ["https://example.com/seoul", "https://example.com/busan"])
+        self.assertEqual(results[1]["snippet"], "흐림")
+        self.assertEqual(stats.to_dict()["fallbacks"], 1)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestProviderGuard(unittest.TestCase):
+    def test_circuit_breaker_half_open_probe(self):
+        """연속 실패로 열리고, 대기 후 시험 요청 하나만 허용, 실패하면 대기 시간 두 배"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=3, cooldown=10, max_cooldown=60, clock=clock)
+        for _ in range(3):
+            self.assertTrue(breaker.allow())
+            breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        clock.now += 10
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.retry_in(), 20)
+
+        clock.now += 20
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.to_dict()["state"], "closed")
+        self.assertTrue(breaker.allow())
+
+    def test_rate_limiter_adapts_to_throttling(self):
+        """버스트를 넘으면 대기/거절, 429를 받으면 속도를 줄이고 Retry-After 동안 차단"""
+        clock = FakeClock()
+        limiter = AdaptiveRateLimiter(rate=2.0, burst=2, clock=clock)
+        self.assertEqual([limiter.reserve(), limiter.reserve()], [0.0, 0.0])
+        self.assertIsNone(limiter.reserve())
+        self.assertEqual(limiter.reserve(max_wait=1.0), 0.5)
+
+        limiter.on_throttle(retry_after=5)
+        self.assertEqual(limiter.rate, 1.0)
+        self.assertFalse(limiter.available(max_wait=1.0))
+        clock.now += 5
+        self.assertTrue(limiter.available())
+        limiter.on_success()
+        self.assertAlmostEqual(limiter.rate, 1.2)
+
+
+class TestSearchFanout(unittest.TestCase):
+    def test_merge_dedupes_by_url(self):
+        """여러 제공자 결과를 URL 기준으로 합치고 양쪽에서 나온 결과를 위로"""
+        mirror = [dict(doc, url=doc["url"].replace("https://", "http://www.") + "/?utm_source=x") for doc in LOCAL_DOCS]
+        mirror[0]["snippet"] = "서울 내일 맑음, 최고 23도"
+        fanout = SearchFanout([
+            LocalSearchProvider(LOCAL_DOCS[1:], name="a"),
+            LocalSearchProvider(mirror[:1], name="b"),
+            LocalSearchProvider(mirror, name="c"),
+        ], fanout=3, grace=1.0)
+
+        results = fanout.search("서울 날씨", max_results=3)
+        self.assertEqual(canonical_url(results[0]["url"]), "//weather.example.com/seoul")
+        self.assertEqual(results[0]["snippet"], "서울 내일 맑음, 최고 23도")
+        self.assertEqual(sorted(results[0]["providers"]), ["b", "c"])
+        self.assertEqual(len({canonical_url(r["url"]) for r in results}), len(results))
+
+    def test_deadline_and_first_good_wins(self):
+        """느린 제공자는 기다리지 않고, 통계에 반영되어 다음 선택에서 밀림"""
+        fast = LocalSearchProvider(LOCAL_DOCS, name="fast", weight=0.5)
+        slow = LocalSearchProvider(LOCAL_DOCS, name="slow", weight=1.0, latency=0.5)
+        fanout = SearchFanout([slow, fast], fanout=2, deadline=2.0, grace=0.05)
+
+        start = time.perf_counter()
+        results = fanout.search("부산 날씨")
+        self.assertLess(time.perf_counter() - start, 0.4)
+        self.assertEqual(results[0]["providers"], ["fast"])
+        self.assertEqual(fanout.get_stats()["slow"]["deadline_misses"], 1)
+
+    def test_failing_provider_is_deprioritized(self):
+        """실패가 이어지는 제공자는 선택에서 밀려나고, 전부 실패하면 예외"""
+        broken = LocalSearchProvider(LOCAL_DOCS, name="broken", fail=True)
+        healthy = LocalSearchProvider(LOCAL_DOCS, name="healthy", weight=0.5)
+        fanout = SearchFanout([broken, healthy], fanout=1)
+
+        self.assertEqual([p.name for p in fanout.select()], ["broken"])
+        with self.assertRaises(SearchProviderError):
+            fanout.search("서울 날씨")
+        self.assertEqual([p.name for p in fanout.select()], ["healthy"])
+        self.assertTrue(fanout.search("서울 날씨"))
+        self.assertEqual(fanout.search("서울 날씨", providers=["healthy"])[0]["providers"], ["healthy"])
+
+    def test_first_tier_before_web(self):
+        """1차 제공자 결과가 있으면 웹 제공자를 질의하지 않고, 없으면 웹 결과로 보충"""
+        index = DocumentIndex(tempfile.mkdtemp())
+        index.add_documents([{"id": "refund", "url": "https://docs.example.com/refund", "title": "환불 정책", "text": "구매 후 7일 이내 전액 환불"}])
+        web = LocalSearchProvider(LOCAL_DOCS, name="web")
+        fanout = SearchFanout([DocIndexProvider(index), web], fanout=2, first_tier=["docs"])
+
+        self.assertEqual([r["url"] for r in fanout.search("환불 정책")], ["https://docs.example.com/refund"])
+        self.assertEqual(fanout.get_stats()["web"]["calls"], 0)
+        self.assertEqual(fanout.search("서울 날씨")[0]["providers"], ["web"])
+        self.assertEqual(fanout.search("환불 정책", providers=["web"]), [])
+
+
+class TestDocumentIndex(unittest.TestCase):
+    def setUp(self):
+        self.source_dir = tempfile.mkdtemp()
+        self.index_dir = tempfile.mkdtemp()
+        self._write("faq/refund.md", "# 환불 정책\n\n구매 후 **7일 이내**에는 [고객센터](https://example.com)에서 환불을 요청할 수 있습니다.\n")
+        self._write("install.html", "<html><head><title>설치 가이드</title></head><body><nav><a href='/'>홈</a></nav>"
+                                    "<p>pip install 명령으로 패키지를 설치한 뒤 환경 변수 파일을 준비하세요.</p></body></html>")
+
+    def _write(self, name: str, text: str):
+        path = os.path.join(self.source_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_directory_sync_is_incremental(self):
+        """바뀐 파일만 다시 색인하고, 삭제된 파일은 검색에서 제외되며, 다시 열어도 유지"""
+        index = DocumentIndex(self.index_dir)
+        self.assertEqual(index.sync_directory(self.source_dir, "https://docs.example.com")["added"], 2)
+        hit = index.search("환불 정책", top_k=1)[0]
+        self.assertEqual((hit["title"], hit["url"]), ("환불 정책", "https://docs.example.com/faq/refund.md"))
+        self.assertNotIn("**", hit["snippet"])
+        self.assertEqual(index.search("pip 설치", top_k=1)[0]["title"], "설치 가이드")
+
+        self._write("faq/refund.md", "# 반품 안내\n\n반품은 14일 이내에 접수하세요.\n")
+        os.remove(os.path.join(self.source_dir, "install.html"))
+        counts = index.sync_directory(self.source_dir)
+        self.assertEqual((counts["updated"], counts["deleted"]), (1, 1))
+        self.assertEqual(index.search("pip 설치"), [])
+        self.assertEqual(index.search("반품", top_k=1)[0]["id"], "faq/refund.md")
+
+        reopened = DocumentIndex(self.index_dir)
+        self.assertEqual(len(reopened), 1)
+        self.assertEqual(reopened.sync_directory(self.source_dir)["unchanged"], 1)
+        self.assertEqual(reopened.search("반품", top_k=1)[0]["title"], "반품 안내")
+
+    def test_instances_sharing_directory_see_each_others_writes(self):
+        """같은 디렉토리를 연 다른 인스턴스(워커 프로세스)의 쓰기를 덮어쓰거나 지우지 않고 다시 읽음"""
+        first = DocumentIndex(self.index_dir)
+        second = DocumentIndex(self.index_dir)
+        first.add_documents([{"id": "a", "title": "서버 점검", "text": "서버 점검 안내"}])
+        self.assertEqual([hit["id"] for hit in second.search("서버 점검")], ["a"])
+
+        second.add_documents([{"id": "b", "title": "요금 안내", "text": "요금제 변경 안내"}])
+        first.delete(["a"])
+        self.assertEqual(len(first), 1)
+        self.assertEqual([hit["id"] for hit in second.search("요금 안내")], ["b"])
+        self.assertEqual(second.search("서버 점검"), [])
+
+        DocumentIndex(self.index_dir)
+        self.assertEqual([hit["id"] for hit in first.search("요금 안내")], ["b"])
+        self.assertEqual(first.sync_directory(self.source_dir)["added"], 2)
+        self.assertEqual(second.sync_directory(self.source_dir)["unchanged"], 2)
+
+    def test_segments_merge_and_min_score(self):
+        """세그먼트가 상한을 넘으면 살아 있는 문서만 하나로 병합, 점수가 낮은 결과는 제외"""
+        index = DocumentIndex(self.index_dir, max_segments=3)
+        for i in range(4):
+            index.add_documents([{"id": f"doc{i}", "title": f"공지 {i}", "text": f"서버 점검 안내 {i}"}])
+        index.delete(["doc0"])
+        self.assertEqual(index.get_stats()["segments"], 1)
+        self.assertEqual(sorted(os.listdir(self.index_dir)), ["index.lock", "manifest.json", "seg-000005"])
+        self.assertEqual(sorted(hit["id"] for hit in index.search("서버 점검")), ["doc1", "doc2", "doc3"])
+        self.assertEqual(index.search("점검 일정 알려줘", min_score=0.9), [])
+
+
+if __name__ == "__main__":
+    unittest.main()